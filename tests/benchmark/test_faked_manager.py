@@ -0,0 +1,66 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for listing faked resources with filter arguments in the
+zhmcclient_mock package (_hmc module), with and without property indexes.
+"""
+
+from __future__ import absolute_import, print_function
+
+import pytest
+
+from tests.benchmark.utils import large_faked_session, partition_name, \
+    PARTITIONS_PER_CPC
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(scope='module')
+def hmc():
+    """
+    Faked HMC with a large topology, shared by all benchmarks in this module.
+    """
+    return large_faked_session().hmc
+
+
+@pytest.mark.benchmark(group='faked-list')
+@pytest.mark.parametrize("indexed", [True, False])
+def test_partition_list_name(benchmark, hmc, indexed):
+    """Benchmark FakedPartitionManager.list() filtered by name."""
+
+    manager = hmc.cpcs.list()[0].partitions
+    if not indexed:
+        manager.indexed_props = ()
+    name = partition_name(0, PARTITIONS_PER_CPC - 1)
+    try:
+        partitions = benchmark(manager.list, {'name': name})
+    finally:
+        vars(manager).pop('indexed_props', None)
+
+    assert len(partitions) == 1
+
+
+@pytest.mark.benchmark(group='faked-list')
+@pytest.mark.parametrize("indexed", [True, False])
+def test_partition_list_status(benchmark, hmc, indexed):
+    """Benchmark FakedPartitionManager.list() filtered by status."""
+
+    manager = hmc.cpcs.list()[0].partitions
+    if not indexed:
+        manager.indexed_props = ()
+    try:
+        benchmark(manager.list, {'status': 'active'})
+    finally:
+        vars(manager).pop('indexed_props', None)
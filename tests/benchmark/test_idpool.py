@@ -0,0 +1,56 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for allocating and freeing ID values in the zhmcclient_mock
+package (_idpool module), as done for the device numbers and WWPNs of
+faked partitions.
+"""
+
+from __future__ import absolute_import, print_function
+
+import pytest
+
+from zhmcclient_mock import IdPool
+
+pytest.importorskip('pytest_benchmark')
+
+COUNT = 1000
+
+
+def test_alloc_free(benchmark):
+    """Benchmark allocating and freeing ID values one by one."""
+
+    def alloc_free():
+        pool = IdPool(0x8000, 0xFFFF)
+        ids = [pool.alloc() for _ in range(COUNT)]
+        for id in ids[::2]:
+            pool.free(id)
+        return [pool.alloc() for _ in range(COUNT // 2)]
+
+    ids = benchmark(alloc_free)
+
+    assert ids[0] == 0x8000
+
+
+def test_alloc_many(benchmark):
+    """Benchmark allocating ID values in bulk."""
+
+    def alloc_many():
+        pool = IdPool(0x8000, 0xFFFF)
+        return pool.alloc_many(COUNT)
+
+    ids = benchmark(alloc_many)
+
+    assert len(ids) == COUNT
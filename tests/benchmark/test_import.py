@@ -0,0 +1,57 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for the time to import the zhmcclient package in a new Python
+interpreter, which is paid by every invocation of short-lived programs.
+"""
+
+from __future__ import absolute_import, print_function
+
+import sys
+import subprocess
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+ROUNDS = 10
+
+
+def run_python(code):
+    """
+    Run Python code in a new Python interpreter.
+    """
+    subprocess.check_call([sys.executable, '-c', code])
+
+
+def test_python(benchmark):
+    """Benchmark starting a Python interpreter, for comparison."""
+
+    benchmark.pedantic(run_python, args=('pass',), rounds=ROUNDS)
+
+
+def test_import(benchmark):
+    """Benchmark importing the zhmcclient package."""
+
+    benchmark.pedantic(run_python, args=('import zhmcclient',),
+                       rounds=ROUNDS)
+
+
+def test_import_client(benchmark):
+    """Benchmark importing the zhmcclient package and accessing the classes
+    needed for connecting to an HMC."""
+
+    code = "import zhmcclient; zhmcclient.Session; zhmcclient.Client"
+
+    benchmark.pedantic(run_python, args=(code,), rounds=ROUNDS)
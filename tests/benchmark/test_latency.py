@@ -0,0 +1,80 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for retrieving resource properties sequentially and in parallel,
+against a faked HMC with injected latency.
+"""
+
+from __future__ import absolute_import, print_function
+
+from multiprocessing.pool import ThreadPool
+import pytest
+
+from zhmcclient import Client
+from zhmcclient_mock import TopologyGenerator, FaultInjector
+
+pytest.importorskip('pytest_benchmark')
+
+# Latency of each HMC operation in seconds
+LATENCY = 0.005
+
+PARTITIONS = 50
+THREADS = 10
+
+
+@pytest.fixture(scope='module')
+def partitions():
+    """
+    Partitions of a faked HMC whose operations have a latency.
+    """
+    generator = TopologyGenerator(cpcs=1, partitions=PARTITIONS, seed=1)
+    session = generator.faked_session()
+    injector = FaultInjector(seed=1)
+    injector.add_latency((LATENCY * 0.5, LATENCY * 1.5))
+    session.fault_injector = injector
+    cpc = Client(session).cpcs.list()[0]
+    return cpc.partitions.list()
+
+
+def pull(partition):
+    """Retrieve the full properties of a partition."""
+    partition.pull_full_properties()
+
+
+@pytest.mark.benchmark(group='latency')
+def test_pull_sequential(benchmark, partitions):
+    """Benchmark retrieving the properties of partitions sequentially."""
+
+    def pull_all():
+        for partition in partitions:
+            pull(partition)
+
+    benchmark.pedantic(pull_all, rounds=3)
+
+
+@pytest.mark.benchmark(group='latency')
+def test_pull_parallel(benchmark, partitions):
+    """Benchmark retrieving the properties of partitions in threads."""
+
+    pool = ThreadPool(THREADS)
+
+    def pull_all():
+        pool.map(pull, partitions)
+
+    try:
+        benchmark.pedantic(pull_all, rounds=3)
+    finally:
+        pool.close()
+        pool.join()
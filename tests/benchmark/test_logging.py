@@ -0,0 +1,85 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for the overhead of the logged_api_call decorator of the
+zhmcclient package (_logging module).
+"""
+
+from __future__ import absolute_import, print_function
+
+import logging
+import pytest
+
+from zhmcclient import API_LOGGER_NAME
+from zhmcclient._logging import logged_api_call
+
+pytest.importorskip('pytest_benchmark')
+
+
+def plain_func(a, b=None):
+    """Function without the decorator."""
+    return a
+
+
+@logged_api_call
+def logged_func(a, b=None):
+    """Function with the decorator."""
+    return a
+
+
+CALLS = 10000
+
+
+def call_many(func):
+    """Call a function many times."""
+    for i in range(CALLS):
+        func(i, b='x')
+
+
+@pytest.fixture
+def debug_logging():
+    """
+    Enable the API logger at debug level with a handler that discards the
+    log records, and restore the logger afterwards.
+    """
+    logger = logging.getLogger(API_LOGGER_NAME)
+    saved_level = logger.level
+    handler = logging.NullHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield
+    logger.removeHandler(handler)
+    logger.setLevel(saved_level)
+
+
+@pytest.mark.benchmark(group='logged_api_call')
+def test_undecorated(benchmark):
+    """Benchmark calls of a function without the decorator (reference)."""
+
+    benchmark(call_many, plain_func)
+
+
+@pytest.mark.benchmark(group='logged_api_call')
+def test_logging_disabled(benchmark):
+    """Benchmark calls of a decorated function with logging disabled."""
+
+    benchmark(call_many, logged_func)
+
+
+@pytest.mark.benchmark(group='logged_api_call')
+def test_logging_enabled(benchmark, debug_logging):
+    """Benchmark calls of a decorated function with debug logging."""
+
+    benchmark(call_many, logged_func)
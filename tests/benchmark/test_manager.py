@@ -0,0 +1,178 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for the resource manager hot paths of the zhmcclient package
+(_manager module), against a faked HMC with a large topology.
+"""
+
+from __future__ import absolute_import, print_function
+
+import pytest
+
+from zhmcclient import Client
+
+from tests.benchmark.utils import large_faked_session, cpc_name, \
+    partition_name, PARTITIONS_PER_CPC, NICS_PER_PARTITION, \
+    CPC_COUNT, STORAGE_GROUPS_PER_CPC
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(scope='module')
+def client():
+    """
+    Client for a faked session with a large topology, shared by all
+    benchmarks in this module.
+    """
+    return Client(large_faked_session())
+
+
+@pytest.fixture(scope='module')
+def cpc(client):
+    """
+    First CPC of the large topology.
+    """
+    return client.cpcs.find_by_name(cpc_name(0))
+
+
+def test_cpc_list(benchmark, client):
+    """Benchmark CpcManager.list()."""
+
+    cpcs = benchmark(client.cpcs.list)
+
+    assert len(cpcs) == CPC_COUNT
+
+
+def test_partition_list(benchmark, cpc):
+    """Benchmark PartitionManager.list() for all partitions of a CPC."""
+
+    partitions = benchmark(cpc.partitions.list)
+
+    assert len(partitions) == PARTITIONS_PER_CPC
+
+
+def test_partition_list_server_filter(benchmark, cpc):
+    """Benchmark PartitionManager.list() with server-side filtering."""
+
+    filter_args = {'status': 'active'}
+
+    partitions = benchmark(cpc.partitions.list, filter_args=filter_args)
+
+    # See large_topology_generator() for the generated status
+    assert len(partitions) == \
+        len([i for i in range(PARTITIONS_PER_CPC) if i % 3])
+
+
+def test_partition_list_client_filter(benchmark, cpc):
+    """Benchmark PartitionManager.list() with client-side filtering."""
+
+    filter_args = {'description': 'Partition #1.*',
+                   'ifl-processors': [1, 2, 3]}
+
+    partitions = benchmark(cpc.partitions.list, filter_args=filter_args)
+
+    # See large_topology_generator() for the generated description and
+    # number of IFL processors
+    assert len(partitions) == \
+        len([i for i in range(PARTITIONS_PER_CPC)
+             if str(i).startswith('1') and 1 + i % 8 in (1, 2, 3)])
+
+
+def test_partition_list_full_properties(benchmark, cpc):
+    """Benchmark PartitionManager.list() with full properties."""
+
+    partitions = benchmark(cpc.partitions.list, full_properties=True)
+
+    assert len(partitions) == PARTITIONS_PER_CPC
+
+
+def test_nic_list(benchmark, cpc):
+    """Benchmark NicManager.list() for the NICs of a partition."""
+
+    partition = cpc.partitions.find_by_name(partition_name(0, 0))
+
+    nics = benchmark(partition.nics.list)
+
+    assert len(nics) == NICS_PER_PARTITION
+
+
+def test_storage_group_list(benchmark, client):
+    """Benchmark StorageGroupManager.list()."""
+
+    storage_groups = benchmark(client.consoles.console.storage_groups.list)
+
+    assert len(storage_groups) == CPC_COUNT * STORAGE_GROUPS_PER_CPC
+
+
+def test_matches_filters(benchmark, cpc):
+    """Benchmark BaseManager._matches_filters() for many resources."""
+
+    partitions = cpc.partitions.list(full_properties=True)
+    manager = cpc.partitions
+    filter_args = {'name': 'CPC00-P.*[13579]',
+                   'type': ['linux', 'ssc'],
+                   'ifl-processors': 2}
+
+    def match_all():
+        return [p for p in partitions
+                if manager._matches_filters(p, filter_args)]
+
+    matches = benchmark(match_all)
+
+    # See large_topology_generator() for the generated number of IFL
+    # processors. All generated partitions have one of the types.
+    assert len(matches) == \
+        len([i for i in range(PARTITIONS_PER_CPC) if i % 2 and i % 8 == 1])
+
+
+def test_find_by_name_cached(benchmark, cpc):
+    """Benchmark PartitionManager.find_by_name() with a populated
+    Name-URI cache."""
+
+    names = [partition_name(0, p) for p in range(PARTITIONS_PER_CPC)]
+    cpc.partitions.find_by_name(names[0])  # populate the Name-URI cache
+
+    def find_all():
+        return [cpc.partitions.find_by_name(name) for name in names]
+
+    partitions = benchmark(find_all)
+
+    assert len(partitions) == PARTITIONS_PER_CPC
+
+
+def test_find_by_name_uncached(benchmark, cpc):
+    """Benchmark PartitionManager.find_by_name() including the refresh of
+    the Name-URI cache."""
+
+    name = partition_name(0, PARTITIONS_PER_CPC - 1)
+
+    def find_one():
+        cpc.partitions.invalidate_cache()
+        return cpc.partitions.find_by_name(name)
+
+    partition = benchmark(find_one)
+
+    assert partition.name == name
+
+
+def test_find_client_filter(benchmark, cpc):
+    """Benchmark PartitionManager.find() on a non-name property."""
+
+    name = partition_name(0, PARTITIONS_PER_CPC - 1)
+    description = 'Partition #{}'.format(PARTITIONS_PER_CPC - 1)
+
+    partition = benchmark(cpc.partitions.find, description=description)
+
+    assert partition.name == name
@@ -0,0 +1,73 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for parsing metrics responses in the zhmcclient package
+(_metrics module), with a multi-megabyte metrics response.
+"""
+
+from __future__ import absolute_import, print_function
+
+import pytest
+
+from zhmcclient import Client, MetricsResponse
+
+from tests.benchmark.utils import large_faked_session, \
+    add_partition_metrics, METRICS_GROUP_NAME, METRICS_SAMPLES, CPC_COUNT, \
+    PARTITIONS_PER_CPC
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(scope='module')
+def metrics():
+    """
+    Tuple of (metrics context, metrics response string, number of metric
+    object values) for a faked session with a large topology, shared by all
+    benchmarks in this module.
+    """
+    session = large_faked_session()
+    count = add_partition_metrics(session)
+    client = Client(session)
+    mc = client.metrics_contexts.create({
+        'anticipated-frequency-seconds': 15,
+        'metric-groups': [METRICS_GROUP_NAME],
+    })
+    response_str = mc.get_metrics()
+    return mc, response_str, count
+
+
+def test_metrics_response(benchmark, metrics):
+    """Benchmark parsing a metrics response string with MetricsResponse."""
+
+    mc, response_str, count = metrics
+    # Each metric object values item takes at least 100 characters, so the
+    # response has several MB at scale 1.0
+    assert count == METRICS_SAMPLES * CPC_COUNT * PARTITIONS_PER_CPC
+    assert len(response_str) > 100 * count
+
+    mr = benchmark(MetricsResponse, mc, response_str)
+
+    assert len(mr.metric_group_values) == 1
+    assert len(mr.metric_group_values[0].object_values) == count
+
+
+def test_get_metrics(benchmark, metrics):
+    """Benchmark MetricsContext.get_metrics() against the faked HMC."""
+
+    mc, response_str, _ = metrics
+
+    result = benchmark(mc.get_metrics)
+
+    assert result == response_str
@@ -0,0 +1,69 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for the client-side processing of HMC operations, by replaying
+a cassette with the zhmcclient.ReplaySession class (_cassette module).
+"""
+
+from __future__ import absolute_import, print_function
+
+import io
+import json
+import pytest
+
+import zhmcclient
+
+pytest.importorskip('pytest_benchmark')
+
+NUM_PARTITIONS = 500
+
+
+@pytest.fixture(scope='module')
+def cassette(tmpdir_factory):
+    """
+    Cassette file with the logon, and the listing of a CPC and of its
+    partitions.
+    """
+    filename = str(tmpdir_factory.mktemp('cassette').join('hmc.cassette'))
+    partitions = [
+        {'object-uri': '/api/partitions/p{}'.format(i),
+         'name': 'PART{}'.format(i), 'status': 'active', 'type': 'linux'}
+        for i in range(NUM_PARTITIONS)]
+    records = [
+        ('POST', '/api/sessions', {'api-session': 'fake-token'}),
+        ('GET', '/api/cpcs',
+         {'cpcs': [{'object-uri': '/api/cpcs/cpc1', 'name': 'CPC1',
+                    'status': 'active'}]}),
+        ('GET', '/api/cpcs/cpc1/partitions', {'partitions': partitions}),
+    ]
+    with io.open(filename, 'w', encoding='utf-8') as fp:
+        for start, (method, uri, response) in enumerate(records):
+            fp.write(json.dumps({
+                'start': start, 'duration': 0.01, 'method': method,
+                'uri': uri, 'status': 200,
+                'content-type': 'application/json', 'response': response,
+            }) + u'\n')
+    return filename
+
+
+def test_replay_list_partitions(benchmark, cassette):
+    """Benchmark listing partitions from a cassette without delays."""
+
+    session = zhmcclient.ReplaySession(cassette)
+    cpc = zhmcclient.Client(session).cpcs.find(name='CPC1')
+
+    result = benchmark(cpc.partitions.list)
+
+    assert len(result) == NUM_PARTITIONS
@@ -0,0 +1,66 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for resetting a faked HMC to its initial state between tests, by
+restoring a snapshot compared to populating it again.
+"""
+
+from __future__ import absolute_import, print_function
+
+import pytest
+
+from zhmcclient_mock import FakedHmc, TopologyGenerator
+
+pytest.importorskip('pytest_benchmark')
+
+PARTITIONS = 200
+
+
+def change(hmc):
+    """Make some changes to a faked HMC, like a typical test does."""
+    cpc = hmc.cpcs.list()[0]
+    partition = cpc.partitions.list()[0]
+    partition.update({'description': 'changed'})
+    cpc.partitions.add({'name': 'new-partition'})
+
+
+@pytest.mark.benchmark(group='reset')
+def test_reset_populate(benchmark):
+    """Benchmark resetting a faked HMC by populating a new one."""
+
+    generator = TopologyGenerator(cpcs=1, partitions=PARTITIONS, seed=1)
+
+    def reset():
+        hmc = FakedHmc('fake-hmc', '2.13.1', '1.8')
+        generator.populate(hmc)
+        change(hmc)
+
+    benchmark(reset)
+
+
+@pytest.mark.benchmark(group='reset')
+def test_reset_restore(benchmark):
+    """Benchmark resetting a faked HMC by restoring a snapshot."""
+
+    generator = TopologyGenerator(cpcs=1, partitions=PARTITIONS, seed=1)
+    hmc = FakedHmc('fake-hmc', '2.13.1', '1.8')
+    generator.populate(hmc)
+    hmc.snapshot()
+
+    def reset():
+        hmc.restore()
+        change(hmc)
+
+    benchmark(reset)
@@ -0,0 +1,69 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for resolving URIs to their handlers in the zhmcclient_mock
+package (_urihandler module).
+"""
+
+from __future__ import absolute_import, print_function
+
+import pytest
+
+from zhmcclient_mock import UriHandler, URIS
+
+pytest.importorskip('pytest_benchmark')
+
+# URIs of typical operations, including URIs that are resolved late in the
+# list of URI patterns.
+URIS_TO_RESOLVE = [
+    '/api/cpcs',
+    '/api/cpcs/fake-cpc-id?name=CPC1',
+    '/api/cpcs/fake-cpc-id/partitions?name=PART1',
+    '/api/partitions/fake-part-id',
+    '/api/partitions/fake-part-id/nics/fake-nic-id',
+    '/api/partitions/fake-part-id/operations/start',
+    '/api/adapters/fake-adapter-id/network-ports/0',
+    '/api/logical-partitions/fake-lpar-id/operations/load',
+    '/api/cpcs/fake-cpc-id/load-activation-profiles/fake-profile',
+    '/api/services/metrics/context/fake-context-id',
+]
+
+
+def test_handler_uncached(benchmark):
+    """Benchmark UriHandler.handler() for URIs that are not cached."""
+
+    urihandler = UriHandler(URIS)
+
+    def resolve_all():
+        # pylint: disable=protected-access
+        urihandler._handler_cache.clear()
+        return [urihandler.handler(uri, 'GET') for uri in URIS_TO_RESOLVE]
+
+    results = benchmark(resolve_all)
+
+    assert len(results) == len(URIS_TO_RESOLVE)
+
+
+def test_handler_cached(benchmark):
+    """Benchmark UriHandler.handler() for URIs that are cached."""
+
+    urihandler = UriHandler(URIS)
+
+    def resolve_all():
+        return [urihandler.handler(uri, 'GET') for uri in URIS_TO_RESOLVE]
+
+    results = benchmark(resolve_all)
+
+    assert len(results) == len(URIS_TO_RESOLVE)
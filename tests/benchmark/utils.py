@@ -0,0 +1,141 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Utility functions for benchmarks.
+
+The benchmarks run against a faked session whose faked HMC is loaded with a
+large generated topology. The size of the topology can be scaled with the
+ZHMC_BENCHMARK_SCALE environment variable (a positive float, default: 1.0).
+"""
+
+from __future__ import absolute_import
+
+import os
+from datetime import datetime, timedelta
+import pytz
+
+from zhmcclient_mock import TopologyGenerator, FakedMetricGroupDefinition, \
+    FakedMetricObjectValues
+
+# Scale factor for the topology sizes
+SCALE = float(os.environ.get('ZHMC_BENCHMARK_SCALE', '1.0'))
+
+# Topology sizes at scale 1.0
+CPC_COUNT = 4
+PARTITIONS_PER_CPC = max(1, int(500 * SCALE))
+NICS_PER_PARTITION = 2
+HBAS_PER_PARTITION = 2
+STORAGE_GROUPS_PER_CPC = max(1, int(50 * SCALE))
+VOLUMES_PER_STORAGE_GROUP = 10
+
+# Number of points in time in the metrics response. With the topology at
+# scale 1.0, this results in a metrics response of a few MB.
+METRICS_SAMPLES = 20
+
+# Metric group used for the metrics response
+METRICS_GROUP_NAME = 'partition-usage'
+METRICS_TYPES = [
+    ('processor-usage', 'integer-metric'),
+    ('network-usage', 'integer-metric'),
+    ('storage-usage', 'integer-metric'),
+    ('accelerator-usage', 'integer-metric'),
+    ('crypto-usage', 'integer-metric'),
+    ('power-consumption-watts', 'double-metric'),
+    ('partition-name', 'string-metric'),
+    ('dedicated-processors', 'boolean-metric'),
+]
+
+
+def cpc_name(cpc_index):
+    """Return the name of a generated CPC."""
+    return 'CPC{:02d}'.format(cpc_index)
+
+
+def partition_name(cpc_index, part_index):
+    """Return the name of a generated partition."""
+    return '{}-P{:04d}'.format(cpc_name(cpc_index), part_index)
+
+
+def large_topology_generator():
+    """
+    Return a :class:`~zhmcclient_mock.TopologyGenerator` object for a large
+    topology of CPCs with adapters, partitions, NICs and HBAs, and storage
+    groups with storage volumes.
+    """
+    return TopologyGenerator(
+        cpcs=CPC_COUNT,
+        partitions=PARTITIONS_PER_CPC,
+        nics=NICS_PER_PARTITION,
+        hbas=HBAS_PER_PARTITION,
+        storage_groups=STORAGE_GROUPS_PER_CPC,
+        storage_volumes=VOLUMES_PER_STORAGE_GROUP,
+        properties={
+            'partition': {
+                'description': lambda rng, index:
+                    'Partition #{}'.format(index),
+                'status': lambda rng, index:
+                    'active' if index % 3 else 'stopped',
+                'ifl-processors': lambda rng, index: 1 + index % 8,
+            },
+        },
+        seed=1)
+
+
+def large_faked_session():
+    """
+    Return a :class:`~zhmcclient_mock.FakedSession` object whose faked HMC
+    is loaded with the topology of :func:`large_topology_generator`.
+    """
+    return large_topology_generator().faked_session()
+
+
+def add_partition_metrics(session):
+    """
+    Prepare metric values for the 'partition-usage' metric group for all
+    partitions in the faked HMC of a faked session, for
+    :data:`METRICS_SAMPLES` points in time.
+
+    Returns:
+      int: Number of metric object values that have been added.
+    """
+    hmc = session.hmc
+    hmc.metrics_contexts.add_metric_group_definition(
+        FakedMetricGroupDefinition(name=METRICS_GROUP_NAME,
+                                   types=METRICS_TYPES))
+    start = datetime(2018, 1, 1, tzinfo=pytz.utc)
+    count = 0
+    for t in range(METRICS_SAMPLES):
+        timestamp = start + timedelta(seconds=15 * t)
+        for faked_cpc in hmc.cpcs.list():
+            for faked_part in faked_cpc.partitions.list():
+                i = count % 100
+                values = [
+                    ('processor-usage', i),
+                    ('network-usage', i * 2 % 100),
+                    ('storage-usage', i * 3 % 100),
+                    ('accelerator-usage', 0),
+                    ('crypto-usage', i * 5 % 100),
+                    ('power-consumption-watts', 100.5 + i),
+                    ('partition-name', faked_part.properties['name']),
+                    ('dedicated-processors', i % 2 == 0),
+                ]
+                hmc.metrics_contexts.add_metric_values(
+                    FakedMetricObjectValues(
+                        group_name=METRICS_GROUP_NAME,
+                        resource_uri=faked_part.uri,
+                        timestamp=timestamp,
+                        values=values))
+                count += 1
+    return count
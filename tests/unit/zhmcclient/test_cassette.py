@@ -0,0 +1,269 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for _cassette module.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import io
+import json
+import stat
+import time
+import requests
+import requests_mock
+import pytest
+
+from zhmcclient import Session, SessionRecorder, ReplaySession, Client, \
+    HTTPError, ConnectionError, ParseError
+
+CPCS_RESULT = {
+    'cpcs': [
+        {'object-uri': '/api/cpcs/cpc1', 'name': 'CPC1', 'status': 'active'},
+    ],
+}
+
+
+def read_records(filename):
+    """Return the records of a cassette file."""
+    with io.open(filename, encoding='utf-8') as fp:
+        return [json.loads(line) for line in fp]
+
+
+def write_records(filename, records):
+    """Write records to a cassette file."""
+    with io.open(filename, 'w', encoding='utf-8') as fp:
+        for record in records:
+            fp.write(json.dumps(record) + u'\n')
+
+
+def record(start, method, uri, status, response=None, duration=0.01):
+    """Return a cassette record for a request with a JSON response."""
+    rec = {'start': start, 'duration': duration, 'method': method,
+           'uri': uri, 'status': status}
+    if response is not None:
+        rec['content-type'] = 'application/json'
+        rec['response'] = response
+    return rec
+
+
+class TestSessionRecorder(object):
+    """All tests for the SessionRecorder class."""
+
+    def setup_method(self):
+        self.session = Session('fake-host', 'fake-user', 'fake-pw')
+
+    def test_record(self, tmpdir):
+        """Test recording successful and failing requests."""
+
+        filename = str(tmpdir.join('hmc.cassette'))
+
+        with SessionRecorder(filename) as recorder:
+            self.session.add_hook(recorder)
+            with requests_mock.mock() as m:
+                m.post('/api/sessions', json={'api-session': 'fake-token'})
+                m.get('/api/cpcs', json=CPCS_RESULT)
+                m.post('/api/cpcs/cpc1', status_code=204)
+                m.delete('/api/cpcs/cpc1', status_code=409,
+                         json={'http-status': 409, 'reason': 1})
+                m.get('/api/console', exc=requests.exceptions.ConnectTimeout)
+
+                self.session.get('/api/cpcs')
+                self.session.post('/api/cpcs/cpc1', body={'description': 'x'})
+                with pytest.raises(HTTPError):
+                    self.session.delete('/api/cpcs/cpc1')
+                with pytest.raises(ConnectionError):
+                    self.session.get('/api/console')
+
+        records = read_records(filename)
+
+        assert [(r['method'], r['uri'], r.get('status')) for r in records] == [
+            ('POST', '/api/sessions', 200),
+            ('GET', '/api/cpcs', 200),
+            ('POST', '/api/cpcs/cpc1', 204),
+            ('DELETE', '/api/cpcs/cpc1', 409),
+            ('GET', '/api/console', None),
+        ]
+        logon, get, post, delete, error = records
+        assert logon['request'] == {'userid': 'fake-user',
+                                    'password': '********'}
+        assert logon['response'] == {'api-session': 'fake-token'}
+        assert get['operation'] == 'get /api/cpcs'
+        assert get['response'] == CPCS_RESULT
+        assert get['duration'] >= 0
+        assert post['operation'] == 'post /api/cpcs/{id}'
+        assert post['request'] == {'description': 'x'}
+        assert 'response' not in post
+        assert delete['response']['reason'] == 1
+        assert 'error' in error
+
+    def test_append(self, tmpdir):
+        """Test that recorders append to an existing cassette file."""
+
+        filename = str(tmpdir.join('hmc.cassette'))
+        self.session = Session('fake-host', session_id='fake-token')
+
+        for _ in range(2):
+            recorder = SessionRecorder(filename)
+            self.session.add_hook(recorder)
+            with requests_mock.mock() as m:
+                m.get('/api/version', text='not json')
+                with pytest.raises(ParseError):
+                    self.session.get('/api/version', logon_required=False)
+            self.session.remove_hook(recorder)
+            recorder.close()
+
+        records = read_records(filename)
+
+        assert len(records) == 2
+        assert records[1]['response-text'] == 'not json'
+        assert records[0]['start'] <= records[1]['start']
+
+    @pytest.mark.skipif(not hasattr(os, 'getuid'),
+                        reason="File permissions are not used on Windows")
+    def test_permissions(self, tmpdir):
+        """Test that the cassette file can only be accessed by the current
+        user."""
+
+        filename = str(tmpdir.join('hmc.cassette'))
+
+        recorder = SessionRecorder(filename)
+        recorder.close()
+
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+        assert mode & (stat.S_IRWXG | stat.S_IRWXO) == 0
+        assert mode & stat.S_IRUSR
+
+
+class TestReplaySession(object):
+    """All tests for the ReplaySession class."""
+
+    def test_round_trip(self, tmpdir):
+        """Test replaying recorded requests through the zhmcclient API."""
+
+        filename = str(tmpdir.join('hmc.cassette'))
+        session = Session('fake-host', 'fake-user', 'fake-pw')
+        with SessionRecorder(filename) as recorder:
+            session.add_hook(recorder)
+            with requests_mock.mock() as m:
+                m.post('/api/sessions', json={'api-session': 'fake-token'})
+                m.get('/api/cpcs', json=CPCS_RESULT)
+                m.delete('/api/sessions/this-session', status_code=204)
+                cpcs = Client(session).cpcs.list()
+                session.logoff()
+
+        replay_session = ReplaySession(filename)
+        replayed_cpcs = Client(replay_session).cpcs.list()
+
+        assert [c.properties for c in replayed_cpcs] == \
+            [c.properties for c in cpcs]
+        assert replay_session.session_id == 'fake-token'
+        replay_session.logoff()
+        assert not replay_session.is_logon()
+
+    def test_sequence(self, tmpdir):
+        """Test that the responses for a URI are returned in the recorded
+        order, and that the last one is repeated."""
+
+        filename = str(tmpdir.join('hmc.cassette'))
+        write_records(filename, [
+            record(2.0, 'GET', '/api/jobs/j1', 200,
+                   {'status': 'complete', 'job-status-code': 204}),
+            record(1.0, 'GET', '/api/jobs/j1', 200, {'status': 'running'}),
+        ])
+        session = ReplaySession(filename)
+        session._session_id = 'fake-token'  # pylint: disable=protected-access
+
+        statuses = [session.get('/api/jobs/j1')['status'] for _ in range(3)]
+
+        assert statuses == ['running', 'complete', 'complete']
+
+    def test_relogon(self, tmpdir):
+        """Test replaying a re-logon after the session token expired."""
+
+        filename = str(tmpdir.join('hmc.cassette'))
+        write_records(filename, [
+            record(1.0, 'POST', '/api/sessions', 200,
+                   {'api-session': 'token1'}),
+            record(3.0, 'POST', '/api/sessions', 200,
+                   {'api-session': 'token2'}),
+            record(4.0, 'GET', '/api/cpcs', 200, CPCS_RESULT),
+            record(2.0, 'GET', '/api/cpcs', 403,
+                   {'http-status': 403, 'reason': 5}),
+        ])
+        session = ReplaySession(filename)
+        session.logon()
+
+        result = session.get('/api/cpcs')
+
+        assert result == CPCS_RESULT
+        assert session.session_id == 'token2'
+
+    def test_errors(self, tmpdir):
+        """Test replaying failed requests and requests without records."""
+
+        filename = str(tmpdir.join('hmc.cassette'))
+        records = [
+            record(1.0, 'DELETE', '/api/cpcs/cpc1', 404,
+                   {'http-status': 404, 'reason': 1, 'message': 'gone'}),
+            {'start': 2.0, 'duration': 0.0, 'method': 'GET',
+             'uri': '/api/version', 'error': 'fake connection error'},
+        ]
+        write_records(filename, records)
+        # The last line of an interrupted recording is incomplete
+        with io.open(filename, 'a', encoding='utf-8') as fp:
+            fp.write(u'{"start": 3.0, "dura')
+        session = ReplaySession(filename)
+
+        with pytest.raises(HTTPError) as exc_info:
+            session.delete('/api/cpcs/cpc1', logon_required=False)
+        assert exc_info.value.http_status == 404
+        assert exc_info.value.message == 'gone'
+
+        with pytest.raises(ConnectionError) as exc_info:
+            session.get('/api/version', logon_required=False)
+        assert 'fake connection error' in str(exc_info.value)
+
+        with pytest.raises(ConnectionError) as exc_info:
+            session.get('/api/console', logon_required=False)
+        assert 'No recorded response' in str(exc_info.value)
+
+    def test_invalid_cassette(self, tmpdir):
+        """Test that an invalid record in a cassette file is rejected."""
+
+        filename = str(tmpdir.join('hmc.cassette'))
+        with io.open(filename, 'w', encoding='utf-8') as fp:
+            fp.write(u'{"invalid\n{}\n')
+
+        with pytest.raises(ValueError):
+            ReplaySession(filename)
+
+    def test_time_scale(self, tmpdir):
+        """Test replaying with scaled timing."""
+
+        filename = str(tmpdir.join('hmc.cassette'))
+        write_records(filename, [
+            record(1.0, 'GET', '/api/version', 200, {'api-major-version': 1},
+                   duration=0.1),
+        ])
+        session = ReplaySession(filename, time_scale=0.5)
+
+        start_time = time.time()
+        session.get('/api/version', logon_required=False)
+        elapsed = time.time() - start_time
+
+        assert session.time_scale == 0.5
+        assert elapsed >= 0.05
@@ -0,0 +1,86 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for the namespace of the zhmcclient package (__init__ module).
+"""
+
+from __future__ import absolute_import, print_function
+
+import sys
+import importlib
+import subprocess
+import pytest
+
+import zhmcclient
+
+# pylint: disable=protected-access
+
+
+def test_lazy_modules():
+    """Test that the public names of the package are those of the modules
+    listed for lazy loading."""
+
+    for module_name, names in zhmcclient._LAZY_MODULES:
+        module = importlib.import_module('zhmcclient.' + module_name)
+        module_all = getattr(module, '__all__', None)
+        if module_all is not None:
+            assert names == module_all
+        for name in names:
+            assert getattr(zhmcclient, name) is getattr(module, name)
+
+
+def test_all():
+    """Test the __all__ and dir() of the package."""
+
+    for name in zhmcclient.__all__:
+        assert hasattr(zhmcclient, name)
+    assert 'Session' in zhmcclient.__all__
+    assert 'HTTPError' in zhmcclient.__all__
+    assert set(zhmcclient.__all__) <= set(dir(zhmcclient))
+    assert '__version__' in dir(zhmcclient)
+
+
+def test_submodule():
+    """Test accessing a module of the package as an attribute."""
+
+    assert zhmcclient._utils is sys.modules['zhmcclient._utils']
+
+
+def test_invalid_name():
+    """Test accessing a name that does not exist in the package."""
+
+    with pytest.raises(AttributeError):
+        getattr(zhmcclient, 'InvalidName')
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason="Lazy loading requires Python 3.7")
+def test_lazy_import():
+    """Test that importing the package does not import its dependencies."""
+
+    code = (
+        "import sys\n"
+        "import zhmcclient\n"
+        "assert 'zhmcclient._session' not in sys.modules\n"
+        "for name in ('requests', 'stomp', 'pbr', 'pytz', 'decorator'):\n"
+        "    assert name not in sys.modules, name\n"
+        "zhmcclient.Session\n"
+        "assert 'requests' in sys.modules\n"
+        "assert 'stomp' not in sys.modules\n"
+        "zhmcclient.Client\n"
+        "assert 'multiprocessing.pool' not in sys.modules\n"
+    )
+
+    subprocess.check_call([sys.executable, '-c', code])
@@ -20,13 +20,17 @@ from __future__ import absolute_import, print_function
 
 from datetime import datetime
 import time
+import gc
+import weakref
+import threading
 import re
 import warnings
 import pytest
 
 from zhmcclient import BaseResource, BaseManager, Session, NotFound, \
-    NoUniqueMatch
-from zhmcclient._manager import _NameUriCache
+    NoUniqueMatch, RetryTimeoutConfig
+from zhmcclient._manager import _NameUriCache, _NameUriCacheStore, \
+    _CompiledFilter, _compile_filter_args
 
 
 class MyResource(BaseResource):
@@ -146,6 +150,69 @@ class TestManager0(object):
         assert res.properties['name'] == add_props['name']
         assert res.properties['prop1'] == add_props['prop1']
 
+    def test_resource_object_identity(self):
+        """
+        Test that BaseManager.resource_object() returns an existing resource
+        object for the same URI, including its properties.
+        """
+
+        res_mgr = MyManager(self.session)
+        res_oid = 'fake-res-id0711'
+        res_uri = '/api/myresources/' + res_oid
+        res_props = {
+            'object-uri': res_uri,
+            'name': 'abc',
+            'prop1': 123,
+        }
+        res1 = MyResource(res_mgr, res_uri, 'abc', res_props)
+
+        # Execute the code to be tested, using a different manager object
+        res_mgr2 = MyManager(self.session)
+        res2 = res_mgr2.resource_object(res_uri, {'prop2': 'x'})
+
+        assert res2 is res1
+        assert res2.properties['prop1'] == 123
+        assert res2.properties['prop2'] == 'x'
+        assert res2.properties[res_mgr._oid_prop] == res_oid
+        assert res2.properties['class'] == res_mgr.class_name
+
+    def test_resource_object_identity_released(self):
+        """
+        Test that BaseManager.resource_object() does not keep resource objects
+        alive that are no longer referenced.
+        """
+
+        res_mgr = MyManager(self.session)
+        res_uri = '/api/myresources/fake-res-id0711'
+        res1 = res_mgr.resource_object(res_uri, {'prop1': 123})
+        del res1
+        gc.collect()
+
+        assert res_uri not in self.session._resource_objects
+
+        # Execute the code to be tested
+        res2 = res_mgr.resource_object(res_uri)
+
+        assert 'prop1' not in res2.properties
+
+    def test_resource_object_identity_other_session(self):
+        """
+        Test that resource objects are not shared between sessions.
+        """
+
+        res_mgr = MyManager(self.session)
+        res_uri = '/api/myresources/fake-res-id0711'
+        res1 = res_mgr.resource_object(res_uri)
+
+        session2 = Session(host='fake-host', userid='fake-user',
+                           password='fake-pw')
+        res_mgr2 = MyManager(session2)
+
+        # Execute the code to be tested
+        res2 = res_mgr2.resource_object(res_uri)
+
+        assert res2 is not res1
+
 
 class TestManager1(object):
     """
@@ -460,6 +527,199 @@ class TestManager2(object):
         assert resource.name == self.resource2.name
 
 
+class TestCompiledFilter(object):
+    """
+    Tests for the _CompiledFilter class and the filter cache.
+    """
+
+    @pytest.mark.parametrize(
+        "prop_match, prop_value, exp_match", [
+            ('abc', 'abc', True),
+            ('abc', 'abcd', False),
+            ('abc', 'xabc', False),
+            ('abc', 'abc\n', True),
+            ('ab.', 'abc', True),
+            ('ab.', 'abcd', False),
+            ('1234-.*', '1234-A0B', True),
+            ('1234-.*', '5678-A0B', False),
+            (['x', 'abc'], 'abc', True),
+            (['x', 'a.c'], 'abc', True),
+            (['x', 'y'], 'abc', False),
+            (('x', ['y', 'abc']), 'abc', True),
+            (42, 42, True),
+            (42, 43, False),
+            ([41, 42], 42, True),
+            ([41, 43], 42, False),
+            (True, True, True),
+            (False, True, False),
+            (None, None, True),
+            ('abc', None, False),
+            (42, 'abc', False),
+            ([1, 2], [1, 2], False),
+            ([[1, 2]], [1, 2], False),
+        ]
+    )
+    def test_matches(self, prop_match, prop_value, exp_match):
+        """Test _CompiledFilter.matches() for a single property."""
+        compiled = _CompiledFilter({'prop': prop_match})
+
+        result = compiled.matches({'prop': prop_value}.__getitem__)
+
+        assert result == exp_match
+
+    def test_matches_missing_prop(self):
+        """Test _CompiledFilter.matches() for a non-existing property."""
+        compiled = _CompiledFilter({'prop': 'abc'})
+
+        result = compiled.matches({'other': 'abc'}.__getitem__)
+
+        assert result is False
+
+    def test_matches_and(self):
+        """Test _CompiledFilter.matches() with multiple properties."""
+        compiled = _CompiledFilter({'p1': 'a.*', 'p2': 42})
+
+        assert compiled.matches({'p1': 'abc', 'p2': 42}.__getitem__)
+        assert not compiled.matches({'p1': 'abc', 'p2': 43}.__getitem__)
+        assert not compiled.matches({'p1': 'xyz', 'p2': 42}.__getitem__)
+
+    def test_matches_none(self):
+        """Test _CompiledFilter.matches() with no filter arguments."""
+        compiled = _CompiledFilter(None)
+
+        assert compiled.matches({}.__getitem__)
+        assert compiled.prop_names == []
+
+    def test_cache_reuse(self):
+        """Test that equal filter arguments reuse the compiled filter."""
+        compiled1 = _compile_filter_args({'p1': ['a', 'b'], 'p2': 1})
+        compiled2 = _compile_filter_args({'p2': 1, 'p1': ['a', 'b']})
+        compiled3 = _compile_filter_args({'p1': ('a', 'b'), 'p2': 1})
+        compiled4 = _compile_filter_args({'p1': ['a', 'b'], 'p2': True})
+
+        assert compiled1 is compiled2
+        assert compiled1 is not compiled3
+        assert compiled1 is not compiled4
+
+    def test_cache_unhashable(self):
+        """Test that unhashable match values are compiled but not cached."""
+        compiled1 = _compile_filter_args({'p1': {'a': 1}})
+        compiled2 = _compile_filter_args({'p1': {'a': 1}})
+
+        assert compiled1 is not compiled2
+        assert compiled1.matches({'p1': {'a': 1}}.__getitem__)
+
+
+class MyFetchResource(MyResource):
+    """
+    A derived resource that simulates retrieving its full properties from
+    a dictionary of full properties, for testing purposes.
+    """
+
+    def __init__(self, manager, uri, name=None, properties=None,
+                 full_props=None):
+        super(MyFetchResource, self).__init__(manager, uri, name, properties)
+        self.full_props = full_props
+        self.pull_called = 0
+
+    def pull_full_properties(self):
+        self.pull_called += 1
+        self._properties = dict(self.full_props)
+        self._full_properties = True
+
+
+class TestManagerMatchingResources(object):
+    """
+    Tests for BaseManager._matching_resources().
+    """
+
+    def setup_method(self):
+        self.session = Session(host='fake-host', userid='fake-user',
+                               password='fake-pw')
+        self.manager = MyManager(self.session)
+        self.resources = []
+        for i, (a, b) in enumerate([('x', 1), ('y', 1), ('x', 2), ('x', 1)]):
+            uri = "/api/fake-uri-{}".format(i)
+            list_props = {'a': a}
+            full_props = {'a': a, 'b': b, self.manager._uri_prop: uri}
+            self.resources.append(MyFetchResource(
+                self.manager, uri=uri, properties=list_props,
+                full_props=full_props))
+
+    def test_present_props(self):
+        """Test filtering on properties present in the list result."""
+
+        result = self.manager._matching_resources(self.resources, {'a': 'x'})
+
+        assert result == [self.resources[0], self.resources[2],
+                          self.resources[3]]
+        assert [r.pull_called for r in self.resources] == [0, 0, 0, 0]
+        assert self.manager.filter_fetch_count == 0
+
+    def test_missing_props(self):
+        """Test filtering on properties missing in the list result, which
+        causes full properties to be retrieved only for candidates."""
+
+        result = self.manager._matching_resources(
+            self.resources, {'a': 'x', 'b': 1})
+
+        assert result == [self.resources[0], self.resources[3]]
+        assert [r.pull_called for r in self.resources] == [1, 0, 1, 1]
+        assert self.manager.filter_fetch_count == 3
+
+    def test_missing_props_full(self):
+        """Test filtering on missing properties with full_properties=True,
+        which must not retrieve the full properties a second time."""
+
+        result = self.manager._matching_resources(
+            self.resources, {'b': 1}, full_properties=True)
+
+        assert result == [self.resources[0], self.resources[1],
+                          self.resources[3]]
+        assert [r.pull_called for r in self.resources] == [1, 1, 1, 1]
+        assert self.manager.filter_fetch_count == 4
+
+    def test_nonexisting_prop(self):
+        """Test filtering on a property that does not exist at all."""
+
+        result = self.manager._matching_resources(
+            self.resources, {'c': 1})
+
+        assert result == []
+        assert self.manager.filter_fetch_count == 4
+
+    def test_no_filter_full(self):
+        """Test no filtering with full_properties=True."""
+
+        result = self.manager._matching_resources(
+            self.resources, None, full_properties=True)
+
+        assert result == self.resources
+        assert [r.pull_called for r in self.resources] == [1, 1, 1, 1]
+        assert self.manager.filter_fetch_count == 0
+
+    def test_fetch_count_threads(self):
+        """Test that the fetch count is accumulated correctly when filtering
+        in multiple threads."""
+
+        def work():
+            for _ in range(50):
+                resources = [
+                    MyFetchResource(self.manager, uri=r.uri,
+                                    properties={'a': r.properties['a']},
+                                    full_props=r.full_props)
+                    for r in self.resources]
+                self.manager._matching_resources(resources, {'b': 1})
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert self.manager.filter_fetch_count == 8 * 50 * 4
+
+
 class TestNameUriCache(object):
     """All tests for the _NameUriCache class."""
 
@@ -795,3 +1055,323 @@ class TestNameUriCache(object):
         act_resource2_uri = self.cache.get(self.resource2_name)
         assert self.manager._list_called == 1
         assert act_resource2_uri == resource2_new_uri
+
+
+class TestNameUriCacheNegative(object):
+    """Tests for the negative entries of the _NameUriCache class."""
+
+    def setup_method(self):
+        self.session = Session(host='fake-host', userid='fake-user',
+                               password='fake-pw')
+        self.manager = MyManager(self.session)
+        self.resource1 = MyResource(
+            self.manager, uri="/api/fake-uri-1",
+            properties={self.manager._name_prop: "fake-name-1"})
+        self.manager._list_resources = [self.resource1]
+        self.cache = _NameUriCache(self.manager, timetolive=10,
+                                   negative_timetolive=0.2)
+
+    def test_get_non_existing_repeated(self):
+        """Test that repeated get() of a non-existing name lists once."""
+
+        for _ in range(3):
+            with pytest.raises(NotFound):
+                self.cache.get('non-existing')
+        assert self.manager._list_called == 1
+
+    def test_get_non_existing_expired(self):
+        """Test that negative entries expire."""
+
+        with pytest.raises(NotFound):
+            self.cache.get('non-existing')
+        assert self.manager._list_called == 1
+
+        time.sleep(0.3)
+
+        with pytest.raises(NotFound):
+            self.cache.get('non-existing')
+        assert self.manager._list_called == 2
+
+    def test_update_removes_negative(self):
+        """Test that update() removes a negative entry."""
+
+        with pytest.raises(NotFound):
+            self.cache.get('new-name')
+
+        self.cache.update('new-name', '/api/fake-uri-new')
+
+        assert self.cache.get('new-name') == '/api/fake-uri-new'
+        assert self.manager._list_called == 1
+
+    def test_invalidate_removes_negative(self):
+        """Test that invalidate() removes negative entries."""
+
+        with pytest.raises(NotFound):
+            self.cache.get('non-existing')
+        self.cache.invalidate()
+        with pytest.raises(NotFound):
+            self.cache.get('non-existing')
+        assert self.manager._list_called == 2
+
+    def test_disabled(self):
+        """Test that negative_timetolive=0 does not remember names."""
+        cache = _NameUriCache(self.manager, timetolive=10)
+
+        for _ in range(2):
+            with pytest.raises(NotFound):
+                cache.get('non-existing')
+        assert self.manager._list_called == 2
+
+
+class TestNameUriCacheShared(object):
+    """Tests for sharing the _NameUriCache between manager objects."""
+
+    def test_shared_same_session(self):
+        """Test that managers in the same session share the cache."""
+        session = Session(host='fake-host')
+        manager1 = MyManager(session)
+        manager2 = MyManager(session)
+        resource = MyResource(
+            manager1, uri="/api/fake-uri-1",
+            properties={manager1._name_prop: "fake-name-1"})
+        manager1._list_resources = [resource]
+        manager2._list_resources = [resource]
+
+        assert manager1._name_uri_cache is manager2._name_uri_cache
+
+        manager1.find_by_name('fake-name-1')
+        manager2.find_by_name('fake-name-1')
+
+        assert manager1._list_called == 1
+        assert manager2._list_called == 0
+
+    def test_refresh_calling_manager(self):
+        """Test that the cache is refreshed using the calling manager."""
+        session = Session(host='fake-host')
+        manager1 = MyManager(session)
+        manager2 = MyManager(session)
+
+        with pytest.raises(NotFound):
+            manager2.find_by_name('fake-name-1')
+
+        assert manager1._list_called == 0
+        assert manager2._list_called == 1
+
+    def test_not_shared_other_session(self):
+        """Test that managers in different sessions do not share the cache."""
+        manager1 = MyManager(Session(host='fake-host'))
+        manager2 = MyManager(Session(host='fake-host'))
+
+        assert manager1._name_uri_cache is not manager2._name_uri_cache
+
+    def test_manager_not_kept_alive(self):
+        """Test that the shared cache does not keep its manager alive, and
+        is removed from the session with the last manager using it."""
+        session = Session(host='fake-host')
+        manager = MyManager(session)
+        manager_ref = weakref.ref(manager)
+
+        assert len(session._name_uri_caches) == 1
+
+        del manager
+        gc.collect()
+
+        assert manager_ref() is None
+        assert len(session._name_uri_caches) == 0
+
+    def test_negative_default(self):
+        """Test that names that were not found are not remembered by
+        default."""
+        manager = MyManager(Session(host='fake-host'))
+
+        for _ in range(2):
+            with pytest.raises(NotFound):
+                manager.find_by_name('non-existing')
+        assert manager._list_called == 2
+
+
+class TestNameUriCacheStore(object):
+    """Tests for persisting the _NameUriCache."""
+
+    def setup_method(self):
+        self.scope = ('fake-host', '', 'myresource')
+
+    def test_store(self, tmpdir):
+        """Test update(), load() and delete() of the store."""
+        store = _NameUriCacheStore(str(tmpdir.join('cache.db')))
+
+        store.update(self.scope, {'n1': '/api/u1', 'n2': '/api/u2'}, 100.0)
+        store.update(self.scope, {'n3': '/api/u3'}, 200.0)
+        store.update(('other-host', '', 'myresource'), {'n4': '/api/u4'},
+                     200.0)
+
+        assert store.load(self.scope, 0) == {
+            'n1': ('/api/u1', 100.0),
+            'n2': ('/api/u2', 100.0),
+            'n3': ('/api/u3', 200.0),
+        }
+        assert store.load(self.scope, 150) == {'n3': ('/api/u3', 200.0)}
+
+        store.delete(self.scope, 'n1')
+        assert set(store.load(self.scope, 0)) == {'n2', 'n3'}
+
+        store.delete(self.scope)
+        assert store.load(self.scope, 0) == {}
+
+    def test_store_open_shared(self, tmpdir):
+        """Test that open() returns one store object per file."""
+        filename = str(tmpdir.join('cache.db'))
+
+        assert _NameUriCacheStore.open(filename) is \
+            _NameUriCacheStore.open(filename)
+
+    def test_store_bad_file(self, tmpdir):
+        """Test that an unusable file causes no exception."""
+        store = _NameUriCacheStore(str(tmpdir))  # a directory
+
+        store.update(self.scope, {'n1': '/api/u1'}, 100.0)
+        assert store.load(self.scope, 0) == {}
+
+    def test_store_without_lock(self):
+        """Test that the store is accessed without holding the lock of the
+        cache."""
+        manager = MyManager(Session(host='fake-host'))
+        manager._list_resources = [MyResource(
+            manager, uri="/api/fake-uri-1",
+            properties={manager._name_prop: "fake-name-1"})]
+        cache = _NameUriCache(manager, timetolive=10)
+        locked = []
+
+        class MyStore(object):
+            """Store that records whether the cache lock is held."""
+
+            def _record(self, *args):
+                # pylint: disable=unused-argument
+                acquired = cache._cond.acquire(False)
+                if acquired:
+                    cache._cond.release()
+                locked.append(not acquired)
+
+            update = delete = _record
+
+        cache._store = MyStore()
+        cache.get('fake-name-1')
+        cache.update('fake-name-2', '/api/fake-uri-2')
+        cache.delete('fake-name-2')
+        cache.invalidate()
+
+        assert locked == [False] * 5
+
+    def test_warm_start(self, tmpdir):
+        """Test that a new session starts with the persisted entries."""
+        rt_config = RetryTimeoutConfig(
+            name_uri_cache_file=str(tmpdir.join('cache.db')))
+
+        session1 = Session(host='fake-host', retry_timeout_config=rt_config)
+        manager1 = MyManager(session1)
+        manager1._list_resources = [MyResource(
+            manager1, uri="/api/fake-uri-1",
+            properties={manager1._name_prop: "fake-name-1"})]
+        manager1.find_by_name('fake-name-1')
+        assert manager1._list_called == 1
+
+        session2 = Session(host='fake-host', retry_timeout_config=rt_config)
+        manager2 = MyManager(session2)
+        res = manager2.find_by_name('fake-name-1')
+        assert res.uri == "/api/fake-uri-1"
+        assert manager2._list_called == 0
+
+        manager2.invalidate_cache()
+
+        session3 = Session(host='fake-host', retry_timeout_config=rt_config)
+        manager3 = MyManager(session3)
+        assert manager3._name_uri_cache._uris == {}
+
+
+class MySlowManager(MyManager):
+    """
+    A derived resource manager whose list() method blocks until released,
+    for testing concurrent access to the Name-URI cache.
+    """
+
+    def __init__(self, session):
+        super(MySlowManager, self).__init__(session)
+        self.list_entered = threading.Event()
+        self.list_release = threading.Event()
+
+    def list(self, full_properties=False, filter_args=None):
+        self.list_entered.set()
+        self.list_release.wait(5)
+        return super(MySlowManager, self).list(full_properties, filter_args)
+
+
+class TestNameUriCacheConcurrent(object):
+    """Tests for concurrent access to the _NameUriCache class."""
+
+    def setup_method(self):
+        self.session = Session(host='fake-host')
+        self.manager = MySlowManager(self.session)
+        self.manager._list_resources = [
+            MyResource(self.manager, uri="/api/fake-uri-{}".format(i),
+                       properties={self.manager._name_prop:
+                                   "fake-name-{}".format(i)})
+            for i in range(3)]
+        self.cache = _NameUriCache(self.manager, timetolive=0.2)
+
+    def run_threads(self, target, names):
+        results = {}
+
+        def func(name):
+            try:
+                results[name] = target(name)
+            except NotFound:
+                results[name] = None
+
+        threads = [threading.Thread(target=func, args=(name,))
+                   for name in names]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_single_flight(self):
+        """Test that concurrent lookups on an empty cache list once."""
+        names = ['fake-name-0', 'fake-name-1', 'fake-name-2', 'non-existing']
+
+        threads, results = self.run_threads(self.cache.get, names)
+        self.manager.list_entered.wait(5)
+        time.sleep(0.1)  # Let the other threads wait for the refresh
+        self.manager.list_release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert self.manager._list_called == 1
+        assert results == {
+            'fake-name-0': '/api/fake-uri-0',
+            'fake-name-1': '/api/fake-uri-1',
+            'fake-name-2': '/api/fake-uri-2',
+            'non-existing': None,
+        }
+
+    def test_stale_while_revalidate(self):
+        """Test that an expired cache serves entries during a refresh."""
+        self.manager.list_release.set()
+        self.cache.get('fake-name-0')
+        assert self.manager._list_called == 1
+        self.manager.list_release.clear()
+        self.manager.list_entered.clear()
+
+        time.sleep(0.3)  # Let the time to live expire
+
+        # The first lookup refreshes the cache and blocks in list()
+        threads, results = self.run_threads(self.cache.get, ['fake-name-0'])
+        self.manager.list_entered.wait(5)
+
+        # Lookups during the refresh are served from the expired cache
+        assert self.cache.get('fake-name-1') == '/api/fake-uri-1'
+
+        self.manager.list_release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == {'fake-name-0': '/api/fake-uri-0'}
+        assert self.manager._list_called == 2
@@ -22,7 +22,7 @@ import pytest
 import re
 import copy
 
-from zhmcclient import Client, Partition, HTTPError, NotFound
+from zhmcclient import Client, Partition, Job, HTTPError, NotFound
 from zhmcclient_mock import FakedSession
 from tests.common.utils import assert_resources
 
@@ -797,6 +797,39 @@ class TestPartition(object):
             status = partition.get_property('status')
             assert status == 'stopped'
 
+    def test_partition_start_async(self):
+        """Test Partition.start() without waiting for completion."""
+
+        # Add a faked partition
+        faked_partition = self.add_partition1()
+        faked_partition.properties['status'] = 'stopped'
+
+        # Let the job run for 10 seconds on a stopped virtual clock
+        hmc = self.session.hmc
+        hmc.clock.speed = 0
+        hmc.jobs.durations['partition/start'] = 10
+
+        partition_mgr = self.cpc.partitions
+        partition = partition_mgr.find(name=faked_partition.name)
+
+        # Execute the code to be tested
+        job = partition.start(wait_for_completion=False)
+
+        assert isinstance(job, Job)
+        assert job.op_uri == partition.uri + '/operations/start'
+        assert job.check_for_completion() == ('running', None)
+        partition.pull_full_properties()
+        assert partition.get_property('status') == 'starting'
+
+        hmc.clock.advance(10)
+
+        assert job.check_for_completion() == ('complete', {})
+        partition.pull_full_properties()
+        assert partition.get_property('status') == 'active'
+        with pytest.raises(HTTPError) as exc_info:
+            job.check_for_completion()  # job status has been deleted
+        assert exc_info.value.http_status == 404
+
     # TODO: Re-enable test_partition_dump_partition() once supported in hdlr
     def xtest_partition_dump_partition(self):
         """Test Partition.dump_partition()."""
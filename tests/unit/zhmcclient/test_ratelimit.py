@@ -0,0 +1,179 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for _ratelimit module, and for the rate limiting and request
+priorities of the Session class.
+"""
+
+from __future__ import absolute_import, print_function
+
+import time
+import threading
+import requests_mock
+import pytest
+
+from zhmcclient import Session, SessionPool, RetryTimeoutConfig, \
+    SessionHook, PrometheusHook, PRIORITY_INTERACTIVE, PRIORITY_LIFECYCLE, \
+    PRIORITY_INVENTORY, PRIORITY_METRICS
+from zhmcclient._ratelimit import _RateLimiter
+
+
+class _RecordingHook(SessionHook):
+    """Session hook that records the ended requests."""
+
+    def __init__(self):
+        self.infos = []
+
+    def request_ended(self, info):
+        self.infos.append(info)
+
+
+class TestRateLimiter(object):
+    """All tests for the _RateLimiter class."""
+
+    def test_init(self):
+        """Test _RateLimiter.__init__()."""
+
+        limiter = _RateLimiter(5, 0)
+
+        assert limiter.rate == 5.0
+        assert limiter.burst == 1
+        assert limiter.waiting == 0
+
+        with pytest.raises(ValueError):
+            _RateLimiter(0, 1)
+
+    def test_burst_and_rate(self):
+        """Test that a burst is admitted without waiting, and further
+        requests at the rate."""
+
+        limiter = _RateLimiter(20, 3)
+
+        queue_times = [limiter.acquire(PRIORITY_INVENTORY) for _ in range(3)]
+        start_time = time.time()
+        for _ in range(4):
+            limiter.acquire(PRIORITY_INVENTORY)
+        elapsed = time.time() - start_time
+
+        assert max(queue_times) < 0.05
+        assert elapsed >= 0.15
+
+    def test_priority(self):
+        """Test that waiting requests are admitted by priority, and by
+        arrival for the same priority."""
+
+        limiter = _RateLimiter(10, 1)
+        limiter.acquire(PRIORITY_INVENTORY)
+        admitted = []
+
+        def acquire(name, priority):
+            limiter.acquire(priority)
+            admitted.append(name)
+
+        threads = []
+        for name, priority in (('metrics', PRIORITY_METRICS),
+                               ('inventory1', PRIORITY_INVENTORY),
+                               ('inventory2', PRIORITY_INVENTORY),
+                               ('interactive', PRIORITY_INTERACTIVE)):
+            thread = threading.Thread(target=acquire, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            # Wait until the request is waiting
+            while limiter.waiting < len(threads) and thread.is_alive():
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+
+        # The first request may have been admitted before all others arrived
+        if admitted[0] == 'metrics':
+            admitted = admitted[1:] + admitted[:1]
+        assert admitted == ['interactive', 'inventory1', 'inventory2',
+                            'metrics']
+
+
+class TestSessionRateLimit(object):
+    """All tests for the rate limiting and priorities of sessions."""
+
+    def test_default(self):
+        """Test that requests are not rate limited by default."""
+
+        session = Session('fake-host', session_id='fake-id')
+        hook = _RecordingHook()
+        session.add_hook(hook)
+
+        with requests_mock.mock() as m:
+            m.get('/api/console', json={})
+            m.get('/api/services/metrics/context/1', json={})
+            m.post('/api/console/operations/reorder', status_code=204)
+            session.get('/api/console')
+            session.get('/api/services/metrics/context/1')
+            session.post('/api/console/operations/reorder')
+            with session.request_priority(PRIORITY_INTERACTIVE):
+                session.get('/api/console')
+                with session.request_priority(PRIORITY_METRICS):
+                    session.get('/api/console')
+                session.post('/api/console/operations/reorder')
+
+        assert session.retry_timeout_config.rate_limit == 0
+        assert [i.priority for i in hook.infos] == [
+            PRIORITY_INVENTORY, PRIORITY_METRICS, PRIORITY_LIFECYCLE,
+            PRIORITY_INTERACTIVE, PRIORITY_METRICS, PRIORITY_INTERACTIVE]
+        assert all(i.queue_time == 0 for i in hook.infos)
+
+    def test_rate_limit(self):
+        """Test the rate limiting of the requests of a session."""
+
+        rt_config = RetryTimeoutConfig(rate_limit=20, rate_burst=2)
+        session = Session('fake-host', session_id='fake-id',
+                          retry_timeout_config=rt_config)
+        hook = PrometheusHook()
+        session.add_hook(hook)
+
+        with requests_mock.mock() as m:
+            m.get('/api/console', json={})
+            start_time = time.time()
+            for _ in range(5):
+                session.get('/api/console')
+            elapsed = time.time() - start_time
+
+        assert elapsed >= 0.15
+        samples = [(l, v) for n, l, v in hook.samples()
+                   if n == 'zhmc_request_queue_seconds_sum']
+        assert samples[0][0] == {'priority': str(PRIORITY_INVENTORY)}
+        assert samples[0][1] >= 0.1
+
+    def test_session_pool(self):
+        """Test that the sessions of a pool share its rate limit and request
+        priorities."""
+
+        rt_config = RetryTimeoutConfig(rate_limit=20, rate_burst=1)
+        pool = SessionPool('fake-host', 'fake-user', 'fake-pw', size=2,
+                           retry_timeout_config=rt_config)
+        hook = _RecordingHook()
+        pool.add_hook(hook)
+
+        with requests_mock.mock() as m:
+            m.post('/api/sessions', json={'api-session': 'fake-id'})
+            m.get('/api/console', json={})
+            pool.logon()
+            with pool.request_priority(PRIORITY_INTERACTIVE):
+                pool.get('/api/console')
+
+        for session in pool.sessions:
+            # pylint: disable=protected-access
+            assert session._rate_limiter is pool._rate_limiter
+        assert [i.priority for i in hook.infos] == [
+            PRIORITY_LIFECYCLE, PRIORITY_LIFECYCLE, PRIORITY_INTERACTIVE]
+        assert hook.infos[1].queue_time > 0
@@ -0,0 +1,248 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for _session_cache module.
+"""
+
+from __future__ import absolute_import, print_function
+
+import io
+import os
+import json
+import stat
+import requests_mock
+import mock
+import pytest
+
+from zhmcclient import Session, SessionCache
+
+unix_only = pytest.mark.skipif(not hasattr(os, 'getuid'),
+                               reason="Requires Unix file permissions")
+
+
+class TestSessionCache(object):
+    """All tests for the SessionCache class."""
+
+    def setup_method(self):
+        self.directory = None
+        self.cache = None
+
+    def create_cache(self, tmpdir):
+        """Create a session cache in a new directory."""
+        self.directory = str(tmpdir.join('sessions'))
+        self.cache = SessionCache(self.directory)
+
+    def cache_files(self):
+        """Return the path names of the files in the cache directory."""
+        return [os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)]
+
+    def test_init(self, tmpdir):
+        """Test SessionCache.__init__()."""
+
+        self.create_cache(tmpdir)
+
+        assert self.cache.directory == self.directory
+        assert os.path.isdir(self.directory)
+        if hasattr(os, 'getuid'):
+            assert stat.S_IMODE(os.stat(self.directory).st_mode) & 0o077 == 0
+
+        # Existing directory
+        cache = SessionCache(self.directory)
+        assert cache.get('fake-host', 'fake-user') is None
+
+    def test_set_get_remove(self, tmpdir):
+        """Test storing, retrieving and removing session-ids."""
+
+        self.create_cache(tmpdir)
+
+        self.cache.set('fake-host', 'fake-user', 'id1')
+        self.cache.set('fake-host', 'other-user', 'id2')
+        self.cache.set('fake-host', 'fake-user', 'id3', port=9000)
+
+        assert self.cache.get('fake-host', 'fake-user') == 'id1'
+        assert self.cache.get('fake-host', 'other-user') == 'id2'
+        assert self.cache.get('fake-host', 'fake-user', port=9000) == 'id3'
+        assert self.cache.get('other-host', 'fake-user') is None
+        assert len(self.cache_files()) == 3
+
+        self.cache.set('fake-host', 'fake-user', 'id4')
+        assert self.cache.get('fake-host', 'fake-user') == 'id4'
+        assert len(self.cache_files()) == 3
+
+        self.cache.remove('fake-host', 'fake-user', session_id='id1')
+        assert self.cache.get('fake-host', 'fake-user') == 'id4'
+        self.cache.remove('fake-host', 'fake-user', session_id='id4')
+        assert self.cache.get('fake-host', 'fake-user') is None
+        self.cache.remove('fake-host', 'other-user')
+        self.cache.remove('fake-host', 'other-user')
+        assert self.cache.get('fake-host', 'other-user') is None
+        assert len(self.cache_files()) == 1
+
+        self.cache.clear()
+        assert self.cache_files() == []
+
+    @unix_only
+    def test_permissions(self, tmpdir):
+        """Test that cache files can only be accessed by the current user,
+        and that other files are ignored."""
+
+        self.create_cache(tmpdir)
+        self.cache.set('fake-host', 'fake-user', 'id1')
+        filename, = self.cache_files()
+
+        assert stat.S_IMODE(os.stat(filename).st_mode) == 0o600
+
+        os.chmod(filename, 0o644)
+        assert self.cache.get('fake-host', 'fake-user') is None
+
+    def test_write_read(self, tmpdir):
+        """Test that an entry is written to its file and read back."""
+
+        self.create_cache(tmpdir)
+        self.cache.set(u'fake-host', u'fake-\u00fcser', u'id1')
+        filename, = self.cache_files()
+
+        with io.open(filename, encoding='utf-8') as fp:
+            entry = json.load(fp)
+        assert entry == {'host': u'fake-host', 'port': 6794,
+                         'userid': u'fake-\u00fcser', 'session-id': u'id1'}
+        cache = SessionCache(self.directory)
+        assert cache.get(u'fake-host', u'fake-\u00fcser') == u'id1'
+
+    def test_write_error(self, tmpdir):
+        """Test that a failed write leaves no temporary file."""
+
+        self.create_cache(tmpdir)
+
+        with mock.patch('os.rename', side_effect=OSError(13, 'denied')):
+            self.cache.set('fake-host', 'fake-user', 'id1')
+
+        assert self.cache_files() == []
+        assert self.cache.get('fake-host', 'fake-user') is None
+
+    def test_invalid_file(self, tmpdir):
+        """Test that invalid cache files are ignored."""
+
+        self.create_cache(tmpdir)
+        self.cache.set('fake-host', 'fake-user', 'id1')
+        filename, = self.cache_files()
+        with open(filename, 'w') as fp:
+            fp.write('{"host": "fake-')
+
+        assert self.cache.get('fake-host', 'fake-user') is None
+
+
+class TestSessionWithCache(object):
+    """All tests for sessions that use a session cache."""
+
+    def setup_method(self):
+        self.logons = 0
+
+    def mock_server(self, m):
+        """Mock the logon, logoff and a GET operation of an HMC."""
+
+        def logon(request, context):
+            # pylint: disable=unused-argument
+            self.logons += 1
+            return {'api-session': 'id{}'.format(self.logons)}
+
+        def get_console(request, context):
+            if request.headers['X-API-Session'] != \
+                    'id{}'.format(self.logons):
+                context.status_code = 403
+                return {'http-status': 403, 'reason': 5,
+                        'message': 'session expired'}
+            return {'name': 'fake-hmc'}
+
+        m.post('/api/sessions', json=logon)
+        m.delete('/api/sessions/this-session', status_code=204)
+        m.get('/api/console', json=get_console)
+
+    def test_shared_logon(self, tmpdir):
+        """Test that sessions share the cached session-id."""
+
+        cache = SessionCache(str(tmpdir.join('sessions')))
+
+        with requests_mock.mock() as m:
+            self.mock_server(m)
+
+            session1 = Session('fake-host', 'fake-user', 'fake-pw',
+                               session_cache=cache)
+            session1.get('/api/console')
+            assert session1.session_id == 'id1'
+            assert cache.get('fake-host', 'fake-user') == 'id1'
+
+            session2 = Session('fake-host', 'fake-user', 'fake-pw',
+                               session_cache=cache)
+            session2.get('/api/console')
+            assert session2.session_id == 'id1'
+            assert session2.session_cache is cache
+            assert self.logons == 1
+
+            # The shared HMC session is not logged off
+            session1.logoff()
+            session2.logoff()
+            assert not session2.is_logon()
+            assert cache.get('fake-host', 'fake-user') == 'id1'
+            assert [r.method for r in m.request_history].count('DELETE') == 0
+
+            # After removing it from the cache, it is logged off
+            session1.logon()
+            cache.remove('fake-host', 'fake-user')
+            session1.logoff()
+            assert [r.method for r in m.request_history].count('DELETE') == 1
+
+    def test_expired_session_id(self, tmpdir):
+        """Test that an expired cached session-id is replaced."""
+
+        cache = SessionCache(str(tmpdir.join('sessions')))
+        cache.set('fake-host', 'fake-user', 'expired-id')
+
+        with requests_mock.mock() as m:
+            self.mock_server(m)
+
+            session = Session('fake-host', 'fake-user', 'fake-pw',
+                              session_cache=cache)
+            result = session.get('/api/console')
+
+            assert result == {'name': 'fake-hmc'}
+            assert session.session_id == 'id1'
+            assert cache.get('fake-host', 'fake-user') == 'id1'
+            assert self.logons == 1
+
+    def test_refreshed_session_id(self, tmpdir):
+        """Test that a session-id that was refreshed by another session is
+        used instead of logging on again."""
+
+        cache = SessionCache(str(tmpdir.join('sessions')))
+
+        with requests_mock.mock() as m:
+            self.mock_server(m)
+
+            session1 = Session('fake-host', 'fake-user', 'fake-pw',
+                               session_cache=cache)
+            session2 = Session('fake-host', 'fake-user', 'fake-pw',
+                               session_cache=cache)
+            session1.get('/api/console')
+            session2.get('/api/console')
+
+            # The HMC expires id1, and another process logs on again
+            self.logons += 1
+            cache.set('fake-host', 'fake-user', 'id2')
+            session2.get('/api/console')
+
+            assert session2.session_id == 'id2'
+            assert self.logons == 2
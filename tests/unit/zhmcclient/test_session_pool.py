@@ -0,0 +1,219 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for _session_pool module.
+"""
+
+from __future__ import absolute_import, print_function
+
+import threading
+import requests_mock
+import mock
+import pytest
+
+from zhmcclient import SessionPool, Session, Client, SessionHook
+
+
+class TestSessionPool(object):
+    """All tests for the SessionPool class."""
+
+    def setup_method(self):
+        self.lock = threading.Lock()
+        self.logons = 0
+        self.expired = set()  # Session-ids expired by the HMC
+
+    def mock_server(self, m):
+        """Mock the logon, logoff and a GET operation of an HMC."""
+
+        def logon(request, context):
+            # pylint: disable=unused-argument
+            with self.lock:
+                self.logons += 1
+                return {'api-session': 'id{}'.format(self.logons)}
+
+        def get_console(request, context):
+            session_id = request.headers['X-API-Session']
+            if session_id in self.expired:
+                context.status_code = 403
+                return {'http-status': 403, 'reason': 5,
+                        'message': 'session expired'}
+            return {'session': session_id}
+
+        m.post('/api/sessions', json=logon)
+        m.delete('/api/sessions/this-session', status_code=204)
+        m.get('/api/console', json=get_console)
+        m.get('/api/version', json={'api-major-version': 2,
+                                    'api-minor-version': 1})
+
+    def test_init(self):
+        """Test SessionPool.__init__()."""
+
+        pool = SessionPool('fake-host', 'fake-user', 'fake-pw', size=3)
+
+        assert pool.size == 3
+        assert len(pool.sessions) == 3
+        for session in pool.sessions:
+            assert isinstance(session, Session)
+            assert session.host == 'fake-host'
+            assert session.userid == 'fake-user'
+            assert session.time_stats_keeper is pool.time_stats_keeper
+        assert not pool.is_logon()
+        assert pool.session_id is None
+
+        with pytest.raises(ValueError):
+            SessionPool('fake-host', 'fake-user', 'fake-pw', size=0)
+
+    def test_logon_logoff(self):
+        """Test logging on and off all sessions of the pool."""
+
+        get_password = mock.MagicMock(return_value='fake-pw')
+        pool = SessionPool('fake-host', 'fake-user', size=3,
+                           get_password=get_password)
+
+        with requests_mock.mock() as m:
+            self.mock_server(m)
+
+            pool.logon()
+
+            assert pool.is_logon()
+            assert sorted(s.session_id for s in pool.sessions) == \
+                ['id1', 'id2', 'id3']
+            get_password.assert_called_once_with('fake-host', 'fake-user')
+
+            pool.logoff()
+
+            assert not pool.is_logon()
+            assert [r.method for r in m.request_history].count('DELETE') == 3
+
+    def test_round_robin(self):
+        """Test that sequential requests use the sessions in turn."""
+
+        pool = SessionPool('fake-host', 'fake-user', 'fake-pw', size=3)
+
+        with requests_mock.mock() as m:
+            self.mock_server(m)
+
+            sessions = [pool.get('/api/console')['session']
+                        for _ in range(6)]
+
+        assert sessions == ['id1', 'id2', 'id3', 'id1', 'id2', 'id3']
+
+    def test_least_in_flight(self):
+        """Test that requests use the sessions with the fewest requests in
+        progress."""
+
+        pool = SessionPool('fake-host', 'fake-user', 'fake-pw', size=3)
+
+        with requests_mock.mock() as m:
+            self.mock_server(m)
+            pool.logon()
+
+            # pylint: disable=protected-access
+            with pool._request_session() as busy1:
+                with pool._request_session() as busy2:
+                    sessions = [pool.get('/api/console')['session']
+                                for _ in range(2)]
+                sessions.append(pool.get('/api/console')['session'])
+
+        assert busy1 is not busy2
+        idle, = [s for s in pool.sessions if s not in (busy1, busy2)]
+        assert sessions == [idle.session_id, idle.session_id,
+                            busy2.session_id]
+
+    def test_lease(self):
+        """Test leasing a session of the pool to a thread."""
+
+        pool = SessionPool('fake-host', 'fake-user', 'fake-pw', size=2)
+        other_results = []
+
+        def get_console():
+            other_results.append(pool.get('/api/console')['session'])
+
+        with requests_mock.mock() as m:
+            self.mock_server(m)
+            pool.logon()
+
+            with pool.lease() as leased:
+                assert leased in pool.sessions
+                with pool.lease() as nested:
+                    assert nested is leased
+                results = [pool.get('/api/console')['session']
+                           for _ in range(3)]
+                for _ in range(3):
+                    thread = threading.Thread(target=get_console)
+                    thread.start()
+                    thread.join()
+
+        assert results == [leased.session_id] * 3
+        assert leased.session_id not in other_results
+
+    def test_lease_wait(self):
+        """Test that leasing waits until a session is returned."""
+
+        pool = SessionPool('fake-host', 'fake-user', 'fake-pw', size=1)
+        leased_sessions = []
+
+        def lease():
+            with pool.lease() as session:
+                leased_sessions.append(session)
+
+        with pool.lease() as session:
+            thread = threading.Thread(target=lease)
+            thread.start()
+            thread.join(0.1)
+            assert thread.is_alive()
+        thread.join()
+
+        assert leased_sessions == [session]
+
+    def test_expired_session(self):
+        """Test that a session of the pool logs on again when the HMC has
+        expired its session-id."""
+
+        pool = SessionPool('fake-host', 'fake-user', 'fake-pw', size=2)
+
+        with requests_mock.mock() as m:
+            self.mock_server(m)
+            pool.logon()
+            self.expired.add('id1')
+
+            sessions = [pool.get('/api/console')['session']
+                        for _ in range(2)]
+
+        assert sorted(sessions) == ['id2', 'id3']
+        assert sorted(s.session_id for s in pool.sessions) == ['id2', 'id3']
+
+    def test_client(self):
+        """Test using a session pool for a client."""
+
+        pool = SessionPool('fake-host', 'fake-user', 'fake-pw', size=2)
+        hook = SessionHook()
+        hook.request_ended = mock.MagicMock()
+        pool.add_hook(hook)
+
+        with requests_mock.mock() as m:
+            self.mock_server(m)
+
+            client = Client(pool)
+            api_version = client.query_api_version()
+
+        assert api_version['api-major-version'] == 2
+        assert hook.request_ended.call_count == 1
+        for session in pool.sessions:
+            assert session.hooks == (hook,)
+
+        pool.remove_hook(hook)
+        for session in pool.sessions:
+            assert session.hooks == ()
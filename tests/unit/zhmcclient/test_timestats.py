@@ -19,9 +19,11 @@ Unit tests for _timestats module.
 from __future__ import absolute_import, print_function
 
 import time
+import threading
+import requests_mock
 import pytest
 
-from zhmcclient import TimeStatsKeeper, TimeStats
+from zhmcclient import TimeStatsKeeper, TimeStats, Session
 
 
 PRINT_HEADER = \
@@ -321,3 +323,370 @@ class TestTimeStats(object):
         num_lines = len(s.split('\n'))
         assert num_lines == 1, \
             "Unexpected str(timestats): %r" % s
+
+
+class TestTimeStatsHistogram(object):
+    """All tests for the histogram support in TimeStats and TimeStatsKeeper."""
+
+    @staticmethod
+    def stats_with(keeper, name, durations):
+        """
+        Return the TimeStats object for a name from a keeper, after adding
+        invocations with the specified durations to it.
+        """
+        stats = keeper.get_stats(name)
+        for dt in durations:
+            stats._add(dt)
+        return stats
+
+    @pytest.mark.parametrize(
+        "durations, percent, exp_time", [
+            ([], 50, 0),
+            ([0.5], 0, 0.5),
+            ([0.5], 99, 0.5),
+            ([0.01] * 99 + [2.0], 50, 0.01),
+            ([0.01] * 99 + [2.0], 99, 0.01),
+            ([0.01] * 99 + [2.0], 100, 2.0),
+            ([0.01] * 90 + [0.2] * 10, 95, 0.2),
+            ([0.001 * i for i in range(1, 1001)], 50, 0.5),
+            ([0.001 * i for i in range(1, 1001)], 99, 0.99),
+            ([1e-8, 1e-8], 50, 1e-8),
+            ([1e5], 50, 1e5),
+        ]
+    )
+    def test_percentile(self, durations, percent, exp_time):
+        """Test TimeStats.percentile()."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        stats = self.stats_with(keeper, 'foo', durations)
+
+        # Execute the code to be tested
+        result = stats.percentile(percent)
+
+        assert result == pytest.approx(exp_time, rel=0.1)
+
+    @pytest.mark.parametrize("percent", [-1, 101])
+    def test_percentile_invalid(self, percent):
+        """Test TimeStats.percentile() with invalid percentages."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        stats = self.stats_with(keeper, 'foo', [0.1])
+
+        with pytest.raises(ValueError):
+            stats.percentile(percent)
+
+    def test_histogram(self):
+        """Test TimeStats.histogram."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        stats = self.stats_with(keeper, 'foo', [0.01, 0.01, 1.0])
+
+        histogram = stats.histogram
+
+        assert [n for _, n in histogram] == [2, 1]
+        assert histogram[0][0] >= 0.01
+        assert histogram[0][0] < 0.011
+        assert histogram[1][0] >= 1.0
+        assert histogram[1][0] < 1.1
+
+    def test_reset(self):
+        """Test that TimeStats.reset() resets the histogram."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        stats = self.stats_with(keeper, 'foo', [0.01, 1.0])
+
+        stats.reset()
+
+        assert stats.histogram == []
+        assert stats.percentile(99) == 0
+
+    def test_keeper_merge(self):
+        """Test TimeStatsKeeper.merge()."""
+
+        keeper1 = TimeStatsKeeper()
+        keeper1.enable()
+        self.stats_with(keeper1, 'foo', [0.01] * 10)
+        keeper2 = TimeStatsKeeper()
+        keeper2.enable()
+        self.stats_with(keeper2, 'foo', [1.0] * 10)
+        self.stats_with(keeper2, 'bar', [0.1])
+
+        # Execute the code to be tested
+        keeper1.merge(keeper2)
+
+        snap = keeper1.snapshot()
+        assert sorted(snap.keys()) == ['bar', 'foo']
+        foo = snap['foo']
+        assert foo.count == 20
+        assert foo.min_time == 0.01
+        assert foo.max_time == 1.0
+        assert foo.avg_time == pytest.approx(0.505)
+        assert foo.percentile(50) == pytest.approx(0.01, rel=0.1)
+        assert foo.percentile(95) == pytest.approx(1.0, rel=0.1)
+        assert snap['bar'].count == 1
+        assert keeper1.get_stats('bar').keeper is keeper1
+
+        # The merged keeper is unchanged
+        assert keeper2.get_stats('foo').count == 10
+
+    def test_keeper_diff(self):
+        """Test TimeStatsKeeper.diff()."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        self.stats_with(keeper, 'foo', [0.01] * 10)
+        self.stats_with(keeper, 'bar', [0.1])
+        snap = keeper.snapshot()
+        self.stats_with(keeper, 'foo', [1.0] * 5)
+        self.stats_with(keeper, 'baz', [0.2])
+
+        # Execute the code to be tested
+        diff = keeper.diff(snap)
+
+        assert sorted(diff.keys()) == ['baz', 'foo']
+        foo = diff['foo']
+        assert foo.count == 5
+        assert foo.avg_time == pytest.approx(1.0)
+        assert foo.min_time == pytest.approx(1.0, rel=0.1)
+        assert foo.max_time == 1.0
+        assert foo.percentile(50) == pytest.approx(1.0, rel=0.1)
+        assert diff['baz'].count == 1
+
+
+class TestTimeStatsOperationName(object):
+    """All tests for TimeStatsKeeper.operation_name()."""
+
+    @pytest.mark.parametrize(
+        "method, uri, exp_name", [
+            ('get', '/api/version',
+             'get /api/version'),
+            ('get', '/api/cpcs',
+             'get /api/cpcs'),
+            ('get', '/api/cpcs/1a2b-3c4d',
+             'get /api/cpcs/{id}'),
+            ('get', '/api/cpcs/1a2b/partitions?name=abc&status=active',
+             'get /api/cpcs/{id}/partitions?name={value}&status={value}'),
+            ('get', '/api/partitions/p1/nics/n1',
+             'get /api/partitions/{id}/nics/{id}'),
+            ('post', '/api/partitions/p1/operations/start',
+             'post /api/partitions/{id}/operations/start'),
+            ('post', '/api/sessions/operations/get-notification-topics',
+             'post /api/sessions/operations/get-notification-topics'),
+            ('delete', '/api/sessions/this-session',
+             'delete /api/sessions/{id}'),
+            ('get', '/api/console/users/u1',
+             'get /api/console/users/{id}'),
+            ('post', '/api/console/operations/list-unmanaged-cpcs',
+             'post /api/console/operations/list-unmanaged-cpcs'),
+            ('get', '/api/cpcs/c1/reset-activation-profiles/DEFAULT',
+             'get /api/cpcs/{id}/reset-activation-profiles/{id}'),
+            ('get', '/api/services/metrics/context/m1',
+             'get /api/services/metrics/context/{id}'),
+            ('get', '/api/storage-groups/s1/storage-volumes/v1',
+             'get /api/storage-groups/{id}/storage-volumes/{id}'),
+            ('get', '/api/jobs/j1',
+             'get /api/jobs/{id}'),
+        ]
+    )
+    def test_operation_name(self, method, uri, exp_name):
+        """Test operation_name() with URI templates."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+
+        name = keeper.operation_name(method, uri)
+
+        assert name == exp_name
+
+    def test_operation_name_raw(self):
+        """Test operation_name() with raw URIs."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable(raw_uris=True)
+        assert keeper.raw_uris is True
+
+        name = keeper.operation_name('get', '/api/partitions/p1/nics/n1')
+
+        assert name == 'get /api/partitions/p1/nics/n1'
+
+
+class TestTimeStatsConcurrency(object):
+    """All tests for the timer support and concurrency in TimeStats."""
+
+    def test_timer(self):
+        """Test TimeStats.timer() as a context manager."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        stats = keeper.get_stats('foo')
+
+        with stats.timer():
+            time.sleep(0.01)
+
+        assert stats.count == 1
+        assert stats.min_time >= 0.01
+
+    def test_timer_nested(self):
+        """Test nested timers for the same TimeStats object."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        stats = keeper.get_stats('foo')
+
+        with stats.timer():
+            with stats.timer():
+                time.sleep(0.01)
+
+        assert stats.count == 2
+
+    def test_timer_disabled(self):
+        """Test a timer started while the keeper is disabled."""
+
+        keeper = TimeStatsKeeper()
+        stats = TimeStats(keeper, 'foo')
+
+        timer = stats.timer()
+        timer.start()
+        keeper.enable()
+        timer.stop()
+
+        assert stats.count == 0
+
+    def test_begin_end_threads(self):
+        """Test begin() and end() in concurrent threads."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        stats = keeper.get_stats('foo')
+        began = [threading.Event(), threading.Event()]
+        errors = []
+
+        def run(index):
+            try:
+                stats.begin()
+                began[index].set()
+                # Wait until the other thread has also called begin()
+                began[1 - index].wait()
+                stats.end()
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert stats.count == 2
+
+    def test_timer_threads(self):
+        """Test timers and snapshots in concurrent threads."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        num_threads = 8
+        num_calls = 500
+
+        def run(index):
+            for i in range(num_calls):
+                stats = keeper.get_stats('op{}'.format(i % 5))
+                with stats.timer():
+                    pass
+                if index == 0 and i % 50 == 0:
+                    keeper.snapshot()
+
+        threads = [threading.Thread(target=run, args=(i,))
+                   for i in range(num_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        snap = keeper.snapshot()
+        assert sorted(snap.keys()) == ['op{}'.format(i) for i in range(5)]
+        assert sum(s.count for s in snap.values()) == num_threads * num_calls
+        for stats in snap.values():
+            assert sum(n for _, n in stats.histogram) == stats.count
+
+
+class TestTimeStatsPayload(object):
+    """All tests for the payload accounting in TimeStats."""
+
+    def test_payload(self):
+        """Test the payload properties, merge() and diff()."""
+
+        keeper = TimeStatsKeeper()
+        keeper.enable()
+        stats = keeper.get_stats('foo')
+        stats._add(0.1)
+        stats._add_transfer(10, 1000)
+        stats._add_decode(0.01, 5)
+        snap = keeper.snapshot()
+        stats._add(0.1)
+        stats._add_transfer(None, 3000)
+        stats._add_decode(0.02, 7)
+
+        assert stats.bytes_sent == 10
+        assert stats.bytes_received == 4000
+        assert stats.avg_bytes_received == 2000
+        assert stats.decode_time == pytest.approx(0.03)
+        assert stats.object_count == 12
+        assert 'received=4000B' in str(stats)
+
+        diff = keeper.diff(snap)['foo']
+        assert diff.bytes_sent == 0
+        assert diff.bytes_received == 3000
+        assert diff.decode_time == pytest.approx(0.02)
+        assert diff.object_count == 7
+
+        stats.merge(diff)
+        assert stats.bytes_received == 7000
+        assert stats.object_count == 19
+
+        stats.reset()
+        assert stats.bytes_received == 0
+        assert stats.object_count == 0
+
+    def test_payload_disabled(self):
+        """Test that payload is not accumulated when disabled."""
+
+        keeper = TimeStatsKeeper()
+        stats = keeper.get_stats('foo')
+
+        stats._add_transfer(10, 1000)
+        stats._add_decode(0.01, 5)
+
+        assert stats.bytes_received == 0
+        assert stats.object_count == 0
+
+    def test_session(self):
+        """Test the payload accounting of Session requests."""
+
+        session = Session('fake-host', 'fake-user', 'fake-pw',
+                          session_id='fake-session-id')
+        keeper = session.time_stats_keeper
+        keeper.enable()
+        content = '{"partitions": [{"name": "p1"}, {"name": "p2"}]}'
+
+        with requests_mock.mock() as m:
+            m.get('/api/cpcs/c1/partitions', text=content)
+            m.post('/api/partitions/p1', status_code=204)
+
+            session.get('/api/cpcs/c1/partitions')
+            session.post('/api/partitions/p1', body={'description': 'd'})
+
+        snap = keeper.snapshot()
+        get_stats = snap['get /api/cpcs/{id}/partitions']
+        assert get_stats.bytes_sent == 0
+        assert get_stats.bytes_received == len(content)
+        assert get_stats.object_count == 3
+        assert get_stats.decode_time >= 0
+        post_stats = snap['post /api/partitions/{id}']
+        assert post_stats.bytes_sent == len('{"description": "d"}')
+        assert post_stats.bytes_received == 0
+        assert post_stats.object_count == 0
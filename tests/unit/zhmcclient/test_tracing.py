@@ -0,0 +1,373 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for _tracing module.
+"""
+
+from __future__ import absolute_import, print_function
+
+import requests_mock
+import pytest
+
+from zhmcclient import Session, SessionHook, PrometheusHook, \
+    OpenTelemetryHook, HTTPError
+
+
+class RecordingHook(SessionHook):
+    """
+    Session hook that records the invocations of its methods.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def request_started(self, info):
+        self.calls.append(('started', info.kind, info.operation))
+
+    def request_ended(self, info):
+        self.calls.append(('ended', info.kind, info.operation))
+        self.last_info = info
+
+
+class FailingHook(SessionHook):
+    """
+    Session hook that raises exceptions.
+    """
+
+    def request_started(self, info):
+        raise ValueError("started")
+
+    def request_ended(self, info):
+        raise ValueError("ended")
+
+
+class TestSessionHooks(object):
+    """
+    All tests for invoking session hooks in the Session class.
+    """
+
+    def setup_method(self):
+        self.session = Session('fake-host', 'fake-user', 'fake-pw',
+                               session_id='fake-session-id')
+        self.hook = RecordingHook()
+        self.session.add_hook(self.hook)
+
+    def test_add_remove(self):
+        """Test Session.add_hook(), remove_hook() and hooks."""
+
+        hook2 = RecordingHook()
+
+        self.session.add_hook(hook2)
+        assert self.session.hooks == (self.hook, hook2)
+
+        self.session.remove_hook(self.hook)
+        assert self.session.hooks == (hook2,)
+
+        with pytest.raises(ValueError):
+            self.session.remove_hook(self.hook)
+
+    def test_get(self):
+        """Test hooks for a successful GET request."""
+
+        with requests_mock.mock() as m:
+            m.get('/api/partitions/p1', text='{"name": "abc"}')
+
+            self.session.get('/api/partitions/p1')
+
+        assert self.hook.calls == [
+            ('started', 'request', 'get /api/partitions/{id}'),
+            ('ended', 'request', 'get /api/partitions/{id}'),
+        ]
+        info = self.hook.last_info
+        assert info.method == 'GET'
+        assert info.uri == '/api/partitions/p1'
+        assert info.status == 200
+        assert info.bytes_sent == 0
+        assert info.bytes_received == len('{"name": "abc"}')
+        assert info.relogon is False
+        assert info.exception is None
+        assert info.duration >= 0
+
+    def test_post(self):
+        """Test hooks for a successful POST request."""
+
+        with requests_mock.mock() as m:
+            m.post('/api/partitions/p1', status_code=204)
+
+            self.session.post('/api/partitions/p1', body={'name': 'abc'})
+
+        assert self.hook.calls == [
+            ('started', 'request', 'post /api/partitions/{id}'),
+            ('ended', 'request', 'post /api/partitions/{id}'),
+        ]
+        info = self.hook.last_info
+        assert info.status == 204
+        assert info.bytes_sent == len('{"name": "abc"}')
+
+    def test_delete_error(self):
+        """Test hooks for a DELETE request that fails."""
+
+        with requests_mock.mock() as m:
+            m.delete('/api/partitions/p1', status_code=409,
+                     json={'http-status': 409, 'reason': 1,
+                           'message': 'fake-message'})
+
+            with pytest.raises(HTTPError) as exc_info:
+                self.session.delete('/api/partitions/p1')
+
+        info = self.hook.last_info
+        assert info.operation == 'delete /api/partitions/{id}'
+        assert info.status == 409
+        assert info.exception is exc_info.value
+
+    def test_relogon(self):
+        """Test hooks for a GET request with an expired session token."""
+
+        with requests_mock.mock() as m:
+            m.get('/api/partitions/p1', [
+                {'status_code': 403,
+                 'json': {'http-status': 403, 'reason': 5,
+                          'message': 'fake-message'}},
+                {'status_code': 200, 'json': {}},
+            ])
+            m.post('/api/sessions', json={'api-session': 'fake-session-id'})
+
+            self.session.get('/api/partitions/p1')
+
+        assert self.hook.calls == [
+            ('started', 'request', 'get /api/partitions/{id}'),
+            ('started', 'request', 'post /api/sessions'),
+            ('ended', 'request', 'post /api/sessions'),
+            ('started', 'request', 'get /api/partitions/{id}'),
+            ('ended', 'request', 'get /api/partitions/{id}'),
+            ('ended', 'request', 'get /api/partitions/{id}'),
+        ]
+        info = self.hook.last_info
+        assert info.status == 403
+        assert info.relogon is True
+
+    def test_job_wait(self):
+        """Test hooks for a POST request with waiting for job completion."""
+
+        with requests_mock.mock() as m:
+            m.post('/api/partitions/p1/operations/start', status_code=202,
+                   json={'job-uri': '/api/jobs/j1'})
+            m.get('/api/jobs/j1',
+                  json={'status': 'complete', 'job-status-code': 200,
+                        'job-results': {'a': 1}})
+            m.delete('/api/jobs/j1', status_code=204)
+
+            result = self.session.post('/api/partitions/p1/operations/start',
+                                       wait_for_completion=True)
+
+        assert result == {'a': 1}
+        op = 'post /api/partitions/{id}/operations/start'
+        assert self.hook.calls == [
+            ('started', 'request', op),
+            ('ended', 'request', op),
+            ('started', 'job-wait', op),
+            ('started', 'request', 'get /api/jobs/{id}'),
+            ('ended', 'request', 'get /api/jobs/{id}'),
+            ('started', 'request', 'delete /api/jobs/{id}'),
+            ('ended', 'request', 'delete /api/jobs/{id}'),
+            ('ended', 'job-wait', op),
+        ]
+        info = self.hook.last_info
+        assert info.job_uri == '/api/jobs/j1'
+        assert info.method == 'POST'
+        assert info.status is None
+
+    def test_failing_hook(self):
+        """Test that exceptions in hooks are ignored."""
+
+        self.session.add_hook(FailingHook())
+
+        with requests_mock.mock() as m:
+            m.get('/api/version', json={})
+
+            result = self.session.get('/api/version')
+
+        assert result == {}
+        assert len(self.hook.calls) == 2
+
+
+class TestPrometheusHook(object):
+    """
+    All tests for the PrometheusHook class.
+    """
+
+    def test_exposition(self):
+        """Test PrometheusHook.exposition() after some requests."""
+
+        session = Session('fake-host', 'fake-user', 'fake-pw',
+                          session_id='fake-session-id')
+        hook = PrometheusHook(buckets=[0.1, 1.0])
+        session.add_hook(hook)
+
+        with requests_mock.mock() as m:
+            m.get('/api/partitions/p1', text='{}')
+            m.get('/api/partitions/p2', text='{}')
+            m.get('/api/partitions/p3', status_code=404,
+                  json={'http-status': 404, 'reason': 1})
+
+            session.get('/api/partitions/p1')
+            session.get('/api/partitions/p2')
+            with pytest.raises(HTTPError):
+                session.get('/api/partitions/p3')
+
+        text = hook.exposition()
+        lines = text.splitlines()
+
+        op_labels = 'method="GET",operation="get /api/partitions/{id}"'
+        assert '# TYPE zhmc_requests_total counter' in lines
+        assert 'zhmc_requests_total{%s,status="200"} 2' % op_labels in lines
+        assert 'zhmc_requests_total{%s,status="404"} 1' % op_labels in lines
+        assert [line for line in lines if line.startswith(
+            'zhmc_request_bytes_received_total{%s} ' % op_labels)]
+        assert '# TYPE zhmc_request_duration_seconds histogram' in lines
+        assert 'zhmc_request_duration_seconds_bucket{%s,le="+Inf"} 3' % \
+            op_labels in lines
+        assert 'zhmc_request_duration_seconds_count{%s} 3' % op_labels \
+            in lines
+        assert text.endswith('\n')
+
+    def test_samples(self):
+        """Test PrometheusHook.samples() for a job wait."""
+
+        hook = PrometheusHook(buckets=[1.0], prefix='x')
+        session = Session('fake-host', 'fake-user', 'fake-pw',
+                          session_id='fake-session-id')
+        session.add_hook(hook)
+        with session._trace_request('POST', '/api/cpcs/c1/operations/x',
+                                    kind='job-wait', job_uri='/api/jobs/j1'):
+            pass
+
+        samples = hook.samples()
+
+        op = {'operation': 'post /api/cpcs/{id}/operations/x'}
+        assert ('x_job_wait_duration_seconds_count', op, 1) in samples
+        assert ('x_job_wait_duration_seconds_bucket',
+                dict(op, le='+Inf'), 1) in samples
+        assert not [s for s in samples if s[0] == 'x_requests_total']
+
+
+class FakeSpan(object):
+    """
+    Span of a FakeTracer.
+    """
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.exceptions = []
+        self.ended = False
+
+    def set_attribute(self, name, value):
+        self.attributes[name] = value
+
+    def record_exception(self, exc):
+        self.exceptions.append(exc)
+
+    def set_status(self, status):
+        self.status = status
+
+    def end(self):
+        self.ended = True
+
+    # Methods used by opentelemetry.trace.use_span(), if installed
+    def is_recording(self):
+        return True
+
+    def get_span_context(self):
+        return None
+
+
+class FakeTracer(object):
+    """
+    Tracer that records the spans it creates.
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, kind=None, attributes=None):
+        span = FakeSpan(name, attributes)
+        self.spans.append(span)
+        return span
+
+
+class TestOpenTelemetryHook(object):
+    """
+    All tests for the OpenTelemetryHook class.
+    """
+
+    def test_spans(self):
+        """Test the spans emitted for requests."""
+
+        session = Session('fake-host', 'fake-user', 'fake-pw',
+                          session_id='fake-session-id')
+        tracer = FakeTracer()
+        hook = OpenTelemetryHook(tracer)
+        assert hook.tracer is tracer
+        session.add_hook(hook)
+
+        with requests_mock.mock() as m:
+            m.get('/api/partitions/p1', text='{}')
+            m.get('/api/partitions/p2', status_code=500,
+                  json={'http-status': 500, 'reason': 1})
+
+            session.get('/api/partitions/p1')
+            with pytest.raises(HTTPError):
+                session.get('/api/partitions/p2')
+
+        assert len(tracer.spans) == 2
+        span1, span2 = tracer.spans
+        assert span1.name == 'get /api/partitions/{id}'
+        assert span1.ended
+        assert span1.attributes['http.method'] == 'GET'
+        assert span1.attributes['http.url'] == '/api/partitions/p1'
+        assert span1.attributes['http.status_code'] == 200
+        assert span1.attributes['zhmc.bytes_received'] == 2
+        assert span1.exceptions == []
+        assert span2.attributes['http.status_code'] == 500
+        assert len(span2.exceptions) == 1
+        assert isinstance(span2.exceptions[0], HTTPError)
+
+    def test_opentelemetry_tracer(self):
+        """Test the spans emitted with an OpenTelemetry SDK tracer."""
+
+        sdk_trace = pytest.importorskip('opentelemetry.sdk.trace')
+        sdk_export = pytest.importorskip(
+            'opentelemetry.sdk.trace.export.in_memory_span_exporter')
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+        exporter = sdk_export.InMemorySpanExporter()
+        provider = sdk_trace.TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        tracer = provider.get_tracer('test')
+
+        session = Session('fake-host', 'fake-user', 'fake-pw',
+                          session_id='fake-session-id')
+        session.add_hook(OpenTelemetryHook(tracer))
+
+        with tracer.start_as_current_span('app') as app_span:
+            with requests_mock.mock() as m:
+                m.get('/api/cpcs', json={'cpcs': []})
+                session.get('/api/cpcs')
+
+        spans = {s.name: s for s in exporter.get_finished_spans()}
+        span = spans['get /api/cpcs']
+        assert span.parent.span_id == app_span.get_span_context().span_id
+        assert span.attributes['http.status_code'] == 200
@@ -25,7 +25,8 @@ from datetime import datetime, MAXYEAR
 import time
 import pytz
 
-from zhmcclient._utils import datetime_from_timestamp, timestamp_from_datetime
+from zhmcclient._utils import datetime_from_timestamp, \
+    timestamp_from_datetime, is_literal_match
 
 
 # The Unix epoch
@@ -302,3 +303,37 @@ class TestTimestampFromDatetime(object):
 
         # The test is that it does not raise an exception:
         timestamp_from_datetime(datetime.max)
+
+
+class TestIsLiteralMatch(object):
+    """
+    All tests for the is_literal_match() function.
+    """
+
+    @pytest.mark.parametrize(
+        "match_value, exp_result", [
+            ('', True),
+            ('part-1', True),
+            ('CPC 1, Z/OS: a@b=c', True),
+            (u'caf\u00e9 #1', True),
+            ('part.1', False),
+            ('part-.*', False),
+            ('^part$', False),
+            ('a|b', False),
+            ('[ab]', False),
+            ('(a)', False),
+            ('a+', False),
+            ('a?', False),
+            ('a{2}', False),
+            ('a\\d', False),
+            (1, False),
+            (None, False),
+            (['part-1'], False),
+        ]
+    )
+    def test_is_literal_match(self, match_value, exp_result):
+        """Test is_literal_match()."""
+
+        result = is_literal_match(match_value)
+
+        assert result is exp_result
@@ -0,0 +1,84 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for _clock module of the zhmcclient_mock package.
+"""
+
+from __future__ import absolute_import, print_function
+
+import time
+import pytest
+
+from zhmcclient_mock._clock import VirtualClock
+
+
+class TestVirtualClock(object):
+    """All tests for class VirtualClock."""
+
+    def test_init_error(self):
+
+        with pytest.raises(ValueError):
+            VirtualClock(speed=-1)
+
+    def test_real_time(self):
+
+        clock = VirtualClock()
+
+        start = clock.time()
+        time.sleep(0.05)
+
+        assert clock.speed == 1.0
+        assert 0 <= start < clock.time()
+
+    def test_stopped(self):
+
+        clock = VirtualClock(speed=0)
+        start = clock.time()
+        time.sleep(0.01)
+
+        assert clock.time() == start
+
+        clock.advance(10)
+
+        assert clock.time() == start + 10
+
+    def test_speed(self):
+
+        clock = VirtualClock(speed=0)
+        clock.advance(5)
+
+        clock.speed = 1000
+        time.sleep(0.01)
+        now = clock.time()
+
+        assert now >= 5 + 10
+        clock.speed = 0
+        assert clock.time() >= now
+
+    def test_advance_error(self):
+
+        clock = VirtualClock()
+
+        with pytest.raises(ValueError):
+            clock.advance(-1)
+
+        with pytest.raises(ValueError):
+            clock.speed = -1
+
+    def test_repr(self):
+
+        clock = VirtualClock(speed=0)
+
+        assert repr(clock) == 'VirtualClock(speed=0, time=0.0)'
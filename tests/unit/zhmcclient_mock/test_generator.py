@@ -0,0 +1,164 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for _generator module of the zhmcclient_mock package.
+"""
+
+from __future__ import absolute_import, print_function
+
+from collections import OrderedDict
+import pytest
+
+from zhmcclient import Client
+from zhmcclient_mock import TopologyGenerator, FakedSession, InputError
+
+
+@pytest.fixture(scope='module')
+def generated_client():
+    """
+    Client for a faked session with a generated topology.
+    """
+    generator = TopologyGenerator(
+        cpcs=3, partitions=20, nics=2, hbas=(1, 3), storage_groups=4,
+        storage_volumes=5, seed=1)
+    return Client(generator.faked_session())
+
+
+class TestTopologyGenerator(object):
+    """All tests for class TopologyGenerator."""
+
+    def test_counts(self, generated_client):
+        """Test the resource counts of the generated topology."""
+
+        cpcs = generated_client.cpcs.list()
+        assert sorted(cpc.name for cpc in cpcs) == ['CPC00', 'CPC01', 'CPC02']
+
+        for cpc in cpcs:
+            partitions = cpc.partitions.list()
+            assert len(partitions) == 20
+            assert partitions[0].name.startswith(cpc.name + '-P')
+            for partition in partitions:
+                assert len(partition.nics.list()) == 2
+                assert 1 <= len(partition.hbas.list()) <= 3
+            assert len(cpc.adapters.list()) == 4
+            assert len(cpc.virtual_switches.list()) == 1
+
+        storage_groups = generated_client.consoles.console.storage_groups.\
+            list()
+        assert len(storage_groups) == 3 * 4
+
+    def test_unique_uris(self, generated_client):
+        """Test that the partition URIs are unique across CPCs."""
+
+        uris = [p.uri for cpc in generated_client.cpcs.list()
+                for p in cpc.partitions.list()]
+
+        assert len(set(uris)) == len(uris)
+
+    def test_backing(self, generated_client):
+        """Test that NICs and HBAs are backed by existing resources."""
+
+        hmc = generated_client.session.hmc
+        cpc = generated_client.cpcs.find(name='CPC01')
+        partition = cpc.partitions.find(name='CPC01-P0000')
+
+        for nic in partition.nics.list(full_properties=True):
+            backing_uri = nic.properties.get('virtual-switch-uri') or \
+                nic.properties.get('network-adapter-port-uri')
+            assert backing_uri in hmc.all_resources
+        for hba in partition.hbas.list(full_properties=True):
+            assert hba.properties['adapter-port-uri'] in hmc.all_resources
+
+    def test_seed(self):
+        """Test that the same seed generates the same topology."""
+
+        generator1 = TopologyGenerator(cpcs=2, partitions=(1, 10), seed=7)
+        generator2 = TopologyGenerator(cpcs=2, partitions=(1, 10), seed=7)
+        generator3 = TopologyGenerator(cpcs=2, partitions=(1, 10), seed=8)
+
+        assert generator1.seed == 7
+        assert generator1.resources() == generator1.resources()
+        assert generator1.resources() == generator2.resources()
+        assert generator1.resources() != generator3.resources()
+
+    def test_seed_property_order(self):
+        """Test that the same seed generates the same topology regardless of
+        the order in which the property distributions are specified."""
+
+        distributions = [
+            ('processor-mode', {'shared': 3, 'dedicated': 1}),
+            ('reserve-resources', [True, False]),
+            ('cp-processors', {0: 1, 1: 1, 2: 1}),
+            ('description', ['a', 'b', 'c']),
+        ]
+        generator1 = TopologyGenerator(
+            cpcs=1, partitions=20,
+            properties={'partition': OrderedDict(distributions)}, seed=7)
+        generator2 = TopologyGenerator(
+            cpcs=1, partitions=20,
+            properties={'partition': OrderedDict(reversed(distributions))},
+            seed=7)
+
+        assert generator1.resources() == generator2.resources()
+
+    def test_properties(self):
+        """Test the property distributions."""
+
+        generator = TopologyGenerator(
+            cpcs=1, partitions=50, nics=0, hbas=0,
+            properties={
+                'partition': {
+                    'status': 'active',
+                    'type': ['linux', 'ssc'],
+                    'ifl-processors': {1: 1, 4: 0},
+                    'description': lambda rng, index: 'part #{}'.format(index),
+                },
+            },
+            seed=3)
+        session = generator.faked_session()
+
+        partitions = session.hmc.cpcs.list()[0].partitions.list()
+        props = [p.properties for p in partitions]
+        assert set(p['status'] for p in props) == set(['active'])
+        assert set(p['type'] for p in props) == set(['linux', 'ssc'])
+        assert set(p['ifl-processors'] for p in props) == set([1])
+        assert sorted(p['description'] for p in props)[0] == 'part #0'
+        assert set(p['maximum-memory'] for p in props) == set([65536])
+
+    def test_populate_existing_console(self):
+        """Test adding the topology to a faked HMC with a console."""
+
+        session = FakedSession('fake-host', 'fake-hmc', '2.13.1', '1.8')
+        console = session.hmc.consoles.add({'name': 'my-hmc'})
+        generator = TopologyGenerator(partitions=1, storage_groups=2,
+                                      storage_volumes=1, seed=1)
+
+        generator.populate(session.hmc)
+
+        assert session.hmc.consoles.console is console
+        assert len(console.storage_groups.list()) == 2
+
+    @pytest.mark.parametrize(
+        "kwargs", [
+            dict(network_adapters=0),
+            dict(storage_adapters=0),
+            dict(properties={'lpar': {'name': 'x'}}),
+        ]
+    )
+    def test_invalid(self, kwargs):
+        """Test invalid input parameters."""
+
+        with pytest.raises(InputError):
+            TopologyGenerator(**kwargs)
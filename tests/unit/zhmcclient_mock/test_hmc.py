@@ -19,6 +19,9 @@ Unit tests for _hmc module of the zhmcclient_mock package.
 from __future__ import absolute_import, print_function
 
 import re
+import copy
+import json
+import threading
 from datetime import datetime
 import pytest
 
@@ -28,6 +31,7 @@ from zhmcclient_mock._hmc import FakedHmc, \
     FakedAdapterManager, FakedAdapter, \
     FakedCpcManager, FakedCpc, \
     FakedHbaManager, FakedHba, \
+    FakedJobManager, FakedJob, \
     FakedLparManager, FakedLpar, \
     FakedNicManager, FakedNic, \
     FakedPartitionManager, FakedPartition, \
@@ -35,7 +39,7 @@ from zhmcclient_mock._hmc import FakedHmc, \
     FakedVirtualFunctionManager, FakedVirtualFunction, \
     FakedVirtualSwitchManager, FakedVirtualSwitch, \
     FakedMetricsContextManager, FakedMetricsContext, \
-    FakedMetricGroupDefinition, FakedMetricObjectValues
+    FakedMetricGroupDefinition, FakedMetricObjectValues, _RWLock
 
 
 class TestFakedHmc(object):
@@ -221,6 +225,261 @@ class TestFakedHmc(object):
         assert port1.manager == adapter1.ports
 
 
+class TestFakedHmcSnapshot(object):
+    """All tests for FakedHmc.snapshot() and FakedHmc.restore()."""
+
+    def setup_method(self):
+        self.hmc = FakedHmc('fake-hmc', '2.13.1', '1.8')
+        self.cpc = self.hmc.cpcs.add({
+            'object-id': 'cpc1',
+            'name': 'cpc1',
+            'dpm-enabled': True,
+        })
+        self.partition = self.cpc.partitions.add({
+            'object-id': 'part1',
+            'name': 'part1',
+            'description': 'Partition #1',
+            'acceptable-status': ['active'],
+        })
+        self.adapter = self.cpc.adapters.add({
+            'object-id': 'osa1',
+            'name': 'osa1',
+            'type': 'osd',
+        })
+        self.port_uri = self.adapter.ports.add({'name': 'port0'}).uri
+        self.hmc.snapshot()
+
+    def add_nic(self):
+        return self.partition.nics.add({
+            'name': 'nic1',
+            'network-adapter-port-uri': self.port_uri,
+        })
+
+    def test_restore_properties(self):
+        """Test restoring changed properties, including nested lists."""
+
+        self.partition.properties['description'] = 'changed'
+        self.partition.properties['acceptable-status'].append('stopped')
+        self.partition.update({'name': 'part2'})
+        self.cpc.properties.pop('dpm-enabled')
+
+        self.hmc.restore()
+
+        assert self.partition.properties['description'] == 'Partition #1'
+        assert self.partition.properties['acceptable-status'] == ['active']
+        assert self.partition.name == 'part1'
+        assert self.cpc.properties['dpm-enabled'] is True
+
+    def test_restore_resources(self):
+        """Test restoring added and removed resources."""
+
+        nic = self.add_nic()
+        devno = nic.properties['device-number']
+        self.cpc.partitions.remove('part1')
+        cpc2 = self.hmc.cpcs.add({'name': 'cpc2'})
+
+        self.hmc.restore()
+
+        assert self.hmc.cpcs.list() == [self.cpc]
+        assert self.cpc.partitions.list() == [self.partition]
+        assert self.partition.nics.list() == []
+        assert self.partition.properties['nic-uris'] == []
+        assert self.hmc.lookup_by_uri(self.partition.uri) is self.partition
+        with pytest.raises(KeyError):
+            self.hmc.lookup_by_uri(nic.uri)
+        with pytest.raises(KeyError):
+            self.hmc.lookup_by_uri(cpc2.uri)
+
+        # Device numbers and object IDs are allocated again the same way
+        nic2 = self.add_nic()
+        assert nic2.properties['device-number'] == devno
+        assert nic2.oid == nic.oid
+
+    def test_restore_repeatedly(self):
+        """Test restoring the same snapshot multiple times."""
+
+        for _ in range(3):
+            self.add_nic()
+            self.partition.properties['description'] = 'changed'
+            self.hmc.disable()
+
+            self.hmc.restore()
+
+            assert len(self.partition.nics.list()) == 0
+            assert self.partition.properties['description'] == \
+                'Partition #1'
+            assert self.hmc.enabled
+
+    def test_restore_metrics(self):
+        """Test restoring added metric group definitions and values."""
+
+        manager = self.hmc.metrics_contexts
+        manager.add_metric_group_definition(FakedMetricGroupDefinition(
+            name='partition-usage',
+            types=[('processor-usage', 'integer-metric')]))
+        manager.add_metric_values(FakedMetricObjectValues(
+            group_name='partition-usage', resource_uri=self.partition.uri,
+            timestamp=datetime.now(), values=[('processor-usage', 10)]))
+
+        self.hmc.restore()
+
+        assert manager.get_metric_group_definition_names() == []
+        assert manager.get_metric_values_group_names() == []
+
+    def test_restore_no_snapshot(self):
+        """Test restoring without a snapshot."""
+
+        hmc = FakedHmc('fake-hmc', '2.13.1', '1.8')
+
+        with pytest.raises(ValueError):
+            hmc.restore()
+
+    def test_copied_properties(self):
+        """Test that copies of tracked properties are plain objects."""
+
+        props = copy.deepcopy(self.partition.properties)
+
+        assert type(props) is dict
+        assert type(props['acceptable-status']) is list
+        assert props == self.partition.properties
+        assert json.loads(json.dumps(self.partition.properties)) == props
+
+
+def run_thread(target):
+    """Start a daemon thread that runs a function, and return the thread."""
+    thread = threading.Thread(target=target)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+class TestRWLock(object):
+    """All tests for the _RWLock class."""
+
+    def test_readers(self):
+        """Test that multiple threads can hold the lock for reading."""
+
+        lock = _RWLock()
+        reading = threading.Event()
+
+        def read():
+            with lock.read():
+                reading.set()
+
+        with lock.read():
+            thread = run_thread(read)
+
+            assert reading.wait(10)
+        thread.join(10)
+
+    def test_writer(self):
+        """Test that a writer excludes readers and other writers."""
+
+        lock = _RWLock()
+        events = []
+
+        def read():
+            with lock.read():
+                events.append('read')
+
+        def write():
+            with lock.write():
+                events.append('write')
+
+        with lock.write():
+            threads = [run_thread(read), run_thread(write)]
+            threads[0].join(0.1)
+            events.append('released')
+        for thread in threads:
+            thread.join(10)
+
+        assert events[0] == 'released'
+        assert sorted(events[1:]) == ['read', 'write']
+
+    def test_waiting_writer(self):
+        """Test that a waiting writer takes precedence over new readers."""
+
+        lock = _RWLock()
+        events = []
+
+        def read():
+            with lock.read():
+                events.append('read')
+
+        def write():
+            with lock.write():
+                events.append('write')
+
+        lock.acquire_read()
+        writer = run_thread(write)
+        while not lock._writers_waiting:  # pylint: disable=protected-access
+            writer.join(0.01)
+        reader = run_thread(read)
+        reader.join(0.1)
+        lock.release_read()
+        writer.join(10)
+        reader.join(10)
+
+        assert events == ['write', 'read']
+
+    def test_reentrant(self):
+        """Test acquiring the lock multiple times in the same thread."""
+
+        lock = _RWLock()
+
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    pass
+        with lock.read():
+            with lock.read():
+                with pytest.raises(RuntimeError):
+                    lock.acquire_write()
+
+        # The lock is free again
+        thread = run_thread(lock.acquire_write)
+        thread.join(10)
+        assert not thread.is_alive()
+
+
+class TestFakedHmcConcurrency(object):
+    """All tests for using a faked HMC in multiple threads concurrently."""
+
+    def test_manager(self):
+        """Test adding, changing, listing and removing faked resources in
+        multiple threads."""
+
+        hmc = FakedHmc('fake-hmc', '2.13.1', '1.8')
+        manager = hmc.cpcs.add({'name': 'cpc1'}).partitions
+        errors = []
+
+        def work(t):
+            try:
+                for i in range(50):
+                    name = 'part-{}-{}'.format(t, i)
+                    partition = manager.add({'name': name})
+                    partition.properties['status'] = 'active'
+                    assert manager.list({'name': name}) == [partition]
+                    assert partition in manager.list({'status': 'active'})
+                    if i % 2:
+                        manager.remove(partition.oid)
+                        assert manager.list({'name': name}) == []
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        threads = [run_thread(lambda t=t: work(t)) for t in range(8)]
+        for thread in threads:
+            thread.join(60)
+
+        assert errors == []
+        partitions = manager.list()
+        assert len(partitions) == 8 * 25
+        assert manager.list({'status': 'active'}) == partitions
+        assert set(p.uri for p in partitions) == \
+            set(uri for uri in hmc.all_resources
+                if uri.startswith('/api/partitions/'))
+
+
 class TestFakedBase(object):
     """All tests for the FakedBaseManager and FakedBaseResource classes."""
 
@@ -303,6 +562,116 @@ class TestFakedBase(object):
         assert self.cpc_resource.uri == self.cpc1_out_props['object-uri']
 
 
+class TestFakedBaseManagerIndexes(object):
+    """All tests for the property indexes of the FakedBaseManager class."""
+
+    def setup_method(self):
+        self.hmc = FakedHmc('fake-hmc', '2.13.1', '1.8')
+        self.cpc = self.hmc.cpcs.add({'name': 'cpc1'})
+        self.manager = self.cpc.partitions
+        for i in range(20):
+            self.manager.add({
+                'name': 'part{}'.format(i),
+                'status': 'active' if i % 3 else 'stopped',
+                'type': 'linux',
+                'description': 'Partition #{}'.format(i),
+            })
+
+    def scan(self, filter_args):
+        """Return the resources matching the filter arguments, without
+        using the indexes."""
+        # pylint: disable=protected-access
+        return [r for r in self.manager._resources.values()
+                if self.manager._matches_filters(r, filter_args)]
+
+    def assert_list(self, filter_args):
+        """Assert that list() returns the same resources as a scan."""
+        resources = self.manager.list(filter_args)
+        assert resources == self.scan(filter_args)
+        return resources
+
+    @pytest.mark.parametrize(
+        "filter_args, exp_names", [
+            ({'name': 'part1'}, ['part1']),
+            ({'name': 'part'}, []),
+            ({'name': 'part1.*'}, ['part1'] + ['part1%d' % i
+                                               for i in range(10)]),
+            ({'name': ['part2', 'part1']}, ['part1', 'part2']),
+            ({'status': 'stopped', 'type': 'linux'},
+             ['part0', 'part3', 'part6', 'part9', 'part12', 'part15',
+              'part18']),
+            ({'status': 'stopped', 'name': 'part3'}, ['part3']),
+            ({'status': 'stopped', 'description': 'Partition #3'},
+             ['part3']),
+            ({'status': 'stopped', 'name': 'part1'}, []),
+            ({'name': 'part1', 'invalid': 'x'}, []),
+        ]
+    )
+    def test_list(self, filter_args, exp_names):
+        """Test list() with filter arguments on indexed properties."""
+
+        resources = self.assert_list(filter_args)
+
+        assert [r.name for r in resources] == exp_names
+
+    def test_list_changes(self):
+        """Test list() after resources and their properties were changed."""
+
+        assert self.assert_list({'status': 'stopped'})
+        partition = self.manager.list({'name': 'part1'})[0]
+
+        partition.properties['status'] = 'stopped'
+        partition.update({'name': 'part1-new'})
+        self.manager.remove(self.manager.list({'name': 'part0'})[0].oid)
+        self.manager.add({'name': 'part20', 'status': 'stopped'})
+        self.manager.add({'name': 'part21', 'status': 'active'})
+        del self.manager.list({'name': 'part3'})[0].properties['status']
+
+        for filter_args in ({'status': 'stopped'}, {'name': 'part1'},
+                            {'name': 'part1-new'}, {'name': 'part0'},
+                            {'name': 'part21'}, {'status': 'active'}):
+            self.assert_list(filter_args)
+        assert self.manager.list({'status': 'stopped'})[0] is partition
+        assert self.manager.list({'status': 'stopped'})[-1].name == 'part20'
+
+    def test_list_special_values(self):
+        """Test list() for property values that are matched specially."""
+
+        self.manager.add({'name': 'newline\n'})
+        self.manager.add({'name': 42, 'status': ['active']})
+
+        assert [r.name for r in self.assert_list({'name': 'newline'})] == \
+            ['newline\n']
+        assert self.assert_list({'name': '42'}) == []
+        assert self.assert_list({'status': 'active'})
+
+    def test_list_restore(self):
+        """Test list() after a snapshot of the faked HMC was restored."""
+
+        self.assert_list({'status': 'stopped'})
+        self.hmc.snapshot()
+        partition = self.manager.list({'name': 'part1'})[0]
+        partition.properties['status'] = 'stopped'
+        self.manager.add({'name': 'part20', 'status': 'stopped'})
+        self.assert_list({'status': 'stopped'})
+
+        self.hmc.restore()
+
+        resources = self.assert_list({'status': 'stopped'})
+        assert partition not in resources
+        assert len(resources) == 7
+
+    def test_list_not_indexed(self):
+        """Test list() for a manager without indexed properties."""
+
+        self.manager.indexed_props = ()
+
+        self.assert_list({'name': 'part1'})
+
+        # pylint: disable=protected-access
+        assert self.manager._indexes == {}
+
+
 class TestFakedActivationProfile(object):
     """All tests for the FakedActivationProfileManager and
     FakedActivationProfile classes."""
@@ -860,6 +1229,122 @@ class TestFakedHba(object):
     # TODO: Add testcases for updating 'hba-uris' parent property
 
 
+class TestFakedJobManager(object):
+    """All tests for the FakedJobManager and FakedJob classes."""
+
+    def setup_method(self):
+        self.hmc = FakedHmc('fake-hmc', '2.13.1', '1.8')
+        self.hmc.clock.speed = 0
+        self.cpc = self.hmc.cpcs.add({
+            'object-id': 'cpc1',
+            'name': 'cpc1',
+            'dpm-enabled': True,
+        })
+        self.partition = self.cpc.partitions.add({
+            'object-id': 'part1',
+            'name': 'part1',
+            'status': 'stopped',
+        })
+        self.op_uri = self.partition.uri + '/operations/start'
+
+    def start(self):
+        """Simulate the "Start Partition" operation."""
+        self.partition.properties['status'] = 'active'
+        return {}
+
+    def test_jobs_attrs(self):
+        """Test the attributes of the faked job manager."""
+
+        jobs = self.hmc.jobs
+
+        assert isinstance(jobs, FakedJobManager)
+        assert jobs.hmc is self.hmc
+        assert jobs.base_uri == '/api/jobs'
+        assert jobs.list() == []
+        assert jobs.durations == {}
+        assert jobs.default_duration == 0
+
+    def test_start_job(self):
+        """Test starting and completing a job."""
+
+        self.hmc.jobs.durations['partition/start'] = 20
+        completed = []
+        self.hmc.jobs.add_completion_callback(completed.append)
+
+        job = self.hmc.jobs.start_job('POST', self.op_uri, self.start,
+                                      notification_topic='topic1')
+
+        assert isinstance(job, FakedJob)
+        assert self.hmc.lookup_by_uri(job.uri) is job
+        assert job.uri == '/api/jobs/' + job.oid
+        assert job.op_method == 'POST'
+        assert job.op_uri == self.op_uri
+        assert job.completion_time == self.hmc.clock.time() + 20
+        assert job.notification_topic == 'topic1'
+        assert job.properties['status'] == 'running'
+        assert self.partition.properties['status'] == 'starting'
+
+        self.hmc.clock.advance(19)
+        assert self.hmc.jobs.process() == []
+
+        self.hmc.clock.advance(1)
+        assert self.hmc.jobs.process() == [job]
+
+        assert completed == [job]
+        assert job.properties['status'] == 'complete'
+        assert job.properties['job-status-code'] == 200
+        assert job.properties['job-results'] == {}
+        assert self.partition.properties['status'] == 'active'
+
+        self.hmc.jobs.remove_completion_callback(completed.append)
+        with pytest.raises(ValueError):
+            self.hmc.jobs.remove_completion_callback(completed.append)
+
+    def test_job_order(self):
+        """Test that jobs complete in the order of their completion times."""
+
+        self.hmc.jobs.default_duration = 10
+        job1 = self.hmc.jobs.start_job('POST', '/api/console/operations/op1',
+                                       lambda: None)
+        self.hmc.jobs.default_duration = 5
+        job2 = self.hmc.jobs.start_job('POST', '/api/console/operations/op2',
+                                       lambda: None)
+
+        self.hmc.clock.advance(10)
+
+        assert self.hmc.jobs.process() == [job2, job1]
+        assert job1.properties['job-status-code'] == 204
+        assert 'job-results' not in job1.properties
+
+    def test_lock_held(self):
+        """Test that jobs are not completed while the lock of the faked HMC is
+        held."""
+
+        job = self.hmc.jobs.start_job('POST', self.op_uri, self.start)
+
+        with self.hmc.lock.read():
+            assert self.hmc.lock.held()
+            assert self.hmc.jobs.process() == []
+        assert not self.hmc.lock.held()
+        assert self.hmc.jobs.process() == [job]
+
+    def test_restore(self):
+        """Test restoring a snapshot with a running job."""
+
+        self.hmc.jobs.default_duration = 10
+        job = self.hmc.jobs.start_job('POST', self.op_uri, self.start)
+        self.hmc.snapshot()
+
+        self.hmc.clock.advance(10)
+        self.hmc.jobs.process()
+        self.hmc.restore()
+
+        assert job.properties['status'] == 'running'
+        assert self.partition.properties['status'] == 'starting'
+        assert self.hmc.jobs.process() == [job]
+        assert self.partition.properties['status'] == 'active'
+
+
 class TestFakedLpar(object):
     """All tests for the FakedLparManager and FakedLpar classes."""
 
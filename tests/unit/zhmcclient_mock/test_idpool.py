@@ -94,7 +94,7 @@ class TestIdPool(object):
             pool.free(id)
 
         # Verify that nothing is used in the pool
-        assert len(pool._used) == 0
+        assert pool.allocated_count == 0
 
         # Exhaust the pool
         id_list2 = []
@@ -148,3 +148,93 @@ class TestIdPool(object):
         self._test_all_for_lo_hi(11, 20)
         self._test_all_for_lo_hi(11, 21)
         self._test_all_for_lo_hi(11, 22)
+
+    def test_alloc_lowest(self):
+        """Test that the lowest free ID values are allocated first."""
+
+        pool = IdPool(10, 40)
+
+        assert [pool.alloc() for _ in range(20)] == list(range(10, 30))
+
+        pool.free(25)
+        pool.free(12)
+        pool.free(17)
+
+        assert [pool.alloc() for _ in range(4)] == [12, 17, 25, 30]
+        assert pool.allocated_count == 21
+        assert pool.lowest == 10
+        assert pool.highest == 40
+
+    def test_is_allocated(self):
+        """Test is_allocated()."""
+
+        pool = IdPool(5, 100)
+        pool.alloc()
+
+        assert pool.is_allocated(5)
+        assert not pool.is_allocated(6)
+        assert not pool.is_allocated(4)
+        assert not pool.is_allocated(99)
+        assert not pool.is_allocated(101)
+
+    def test_alloc_many(self):
+        """Test alloc_many()."""
+
+        pool = IdPool(0, 9)
+        pool.alloc()
+
+        assert pool.alloc_many(5) == [1, 2, 3, 4, 5]
+
+        with pytest.raises(ValueError):
+            pool.alloc_many(5)  # only 4 left
+        assert pool.allocated_count == 6
+
+        assert pool.alloc_many(4) == [6, 7, 8, 9]
+
+        pool.free(3)
+        pool.free(8)
+
+        assert pool.alloc_many(2) == [3, 8]
+        assert pool.allocated_count == 10
+
+    def test_free_many(self):
+        """Test free_many()."""
+
+        pool = IdPool(0, 9)
+        pool.alloc_many(5)
+
+        with pytest.raises(ValueError):
+            pool.free_many([1, 2, 7])  # 7 is not allocated
+        assert pool.allocated_count == 5
+
+        pool.free_many([1, 2])
+
+        assert pool.allocated_count == 3
+        assert pool.alloc_many(2) == [1, 2]
+
+    def test_reserve(self):
+        """Test reserve()."""
+
+        pool = IdPool(0x8000, 0xFFFF)
+
+        pool.reserve(0x8000, 0x8002)
+        pool.reserve(0x8010)
+        pool.reserve(0xFFF0, 0xFFFF)
+
+        assert pool.allocated_count == 20
+        assert pool.alloc() == 0x8003
+        assert pool.is_allocated(0xFFFF)
+        assert not pool.is_allocated(0xFFEF)
+
+        with pytest.raises(ValueError):
+            pool.reserve(0x8002, 0x8004)  # 0x8002 is already allocated
+        assert not pool.is_allocated(0x8004)
+        with pytest.raises(ValueError):
+            pool.reserve(0x7FFF, 0x8000)  # not in range
+        with pytest.raises(ValueError):
+            pool.reserve(0xFFFF, 0x10000)  # not in range
+
+        pool.free(0x8010)
+        pool.free(0x8001)
+
+        assert pool.alloc_many(3) == [0x8001, 0x8004, 0x8005]
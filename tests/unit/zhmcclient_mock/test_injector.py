@@ -0,0 +1,197 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for _injector module of the zhmcclient_mock package.
+"""
+
+from __future__ import absolute_import, print_function
+
+import json
+import pytest
+
+import zhmcclient
+from zhmcclient import Client, RetryTimeoutConfig
+from zhmcclient_mock import FakedSession, FaultInjector
+
+
+class SleepRecorder(object):
+    """
+    Replacement for time.sleep() that records the sleep times.
+    """
+
+    def __init__(self):
+        self.times = []
+
+    def __call__(self, seconds):
+        self.times.append(seconds)
+
+
+class TestFaultInjector(object):
+    """All tests for the FaultInjector class."""
+
+    def setup_method(self):
+        self.sleep = SleepRecorder()
+        self.injector = FaultInjector(seed=1, sleep=self.sleep)
+        self.session = FakedSession('fake-host', 'fake-hmc', '2.13.1', '1.8',
+                                    fault_injector=self.injector)
+        self.session.hmc.cpcs.add({'object-id': 'cpc1', 'name': 'CPC1'})
+        self.client = Client(self.session)
+
+    def test_no_injection(self):
+        """Test a faked session without any rules."""
+
+        assert self.session.fault_injector is self.injector
+
+        cpcs = self.client.cpcs.list()
+
+        assert [cpc.name for cpc in cpcs] == ['CPC1']
+        assert self.sleep.times == []
+
+    def test_latency(self):
+        """Test latency rules."""
+
+        self.injector.add_latency(0.5, method='get', uri='/api/cpcs/[^/]+')
+        self.injector.add_latency((0.1, 0.2), method='GET')
+        self.injector.add_latency(lambda rng: 3.0)
+
+        self.session.get('/api/cpcs/cpc1')
+        self.session.get('/api/cpcs?name=CPC1')
+        self.session.post('/api/cpcs/cpc1', body={'description': 'x'})
+
+        assert self.sleep.times[0] == 0.5
+        assert 0.1 <= self.sleep.times[1] <= 0.2
+        assert self.sleep.times[2] == 3.0
+
+    def test_latency_on_error(self):
+        """Test that latency is also injected for failing operations."""
+
+        self.injector.add_latency(0.5)
+
+        with pytest.raises(zhmcclient.HTTPError):
+            self.session.get('/api/cpcs/invalid')
+
+        assert self.sleep.times == [0.5]
+
+    def test_bandwidth(self):
+        """Test the bandwidth limit."""
+
+        self.injector.set_bandwidth(100)
+
+        result = self.session.get('/api/cpcs/cpc1')
+
+        size = len(json.dumps(result))
+        assert self.sleep.times == [pytest.approx(size / 100.0)]
+
+    def test_unavailable(self):
+        """Test injected 503 errors."""
+
+        self.injector.add_failure('unavailable', count=1, method='get')
+
+        with pytest.raises(zhmcclient.HTTPError) as exc_info:
+            self.client.cpcs.list()
+        exc = exc_info.value
+        assert exc.http_status == 503
+        assert exc.reason == 1
+
+        self.client.cpcs.list()
+        assert self.injector.injected['unavailable'] == 1
+
+    def test_session_expired(self):
+        """Test injected expired API session tokens."""
+
+        self.injector.add_latency(1.0, method='post', uri='/api/sessions')
+        self.injector.add_failure('session-expired', count=2)
+
+        cpcs = self.client.cpcs.list()
+
+        assert len(cpcs) == 1
+        assert self.injector.injected['session-expired'] == 2
+        # Two re-logons
+        assert self.sleep.times == [1.0, 1.0]
+
+    def test_connection_reset(self):
+        """Test injected connection resets with read retries."""
+
+        session = FakedSession(
+            'fake-host', 'fake-hmc', '2.13.1', '1.8',
+            retry_timeout_config=RetryTimeoutConfig(read_retries=2))
+        session.hmc.cpcs.add({'object-id': 'cpc1', 'name': 'CPC1'})
+        session.fault_injector = self.injector
+        self.injector.add_failure('connection-reset', count=2)
+
+        session.get('/api/cpcs/cpc1')
+        assert self.injector.injected['connection-reset'] == 2
+
+        self.injector.add_failure('connection-reset', count=3)
+
+        with pytest.raises(zhmcclient.ConnectionError):
+            session.get('/api/cpcs/cpc1')
+        assert self.injector.injected['connection-reset'] == 5
+
+        self.injector.add_failure('connection-reset', count=1)
+
+        with pytest.raises(zhmcclient.ConnectionError):
+            session.post('/api/cpcs/cpc1', {'description': 'new'})
+        assert self.injector.injected['connection-reset'] == 6
+        assert 'description' not in session.hmc.cpcs.list()[0].properties
+
+    def test_probability(self):
+        """Test failure rules with a probability."""
+
+        self.injector.add_failure('unavailable', probability=0.5,
+                                  uri='/api/cpcs/cpc1')
+
+        failures = 0
+        for _ in range(200):
+            try:
+                self.session.get('/api/cpcs/cpc1')
+            except zhmcclient.HTTPError:
+                failures += 1
+        self.session.get('/api/cpcs')
+
+        assert 50 < failures < 150
+        assert self.injector.injected['unavailable'] == failures
+
+    def test_clear(self):
+        """Test FaultInjector.clear()."""
+
+        self.injector.add_latency(1.0)
+        self.injector.set_bandwidth(1)
+        self.injector.add_failure('unavailable')
+
+        self.injector.clear()
+        self.session.get('/api/cpcs/cpc1')
+
+        assert self.sleep.times == []
+        assert self.injector.bandwidth is None
+        assert self.injector.injected['unavailable'] == 0
+
+    @pytest.mark.parametrize(
+        "kwargs", [
+            dict(failure='invalid'),
+            dict(failure='unavailable', probability=1.5),
+        ]
+    )
+    def test_invalid_failure(self, kwargs):
+        """Test invalid parameters for add_failure()."""
+
+        with pytest.raises(ValueError):
+            self.injector.add_failure(**kwargs)
+
+    def test_invalid_bandwidth(self):
+        """Test invalid parameters for set_bandwidth()."""
+
+        with pytest.raises(ValueError):
+            self.injector.set_bandwidth(0)
@@ -0,0 +1,223 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for _server module of the zhmcclient_mock package.
+"""
+
+from __future__ import absolute_import, print_function
+
+import time
+import threading
+import warnings
+import pytest
+from requests.packages import urllib3
+
+import zhmcclient
+from zhmcclient_mock import FakedHmc, FakedHmcServer
+
+try:
+    from shutil import which
+except ImportError:
+    from distutils.spawn import find_executable as which
+
+pytestmark = pytest.mark.skipif(
+    which('openssl') is None,
+    reason="The 'openssl' command is needed for creating a certificate")
+
+
+def wait_for_subscription(server, topic, timeout=10):
+    """
+    Wait until the STOMP server of a FakedHmcServer has processed a
+    subscription for a topic, because notification receivers subscribe
+    without waiting for a receipt.
+    """
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        # pylint: disable=protected-access
+        for conn in list(server._stomp_connections):
+            if topic in conn._subscriptions.values():
+                return
+        time.sleep(0.01)
+    raise AssertionError("No subscription for topic {}".format(topic))
+
+
+@pytest.fixture(scope='module')
+def server():
+    """
+    Started FakedHmcServer for a faked HMC with a CPC and a partition,
+    shared by all tests in this module.
+    """
+    hmc = FakedHmc('fake-hmc', '2.13.1', '1.8')
+    cpc = hmc.cpcs.add({
+        'object-id': 'cpc1',
+        'name': 'CPC1',
+        'dpm-enabled': True,
+    })
+    cpc.partitions.add({
+        'object-id': 'part1',
+        'name': 'PART1',
+        'status': 'stopped',
+    })
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', urllib3.exceptions.HTTPWarning)
+        with FakedHmcServer(hmc) as server:
+            yield server
+
+
+@pytest.fixture
+def session(server):
+    """
+    Real zhmcclient session for the server, that is logged off at the end.
+    """
+    session = zhmcclient.Session(server.host, 'fake-user', 'fake-pw',
+                                 port=server.port)
+    yield session
+    if session.is_logon():
+        session.logoff()
+
+
+class TestFakedHmcServer(object):
+    """All tests for the FakedHmcServer class."""
+
+    def test_list(self, session):
+        """Test listing and finding resources via the server."""
+
+        client = zhmcclient.Client(session)
+
+        cpcs = client.cpcs.list()
+        partition = cpcs[0].partitions.find(name='PART1')
+
+        assert [cpc.name for cpc in cpcs] == ['CPC1']
+        assert partition.uri == '/api/partitions/part1'
+        assert client.query_api_version()['hmc-name'] == 'fake-hmc'
+
+    def test_logon_logoff(self, server, session):
+        """Test logon and logoff."""
+
+        session.logon()
+        assert session.is_logon()
+        topics = session.get_notification_topics()
+        assert set(t['topic-type'] for t in topics) == \
+            set(['object-notification', 'job-notification'])
+
+        session.logoff()
+        assert not session.is_logon()
+
+    def test_no_session(self, server, session):
+        """Test that an operation without API session token is rejected."""
+
+        with pytest.raises(zhmcclient.ServerAuthError) as exc_info:
+            session.get('/api/cpcs', logon_required=False)
+        assert exc_info.value.details.http_status == 403
+        assert exc_info.value.details.reason == 4
+
+    def test_expired_session(self, server, session):
+        """Test the re-logon after the API session token expired."""
+
+        session.logon()
+        token = session.session_id
+
+        server.expire_sessions()
+        result = session.get('/api/cpcs')
+
+        assert len(result['cpcs']) == 1
+        assert session.session_id != token
+
+    def test_error(self, session):
+        """Test that HTTP errors of the faked HMC are returned."""
+
+        with pytest.raises(zhmcclient.HTTPError) as exc_info:
+            session.get('/api/cpcs/invalid')
+        assert exc_info.value.http_status == 404
+
+    def test_async_operation(self, server, session):
+        """Test an asynchronous operation with a job and a job completion
+        notification."""
+
+        session.logon()
+        topic = [t['topic-name'] for t in session.get_notification_topics()
+                 if t['topic-type'] == 'job-notification'][0]
+        receiver = zhmcclient.NotificationReceiver(
+            topic, server.host, 'fake-user', 'fake-pw',
+            port=server.stomp_port)
+        notifications = []
+
+        def receive():
+            for headers, message in receiver.notifications():
+                notifications.append((headers, message))
+                receiver.close()
+
+        thread = threading.Thread(target=receive)
+        thread.start()
+        wait_for_subscription(server, topic)
+
+        client = zhmcclient.Client(session)
+        partition = client.cpcs.find(name='CPC1').partitions.\
+            find(name='PART1')
+        job = partition.start(wait_for_completion=False)
+        status, result = job.check_for_completion()
+        thread.join(10)
+
+        assert status == 'complete'
+        assert result == {}
+        partition.pull_full_properties()
+        assert partition.properties['status'] == 'active'
+        assert not thread.is_alive()
+        headers, _ = notifications[0]
+        assert headers['notification-type'] == 'job-completion'
+        assert headers['job-uri'] == job.uri
+
+        partition.stop()
+        partition.pull_full_properties()
+        assert partition.properties['status'] == 'stopped'
+
+    def test_send_notification(self, server):
+        """Test sending notifications to a notification receiver."""
+
+        receiver = zhmcclient.NotificationReceiver(
+            'my-topic', server.host, 'fake-user', 'fake-pw',
+            port=server.stomp_port)
+        notifications = []
+
+        def receive():
+            for headers, message in receiver.notifications():
+                notifications.append((headers, message))
+                if len(notifications) == 2:
+                    receiver.close()
+
+        thread = threading.Thread(target=receive)
+        thread.start()
+        wait_for_subscription(server, 'my-topic')
+
+        server.send_notification('other-topic', {'x': '0'}, {})
+        server.send_notification('my-topic', {'x': '1'}, {'a': 'b:c'})
+        server.send_notification('my-topic', {'x': '2'}, {})
+        thread.join(10)
+
+        assert not thread.is_alive()
+        assert [h['x'] for h, _ in notifications] == ['1', '2']
+        assert notifications[0][1] == {'a': 'b:c'}
+        assert notifications[0][0]['destination'] == '/topic/my-topic'
+
+    def test_disabled_hmc(self, server, session):
+        """Test that a disabled faked HMC causes connection errors."""
+
+        session.logon()
+        server.hmc.disable()
+        try:
+            with pytest.raises(zhmcclient.ConnectionError):
+                session.get('/api/cpcs')
+        finally:
+            server.hmc.enable()
@@ -18,6 +18,8 @@ Unit tests for _urihandler module of the zhmcclient_mock package.
 
 from __future__ import absolute_import, print_function
 
+import re
+import threading
 import requests.packages.urllib3
 from datetime import datetime
 # FIXME: Migrate mock to zhmcclient_mock
@@ -30,10 +32,10 @@ from zhmcclient_mock._hmc import FakedHmc, FakedMetricGroupDefinition, \
 from zhmcclient_mock._urihandler import HTTPError, InvalidResourceError, \
     InvalidMethodError, CpcNotInDpmError, CpcInDpmError, BadRequestError, \
     ConflictError, ConnectionError, \
-    parse_query_parms, UriHandler, \
+    parse_query_parms, UriHandler, URIS, \
     GenericGetPropertiesHandler, GenericUpdatePropertiesHandler, \
     GenericDeleteHandler, \
-    VersionHandler, \
+    VersionHandler, JobHandler, \
     ConsoleHandler, ConsoleRestartHandler, ConsoleShutdownHandler, \
     ConsoleMakePrimaryHandler, ConsoleReorderUserPatternsHandler, \
     ConsoleGetAuditLogHandler, ConsoleGetSecurityLogHandler, \
@@ -436,6 +438,96 @@ class TestUriHandlerHandlerSimple(object):
             self.urihandler.handler('/api/cpcs/fake-id1/child_x', 'GET')
 
 
+class TestUriHandlerHandlerIndex(object):
+    """All tests for the URI index and cache of UriHandler.handler()."""
+
+    def test_order(self):
+        """Test that the first matching URI pattern wins, regardless of the
+        number of its literal path segments."""
+
+        urihandler = UriHandler((
+            (r'/api/cpcs/special', DummyHandler1),
+            (r'/api/([^/]+)/special', DummyHandler2),
+            (r'/api/cpcs/([^/]+)', DummyHandler3),
+        ))
+
+        handler_class, uri_parms = urihandler.handler(
+            '/api/cpcs/special', 'GET')
+        assert handler_class == DummyHandler1
+        handler_class, uri_parms = urihandler.handler(
+            '/api/adapters/special', 'GET')
+        assert handler_class == DummyHandler2
+        assert uri_parms == ('adapters',)
+        handler_class, uri_parms = urihandler.handler(
+            '/api/cpcs/fake-id1', 'GET')
+        assert handler_class == DummyHandler3
+
+    @pytest.mark.parametrize(
+        "uri_pattern, uri", [
+            (r'/api/cpcs(?:\?(.*))?', '/api/cpcs?name=a/b'),
+            (r'/api/cpcs/?', '/api/cpcs'),
+            (r'/api/cpcs/*x', '/api/cpcsx'),
+            (r'/api/cpcs|/api/adapters', '/api/adapters'),
+            (r'/api/.*', '/api/cpcs/1'),
+            (r'/api/cpcs/([^/]+)/child', '/api/cpcs/1?x=y/child'),
+            (r'/api/cpcs/([^/]+)/?', '/api/cpcs/1'),
+            (r'/api/([^/]+)/([^/]+)/x', '/api/cpcs/1/x'),
+        ]
+    )
+    def test_patterns(self, uri_pattern, uri):
+        """Test URI patterns with special regular expressions."""
+
+        urihandler = UriHandler(((uri_pattern, DummyHandler1),))
+
+        handler_class, _ = urihandler.handler(uri, 'GET')
+        assert handler_class == DummyHandler1
+
+    def test_cache(self):
+        """Test that the resolution of URIs is cached."""
+
+        urihandler = UriHandler((
+            (r'/api/cpcs/([^/]+)', DummyHandler1),
+        ))
+
+        result1 = urihandler.handler('/api/cpcs/1', 'GET')
+        result2 = urihandler.handler('/api/cpcs/1', 'GET')
+        assert result1 is result2
+
+        for _ in range(2):
+            with pytest.raises(InvalidResourceError) as exc_info:
+                urihandler.handler('/api/cpcs', 'POST')
+            assert exc_info.value.method == 'POST'
+
+    def test_uris(self):
+        """Test that the resolution of URIs with the URI patterns of the
+        faked HMC is the same as with a linear search."""
+
+        urihandler = UriHandler(URIS)
+        patterns = [(re.compile('^' + uri + '$'), handler_class)
+                    for uri, handler_class in URIS]
+
+        uris = []
+        for uri, _ in URIS:
+            uri = uri.replace('([^/]+)', 'fake-id1')
+            uris.append(uri.replace(r'(?:\?(.*))?', ''))
+            uris.append(uri.replace(r'(?:\?(.*))?', '?name=a'))
+            uris.append(uri.replace(r'(?:\?(.*))?', '') + '/x')
+        assert len(uris) == 3 * len(URIS)
+
+        for uri in uris:
+            expected = None
+            for uri_pattern, handler_class in patterns:
+                m = uri_pattern.match(uri)
+                if m:
+                    expected = (handler_class, m.groups())
+                    break
+            if expected is None:
+                with pytest.raises(InvalidResourceError):
+                    urihandler.handler(uri, 'GET')
+            else:
+                assert urihandler.handler(uri, 'GET') == expected
+
+
 class TestUriHandlerMethod(object):
     """All tests for get(), post(), delete() methods of class UriHandler."""
 
@@ -3672,6 +3764,138 @@ class TestPartitionStartStopHandler(object):
                                  None, True, True)
 
 
+class TestPartitionStartStopAsync(object):
+    """All tests for asynchronous operations with faked jobs, and for class
+    JobHandler."""
+
+    def setup_method(self):
+        self.hmc, self.hmc_resources = standard_test_hmc()
+        self.hmc.clock.speed = 0
+        self.uris = (
+            (r'/api/jobs/([^/]+)', JobHandler),
+            (r'/api/partitions/([^/]+)', PartitionHandler),
+            (r'/api/partitions/([^/]+)/operations/start',
+             PartitionStartHandler),
+            (r'/api/partitions/([^/]+)/operations/stop', PartitionStopHandler),
+        )
+        self.urihandler = UriHandler(self.uris)
+
+    def test_start_no_duration(self):
+        """Test an asynchronous operation whose job completes with the next
+        operation."""
+
+        # the function to be tested:
+        result = self.urihandler.post(
+            self.hmc, '/api/partitions/1/operations/start', None, True,
+            False)
+
+        job_uri = result['job-uri']
+        assert job_uri.startswith('/api/jobs/')
+        partition1 = self.urihandler.get(self.hmc, '/api/partitions/1', True)
+        assert partition1['status'] == 'active'
+
+        job = self.urihandler.get(self.hmc, job_uri, True)
+        assert job == {
+            'status': 'complete',
+            'job-status-code': 200,
+            'job-reason-code': None,
+            'job-results': {},
+        }
+
+        self.urihandler.delete(self.hmc, job_uri, True)
+        with pytest.raises(InvalidResourceError):
+            self.urihandler.get(self.hmc, job_uri, True)
+
+    def test_start_stop_duration(self):
+        """Test asynchronous operations with durations and transitional
+        statuses."""
+
+        self.hmc.jobs.durations['partition/start'] = 30
+        self.hmc.jobs.default_duration = 5
+
+        # the start() function to be tested:
+        result = self.urihandler.post(
+            self.hmc, '/api/partitions/1/operations/start', None, True,
+            False)
+
+        job_uri = result['job-uri']
+        partition1 = self.urihandler.get(self.hmc, '/api/partitions/1', True)
+        assert partition1['status'] == 'starting'
+        job = self.urihandler.get(self.hmc, job_uri, True)
+        assert job == {'status': 'running'}
+        with pytest.raises(ConflictError):
+            self.urihandler.delete(self.hmc, job_uri, True)
+
+        self.hmc.clock.advance(29)
+        job = self.urihandler.get(self.hmc, job_uri, True)
+        assert job['status'] == 'running'
+
+        self.hmc.clock.advance(1)
+        job = self.urihandler.get(self.hmc, job_uri, True)
+        assert job['status'] == 'complete'
+        partition1 = self.urihandler.get(self.hmc, '/api/partitions/1', True)
+        assert partition1['status'] == 'active'
+
+        # the stop() function to be tested, with the default duration:
+        result = self.urihandler.post(
+            self.hmc, '/api/partitions/1/operations/stop', None, True,
+            False)
+
+        partition1 = self.urihandler.get(self.hmc, '/api/partitions/1', True)
+        assert partition1['status'] == 'stopping'
+        self.hmc.clock.advance(5)
+        partition1 = self.urihandler.get(self.hmc, '/api/partitions/1', True)
+        assert partition1['status'] == 'stopped'
+
+    def test_status_changed_while_running(self):
+        """Test that a status change while the job is running is kept."""
+
+        self.hmc.jobs.default_duration = 10
+        self.urihandler.post(
+            self.hmc, '/api/partitions/1/operations/start', None, True,
+            False)
+        partition1 = self.hmc.lookup_by_uri('/api/partitions/1')
+        partition1.properties['status'] = 'degraded'
+
+        self.hmc.clock.advance(10)
+        completed = self.hmc.jobs.process()
+
+        assert len(completed) == 1
+        assert partition1.properties['status'] == 'degraded'
+
+    def test_start_error(self):
+        """Test that no job is created for an operation that fails."""
+
+        self.hmc.lookup_by_uri('/api/partitions/1').properties['status'] = \
+            'active'
+
+        with pytest.raises(ConflictError):
+            self.urihandler.post(
+                self.hmc, '/api/partitions/1/operations/start', None, True,
+                False)
+
+        assert self.hmc.jobs.list() == []
+
+    def test_start_wait(self):
+        """Test that no job is created when waiting for completion."""
+
+        self.hmc.jobs.default_duration = 10
+
+        result = self.urihandler.post(
+            self.hmc, '/api/partitions/1/operations/start', None, True, True)
+
+        assert result == {}
+        assert self.hmc.jobs.list() == []
+
+    def test_job_not_found(self):
+        """Test the job URI of a job that does not exist."""
+
+        with pytest.raises(InvalidResourceError):
+            self.urihandler.get(self.hmc, '/api/jobs/invalid', True)
+        with pytest.raises(InvalidResourceError):
+            self.urihandler.delete(self.hmc, '/api/jobs/invalid', True)
+
+
 class TestPartitionScsiDumpHandler(object):
     """All tests for class PartitionScsiDumpHandler."""
 
@@ -4925,3 +5149,52 @@ class TestLoadActProfileHandlers(object):
             'description': 'Load profile #1 in CPC #1',
         }
         assert lap1 == exp_lap1
+
+
+class TestUriHandlerConcurrency(object):
+    """All tests for using UriHandler in multiple threads concurrently."""
+
+    def setup_method(self):
+        self.hmc, self.hmc_resources = standard_test_hmc()
+        self.urihandler = UriHandler(URIS)
+
+    def test_partitions(self):
+        """Test creating, updating, listing and deleting partitions in
+        multiple threads."""
+
+        errors = []
+
+        def work(t):
+            try:
+                for i in range(20):
+                    name = 'part-{}-{}'.format(t, i)
+                    resp = self.urihandler.post(
+                        self.hmc, '/api/cpcs/2/partitions',
+                        {'name': name, 'initial-memory': 1024,
+                         'maximum-memory': 2048}, True, True)
+                    uri = resp['object-uri']
+                    self.urihandler.post(
+                        self.hmc, uri, {'description': name}, True, True)
+                    partition = self.urihandler.get(self.hmc, uri, True)
+                    assert partition['description'] == name
+                    partitions = self.urihandler.get(
+                        self.hmc, '/api/cpcs/2/partitions?name=' + name,
+                        True)['partitions']
+                    assert [p['object-uri'] for p in partitions] == [uri]
+                    if i % 2:
+                        self.urihandler.delete(self.hmc, uri, True)
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        threads = [threading.Thread(target=work, args=(t,))
+                   for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+
+        assert errors == []
+        partitions = self.urihandler.get(
+            self.hmc, '/api/cpcs/2/partitions', True)['partitions']
+        names = [p['name'] for p in partitions]
+        assert len([n for n in names if n.startswith('part-')]) == 8 * 10
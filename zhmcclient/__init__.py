@@ -21,36 +21,102 @@ For documentation, see TODO: Add link to RTD once available.
 
 from __future__ import absolute_import
 
-from ._version import *       # noqa: F401
+import sys
+import importlib
+
 from ._constants import *     # noqa: F401
 from ._exceptions import *    # noqa: F401
-from ._manager import *       # noqa: F401
-from ._resource import *      # noqa: F401
-from ._logging import *       # noqa: F401
-from ._session import *       # noqa: F401
-from ._timestats import *     # noqa: F401
-from ._client import *        # noqa: F401
-from ._cpc import *           # noqa: F401
-from ._lpar import *          # noqa: F401
-from ._partition import *     # noqa: F401
-from ._activation_profile import *     # noqa: F401
-from ._adapter import *       # noqa: F401
-from ._nic import *           # noqa: F401
-from ._hba import *           # noqa: F401
-from ._virtual_function import *       # noqa: F401
-from ._virtual_switch import *         # noqa: F401
-from ._port import *          # noqa: F401
-from ._notification import *  # noqa: F401
-from ._metrics import *       # noqa: F401
-from ._utils import *         # noqa: F401
-from ._console import *       # noqa: F401
-from ._user import *          # noqa: F401
-from ._user_role import *     # noqa: F401
-from ._user_pattern import *  # noqa: F401
-from ._password_rule import *          # noqa: F401
-from ._task import *          # noqa: F401
-from ._ldap_server_definition import *         # noqa: F401
-from ._unmanaged_cpc import *          # noqa: F401
-from ._storage_group import *          # noqa: F401
-from ._storage_volume import *         # noqa: F401
-from ._virtual_storage_resource import *        # noqa: F401
+from ._constants import __all__ as _constants_all
+from ._exceptions import __all__ as _exceptions_all
+
+# Public names of the package that are imported from their modules, in the
+# order of importing the modules. On Python 3.7 and higher, the modules are
+# imported when one of their names is accessed for the first time (PEP 562),
+# so that importing the package does not import the modules that are not
+# needed, and the packages they depend on (e.g. requests, stomp, pbr).
+_LAZY_MODULES = (
+    ('_version', ['__version__']),
+    ('_manager', ['BaseManager']),
+    ('_resource', ['BaseResource']),
+    ('_logging', ['get_logger', 'logged_api_call']),
+    ('_session_cache', ['SessionCache']),
+    ('_session', ['Session', 'Job', 'RetryTimeoutConfig',
+                  'get_password_interface']),
+    ('_timestats', ['TimeStatsKeeper', 'TimeStats']),
+    ('_tracing', ['RequestInfo', 'SessionHook', 'OpenTelemetryHook',
+                  'PrometheusHook']),
+    ('_cassette', ['SessionRecorder', 'ReplaySession']),
+    ('_session_pool', ['SessionPool']),
+    ('_client', ['Client']),
+    ('_cpc', ['CpcManager', 'Cpc']),
+    ('_lpar', ['LparManager', 'Lpar']),
+    ('_partition', ['PartitionManager', 'Partition']),
+    ('_activation_profile', ['ActivationProfileManager',
+                             'ActivationProfile']),
+    ('_adapter', ['AdapterManager', 'Adapter']),
+    ('_nic', ['NicManager', 'Nic']),
+    ('_hba', ['HbaManager', 'Hba']),
+    ('_virtual_function', ['VirtualFunctionManager', 'VirtualFunction']),
+    ('_virtual_switch', ['VirtualSwitchManager', 'VirtualSwitch']),
+    ('_port', ['PortManager', 'Port']),
+    ('_notification', ['NotificationReceiver']),
+    ('_metrics', ['MetricsContextManager', 'MetricsContext',
+                  'MetricGroupDefinition', 'MetricDefinition',
+                  'MetricsResponse', 'MetricGroupValues',
+                  'MetricObjectValues']),
+    ('_utils', ['datetime_from_timestamp', 'timestamp_from_datetime']),
+    ('_console', ['ConsoleManager', 'Console']),
+    ('_user', ['UserManager', 'User']),
+    ('_user_role', ['UserRoleManager', 'UserRole']),
+    ('_user_pattern', ['UserPatternManager', 'UserPattern']),
+    ('_password_rule', ['PasswordRuleManager', 'PasswordRule']),
+    ('_task', ['TaskManager', 'Task']),
+    ('_ldap_server_definition', ['LdapServerDefinitionManager',
+                                 'LdapServerDefinition']),
+    ('_unmanaged_cpc', ['UnmanagedCpcManager', 'UnmanagedCpc']),
+    ('_storage_group', ['StorageGroupManager', 'StorageGroup']),
+    ('_storage_volume', ['StorageVolumeManager', 'StorageVolume']),
+    ('_virtual_storage_resource', ['VirtualStorageResourceManager',
+                                   'VirtualStorageResource']),
+)
+
+# Public name -> name of the module defining it
+_LAZY_NAMES = dict((name, module_name)
+                   for module_name, names in _LAZY_MODULES
+                   for name in names)
+
+__all__ = _constants_all + _exceptions_all + \
+    [name for _, names in _LAZY_MODULES for name in names
+     if not name.startswith('_')]
+
+
+def _import_module(module_name):
+    return importlib.import_module('.' + module_name, __name__)
+
+
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        """
+        Return a public name of the package, importing its module on first
+        access, or a module of the package that is not yet imported.
+        """
+        try:
+            module_name = _LAZY_NAMES[name]
+        except KeyError:
+            if name in dict(_LAZY_MODULES):
+                return _import_module(name)
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name))
+        value = getattr(_import_module(module_name), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_NAMES))
+
+else:
+    for _module_name, _names in _LAZY_MODULES:
+        _module = _import_module(_module_name)
+        for _name in _names:
+            globals()[_name] = getattr(_module, _name)
@@ -0,0 +1,376 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The :class:`~zhmcclient.SessionRecorder` class is a session hook that records
+the HTTP requests against the HMC API of a :class:`~zhmcclient.Session`,
+including their timing and their request and response bodies, in a
+*cassette* file. The :class:`~zhmcclient.ReplaySession` class is a session
+that serves the recorded responses from a cassette file instead of
+communicating with an HMC, with no delay or with the recorded or scaled
+timing.
+
+This allows reproducing the behavior and the performance of programs using
+the zhmcclient package offline, e.g. in regression tests and benchmarks that
+are based on real HMC traffic.
+
+A cassette file has one line for each request, with a JSON object that has
+the following items:
+
+* ``start`` (float): Time when the request was started, as returned by
+  :func:`py:time.time`.
+* ``duration`` (float): Elapsed time of the request in seconds.
+* ``method`` (string): HTTP method of the request.
+* ``uri`` (string): URI of the request.
+* ``operation`` (string): Name of the operation, with a URI template instead
+  of the URI (e.g. 'get /api/partitions/{id}').
+* ``request`` (JSON value) or ``request-text`` (string): Request body, if the
+  request has a body that is a string. The password in the request body of
+  the "Logon" operation is replaced with asterisks.
+* ``status`` (integer): HTTP status code of the response.
+* ``content-type`` (string): Content type of the response, if it has one.
+* ``response`` (JSON value) or ``response-text`` (string): Response body, if
+  the response has a body. Response bodies in JSON format are stored as JSON
+  values, and other response bodies as strings.
+* ``error`` (string): Error message, instead of ``status`` for requests that
+  did not receive a response (e.g. because of a connection error).
+
+The recorder only appends to the cassette file, so the requests of multiple
+sessions and program runs can be recorded in the same file. Note that
+cassette files contain all data returned by the HMC, including the API
+session tokens, so the recorder creates them with permissions that allow
+only the current user to access them.
+
+Example::
+
+    import zhmcclient
+
+    # Recording the HTTP requests of a session
+    session = zhmcclient.Session(host, userid, password)
+    with zhmcclient.SessionRecorder('hmc.cassette') as recorder:
+        session.add_hook(recorder)
+        cpcs = zhmcclient.Client(session).cpcs.list()
+        session.remove_hook(recorder)
+
+    # Replaying them with the recorded timing
+    session = zhmcclient.ReplaySession('hmc.cassette', time_scale=1.0)
+    cpcs = zhmcclient.Client(session).cpcs.list()
+"""
+
+from __future__ import absolute_import
+
+import os
+import io
+import json
+import time
+import threading
+from collections import OrderedDict, deque
+import six
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import requote_uri
+
+from ._session import Session
+from ._tracing import SessionHook
+
+__all__ = ['SessionRecorder', 'ReplaySession']
+
+_LOGON_URI = '/api/sessions'
+
+
+def _is_json(content_type):
+    return content_type is None or content_type.startswith('application/json')
+
+
+def _add_body(record, key, body, content_type):
+    """
+    Add a request or response body to a cassette record, as a JSON value if
+    it is in JSON format, or as a string otherwise. Bodies that are not text
+    are not added.
+    """
+    if isinstance(body, six.binary_type):
+        try:
+            body = body.decode('utf-8')
+        except UnicodeDecodeError:
+            return
+    if _is_json(content_type):
+        try:
+            record[key] = json.loads(body, object_pairs_hook=OrderedDict)
+            return
+        except ValueError:
+            pass
+    record[key + '-text'] = body
+
+
+def _record(info):
+    """
+    Return the cassette record for an ended request, as an OrderedDict.
+    """
+    record = OrderedDict()
+    record['start'] = round(info.start_time, 6)
+    record['duration'] = round(info.duration, 6)
+    record['method'] = info.method
+    record['uri'] = info.uri
+    record['operation'] = info.operation
+    if info.request_body is not None:
+        _add_body(record, 'request', info.request_body, None)
+        if info.method == 'POST' and info.uri == _LOGON_URI and \
+                isinstance(record.get('request'), dict):
+            record['request']['password'] = '********'
+    response = info.response
+    if response is None:
+        record['error'] = str(info.exception)
+    else:
+        record['status'] = response.status_code
+        content_type = response.headers.get('content-type', None)
+        if content_type:
+            record['content-type'] = content_type
+        if response.content:
+            _add_body(record, 'response', response.content, content_type)
+    return record
+
+
+class SessionRecorder(SessionHook):
+    """
+    Session hook that records the HTTP requests against the HMC API of the
+    sessions it is added to in a cassette file (for details, see section
+    :ref:`Recording and replaying sessions`).
+
+    The recorder can be used as a context manager, that closes the cassette
+    file when leaving the context.
+    """
+
+    def __init__(self, filename):
+        """
+        Parameters:
+
+          filename (:term:`string`): Path name of the cassette file. The file
+            is created with permissions for the current user only if it does
+            not exist, and is appended to otherwise.
+        """
+        self._filename = filename
+        self._lock = threading.Lock()
+        # The cassette file contains the API session tokens
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        self._file = io.open(fd, 'a', encoding='utf-8')
+
+    def __repr__(self):
+        return "SessionRecorder(filename={!r})".format(self._filename)
+
+    @property
+    def filename(self):
+        """
+        :term:`string`: Path name of the cassette file.
+        """
+        return self._filename
+
+    def close(self):
+        """
+        Close the cassette file. Requests that end afterwards are not
+        recorded.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def request_ended(self, info):
+        """
+        Append the record for an ended HTTP request to the cassette file.
+        Job waits are not recorded, but the requests for checking the job
+        status are.
+        """
+        if info.kind != 'request':
+            return
+        line = json.dumps(_record(info), separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._file is not None:
+                self._file.write(six.text_type(line))
+                self._file.flush()
+
+
+class _Cassette(object):
+    """
+    The records of a cassette file, by HTTP method and URI, in the order in
+    which their requests were started.
+    """
+
+    def __init__(self, filename):
+        with io.open(filename, 'r', encoding='utf-8') as fp:
+            lines = fp.readlines()
+        records = []
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line,
+                                          object_pairs_hook=OrderedDict))
+            except ValueError as exc:
+                if lineno == len(lines) and not line.endswith('\n'):
+                    # Incomplete last line of an interrupted recording
+                    break
+                raise ValueError("Invalid record in line {} of cassette "
+                                 "file {}: {}".format(lineno, filename, exc))
+        # Nested requests (e.g. the re-logon after the API session token
+        # expired) end before their outer request
+        records.sort(key=lambda r: r['start'])
+        self._lock = threading.Lock()
+        self._records = {}  # tuple(method, URI) -> deque of records
+        for record in records:
+            key = (record['method'], requote_uri(record['uri']))
+            self._records.setdefault(key, deque()).append(record)
+
+    def next_record(self, method, uri):
+        """
+        Return the next record for an HTTP method and URI, or `None` if
+        there is no record for them. The last record is returned repeatedly.
+        """
+        with self._lock:
+            records = self._records.get((method, uri))
+            if not records:
+                return None
+            if len(records) > 1:
+                return records.popleft()
+            return records[0]
+
+
+class _ReplayAdapter(requests.adapters.BaseAdapter):
+    """
+    Transport adapter for the `requests` package that returns the responses
+    of a cassette instead of sending the requests.
+    """
+
+    def __init__(self, replay_session):
+        super(_ReplayAdapter, self).__init__()
+        self._replay_session = replay_session
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        # pylint: disable=protected-access
+        cassette = self._replay_session._cassette
+        record = cassette.next_record(request.method, request.path_url)
+        if record is None:
+            raise requests.exceptions.ConnectionError(
+                "No recorded response for {} {}".format(request.method,
+                                                        request.path_url),
+                request=request)
+        delay = record['duration'] * self._replay_session.time_scale
+        if delay > 0:
+            time.sleep(delay)
+        if 'status' not in record:
+            raise requests.exceptions.ConnectionError(record['error'],
+                                                      request=request)
+
+        if 'response' in record:
+            content = json.dumps(record['response']).encode('utf-8')
+        else:
+            content = record.get('response-text', u'').encode('utf-8')
+        response = requests.Response()
+        response.status_code = record['status']
+        response.headers = CaseInsensitiveDict()
+        if 'content-type' in record:
+            response.headers['Content-Type'] = record['content-type']
+        response._content = content
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+class ReplaySession(Session):
+    """
+    A session that serves the responses recorded in a cassette file by
+    :class:`~zhmcclient.SessionRecorder`, instead of communicating with an
+    HMC (for details, see section :ref:`Recording and replaying sessions`).
+
+    Each HTTP request is answered with the next recorded response for its
+    HTTP method and URI, in the order in which the requests were started when
+    they were recorded. When the recorded responses for an HTTP method and
+    URI are exhausted, the last of them is repeated. Requests without a
+    recorded response fail with :exc:`~zhmcclient.ConnectionError`.
+
+    The responses pass through the normal processing of HTTP requests by
+    :class:`~zhmcclient.Session`, including the handling of errors, re-logons
+    and asynchronous jobs, the time statistics and the session hooks.
+    """
+
+    def __init__(self, filename, time_scale=0.0, host='replay-host',
+                 userid='replay-user', password='replay-password',
+                 retry_timeout_config=None):
+        """
+        Parameters:
+
+          filename (:term:`string`): Path name of the cassette file.
+
+          time_scale (:term:`number`): Factor for the recorded durations of
+            the requests, by which the responses are delayed. 1 replays the
+            requests with the recorded timing, and 0 without delay.
+
+          host (:term:`string`): HMC host, for the URLs of the requests.
+
+          userid (:term:`string`): Userid of the HMC user, for the "Logon"
+            operation.
+
+          password (:term:`string`): Password of the HMC user, for the
+            "Logon" operation.
+
+          retry_timeout_config (:class:`~zhmcclient.RetryTimeoutConfig`):
+            The retry/timeout configuration for this session, see
+            :class:`~zhmcclient.Session`.
+
+        Raises:
+
+          ValueError: Invalid record in the cassette file.
+        """
+        self._cassette = _Cassette(filename)
+        self._time_scale = time_scale
+        super(ReplaySession, self).__init__(
+            host, userid, password,
+            retry_timeout_config=retry_timeout_config)
+        # Requests that do not require logon are also served from the
+        # cassette
+        self._session = self._new_session(self.retry_timeout_config)
+
+    @property
+    def time_scale(self):
+        """
+        :term:`number`: Factor for the recorded durations of the requests, by
+        which the responses are delayed.
+        """
+        return self._time_scale
+
+    def _new_session(self, retry_timeout_config):
+        """
+        Return a new `requests.Session` object that serves the responses of
+        the cassette.
+        """
+        session = requests.Session()
+        adapter = _ReplayAdapter(self)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _do_logoff(self):
+        super(ReplaySession, self)._do_logoff()
+        self._session = self._new_session(self.retry_timeout_config)
@@ -33,6 +33,13 @@ __all__ = ['DEFAULT_CONNECT_TIMEOUT',
            'DEFAULT_OPERATION_TIMEOUT',
            'DEFAULT_STATUS_TIMEOUT',
            'DEFAULT_NAME_URI_CACHE_TIMETOLIVE',
+           'DEFAULT_NAME_URI_CACHE_NEGATIVE_TIMETOLIVE',
+           'DEFAULT_RATE_LIMIT',
+           'DEFAULT_RATE_BURST',
+           'PRIORITY_INTERACTIVE',
+           'PRIORITY_LIFECYCLE',
+           'PRIORITY_INVENTORY',
+           'PRIORITY_METRICS',
            'HMC_LOGGER_NAME',
            'API_LOGGER_NAME',
            'HTML_REASON_WEB_SERVICES_DISABLED',
@@ -112,6 +119,46 @@ DEFAULT_STATUS_TIMEOUT = 900
 #: caching is disabled).
 DEFAULT_NAME_URI_CACHE_TIMETOLIVE = 300
 
+#: Default time in seconds during which the Name-URI cache of manager objects
+#: remembers that a resource name was not found, so that repeated lookups of
+#: that name do not cause the resources to be listed again,
+#: if not specified in the ``retry_timeout_config`` init argument to
+#: :class:`~zhmcclient.Session`.
+#:
+#: The special value 0 means that names that were not found are not
+#: remembered. This is the default, because resources that are created by
+#: other clients would otherwise not be found during that time.
+DEFAULT_NAME_URI_CACHE_NEGATIVE_TIMETOLIVE = 0
+
+#: Default maximum average rate of HTTP requests of a session, in requests per
+#: second, if not specified in the ``retry_timeout_config`` init argument to
+#: :class:`~zhmcclient.Session`.
+#:
+#: The special value 0 means that the rate of HTTP requests is not limited.
+DEFAULT_RATE_LIMIT = 0
+
+#: Default maximum number of HTTP requests of a session that can be sent
+#: in a burst without waiting for the rate limit,
+#: if not specified in the ``retry_timeout_config`` init argument to
+#: :class:`~zhmcclient.Session`.
+DEFAULT_RATE_BURST = 10
+
+#: Priority of HTTP requests for operations performed on behalf of an
+#: interactive user. This is the highest priority.
+PRIORITY_INTERACTIVE = 0
+
+#: Priority of HTTP requests for operations that change resources. This is
+#: the default for POST and DELETE requests.
+PRIORITY_LIFECYCLE = 1
+
+#: Priority of HTTP requests for retrieving resources. This is the default
+#: for GET requests.
+PRIORITY_INVENTORY = 2
+
+#: Priority of HTTP requests for the metrics service of the HMC. This is the
+#: lowest priority.
+PRIORITY_METRICS = 3
+
 #: Name of the Python logger that logs HMC operations.
 HMC_LOGGER_NAME = 'zhmcclient.hmc'
 
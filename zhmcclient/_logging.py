@@ -130,12 +130,13 @@ def logged_api_call(func):
 
     try:
         # We avoid the use of inspect.getouterframes() because it is slow,
-        # and use the pointers up the stack frame, instead.
+        # and use the pointers up the stack frame, instead. We also avoid
+        # inspect.getframeinfo() because it reads the source file.
 
         this_frame = inspect.currentframe()  # this decorator function here
         apifunc_frame = this_frame.f_back  # the decorated API function
 
-        apifunc_owner = inspect.getframeinfo(apifunc_frame)[2]
+        apifunc_owner = apifunc_frame.f_code.co_name
 
     finally:
         # Recommended way to deal with frame objects to avoid ref cycles
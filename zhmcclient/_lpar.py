@@ -146,10 +146,10 @@ class LparManager(BaseManager):
                         name=props.get(self._name_prop, None),
                         properties=props)
 
-                    if self._matches_filters(resource_obj, client_filters):
-                        resource_obj_list.append(resource_obj)
-                        if full_properties:
-                            resource_obj.pull_full_properties()
+                    resource_obj_list.append(resource_obj)
+
+                resource_obj_list = self._matching_resources(
+                    resource_obj_list, client_filters, full_properties)
 
         self._name_uri_cache.update_from(resource_obj_list)
         return resource_obj_list
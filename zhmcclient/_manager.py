@@ -29,101 +29,660 @@ from __future__ import absolute_import
 
 import six
 import re
+import time
+import threading
+import weakref
+import sqlite3
 from datetime import datetime, timedelta
 import warnings
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
 from requests.utils import quote
 
 from ._logging import get_logger, logged_api_call
 from ._exceptions import NotFound, NoUniqueMatch, HTTPError
-from ._utils import repr_list
+from ._utils import repr_list, is_literal_match
 
 __all__ = ['BaseManager']
 
 LOG = get_logger(__name__)
 
+# Maximum number of compiled filters kept in the filter cache.
+_FILTER_CACHE_SIZE = 128
+
+# Lock for creating the Name-URI caches that are shared in a session.
+_SHARED_NAME_URI_CACHES_LOCK = threading.Lock()
+
+# Maximum number of concurrent HMC requests for retrieving the full set of
+# properties of multiple resources.
+_PARALLEL_FETCH_WORKERS = 8
+
+
+class _CompiledFilter(object):
+    """
+    Filter arguments compiled into a predicate for client-side filtering.
+
+    Compiling the filter arguments once avoids re-parsing the match values
+    for each resource that is matched:
+
+    * String match values are compiled into anchored regular expressions.
+      Match values that do not contain any regular expression special
+      characters are matched by set lookup instead.
+    * Non-string match values are matched by set lookup (falling back to
+      equality comparison for unhashable property values).
+    * Lists and tuples of match values (including nested ones) are flattened.
+
+    This class is used by the implementation of manager classes, and is not
+    part of the external API.
+    """
+
+    def __init__(self, filter_args):
+        """
+        Parameters:
+
+          filter_args (dict):
+            Filter arguments. For details, see :ref:`Filtering`.
+            `None` causes all resources to match.
+        """
+        # List of tuples (prop_name, matcher), with matcher being a function
+        # that takes a property value and returns a bool.
+        self._matchers = []
+        if filter_args is not None:
+            for prop_name in filter_args:
+                matcher = self._compile_prop_match(filter_args[prop_name])
+                self._matchers.append((prop_name, matcher))
+
+    @property
+    def prop_names(self):
+        """
+        list of string: Names of the properties used in this filter, in the
+        order they are matched.
+        """
+        return [prop_name for prop_name, _ in self._matchers]
+
+    @staticmethod
+    def _flatten(prop_match, items):
+        if isinstance(prop_match, (list, tuple)):
+            for pm in prop_match:
+                _CompiledFilter._flatten(pm, items)
+        else:
+            items.append(prop_match)
+
+    @staticmethod
+    def _compile_prop_match(prop_match):
+        """
+        Return a matcher function for a property match value.
+        """
+        items = []
+        _CompiledFilter._flatten(prop_match, items)
+
+        str_literals = set()
+        regexes = []
+        other_literals = set()
+        other_unhashable = []
+        for pm in items:
+            if isinstance(pm, six.string_types):
+                if is_literal_match(pm):
+                    str_literals.add(pm)
+                else:
+                    # The regexp matching implemented in the HMC requires
+                    # begin and end of the string value to match, even if the
+                    # '^' for begin and '$' for end are not specified in the
+                    # pattern. We are consistent with that.
+                    regexes.append(re.compile(pm + '$'))
+            else:
+                try:
+                    other_literals.add(pm)
+                except TypeError:
+                    other_unhashable.append(pm)
+
+        def matcher(prop_value):
+            if isinstance(prop_value, six.string_types):
+                # HMC resource property is Enum String or (non-enum) String,
+                # and is both matched by regexp matching.
+                if prop_value in str_literals:
+                    return True
+                # A '$' also matches before a trailing newline.
+                if prop_value.endswith('\n') and \
+                        prop_value[:-1] in str_literals:
+                    return True
+                for regex in regexes:
+                    if regex.match(prop_value):
+                        return True
+                return False
+            try:
+                if prop_value in other_literals:
+                    return True
+            except TypeError:
+                # Unhashable property value (e.g. a list)
+                for pm in other_literals:
+                    if prop_value == pm:
+                        return True
+            for pm in other_unhashable:
+                if prop_value == pm:
+                    return True
+            return False
+
+        return matcher
+
+    def matches(self, get_property):
+        """
+        Return a boolean indicating whether a resource matches this filter.
+
+        Parameters:
+
+          get_property (callable): Function that takes a property name and
+            returns the property value of the resource, or raises
+            :exc:`py:KeyError` if the resource does not have the property.
+
+        Returns:
+
+          bool: Boolean indicating whether the resource matches this filter.
+        """
+        for prop_name, matcher in self._matchers:
+            # Some lists of resources do not have all properties, for example
+            # Hipersocket adapters do not have a "card-location" property.
+            # If a filter property does not exist on a resource, the resource
+            # does not match.
+            try:
+                prop_value = get_property(prop_name)
+            except KeyError:
+                return False
+            if not matcher(prop_value):
+                return False
+        return True
+
+    def matches_present(self, properties):
+        """
+        Match this filter against only those of its properties that are
+        present in a properties dictionary.
+
+        Parameters:
+
+          properties (dict): Resource properties, e.g. from a list operation.
+
+        Returns:
+
+          bool or None: `False` if a present property does not match, `True`
+          if all filter properties are present and match, or `None` if all
+          present properties match but some filter properties are not present
+          (so that the result cannot be determined yet).
+        """
+        result = True
+        for prop_name, matcher in self._matchers:
+            try:
+                prop_value = properties[prop_name]
+            except KeyError:
+                result = None
+                continue
+            if not matcher(prop_value):
+                return False
+        return result
+
+
+def _freeze_filter_value(value):
+    """
+    Return a hashable representation of a filter match value.
+
+    Raises TypeError if the value cannot be represented.
+    """
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + \
+            tuple(_freeze_filter_value(v) for v in value)
+    hash(value)
+    return (type(value).__name__, value)
+
+
+_FILTER_CACHE = OrderedDict()
+_FILTER_CACHE_LOCK = threading.Lock()
+
+
+def _compile_filter_args(filter_args):
+    """
+    Return a :class:`_CompiledFilter` object for the filter arguments.
+
+    Compiled filters are kept in a module-wide LRU cache, so that repeated
+    calls with the same filter arguments (e.g. in repeated ``findall()``
+    calls) reuse the compiled filter.
+    """
+    try:
+        key = tuple(sorted(
+            (name, _freeze_filter_value(value))
+            for name, value in six.iteritems(filter_args or {})))
+    except TypeError:
+        # Unhashable or non-comparable match values; do not cache.
+        return _CompiledFilter(filter_args)
+    with _FILTER_CACHE_LOCK:
+        try:
+            compiled = _FILTER_CACHE.pop(key)
+        except KeyError:
+            compiled = None
+        if compiled is None:
+            compiled = _CompiledFilter(filter_args)
+            if len(_FILTER_CACHE) >= _FILTER_CACHE_SIZE:
+                _FILTER_CACHE.popitem(last=False)
+        _FILTER_CACHE[key] = compiled
+    return compiled
+
+
+class _NameUriCacheStore(object):
+    """
+    A persistent store for Name-URI cache entries, in an SQLite database file.
+
+    The store allows short-lived processes to start with a populated Name-URI
+    cache. Each entry is scoped by the HMC host, the URI of the parent
+    resource and the resource class, and carries the point in time it was
+    stored, so that entries that are older than the time to live of the
+    Name-URI cache are not used.
+
+    Errors accessing the database are logged and otherwise ignored, because
+    the store is only an optimization.
+
+    This class is used by the implementation of manager classes, and is not
+    part of the external API.
+    """
+
+    # Store objects by file name, so that all caches of a process that use
+    # the same file share one database connection.
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, filename):
+        """
+        Parameters:
+
+          filename (string): Path name of the SQLite database file. The file
+            is created if it does not exist.
+        """
+        self._filename = filename
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(filename, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS name_uri ("
+                    "host TEXT, parent TEXT, class TEXT, name TEXT, "
+                    "uri TEXT, stored REAL, "
+                    "PRIMARY KEY (host, parent, class, name))")
+        except sqlite3.Error as exc:
+            LOG.warning("Cannot use Name-URI cache file %s: %s",
+                        filename, exc)
+            self._conn = None
+
+    @classmethod
+    def open(cls, filename):
+        """
+        Return the store object for the specified file name, creating it if
+        needed.
+        """
+        with cls._stores_lock:
+            try:
+                return cls._stores[filename]
+            except KeyError:
+                store = cls(filename)
+                cls._stores[filename] = store
+                return store
+
+    @property
+    def filename(self):
+        """
+        string: Path name of the SQLite database file.
+        """
+        return self._filename
+
+    def _execute(self, sql, parms_list):
+        if self._conn is None:
+            return []
+        with self._lock:
+            try:
+                with self._conn:
+                    rows = []
+                    for parms in parms_list:
+                        rows.extend(self._conn.execute(sql, parms))
+                    return rows
+            except sqlite3.Error as exc:
+                LOG.warning("Cannot access Name-URI cache file %s: %s",
+                            self._filename, exc)
+                return []
+
+    def load(self, scope, min_stored):
+        """
+        Return the entries in a scope that have been stored at or after a
+        point in time, as a dictionary of name: (uri, stored).
+
+        The scope is a tuple (host, parent URI, class name).
+        """
+        rows = self._execute(
+            "SELECT name, uri, stored FROM name_uri "
+            "WHERE host=? AND parent=? AND class=? AND stored>=?",
+            [scope + (min_stored,)])
+        return {name: (uri, stored) for name, uri, stored in rows}
+
+    def update(self, scope, entries, stored):
+        """
+        Create or update entries in a scope, from a dictionary of name: uri.
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO name_uri "
+            "(host, parent, class, name, uri, stored) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [scope + (name, uri, stored)
+             for name, uri in six.iteritems(entries)])
+
+    def delete(self, scope, name=None):
+        """
+        Delete the entry for a name in a scope, or all entries in the scope
+        if the name is `None`.
+        """
+        if name is None:
+            self._execute(
+                "DELETE FROM name_uri WHERE host=? AND parent=? AND class=?",
+                [scope])
+        else:
+            self._execute(
+                "DELETE FROM name_uri "
+                "WHERE host=? AND parent=? AND class=? AND name=?",
+                [scope + (name,)])
+
 
 class _NameUriCache(object):
     """
     A Name-URI cache, that caches the mapping between resource names and
     resource URIs. It supports looking up resource URIs by resource names.
 
+    The cache can be used by multiple threads concurrently. Refreshing the
+    cache from the HMC is performed by only one thread at a time, and other
+    threads needing the refresh wait for its result.
+
+    In addition, the cache remembers for a shorter time the names that were
+    not found (negative entries), so that repeated lookups of non-existing
+    names do not each cause the resources to be listed again.
+
+    The cache can optionally be backed by a persistent store, so that its
+    entries survive the process.
+
+    Manager objects for the same set of resources (i.e. with the same parent
+    resource URI and resource class, in the same session) share one Name-URI
+    cache (see :meth:`shared`). The cache holds only a weak reference to the
+    manager that created it, so that the cache does not keep the manager and
+    its parent resource alive.
+
     This class is used by the implementation of manager classes, and is not
     part of the external API.
     """
 
-    def __init__(self, manager, timetolive):
+    def __init__(self, manager, timetolive, negative_timetolive=0,
+                 store=None):
         """
         Parameters:
 
           manager (BaseManager): Manager that holds this Name-URI cache. The
             manager object is expected to have a ``list()`` method, which
             is used to list the resources of that manager, in order to
-            fill this cache.
+            fill this cache. Only a weak reference to it is kept.
 
           timetolive (number): Time in seconds until the cache will invalidate
             itself automatically, since it was last invalidated.
+
+          negative_timetolive (number): Time in seconds during which a name
+            that was not found is remembered as not existing. 0 means that
+            names that were not found are not remembered.
+
+          store (_NameUriCacheStore): Persistent store backing the cache,
+            or `None`.
         """
-        self._manager = manager
+        self._manager_ref = weakref.ref(manager)
+        self._name_prop = manager._name_prop
+        self._uri_prop = manager._uri_prop
+        parent = manager.parent
+        self._store_scope = (manager.session.host,
+                             parent.uri if parent is not None else '',
+                             manager.class_name)
         self._timetolive = timetolive
+        self._negative_timetolive = negative_timetolive
+        self._store = store
 
         # The cached data, as a dictionary with:
         # Key (string): Name of a resource (unique within its parent resource)
         # Value (string): URI of that resource
         self._uris = {}
 
+        # The negative entries, as a dictionary with:
+        # Key (string): Name of a resource that was not found
+        # Value (datetime): Point in time when it was not found
+        self._not_found = {}
+
         # Point in time when the cache was last invalidated
         self._invalidated = datetime.now()
 
-    def get(self, name):
+        # Lock protecting the state of this cache, and condition for waiting
+        # on the completion of a refresh in progress
+        self._cond = threading.Condition(threading.Lock())
+
+        # Indicates that a refresh is in progress
+        self._refreshing = False
+
+        # Number of completed refreshes
+        self._generation = 0
+
+        if self._store is not None:
+            self._load()
+
+    @classmethod
+    def shared(cls, manager):
+        """
+        Return the Name-URI cache for the resources of a manager, that is
+        shared between all manager objects for the same parent resource URI
+        and resource class in the session of the manager, creating it if
+        needed.
+        """
+        session = manager.session
+        rt_config = session.retry_timeout_config
+        key = (manager.parent.uri if manager.parent is not None else None,
+               manager.class_name)
+        caches = getattr(session, '_name_uri_caches', None)
+        with _SHARED_NAME_URI_CACHES_LOCK:
+            if caches is not None:
+                try:
+                    return caches[key]
+                except KeyError:
+                    pass
+            cache_file = getattr(rt_config, 'name_uri_cache_file', None)
+            store = _NameUriCacheStore.open(cache_file) \
+                if cache_file else None
+            negative_timetolive = getattr(
+                rt_config, 'name_uri_cache_negative_timetolive', 0) or 0
+            cache = cls(manager, rt_config.name_uri_cache_timetolive,
+                        negative_timetolive, store)
+            if caches is not None:
+                caches[key] = cache
+        return cache
+
+    @property
+    def _manager(self):
+        """
+        The manager that holds this cache, or `None` if it no longer exists.
+        """
+        return self._manager_ref()
+
+    def _store_update(self, entries):
+        """
+        Create or update entries in the persistent store, from a dictionary
+        of name: uri. Must be called without the lock held, so that lookups
+        in the cache do not wait for the store.
+        """
+        if self._store is not None and entries:
+            self._store.update(self._store_scope, entries, time.time())
+
+    def _store_delete(self, name=None):
+        """
+        Delete the entry for a name, or all entries of this cache if the name
+        is `None`, from the persistent store. Must be called without the lock
+        held, so that lookups in the cache do not wait for the store.
+        """
+        if self._store is not None:
+            self._store.delete(self._store_scope, name)
+
+    def _load(self):
+        """
+        Populate the cache from its persistent store, using only entries that
+        have not exceeded the time to live.
+        """
+        now = time.time()
+        entries = self._store.load(self._store_scope, now - self._timetolive)
+        if entries:
+            self._uris = {name: uri
+                          for name, (uri, _) in six.iteritems(entries)}
+            oldest = min(stored for _, stored in six.itervalues(entries))
+            self._invalidated = datetime.now() - \
+                timedelta(seconds=now - oldest)
+
+    def get(self, name, manager=None):
         """
         Get the resource URI for a specified resource name.
 
         If an entry for the specified resource name does not exist in the
-        Name-URI cache, the cache is refreshed from the HMC with all resources
-        of the manager holding this cache.
+        Name-URI cache, and the name has not recently been found not to exist,
+        the cache is refreshed from the HMC with all resources of the manager.
+
+        If the time to live of the cache has expired, the cache is refreshed
+        as well. While another thread is refreshing the cache, existing
+        entries continue to be served from the expired cache.
 
         If an entry for the specified resource name still does not exist after
-        that, ``NotFound`` is raised.
+        that, ``NotFound`` is raised, and the name is remembered as not
+        existing.
+
+        Parameters:
+
+          name (string): Name of the resource.
+
+          manager (BaseManager): Manager used to refresh the cache. `None`
+            means the manager holding this cache.
         """
-        self.auto_invalidate()
-        try:
-            return self._uris[name]
-        except KeyError:
-            self.refresh()
+        if manager is None:
+            manager = self._manager
+        with self._cond:
+            if not self._expired():
+                try:
+                    return self._uris[name]
+                except KeyError:
+                    pass
+                if self._is_not_found(name):
+                    raise NotFound({manager._name_prop: name}, manager)
+            elif self._refreshing:
+                # Stale-while-revalidate: Another thread is refreshing the
+                # expired cache, so we serve the entry from the expired cache.
+                try:
+                    return self._uris[name]
+                except KeyError:
+                    pass
+        self.refresh(manager)
+        with self._cond:
             try:
                 return self._uris[name]
             except KeyError:
-                raise NotFound({self._manager._name_prop: name}, self._manager)
+                if self._negative_timetolive > 0:
+                    self._not_found[name] = datetime.now()
+                raise NotFound({manager._name_prop: name}, manager)
+
+    def _expired(self):
+        """
+        Return a boolean indicating whether the time to live of the cache has
+        expired. Must be called with the lock held.
+        """
+        return datetime.now() > \
+            self._invalidated + timedelta(seconds=self._timetolive)
+
+    def _is_not_found(self, name):
+        """
+        Return a boolean indicating whether there is a negative entry for the
+        specified name that has not yet expired. Must be called with the lock
+        held.
+        """
+        try:
+            not_found = self._not_found[name]
+        except KeyError:
+            return False
+        if datetime.now() > not_found + \
+                timedelta(seconds=self._negative_timetolive):
+            del self._not_found[name]
+            return False
+        return True
 
     def auto_invalidate(self):
         """
         Invalidate the cache if the current time is past the time to live.
         """
-        current = datetime.now()
-        if current > self._invalidated + timedelta(seconds=self._timetolive):
-            self.invalidate()
+        with self._cond:
+            expired = self._expired()
+            if expired:
+                self._invalidate()
+        if expired:
+            self._store_delete()
 
     def invalidate(self):
         """
         Invalidate the cache.
 
-        This empties the cache and sets the time of last invalidation to the
-        current time.
+        This empties the cache (including the negative entries and the
+        persistent store for this cache) and sets the time of last
+        invalidation to the current time.
         """
+        with self._cond:
+            self._invalidate()
+        self._store_delete()
+
+    def _invalidate(self):
         self._uris = {}
+        self._not_found = {}
         self._invalidated = datetime.now()
 
-    def refresh(self):
+    def refresh(self, manager=None):
         """
         Refresh the Name-URI cache from the HMC.
 
-        This is done by invalidating the cache, listing the resources of this
-        manager from the HMC, and populating the cache with that information.
+        This is done by listing the resources of the manager from the HMC,
+        and replacing the content of the cache with that information.
+
+        Only one thread at a time refreshes the cache. If a refresh by another
+        thread is in progress, this method waits for its completion and
+        uses its result, instead of listing the resources again. If that
+        refresh fails, this method performs the refresh itself.
+
+        Parameters:
+
+          manager (BaseManager): Manager used to list the resources. `None`
+            means the manager holding this cache.
         """
-        self.invalidate()
-        full = not self._manager._list_has_name
-        res_list = self._manager.list(full_properties=full)
-        self.update_from(res_list)
+        if manager is None:
+            manager = self._manager
+        with self._cond:
+            if self._refreshing:
+                generation = self._generation
+                while self._refreshing:
+                    self._cond.wait()
+                if self._generation != generation:
+                    return
+            self._refreshing = True
+        try:
+            full = not manager._list_has_name
+            res_list = manager.list(full_properties=full)
+        except Exception:
+            with self._cond:
+                self._refreshing = False
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._invalidate()
+            entries = self._update_from(res_list)
+            self._generation += 1
+            self._refreshing = False
+            self._cond.notify_all()
+        self._store_delete()
+        self._store_update(entries)
 
     def update_from(self, res_list):
         """
@@ -133,12 +692,27 @@ class _NameUriCache(object):
         entries for non-empty resource names in that list. Other cache entries
         remain unchanged.
         """
+        with self._cond:
+            entries = self._update_from(res_list)
+        self._store_update(entries)
+
+    def _update_from(self, res_list):
+        """
+        Update the cache entries from the provided resource list, and return
+        the updated entries as a dictionary of name: uri. Must be called with
+        the lock held.
+        """
+        entries = {}
         for res in res_list:
             # We access the properties dictionary, in order to make sure
             # we don't drive additional HMC interactions.
-            name = res.properties.get(self._manager._name_prop, None)
-            uri = res.properties.get(self._manager._uri_prop, None)
-            self.update(name, uri)
+            name = res.properties.get(self._name_prop, None)
+            uri = res.properties.get(self._uri_prop, None)
+            if name:
+                self._uris[name] = uri
+                self._not_found.pop(name, None)
+                entries[name] = uri
+        return entries
 
     def update(self, name, uri):
         """
@@ -148,7 +722,10 @@ class _NameUriCache(object):
         If the specified name is `None` or the empty string, do nothing.
         """
         if name:
-            self._uris[name] = uri
+            with self._cond:
+                self._uris[name] = uri
+                self._not_found.pop(name, None)
+            self._store_update({name: uri})
 
     def delete(self, name):
         """
@@ -159,10 +736,9 @@ class _NameUriCache(object):
         the specified name does not exist, do nothing.
         """
         if name:
-            try:
-                del self._uris[name]
-            except KeyError:
-                pass
+            with self._cond:
+                self._uris.pop(name, None)
+            self._store_delete(name)
 
 
 class BaseManager(object):
@@ -254,8 +830,12 @@ class BaseManager(object):
         self._query_props = query_props
         self._list_has_name = list_has_name
 
-        self._name_uri_cache = _NameUriCache(
-            self, session.retry_timeout_config.name_uri_cache_timetolive)
+        # Number of HMC requests caused by client-side filtering, and the
+        # lock protecting it
+        self._filter_fetch_count = 0
+        self._filter_fetch_lock = threading.Lock()
+
+        self._name_uri_cache = _NameUriCache.shared(self)
 
     def __repr__(self):
         """
@@ -302,17 +882,24 @@ class BaseManager(object):
         caches the mappings between resource URIs and resource names, to speed
         up certain zhmcclient methods.
 
+        The Name-URI cache is shared between the manager objects for the same
+        resources (i.e. with the same parent resource and resource type) in
+        the same session. It can optionally remember for a short time the
+        names that were not found (see
+        :attr:`~zhmcclient.RetryTimeoutConfig.name_uri_cache_negative_timetolive`),
+        and can optionally be persisted in a file (see
+        :attr:`~zhmcclient.RetryTimeoutConfig.name_uri_cache_file`).
+
         The Name-URI cache is properly updated during changes on the resource
         name (e.g. via :meth:`~zhmcclient.Partition.update_properties`) or
         changes on the resource URI (e.g. via resource creation or deletion),
-        if these changes are performed through the same Python manager object.
+        if these changes are performed through a Python manager object
+        sharing the Name-URI cache.
 
-        However, changes performed through a different manager object (e.g.
-        because a different session, client or parent resource object was
-        used), or changes performed in a different Python process, or changes
-        performed via other means than the zhmcclient library (e.g. directly on
-        the HMC) will not automatically update the Name-URI cache of this
-        manager.
+        However, changes performed through a different session, or changes
+        performed in a different Python process, or changes performed via
+        other means than the zhmcclient library (e.g. directly on the HMC)
+        will not automatically update the Name-URI cache of this manager.
 
         In cases where the resource name or resource URI are effected by such
         changes, the Name-URI cache can be manually invalidated by the user,
@@ -435,6 +1022,10 @@ class BaseManager(object):
         Depending on the properties specified in the filter arguments, this
         method retrieves the resource properties from the HMC.
 
+        The filter arguments are compiled into a predicate once, and the
+        compiled predicate is cached, so that matching many resource objects
+        against the same filter arguments does not re-parse the match values.
+
         Parameters:
 
           obj (BaseResource):
@@ -449,12 +1040,9 @@ class BaseManager(object):
           bool: Boolean indicating whether the resource object matches the
             filter arguments.
         """
-        if filter_args is not None:
-            for prop_name in filter_args:
-                prop_match = filter_args[prop_name]
-                if not self._matches_prop(obj, prop_name, prop_match):
-                    return False
-        return True
+        if not filter_args:
+            return True
+        return _compile_filter_args(filter_args).matches(obj.get_property)
 
     def _matches_prop(self, obj, prop_name, prop_match):
         """
@@ -474,9 +1062,8 @@ class BaseManager(object):
             Property match value that is used to match the actual value of
             the specified property against, as follows:
 
-            - If the match value is a list or tuple, this method is invoked
-              recursively to find whether one or more match values inthe list
-              match.
+            - If the match value is a list or tuple, one or more match values
+              in the list must match.
 
             - Else if the property is of string type, its value is matched by
               interpreting the match value as a regular expression.
@@ -489,41 +1076,119 @@ class BaseManager(object):
           bool: Boolean indicating whether the resource object matches w.r.t.
             the specified property and the match value.
         """
-        if isinstance(prop_match, (list, tuple)):
-            # List items are logically ORed, so one matching item suffices.
-            for pm in prop_match:
-                if self._matches_prop(obj, prop_name, pm):
-                    return True
+        return self._matches_filters(obj, {prop_name: prop_match})
+
+    def _matching_resources(self, resource_objs, filter_args,
+                            full_properties=False):
+        """
+        Return the resource objects that match a set of filter arguments,
+        retrieving the full set of properties where needed.
+        This is used for client-side filtering in the `list()` methods of the
+        derived manager classes.
+
+        The filter arguments are first matched against the properties that
+        are present in the resource objects (i.e. those returned by the list
+        operation). The resource objects that are still candidates but lack
+        some of the filter properties get their full set of properties
+        retrieved in one batch of concurrent HMC requests, before the filter
+        arguments are matched against them again. This avoids retrieving the
+        properties of resources that can already be excluded, and avoids
+        serializing the retrieval for the remaining resources.
+
+        If `full_properties` is `True`, the full set of properties is retrieved
+        for all matching resource objects in the same concurrent manner, unless
+        already retrieved during filtering.
+
+        The number of additional HMC requests caused by filtering is
+        accumulated in :attr:`filter_fetch_count`.
+
+        Parameters:
+
+          resource_objs (iterable of BaseResource):
+            Resource objects to be filtered, in the order to be returned.
+
+          filter_args (dict):
+            Filter arguments. For details, see :ref:`Filtering`.
+            `None` causes all resources to match.
+
+          full_properties (bool):
+            Controls whether the full set of resource properties should be
+            retrieved for the matching resource objects.
+
+        Returns:
+
+          list of BaseResource: The matching resource objects, in their
+          original order.
+        """
+        resource_objs = list(resource_objs)
+        if filter_args:
+            compiled = _compile_filter_args(filter_args)
+            results = []  # True, False, or None (= needs full properties)
+            fetch_objs = []
+            for obj in resource_objs:
+                result = compiled.matches_present(obj.properties)
+                if result is None:
+                    if obj.full_properties:
+                        result = False
+                    else:
+                        fetch_objs.append(obj)
+                results.append(result)
+            if fetch_objs:
+                self._pull_full_properties_all(fetch_objs)
+                with self._filter_fetch_lock:
+                    self._filter_fetch_count += len(fetch_objs)
+                LOG.debug("Client-side filtering on properties %r caused "
+                          "%d additional HMC requests for %d listed %s "
+                          "resources", compiled.prop_names, len(fetch_objs),
+                          len(resource_objs), self.class_name)
+            matching_objs = []
+            for obj, result in zip(resource_objs, results):
+                if result is None:
+                    result = compiled.matches(obj.properties.__getitem__)
+                if result:
+                    matching_objs.append(obj)
         else:
-            # Some lists of resources do not have all properties, for example
-            # Hipersocket adapters do not have a "card-location" property.
-            # If a filter property does not exist on a resource, the resource
-            # does not match.
-            try:
-                prop_value = obj.get_property(prop_name)
-            except KeyError:
-                return False
-            if isinstance(prop_value, six.string_types):
-                # HMC resource property is Enum String or (non-enum) String,
-                # and is both matched by regexp matching. Ideally, regexp
-                # matching should only be done for non-enum strings, but
-                # distinguishing them is not possible given that the client
-                # has no knowledge about the properties.
-
-                # The regexp matching implemented in the HMC requires begin and
-                # end of the string value to match, even if the '^' for begin
-                # and '$' for end are not specified in the pattern. The code
-                # here is consistent with that: We add end matching to the
-                # pattern, and begin matching is done by re.match()
-                # automatically.
-                re_match = prop_match + '$'
-                m = re.match(re_match, prop_value)
-                if m:
-                    return True
-            else:
-                if prop_value == prop_match:
-                    return True
-        return False
+            matching_objs = resource_objs
+        if full_properties:
+            self._pull_full_properties_all(
+                [obj for obj in matching_objs if not obj.full_properties])
+        return matching_objs
+
+    @staticmethod
+    def _pull_full_properties_all(resource_objs):
+        """
+        Retrieve the full set of properties for the specified resource
+        objects, using concurrent HMC requests.
+
+        If one of the requests fails, its exception is raised.
+        """
+        if len(resource_objs) <= 1:
+            for obj in resource_objs:
+                obj.pull_full_properties()
+            return
+        # Imported here, because importing it takes a significant part of
+        # the time for importing the zhmcclient package
+        from multiprocessing.pool import ThreadPool
+        num_workers = min(len(resource_objs), _PARALLEL_FETCH_WORKERS)
+        pool = ThreadPool(num_workers)
+        try:
+            pool.map(lambda obj: obj.pull_full_properties(), resource_objs)
+        finally:
+            pool.close()
+            pool.join()
+
+    @property
+    def filter_fetch_count(self):
+        """
+        :term:`integer`: The number of additional HMC requests for retrieving
+        the full set of resource properties that were caused by client-side
+        filtering in this manager object, because the filter arguments
+        specified properties that are not returned by the HMC list operation.
+
+        This counter accumulates over the lifetime of this manager object
+        and allows determining the cost of filter arguments.
+        """
+        return self._filter_fetch_count
 
     @property
     def resource_class(self):
@@ -561,14 +1226,46 @@ class BaseManager(object):
         """
         return self._parent
 
+    def _register_resource_object(self, resource_obj):
+        """
+        Register a resource object in the identity map of the session, so
+        that resolving its URI returns this resource object.
+
+        This is invoked when resource objects are created. The most recently
+        created resource object for a URI is the one that is registered.
+        """
+        registry = getattr(self.session, '_resource_objects', None)
+        if registry is not None:
+            registry[resource_obj.uri] = resource_obj
+
+    def _registered_resource_object(self, uri):
+        """
+        Return the resource object of this resource class for a URI from the
+        identity map of the session, or `None` if there is none.
+        """
+        registry = getattr(self.session, '_resource_objects', None)
+        if registry is None:
+            return None
+        resource_obj = registry.get(uri, None)
+        if resource_obj is None or \
+                not isinstance(resource_obj, self.resource_class):
+            return None
+        return resource_obj
+
     def resource_object(self, uri_or_oid, props=None):
         """
-        Return a minimalistic Python resource object for this resource class,
-        that is scoped to this manager.
+        Return a Python resource object for this resource class, that is
+        scoped to this manager.
 
         This method is an internal helper function and is not normally called
         by users.
 
+        If a resource object for the resource URI already exists in the
+        session (e.g. because the resource was listed or retrieved before and
+        the resource object is still referenced), that resource object is
+        returned, including any properties it already has. Otherwise, a new,
+        minimalistic resource object is returned.
+
         The returned resource object will have the following minimal set of
         properties set automatically:
 
@@ -612,6 +1309,10 @@ class BaseManager(object):
                 name = props[self._name_prop]
             except KeyError:
                 pass
+        resource_obj = self._registered_resource_object(uri)
+        if resource_obj is not None:
+            resource_obj._properties.update(res_props)
+            return resource_obj
         return self.resource_class(self, uri, name, res_props)
 
     @logged_api_call
@@ -879,12 +1580,14 @@ class BaseManager(object):
 
               cpc = client.cpcs.find_by_name('CPC001')
         """
-        uri = self._name_uri_cache.get(name)
-        obj = self.resource_class(
-            manager=self,
-            uri=uri,
-            name=name,
-            properties=None)
+        uri = self._name_uri_cache.get(name, self)
+        obj = self._registered_resource_object(uri)
+        if obj is None or obj.properties.get(self._name_prop, None) != name:
+            obj = self.resource_class(
+                manager=self,
+                uri=uri,
+                name=name,
+                properties=None)
         return obj
 
     @logged_api_call
@@ -152,10 +152,10 @@ class PortManager(BaseManager):
                 name=None,
                 properties=None)
 
-            if self._matches_filters(resource_obj, filter_args):
-                resource_obj_list.append(resource_obj)
-                if full_properties:
-                    resource_obj.pull_full_properties()
+            resource_obj_list.append(resource_obj)
+
+        resource_obj_list = self._matching_resources(
+            resource_obj_list, filter_args, full_properties)
 
         self._name_uri_cache.update_from(resource_obj_list)
         return resource_obj_list
@@ -0,0 +1,130 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Rate limiter for the HTTP requests of a session, with priorities.
+
+This module is internal; the rate limiter is configured with the
+`rate_limit` and `rate_burst` attributes of
+:class:`~zhmcclient.RetryTimeoutConfig`.
+"""
+
+from __future__ import absolute_import
+
+import time
+import heapq
+import threading
+
+__all__ = []
+
+
+class _RateLimiter(object):
+    """
+    Token bucket rate limiter, whose waiting requests are admitted in the
+    order of their priority, and in the order of their arrival for the same
+    priority.
+
+    The bucket holds up to `burst` tokens and is refilled with `rate` tokens
+    per second. Each request takes one token, and waits until one is
+    available and no request with a higher priority, or with the same
+    priority that arrived earlier, is waiting.
+    """
+
+    def __init__(self, rate, burst):
+        """
+        Parameters:
+
+          rate (:term:`number`): Average number of requests per second.
+            Must be positive.
+
+          burst (:term:`integer`): Maximum number of requests that are
+            admitted without waiting. Values less than 1 are treated as 1.
+        """
+        if rate <= 0:
+            raise ValueError("Rate limit must be positive: {!r}".
+                             format(rate))
+        self._rate = float(rate)
+        self._burst = max(burst, 1)
+        self._tokens = float(self._burst)
+        self._last_time = time.time()
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of tuple(priority, sequence)
+        self._sequence = 0
+
+    def __repr__(self):
+        return "_RateLimiter(rate={!r}, burst={!r})".format(self._rate,
+                                                            self._burst)
+
+    @property
+    def rate(self):
+        """
+        float: Average number of requests per second.
+        """
+        return self._rate
+
+    @property
+    def burst(self):
+        """
+        int: Maximum number of requests that are admitted without waiting.
+        """
+        return self._burst
+
+    @property
+    def waiting(self):
+        """
+        int: Number of requests currently waiting.
+        """
+        with self._cond:
+            return len(self._waiting)
+
+    def _refill(self):
+        now = time.time()
+        self._tokens = min(self._burst,
+                           self._tokens + (now - self._last_time) * self._rate)
+        self._last_time = now
+
+    def acquire(self, priority):
+        """
+        Wait until a request with the specified priority is admitted.
+
+        Parameters:
+
+          priority (:term:`integer`): Priority of the request. Lower values
+            have higher priority (see :ref:`Constants`).
+
+        Returns:
+
+          float: Time in seconds the request has waited.
+        """
+        start_time = time.time()
+        with self._cond:
+            entry = (priority, self._sequence)
+            self._sequence += 1
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiting[0] != entry:
+                        # Woken up when the first waiting request leaves
+                        self._cond.wait()
+                    elif self._tokens < 1:
+                        self._cond.wait((1 - self._tokens) / self._rate)
+                    else:
+                        break
+                self._tokens -= 1
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+        return time.time() - start_time
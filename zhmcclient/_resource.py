@@ -94,6 +94,8 @@ class BaseResource(object):
         self._properties_timestamp = int(time.time())
         self._full_properties = False
 
+        self._manager._register_resource_object(self)
+
     @property
     def properties(self):
         """
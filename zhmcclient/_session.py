@@ -21,7 +21,10 @@ from __future__ import absolute_import
 import json
 import time
 import re
+import weakref
+import threading
 import collections
+from contextlib import contextmanager
 import six
 from copy import copy
 try:
@@ -35,13 +38,17 @@ from ._exceptions import HTTPError, ServerAuthError, ClientAuthError, \
     ConnectionError, ParseError, ConnectTimeout, ReadTimeout, \
     RetriesExceeded, OperationTimeout
 from ._timestats import TimeStatsKeeper
+from ._tracing import RequestInfo, _RequestTracer
+from ._ratelimit import _RateLimiter
 from ._logging import get_logger, logged_api_call
 from ._constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_CONNECT_RETRIES, \
     DEFAULT_READ_TIMEOUT, DEFAULT_READ_RETRIES, DEFAULT_MAX_REDIRECTS, \
     DEFAULT_OPERATION_TIMEOUT, DEFAULT_STATUS_TIMEOUT, \
-    DEFAULT_NAME_URI_CACHE_TIMETOLIVE, HMC_LOGGER_NAME, \
+    DEFAULT_NAME_URI_CACHE_TIMETOLIVE, \
+    DEFAULT_NAME_URI_CACHE_NEGATIVE_TIMETOLIVE, HMC_LOGGER_NAME, \
     HTML_REASON_WEB_SERVICES_DISABLED, HTML_REASON_OTHER, \
-    DEFAULT_HMC_PORT
+    DEFAULT_HMC_PORT, DEFAULT_RATE_LIMIT, DEFAULT_RATE_BURST, \
+    PRIORITY_LIFECYCLE, PRIORITY_INVENTORY, PRIORITY_METRICS
 
 __all__ = ['Session', 'Job', 'RetryTimeoutConfig', 'get_password_interface']
 
@@ -56,6 +63,31 @@ _STD_HEADERS = {
 }
 
 
+def _body_size(data):
+    """
+    Return the number of bytes of a request body, or `None` if it is not
+    known (e.g. for files).
+    """
+    if data is None:
+        return 0
+    if isinstance(data, (six.binary_type, six.text_type)):
+        return len(data)
+    return None
+
+
+def _update_trace_info(trace_info, result):
+    """
+    Update the trace information of a request from its HTTP response.
+    """
+    trace_info.status = result.status_code
+    trace_info.response = result
+    trace_info.bytes_received = len(result.content or b'')
+    retries = getattr(getattr(result, 'raw', None), 'retries', None)
+    history = getattr(retries, 'history', None)
+    if history:
+        trace_info.retries = len(history)
+
+
 def _handle_request_exc(exc, retry_timeout_config):
     """
     Handle a :exc:`request.exceptions.RequestException` exception that was
@@ -122,7 +154,9 @@ class RetryTimeoutConfig(object):
     def __init__(self, connect_timeout=None, connect_retries=None,
                  read_timeout=None, read_retries=None, max_redirects=None,
                  operation_timeout=None, status_timeout=None,
-                 name_uri_cache_timetolive=None):
+                 name_uri_cache_timetolive=None,
+                 name_uri_cache_negative_timetolive=None,
+                 name_uri_cache_file=None, rate_limit=None, rate_burst=None):
         """
         For all parameters, `None` means that this object does not specify a
         value for the parameter, and that a default value should be used
@@ -172,6 +206,34 @@ class RetryTimeoutConfig(object):
             seconds since the last invalidation. The special value 0 means
             that no Name-URI cache is maintained (i.e. the caching is
             disabled).
+
+          name_uri_cache_negative_timetolive (:term:`number`): Time in seconds
+            during which the Name-URI cache of manager objects remembers that
+            a resource name was not found. Within that time, looking up the
+            name again raises :exc:`~zhmcclient.NotFound` without listing the
+            resources again. Creating a resource with that name through the
+            zhmcclient removes the remembered name, but resources created by
+            other clients with that name are not found during that time. The
+            special value 0 means that names that were not found are not
+            remembered.
+
+          name_uri_cache_file (:term:`string`): Path name of a file in which
+            the Name-URI cache of manager objects is persisted, so that it can
+            be reused by other sessions and processes for the same HMC, within
+            the time to live of the Name-URI cache. The file is an SQLite
+            database and is created if it does not exist. The special value
+            `None` means that the Name-URI cache is not persisted.
+
+          rate_limit (:term:`number`): Maximum average rate of the HTTP
+            requests of a session, in requests per second. Requests that
+            exceed the rate wait before they are sent, and waiting requests
+            are sent in the order of their priority (see
+            :meth:`~zhmcclient.Session.request_priority`). The special value
+            0 means that the rate is not limited.
+
+          rate_burst (:term:`integer`): Maximum number of HTTP requests of a
+            session that can be sent in a burst without waiting for the rate
+            limit.
         """
         self.connect_timeout = connect_timeout
         self.connect_retries = connect_retries
@@ -181,6 +243,11 @@ class RetryTimeoutConfig(object):
         self.operation_timeout = operation_timeout
         self.status_timeout = status_timeout
         self.name_uri_cache_timetolive = name_uri_cache_timetolive
+        self.name_uri_cache_negative_timetolive = \
+            name_uri_cache_negative_timetolive
+        self.name_uri_cache_file = name_uri_cache_file
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
 
         # Read retries only for these HTTP methods:
         self.method_whitelist = {'GET'}
@@ -188,7 +255,8 @@ class RetryTimeoutConfig(object):
     _attrs = ('connect_timeout', 'connect_retries', 'read_timeout',
               'read_retries', 'max_redirects', 'operation_timeout',
               'status_timeout', 'name_uri_cache_timetolive',
-              'method_whitelist')
+              'name_uri_cache_negative_timetolive', 'name_uri_cache_file',
+              'rate_limit', 'rate_burst', 'method_whitelist')
 
     def override_with(self, override_config):
         """
@@ -254,11 +322,15 @@ class Session(object):
         operation_timeout=DEFAULT_OPERATION_TIMEOUT,
         status_timeout=DEFAULT_STATUS_TIMEOUT,
         name_uri_cache_timetolive=DEFAULT_NAME_URI_CACHE_TIMETOLIVE,
+        name_uri_cache_negative_timetolive=(
+            DEFAULT_NAME_URI_CACHE_NEGATIVE_TIMETOLIVE),
+        rate_limit=DEFAULT_RATE_LIMIT,
+        rate_burst=DEFAULT_RATE_BURST,
     )
 
     def __init__(self, host, userid=None, password=None, session_id=None,
                  get_password=None, retry_timeout_config=None,
-                 port=DEFAULT_HMC_PORT):
+                 port=DEFAULT_HMC_PORT, session_cache=None):
         """
         Creating a session object will not immediately cause a logon to be
         attempted; the logon is deferred until needed.
@@ -336,12 +408,23 @@ class Session(object):
             HMC TCP port. Defaults to
             :attr:`~zhmcclient._constants.DEFAULT_HMC_PORT`.
             For details, see the :attr:`~zhmcclient.Session.port` property.
+
+          session_cache (:class:`~zhmcclient.SessionCache`):
+            A cache of session-ids that is shared with other sessions and
+            processes, or `None`.
+
+            If provided, the session uses the session-id that is cached for
+            its host, port and userid instead of logging on to the HMC, and
+            stores the session-id in the cache after logging on. Logging off
+            the session while its session-id is in the cache keeps the HMC
+            session. For details, see :ref:`Session cache`.
         """
         self._host = host
         self._port = port
         self._userid = userid
         self._password = password
         self._get_password = get_password
+        self._session_cache = session_cache
         self._retry_timeout_config = self.default_rt_config.override_with(
             retry_timeout_config)
         self._base_url = "{scheme}://{host}:{port}".format(
@@ -360,6 +443,30 @@ class Session(object):
             self._session = None
         self._time_stats_keeper = TimeStatsKeeper()
 
+        # Name-URI caches shared by the manager objects of this session, by
+        # tuple (parent resource URI, resource class name). A cache is kept
+        # only as long as manager objects that use it exist.
+        self._name_uri_caches = weakref.WeakValueDictionary()
+
+        # Identity map of the resource objects of this session, by resource
+        # URI. Used for resolving resource URIs to existing resource objects.
+        self._resource_objects = weakref.WeakValueDictionary()
+
+        # Session hooks (SessionHook objects). The list is replaced when
+        # hooks are added or removed, so it can be iterated without locking.
+        self._hooks = []
+
+        # Rate limiter for the HTTP requests, or None
+        if self._retry_timeout_config.rate_limit:
+            self._rate_limiter = _RateLimiter(
+                self._retry_timeout_config.rate_limit,
+                self._retry_timeout_config.rate_burst)
+        else:
+            self._rate_limiter = None
+
+        # Request priority set by request_priority() for the current thread
+        self._priority_local = threading.local()
+
     def __repr__(self):
         """
         Return a string with the state of this session, for debug purposes.
@@ -370,6 +477,7 @@ class Session(object):
             "  _userid = {s._userid!r}\n"
             "  _password = '...'\n"
             "  _get_password = {s._get_password!r}\n"
+            "  _session_cache = {s._session_cache!r}\n"
             "  _retry_timeout_config = {s._retry_timeout_config!r}\n"
             "  _base_url = {s._base_url!r}\n"
             "  _headers = {s._headers!r}\n"
@@ -470,6 +578,109 @@ class Session(object):
         """
         return self._time_stats_keeper
 
+    @property
+    def hooks(self):
+        """
+        :class:`py:tuple` of :class:`~zhmcclient.SessionHook`: The hooks of
+        this session, in the order they were added (see
+        :meth:`~zhmcclient.Session.add_hook`).
+        """
+        return tuple(self._hooks)
+
+    @logged_api_call
+    def add_hook(self, hook):
+        """
+        Add a hook to this session, that is invoked around every HTTP request
+        against the HMC API and around every wait for completion of an
+        asynchronous job (for details, see section :ref:`Session hooks`).
+
+        The hooks are invoked in the order they were added when a request
+        starts, and in the reverse order when a request ends.
+
+        Parameters:
+
+          hook (:class:`~zhmcclient.SessionHook`): The hook to be added.
+        """
+        self._hooks = self._hooks + [hook]
+
+    @logged_api_call
+    def remove_hook(self, hook):
+        """
+        Remove a hook from this session.
+
+        Parameters:
+
+          hook (:class:`~zhmcclient.SessionHook`): The hook to be removed.
+
+        Raises:
+
+          ValueError: The hook has not been added to this session.
+        """
+        hooks = list(self._hooks)
+        hooks.remove(hook)
+        self._hooks = hooks
+
+    @contextmanager
+    def request_priority(self, priority):
+        """
+        Return a context manager that sets the priority of the HTTP requests
+        that are performed by the current thread within the context.
+
+        The priority determines the order in which requests that wait for the
+        rate limit of the session are sent (see the `rate_limit` attribute of
+        :class:`~zhmcclient.RetryTimeoutConfig`). By default, requests for
+        the metrics service of the HMC have priority
+        :data:`~zhmcclient._constants.PRIORITY_METRICS`, other GET requests
+        have priority :data:`~zhmcclient._constants.PRIORITY_INVENTORY`, and
+        POST and DELETE requests have priority
+        :data:`~zhmcclient._constants.PRIORITY_LIFECYCLE`.
+
+        Example::
+
+            with session.request_priority(zhmcclient.PRIORITY_INTERACTIVE):
+                partition.start()
+
+        Parameters:
+
+          priority (:term:`integer`): Priority of the requests. Lower values
+            have higher priority (see :ref:`Constants`).
+        """
+        saved_priority = getattr(self._priority_local, 'priority', None)
+        self._priority_local.priority = priority
+        try:
+            yield
+        finally:
+            self._priority_local.priority = saved_priority
+
+    def _request_priority(self, method, uri):
+        """
+        Return the priority of an HTTP request of the current thread.
+        """
+        priority = getattr(self._priority_local, 'priority', None)
+        if priority is not None:
+            return priority
+        if uri.startswith('/api/services/metrics/'):
+            return PRIORITY_METRICS
+        if method == 'GET':
+            return PRIORITY_INVENTORY
+        return PRIORITY_LIFECYCLE
+
+    def _trace_request(self, method, uri, kind='request', job_uri=None):
+        """
+        Return a context manager that invokes the hooks of this session
+        around a request, and that returns the
+        :class:`~zhmcclient.RequestInfo` object for the request.
+
+        For HTTP requests, this waits until the rate limiter of this session
+        admits the request.
+        """
+        info = RequestInfo(kind, method, uri, job_uri)
+        if kind == 'request':
+            info.priority = self._request_priority(method, uri)
+            if self._rate_limiter is not None:
+                info.queue_time = self._rate_limiter.acquire(info.priority)
+        return _RequestTracer(self._hooks, info)
+
     @property
     def session_id(self):
         """
@@ -484,6 +695,14 @@ class Session(object):
         """
         return self._session
 
+    @property
+    def session_cache(self):
+        """
+        :class:`~zhmcclient.SessionCache`: The cache of session-ids used by
+        this session, or `None`.
+        """
+        return self._session_cache
+
     @logged_api_call
     def logon(self, verify=False):
         """
@@ -579,6 +798,17 @@ class Session(object):
         """
         if self._userid is None:
             raise ClientAuthError("Userid is not provided.")
+        if self._session_cache is not None:
+            # Use the session-id of another session, unless it is the one
+            # that has just expired. It is verified lazily by the HMC with the
+            # next operation.
+            session_id = self._session_cache.get(
+                self._host, self._userid, self._port)
+            if session_id is not None and session_id != self._session_id:
+                self._session = self._new_session(self.retry_timeout_config)
+                self._session_id = session_id
+                self._headers['X-API-Session'] = session_id
+                return
         if self._password is None:
             if self._get_password:
                 self._password = self._get_password(self._host, self._userid)
@@ -594,6 +824,9 @@ class Session(object):
         logon_res = self.post(logon_uri, logon_body, logon_required=False)
         self._session_id = logon_res['api-session']
         self._headers['X-API-Session'] = self._session_id
+        if self._session_cache is not None:
+            self._session_cache.set(self._host, self._userid,
+                                    self._session_id, self._port)
 
     @staticmethod
     def _new_session(retry_timeout_config):
@@ -617,6 +850,10 @@ class Session(object):
         """
         Log off, unconditionally.
 
+        If the session-id is in the session cache, only the state of this
+        session object is reset and the HMC session is kept for the other
+        sessions that share it.
+
         Raises:
 
           :exc:`~zhmcclient.ServerAuthError`
@@ -624,8 +861,11 @@ class Session(object):
           :exc:`~zhmcclient.ParseError`
           :exc:`~zhmcclient.HTTPError`
         """
-        session_uri = '/api/sessions/this-session'
-        self.delete(session_uri, logon_required=False)
+        if self._session_cache is None or self._userid is None or \
+                self._session_cache.get(self._host, self._userid,
+                                        self._port) != self._session_id:
+            session_uri = '/api/sessions/this-session'
+            self.delete(session_uri, logon_required=False)
         self._session_id = None
         self._session = None
         self._headers.pop('X-API-Session', None)
@@ -713,41 +953,46 @@ class Session(object):
         """
         if logon_required:
             self.logon()
-        url = self.base_url + uri
-        self._log_http_request('GET', url, headers=self.headers)
-        stats = self.time_stats_keeper.get_stats('get ' + uri)
-        stats.begin()
-        req = self._session or requests
-        req_timeout = (self.retry_timeout_config.connect_timeout,
-                       self.retry_timeout_config.read_timeout)
-        try:
-            result = req.get(url, headers=self.headers, verify=False,
-                             timeout=req_timeout)
-        except requests.exceptions.RequestException as exc:
-            _handle_request_exc(exc, self.retry_timeout_config)
-        finally:
-            stats.end()
-        self._log_http_response('GET', url,
-                                status=result.status_code,
-                                headers=result.headers,
-                                content=result.content)
-
-        if result.status_code == 200:
-            return _result_object(result)
-        elif result.status_code == 403:
-            result_object = _result_object(result)
-            reason = result_object.get('reason', None)
-            if reason == 5:
-                # API session token expired: re-logon and retry
-                self._do_logon()
-                return self.get(uri, logon_required)
+        with self._trace_request('GET', uri) as trace_info:
+            url = self.base_url + uri
+            self._log_http_request('GET', url, headers=self.headers)
+            stats = self.time_stats_keeper.get_stats(
+                self.time_stats_keeper.operation_name('get', uri))
+            req = self._session or requests
+            req_timeout = (self.retry_timeout_config.connect_timeout,
+                           self.retry_timeout_config.read_timeout)
+            with stats.timer():
+                try:
+                    result = req.get(url, headers=self.headers, verify=False,
+                                     timeout=req_timeout)
+                except requests.exceptions.RequestException as exc:
+                    _handle_request_exc(exc, self.retry_timeout_config)
+            _update_trace_info(trace_info, result)
+            stats._add_transfer(trace_info.bytes_sent,
+                                trace_info.bytes_received)
+            self._log_http_response('GET', url,
+                                    status=result.status_code,
+                                    headers=result.headers,
+                                    content=result.content)
+
+            if result.status_code == 200:
+                return _result_object(result, stats)
+            elif result.status_code == 403:
+                result_object = _result_object(result)
+                reason = result_object.get('reason', None)
+                if reason == 5:
+                    # API session token expired: re-logon and retry
+                    trace_info.relogon = True
+                    self._do_logon()
+                    return self.get(uri, logon_required)
+                else:
+                    msg = result_object.get('message', None)
+                    raise ServerAuthError(
+                        "HTTP authentication failed: {}".format(msg),
+                        HTTPError(result_object))
             else:
-                msg = result_object.get('message', None)
-                raise ServerAuthError("HTTP authentication failed: {}".
-                                      format(msg), HTTPError(result_object))
-        else:
-            result_object = _result_object(result)
-            raise HTTPError(result_object)
+                result_object = _result_object(result)
+                raise HTTPError(result_object)
 
     @logged_api_call
     def post(self, uri, body=None, logon_required=True,
@@ -892,66 +1137,77 @@ class Session(object):
                        self.retry_timeout_config.read_timeout)
         if wait_for_completion:
             stats_total = self.time_stats_keeper.get_stats(
-                'post ' + uri + '+completion')
-            stats_total.begin()
+                '{}+completion'.format(
+                    self.time_stats_keeper.operation_name('post', uri)))
+            timer_total = stats_total.timer()
+            timer_total.start()
         try:
-            stats = self.time_stats_keeper.get_stats('post ' + uri)
-            stats.begin()
-            try:
-                if data is None:
-                    result = req.post(url, headers=headers,
-                                      verify=False, timeout=req_timeout)
-                else:
-                    result = req.post(url, data=data, headers=headers,
-                                      verify=False, timeout=req_timeout)
-            except requests.exceptions.RequestException as exc:
-                _handle_request_exc(exc, self.retry_timeout_config)
-            finally:
-                stats.end()
-            self._log_http_response('POST', url,
-                                    status=result.status_code,
-                                    headers=result.headers,
-                                    content=result.content)
-
-            if result.status_code in (200, 201):
-                return _result_object(result)
-            elif result.status_code == 204:
-                # No content
-                return None
-            elif result.status_code == 202:
-                if result.content == '':
-                    # Some operations (e.g. "Restart Console",
-                    # "Shutdown Console" or "Cancel Job") return 202
-                    # with no response content.
+            with self._trace_request('POST', uri) as trace_info:
+                trace_info.bytes_sent = _body_size(data)
+                if isinstance(data, (six.binary_type, six.text_type)):
+                    trace_info.request_body = data
+                stats = self.time_stats_keeper.get_stats(
+                    self.time_stats_keeper.operation_name('post', uri))
+                with stats.timer():
+                    try:
+                        if data is None:
+                            result = req.post(
+                                url, headers=headers, verify=False,
+                                timeout=req_timeout)
+                        else:
+                            result = req.post(
+                                url, data=data, headers=headers, verify=False,
+                                timeout=req_timeout)
+                    except requests.exceptions.RequestException as exc:
+                        _handle_request_exc(exc, self.retry_timeout_config)
+                _update_trace_info(trace_info, result)
+                stats._add_transfer(trace_info.bytes_sent,
+                                    trace_info.bytes_received)
+                self._log_http_response('POST', url,
+                                        status=result.status_code,
+                                        headers=result.headers,
+                                        content=result.content)
+
+                if result.status_code in (200, 201):
+                    return _result_object(result, stats)
+                elif result.status_code == 204:
+                    # No content
                     return None
-                else:
-                    # This is the most common case to return 202: An
-                    # asynchronous job has been started.
+                elif result.status_code == 202:
+                    if result.content == '':
+                        # Some operations (e.g. "Restart Console",
+                        # "Shutdown Console" or "Cancel Job") return 202
+                        # with no response content.
+                        return None
+                    else:
+                        # This is the most common case to return 202: An
+                        # asynchronous job has been started.
+                        result_object = _result_object(result, stats)
+                        job_uri = result_object['job-uri']
+                        job = Job(self, job_uri, 'POST', uri)
+                        if not wait_for_completion:
+                            return job
+                elif result.status_code == 403:
                     result_object = _result_object(result)
-                    job_uri = result_object['job-uri']
-                    job = Job(self, job_uri, 'POST', uri)
-                    if wait_for_completion:
-                        return job.wait_for_completion(operation_timeout)
+                    reason = result_object.get('reason', None)
+                    if reason == 5:
+                        # API session token expired: re-logon and retry
+                        trace_info.relogon = True
+                        self._do_logon()
+                        return self.post(uri, body, logon_required)
                     else:
-                        return job
-            elif result.status_code == 403:
-                result_object = _result_object(result)
-                reason = result_object.get('reason', None)
-                if reason == 5:
-                    # API session token expired: re-logon and retry
-                    self._do_logon()
-                    return self.post(uri, body, logon_required)
+                        msg = result_object.get('message', None)
+                        raise ServerAuthError(
+                            "HTTP authentication failed: {}".format(msg),
+                            HTTPError(result_object))
                 else:
-                    msg = result_object.get('message', None)
-                    raise ServerAuthError("HTTP authentication failed: {}".
-                                          format(msg),
-                                          HTTPError(result_object))
-            else:
-                result_object = _result_object(result)
-                raise HTTPError(result_object)
+                    result_object = _result_object(result)
+                    raise HTTPError(result_object)
+            # The job wait is traced separately from the POST request
+            return job.wait_for_completion(operation_timeout)
         finally:
             if wait_for_completion:
-                stats_total.end()
+                timer_total.stop()
 
     @logged_api_call
     def delete(self, uri, logon_required=True):
@@ -988,42 +1244,47 @@ class Session(object):
         """
         if logon_required:
             self.logon()
-        url = self.base_url + uri
-        self._log_http_request('DELETE', url, headers=self.headers)
-        stats = self.time_stats_keeper.get_stats('delete ' + uri)
-        stats.begin()
-        req = self._session or requests
-        req_timeout = (self.retry_timeout_config.connect_timeout,
-                       self.retry_timeout_config.read_timeout)
-        try:
-            result = req.delete(url, headers=self.headers, verify=False,
-                                timeout=req_timeout)
-        except requests.exceptions.RequestException as exc:
-            _handle_request_exc(exc, self.retry_timeout_config)
-        finally:
-            stats.end()
-        self._log_http_response('DELETE', url,
-                                status=result.status_code,
-                                headers=result.headers,
-                                content=result.content)
-
-        if result.status_code in (200, 204):
-            return
-        elif result.status_code == 403:
-            result_object = _result_object(result)
-            reason = result_object.get('reason', None)
-            if reason == 5:
-                # API session token expired: re-logon and retry
-                self._do_logon()
-                self.delete(uri, logon_required)
+        with self._trace_request('DELETE', uri) as trace_info:
+            url = self.base_url + uri
+            self._log_http_request('DELETE', url, headers=self.headers)
+            stats = self.time_stats_keeper.get_stats(
+                self.time_stats_keeper.operation_name('delete', uri))
+            req = self._session or requests
+            req_timeout = (self.retry_timeout_config.connect_timeout,
+                           self.retry_timeout_config.read_timeout)
+            with stats.timer():
+                try:
+                    result = req.delete(url, headers=self.headers,
+                                        verify=False, timeout=req_timeout)
+                except requests.exceptions.RequestException as exc:
+                    _handle_request_exc(exc, self.retry_timeout_config)
+            _update_trace_info(trace_info, result)
+            stats._add_transfer(trace_info.bytes_sent,
+                                trace_info.bytes_received)
+            self._log_http_response('DELETE', url,
+                                    status=result.status_code,
+                                    headers=result.headers,
+                                    content=result.content)
+
+            if result.status_code in (200, 204):
                 return
+            elif result.status_code == 403:
+                result_object = _result_object(result)
+                reason = result_object.get('reason', None)
+                if reason == 5:
+                    # API session token expired: re-logon and retry
+                    trace_info.relogon = True
+                    self._do_logon()
+                    self.delete(uri, logon_required)
+                    return
+                else:
+                    msg = result_object.get('message', None)
+                    raise ServerAuthError(
+                        "HTTP authentication failed: {}".format(msg),
+                        HTTPError(result_object))
             else:
-                msg = result_object.get('message', None)
-                raise ServerAuthError("HTTP authentication failed: {}".
-                                      format(msg), HTTPError(result_object))
-        else:
-            result_object = _result_object(result)
-            raise HTTPError(result_object)
+                result_object = _result_object(result)
+                raise HTTPError(result_object)
 
     @logged_api_call
     def get_notification_topics(self):
@@ -1250,25 +1511,29 @@ class Job(object):
         if operation_timeout > 0:
             start_time = time.time()
 
-        while True:
-            job_status, op_result_obj = self.check_for_completion()
+        with self.session._trace_request(
+                self._op_method, self._op_uri, kind='job-wait',
+                job_uri=self.uri):
+            while True:
+                job_status, op_result_obj = self.check_for_completion()
 
-            # We give completion of status priority over strictly achieving
-            # the timeout, so we check status first. This may cause a longer
-            # duration of the method than prescribed by the timeout.
-            if job_status == 'complete':
-                return op_result_obj
+                # We give completion of status priority over strictly
+                # achieving the timeout, so we check status first. This may
+                # cause a longer duration of the method than prescribed by the
+                # timeout.
+                if job_status == 'complete':
+                    return op_result_obj
 
-            if operation_timeout > 0:
-                current_time = time.time()
-                if current_time > start_time + operation_timeout:
-                    raise OperationTimeout(
-                        "Waiting for completion of job {} timed out "
-                        "(operation timeout: {} s)".
-                        format(self.uri, operation_timeout),
-                        operation_timeout)
+                if operation_timeout > 0:
+                    current_time = time.time()
+                    if current_time > start_time + operation_timeout:
+                        raise OperationTimeout(
+                            "Waiting for completion of job {} timed out "
+                            "(operation timeout: {} s)".
+                            format(self.uri, operation_timeout),
+                            operation_timeout)
 
-            time.sleep(1)  # Avoid hot spin loop
+                time.sleep(1)  # Avoid hot spin loop
 
 
 def _text_repr(text, max_len=1000):
@@ -1285,12 +1550,33 @@ def _text_repr(text, max_len=1000):
     return text_repr
 
 
-def _result_object(result):
+def _counted_json(result, stats):
+    """
+    Return the JSON payload in the HTTP response as a Python dict, and update
+    the time statistics with the time for decoding it and the number of JSON
+    objects in it.
+    """
+    num_objects = [0]
+
+    def object_pairs_hook(pairs):
+        num_objects[0] += 1
+        return OrderedDict(pairs)
+
+    begin_time = time.time()
+    result_obj = result.json(object_pairs_hook=object_pairs_hook)
+    stats._add_decode(time.time() - begin_time, num_objects[0])
+    return result_obj
+
+
+def _result_object(result, stats=None):
     """
     Return the JSON payload in the HTTP response as a Python dict.
 
     Parameters:
         result (requests.Response): HTTP response object.
+        stats (TimeStats): Time statistics of the operation, that is updated
+          with the time for decoding the JSON payload and the number of JSON
+          objects in it, or `None`.
 
     Raises:
         zhmcclient.ParseError: Error parsing the returned JSON.
@@ -1301,6 +1587,8 @@ def _result_object(result):
         # This function is only called when there is content expected.
         # Therefore, a response without content will result in a ParseError.
         try:
+            if stats is not None and stats.keeper.enabled:
+                return _counted_json(result, stats)
             return result.json(object_pairs_hook=OrderedDict)
         except ValueError as exc:
             raise ParseError(
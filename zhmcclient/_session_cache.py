@@ -0,0 +1,250 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The :class:`~zhmcclient.SessionCache` class is an on-disk cache of HMC
+session-ids that allows sessions in different processes to share the
+session-id of an HMC user, instead of each process logging on to the HMC and
+off again. This avoids the "Logon" operation, which is expensive on the HMC,
+for programs that run often but only briefly (e.g. from cron jobs).
+
+A session uses a session cache when it is passed with the `session_cache`
+parameter of :class:`~zhmcclient.Session`:
+
+* When the session needs to log on, it uses the session-id that is cached
+  for its HMC host, port and userid, if there is one. The cached session-id
+  is not verified with the HMC at that point. If the HMC has expired it, the
+  next operation fails with HTTP status 403 and reason code 5, and the session
+  then logs on to the HMC as usual, and stores the new session-id in the
+  cache.
+
+* When the session is logged off while its session-id is in the cache, only
+  the session object is reset and the HMC session is kept, because it may
+  be in use by other processes. To log off from the HMC, remove the
+  session-id from the cache before logging off the session.
+
+The cache is a directory with one file for each cached session-id. The
+directory is created with permissions that allow only the current user to
+access it, and session-id files that can be accessed by other users are
+ignored.
+
+Example::
+
+    import zhmcclient
+
+    cache = zhmcclient.SessionCache()
+    session = zhmcclient.Session(host, userid, password, session_cache=cache)
+    cpcs = zhmcclient.Client(session).cpcs.list()
+    session.logoff()  # The HMC session is kept for the next run
+"""
+
+from __future__ import absolute_import
+
+import os
+import io
+import json
+import errno
+import stat
+import hashlib
+import tempfile
+import six
+
+from ._logging import get_logger
+from ._constants import DEFAULT_HMC_PORT
+
+__all__ = ['SessionCache']
+
+LOG = get_logger(__name__)
+
+# Default directory of the session cache, relative to the home directory
+_DEFAULT_DIRECTORY = os.path.join('.zhmcclient', 'sessions')
+
+
+def _is_private(st):
+    """
+    Return a boolean indicating whether a file with the specified `os.stat()`
+    result can only be accessed by the current user.
+    """
+    if not hasattr(os, 'getuid'):
+        # Windows: Permissions are inherited from the home directory
+        return True
+    return st.st_uid == os.getuid() and \
+        (st.st_mode & (stat.S_IRWXG | stat.S_IRWXO)) == 0
+
+
+class SessionCache(object):
+    """
+    An on-disk cache of HMC session-ids, by HMC host, port and userid (for
+    details, see section :ref:`Session cache`).
+
+    The cache can be used by multiple sessions, threads and processes
+    concurrently. Errors accessing the cache files are logged and are
+    otherwise handled like a cache miss, so that sessions fall back to logging
+    on to the HMC.
+    """
+
+    def __init__(self, directory=None):
+        """
+        Parameters:
+
+          directory (:term:`string`): Path name of the cache directory. It is
+            created if it does not exist.
+
+            `None` means the directory ``.zhmcclient/sessions`` in the home
+            directory of the current user.
+        """
+        if directory is None:
+            directory = os.path.join(os.path.expanduser('~'),
+                                     _DEFAULT_DIRECTORY)
+        self._directory = directory
+        try:
+            os.makedirs(directory, 0o700)
+        except OSError as exc:
+            if exc.errno != errno.EEXIST:
+                raise
+
+    def __repr__(self):
+        return "SessionCache(directory={!r})".format(self._directory)
+
+    @property
+    def directory(self):
+        """
+        :term:`string`: Path name of the cache directory.
+        """
+        return self._directory
+
+    def _filename(self, host, userid, port):
+        key = u'{}:{}:{}'.format(host, port, userid).encode('utf-8')
+        return os.path.join(self._directory,
+                            hashlib.sha256(key).hexdigest() + '.json')
+
+    def get(self, host, userid, port=DEFAULT_HMC_PORT):
+        """
+        Return the cached session-id for an HMC host, port and userid.
+
+        Parameters:
+
+          host (:term:`string`): HMC host.
+
+          userid (:term:`string`): Userid of the HMC user.
+
+          port (:term:`integer`): HMC TCP port.
+
+        Returns:
+
+          :term:`string`: The cached session-id, or `None` if there is none.
+        """
+        filename = self._filename(host, userid, port)
+        try:
+            with io.open(filename, 'r', encoding='utf-8') as fp:
+                if not _is_private(os.fstat(fp.fileno())):
+                    LOG.warning("Ignoring session cache file %s that can be "
+                                "accessed by other users", filename)
+                    return None
+                entry = json.load(fp)
+        except (IOError, OSError) as exc:
+            if exc.errno != errno.ENOENT:
+                LOG.warning("Cannot read session cache file %s: %s",
+                            filename, exc)
+            return None
+        except ValueError as exc:
+            LOG.warning("Invalid session cache file %s: %s", filename, exc)
+            return None
+        if (entry.get('host'), entry.get('port'), entry.get('userid')) != \
+                (host, port, userid):
+            return None
+        return entry.get('session-id')
+
+    def set(self, host, userid, session_id, port=DEFAULT_HMC_PORT):
+        """
+        Store the session-id for an HMC host, port and userid in the cache,
+        replacing any session-id that is cached for them.
+
+        Parameters:
+
+          host (:term:`string`): HMC host.
+
+          userid (:term:`string`): Userid of the HMC user.
+
+          session_id (:term:`string`): Session-id.
+
+          port (:term:`integer`): HMC TCP port.
+        """
+        filename = self._filename(host, userid, port)
+        entry = {'host': host, 'port': port, 'userid': userid,
+                 'session-id': session_id}
+        tmp_filename = None
+        try:
+            # The temporary file is created with permissions for the current
+            # user only, and is renamed so that readers never see a partially
+            # written file.
+            fd, tmp_filename = tempfile.mkstemp(dir=self._directory,
+                                                suffix='.tmp')
+            with io.open(fd, 'w', encoding='utf-8') as fp:
+                fp.write(six.text_type(json.dumps(entry)))
+            try:
+                os.rename(tmp_filename, filename)
+            except OSError:
+                # On Windows, the target file must not exist
+                os.remove(filename)
+                os.rename(tmp_filename, filename)
+            tmp_filename = None
+        except (IOError, OSError) as exc:
+            LOG.warning("Cannot write session cache file %s: %s",
+                        filename, exc)
+        finally:
+            if tmp_filename is not None:
+                try:
+                    os.remove(tmp_filename)
+                except OSError:
+                    pass
+
+    def remove(self, host, userid, port=DEFAULT_HMC_PORT, session_id=None):
+        """
+        Remove the cached session-id for an HMC host, port and userid from the
+        cache.
+
+        Parameters:
+
+          host (:term:`string`): HMC host.
+
+          userid (:term:`string`): Userid of the HMC user.
+
+          port (:term:`integer`): HMC TCP port.
+
+          session_id (:term:`string`): If not `None`, the session-id is only
+            removed if it is the cached session-id.
+        """
+        if session_id is not None and \
+                self.get(host, userid, port) != session_id:
+            return
+        filename = self._filename(host, userid, port)
+        try:
+            os.remove(filename)
+        except OSError as exc:
+            if exc.errno != errno.ENOENT:
+                LOG.warning("Cannot remove session cache file %s: %s",
+                            filename, exc)
+
+    def clear(self):
+        """
+        Remove all session-ids from the cache.
+        """
+        for name in os.listdir(self._directory):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self._directory, name))
+                except OSError as exc:
+                    if exc.errno != errno.ENOENT:
+                        raise
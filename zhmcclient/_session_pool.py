@@ -0,0 +1,320 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The :class:`~zhmcclient.SessionPool` class is a session that spreads the HTTP
+requests against the HMC API over multiple sessions with the HMC, each with
+its own HMC session-id and its own connections. This increases the
+throughput of programs that perform many operations against the same HMC
+from multiple threads, because the HMC serializes some of the processing of
+the operations per session.
+
+A session pool can be used everywhere a :class:`~zhmcclient.Session` object
+can be used, in particular for a :class:`~zhmcclient.Client` object. Each
+request is performed using the session of the pool with the fewest requests
+in progress. In addition, a thread can lease a session of the pool for
+exclusive use, for a sequence of operations that should be performed in the
+same HMC session.
+
+Example::
+
+    import threading
+    import zhmcclient
+
+    pool = zhmcclient.SessionPool(host, userid, password, size=4)
+    client = zhmcclient.Client(pool)
+    cpc = client.cpcs.find(name='CPC1')
+
+    def worker(partition):
+        with pool.lease():
+            partition.stop()
+            partition.start()
+
+    threads = [threading.Thread(target=worker, args=(p,))
+               for p in cpc.partitions.list()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    pool.logoff()
+"""
+
+from __future__ import absolute_import
+
+import threading
+from contextlib import contextmanager
+
+from ._session import Session
+from ._logging import logged_api_call
+from ._constants import DEFAULT_HMC_PORT
+
+__all__ = ['SessionPool']
+
+
+class SessionPool(Session):
+    """
+    A session that performs its HTTP requests using a pool of sessions with
+    the same HMC and HMC user (for details, see section :ref:`Session pool`).
+
+    The sessions of the pool log on to the HMC when they are first used, and
+    each of them logs on again when the HMC has expired its session-id. The
+    session pool itself has no session-id.
+
+    The time statistics keeper, the hooks, the rate limit and the request
+    priorities of the session pool are used for the requests of all sessions
+    of the pool.
+    """
+
+    def __init__(self, host, userid=None, password=None, size=4,
+                 get_password=None, retry_timeout_config=None,
+                 port=DEFAULT_HMC_PORT):
+        """
+        Parameters:
+
+          host (:term:`string`):
+            HMC host, see :class:`~zhmcclient.Session`.
+
+          userid (:term:`string`):
+            Userid of the HMC user to be used, or `None`.
+
+          password (:term:`string`):
+            Password of the HMC user to be used, if `userid` was specified.
+
+          size (:term:`integer`):
+            Number of sessions in the pool. Must be positive.
+
+          get_password (:term:`callable`):
+            A password retrieval function, or `None`, see
+            :class:`~zhmcclient.Session`. It is called at most once for all
+            sessions of the pool.
+
+          retry_timeout_config (:class:`~zhmcclient.RetryTimeoutConfig`):
+            The retry/timeout configuration for the sessions of the pool, see
+            :class:`~zhmcclient.Session`.
+
+          port (:term:`integer`):
+            HMC TCP port, see :class:`~zhmcclient.Session`.
+        """
+        if size < 1:
+            raise ValueError("Size of the session pool must be positive: "
+                             "{!r}".format(size))
+        if get_password is not None:
+            get_password = self._shared_get_password(get_password)
+        super(SessionPool, self).__init__(
+            host, userid, password, get_password=get_password,
+            retry_timeout_config=retry_timeout_config, port=port)
+        self._sessions = []
+        for _ in range(size):
+            session = Session(
+                host, userid, password, get_password=get_password,
+                retry_timeout_config=retry_timeout_config, port=port)
+            session._time_stats_keeper = self._time_stats_keeper
+            session._rate_limiter = self._rate_limiter
+            session._priority_local = self._priority_local
+            self._sessions.append(session)
+
+        # Protects the following state, and is used for waiting until a
+        # session can be leased
+        self._cond = threading.Condition()
+        self._in_flight = [0] * size  # Number of requests per session
+        self._leased = [False] * size
+        self._next = 0  # Index of the session preferred for ties
+        self._local = threading.local()  # Leased session of a thread
+
+    @staticmethod
+    def _shared_get_password(get_password):
+        """
+        Return a password retrieval function that calls `get_password` only
+        once for all sessions of the pool.
+        """
+        lock = threading.Lock()
+        passwords = {}
+
+        def shared_get_password(host, userid):
+            with lock:
+                if (host, userid) not in passwords:
+                    passwords[(host, userid)] = get_password(host, userid)
+                return passwords[(host, userid)]
+
+        return shared_get_password
+
+    @property
+    def size(self):
+        """
+        :term:`integer`: Number of sessions in the pool.
+        """
+        return len(self._sessions)
+
+    @property
+    def sessions(self):
+        """
+        :class:`py:tuple` of :class:`~zhmcclient.Session`: The sessions of
+        the pool.
+        """
+        return tuple(self._sessions)
+
+    @contextmanager
+    def lease(self):
+        """
+        Return a context manager that leases a session of the pool to the
+        current thread, for exclusive use within the context.
+
+        The requests of the session pool that are performed by the current
+        thread within the context, including those performed by resource and
+        manager objects, use the leased session. Requests of other threads
+        use the sessions of the pool that are not leased, as long as there
+        are any.
+
+        If all sessions of the pool are leased, this method waits until one
+        of them is returned. If the current thread already has leased a
+        session, that session is used.
+
+        Returns:
+
+          context manager for the leased :class:`~zhmcclient.Session` object.
+        """
+        leased = getattr(self._local, 'session', None)
+        if leased is not None:
+            yield leased
+            return
+        with self._cond:
+            while all(self._leased):
+                self._cond.wait()
+            index = self._select(True)
+            self._leased[index] = True
+        self._local.session = self._sessions[index]
+        try:
+            yield self._sessions[index]
+        finally:
+            self._local.session = None
+            with self._cond:
+                self._leased[index] = False
+                self._cond.notify()
+
+    def _select(self, only_not_leased):
+        """
+        Return the index of the session with the fewest requests in progress,
+        preferring the sessions in round-robin order for ties. Must be called
+        with the condition held.
+        """
+        size = len(self._sessions)
+        index = None
+        for i in range(self._next, self._next + size):
+            i %= size
+            if only_not_leased and self._leased[i]:
+                continue
+            if index is None or self._in_flight[i] < self._in_flight[index]:
+                index = i
+        self._next = (index + 1) % size
+        return index
+
+    @contextmanager
+    def _request_session(self):
+        """
+        Return a context manager for the session to be used for a request of
+        the current thread.
+        """
+        leased = getattr(self._local, 'session', None)
+        if leased is not None:
+            yield leased
+            return
+        with self._cond:
+            index = self._select(not all(self._leased))
+            self._in_flight[index] += 1
+        try:
+            yield self._sessions[index]
+        finally:
+            with self._cond:
+                self._in_flight[index] -= 1
+
+    @logged_api_call
+    def add_hook(self, hook):
+        """
+        Add a hook to this session pool and to its sessions, see
+        :meth:`~zhmcclient.Session.add_hook`.
+        """
+        super(SessionPool, self).add_hook(hook)
+        for session in self._sessions:
+            session.add_hook(hook)
+
+    @logged_api_call
+    def remove_hook(self, hook):
+        """
+        Remove a hook from this session pool and from its sessions, see
+        :meth:`~zhmcclient.Session.remove_hook`.
+        """
+        super(SessionPool, self).remove_hook(hook)
+        for session in self._sessions:
+            session.remove_hook(hook)
+
+    @logged_api_call
+    def logon(self, verify=False):
+        """
+        Make sure all sessions of the pool are logged on to the HMC, see
+        :meth:`~zhmcclient.Session.logon`.
+        """
+        for session in self._sessions:
+            session.logon(verify)
+
+    @logged_api_call
+    def logoff(self, verify=False):
+        """
+        Make sure all sessions of the pool are logged off from the HMC, see
+        :meth:`~zhmcclient.Session.logoff`.
+        """
+        for session in self._sessions:
+            session.logoff(verify)
+
+    @logged_api_call
+    def is_logon(self, verify=False):
+        """
+        Return a boolean indicating whether all sessions of the pool are
+        currently logged on to the HMC, see
+        :meth:`~zhmcclient.Session.is_logon`.
+        """
+        return all(session.is_logon(verify) for session in self._sessions)
+
+    @logged_api_call
+    def get(self, uri, logon_required=True):
+        """
+        Perform the HTTP GET method using a session of the pool, see
+        :meth:`~zhmcclient.Session.get`.
+        """
+        with self._request_session() as session:
+            return session.get(uri, logon_required)
+
+    @logged_api_call
+    def post(self, uri, body=None, logon_required=True,
+             wait_for_completion=False, operation_timeout=None):
+        """
+        Perform the HTTP POST method using a session of the pool, see
+        :meth:`~zhmcclient.Session.post`.
+
+        The :class:`~zhmcclient.Job` object that is returned for
+        asynchronous operations with `wait_for_completion=False` uses the
+        session of the pool that performed the operation.
+        """
+        with self._request_session() as session:
+            return session.post(uri, body, logon_required,
+                                wait_for_completion, operation_timeout)
+
+    @logged_api_call
+    def delete(self, uri, logon_required=True):
+        """
+        Perform the HTTP DELETE method using a session of the pool, see
+        :meth:`~zhmcclient.Session.delete`.
+        """
+        with self._request_session() as session:
+            return session.delete(uri, logon_required)
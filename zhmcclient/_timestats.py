@@ -24,6 +24,17 @@ The :class:`~zhmcclient.TimeStats` class is a helper class that contains the
 actual measurement data for all invocations of a particular HTTP request. Its
 objects are under control of the :class:`~zhmcclient.TimeStatsKeeper` class.
 
+In addition to count, average, minimum and maximum time, each time statistics
+keeps a histogram of the elapsed times in logarithmically sized buckets of
+fixed number, from which percentiles (e.g. the 95th or 99th percentile) can
+be determined with a relative error of less than 10%. Time statistics can be
+merged (e.g. from multiple keepers) and the difference between two snapshots
+can be determined.
+
+Time statistics can be updated concurrently by multiple threads. Each
+measurement uses its own timer (see :meth:`~zhmcclient.TimeStats.timer`),
+and the statistics data is updated atomically.
+
 Example::
 
     import zhmcclient
@@ -40,8 +51,10 @@ Example::
 
 from __future__ import absolute_import
 
+import re
 import time
-import copy
+import math
+import threading
 
 from ._logging import get_logger, logged_api_call
 
@@ -49,6 +62,100 @@ __all__ = ['TimeStatsKeeper', 'TimeStats']
 
 LOG = get_logger(__name__)
 
+# Lower bound of the elapsed time histogram, in seconds. Times below that go
+# into bucket 0.
+_HISTOGRAM_MIN_TIME = 1e-6
+
+# Number of histogram buckets per doubling of the elapsed time. The upper
+# bound of each bucket is larger than its lower bound by a factor of
+# 2 ** (1 / _HISTOGRAM_SUBBUCKETS).
+_HISTOGRAM_SUBBUCKETS = 8
+
+# Total number of histogram buckets. The upper bound of the last bucket is
+# about 4.7 hours; larger times go into the last bucket.
+_HISTOGRAM_BUCKETS = 1 + 34 * _HISTOGRAM_SUBBUCKETS
+
+_HISTOGRAM_LOG_FACTOR = _HISTOGRAM_SUBBUCKETS / math.log(2)
+
+
+# Collection segments of HMC resource URIs whose next segment is a resource
+# ID (or resource name, for activation profiles).
+_URI_COLLECTIONS = (
+    'adapters',
+    'capacity-records',
+    'context',
+    'cpcs',
+    'group-profiles',
+    'groups',
+    'hardware-messages',
+    'hbas',
+    'image-activation-profiles',
+    'jobs',
+    'ldap-server-definitions',
+    'load-activation-profiles',
+    'logical-partitions',
+    'network-ports',
+    'nics',
+    'partitions',
+    'password-rules',
+    'reset-activation-profiles',
+    'sessions',
+    'storage-groups',
+    'storage-ports',
+    'storage-templates',
+    'storage-template-volumes',
+    'storage-volumes',
+    'tasks',
+    'user-patterns',
+    'user-roles',
+    'users',
+    'virtual-functions',
+    'virtual-storage-resources',
+    'virtual-switches',
+)
+
+# Route table for normalizing HMC URIs to URI templates, as a list of tuples
+# (compiled pattern, replacement). They are applied in order.
+_URI_TEMPLATE_ROUTES = [
+    # Resource IDs following a collection segment
+    (re.compile(r'(/(?:{})/)(?!operations(?:[/?]|$))[^/?]+'.format(
+        '|'.join(re.escape(c) for c in _URI_COLLECTIONS))),
+     r'\1{id}'),
+    # Values of query parameters
+    (re.compile(r'([?&][^=&]+=)[^&]*'),
+     r'\1{value}'),
+]
+
+
+def _uri_template(uri):
+    """
+    Return the URI template for an HMC URI, where resource IDs and query
+    parameter values are replaced by placeholders.
+
+    For example, '/api/partitions/1a2b/nics/3c4d?name=abc' is normalized to
+    '/api/partitions/{id}/nics/{id}?name={value}'.
+    """
+    for pattern, replacement in _URI_TEMPLATE_ROUTES:
+        uri = pattern.sub(replacement, uri)
+    return uri
+
+
+def _histogram_index(dt):
+    """
+    Return the index of the histogram bucket for an elapsed time.
+    """
+    if dt < _HISTOGRAM_MIN_TIME:
+        return 0
+    index = 1 + int(math.log(dt / _HISTOGRAM_MIN_TIME) * _HISTOGRAM_LOG_FACTOR)
+    return min(index, _HISTOGRAM_BUCKETS - 1)
+
+
+def _histogram_bound(index):
+    """
+    Return the upper bound of a histogram bucket, in seconds.
+    """
+    return _HISTOGRAM_MIN_TIME * 2 ** (float(index) / _HISTOGRAM_SUBBUCKETS)
+
 
 class TimeStats(object):
     """
@@ -76,11 +183,43 @@ class TimeStats(object):
         """
         self._keeper = keeper
         self._name = name
+        self._lock = threading.Lock()
         self._count = 0
         self._sum = float(0)
         self._min = float('inf')
         self._max = float(0)
-        self._begin_time = None
+        self._buckets = [0] * _HISTOGRAM_BUCKETS
+        self._bytes_sent = 0
+        self._bytes_received = 0
+        self._decode_time = float(0)
+        self._objects = 0
+        # Begin times of the begin()/end() calls, per thread
+        self._local = threading.local()
+
+    def __deepcopy__(self, memo):
+        """
+        Return a copy of this time statistics with its current statistics
+        data, that is held by the same statistics keeper.
+        """
+        return self._copy()
+
+    def _copy(self):
+        """
+        Return a copy of this time statistics with its current statistics
+        data, that is held by the same statistics keeper.
+        """
+        result = TimeStats(self._keeper, self._name)
+        with self._lock:
+            result._count = self._count
+            result._sum = self._sum
+            result._min = self._min
+            result._max = self._max
+            result._buckets = list(self._buckets)
+            result._bytes_sent = self._bytes_sent
+            result._bytes_received = self._bytes_received
+            result._decode_time = self._decode_time
+            result._objects = self._objects
+        return result
 
     @property
     def name(self):
@@ -132,83 +271,351 @@ class TimeStats(object):
         """
         return self._max
 
+    @property
+    def bytes_sent(self):
+        """
+        :term:`integer`: The total number of bytes in the request bodies of
+        the invocations of the operation.
+        """
+        return self._bytes_sent
+
+    @property
+    def bytes_received(self):
+        """
+        :term:`integer`: The total number of bytes in the response bodies of
+        the invocations of the operation.
+        """
+        return self._bytes_received
+
+    @property
+    def avg_bytes_received(self):
+        """
+        float: The average number of bytes in the response body of an
+        invocation of the operation.
+        """
+        try:
+            return float(self._bytes_received) / self._count
+        except ZeroDivisionError:
+            return 0
+
+    @property
+    def decode_time(self):
+        """
+        float: The total time for decoding the JSON payloads of the responses
+        of the invocations of the operation, in seconds. This time is not
+        included in the elapsed times of the invocations.
+        """
+        return self._decode_time
+
+    @property
+    def object_count(self):
+        """
+        :term:`integer`: The total number of JSON objects in the JSON payloads
+        of the responses of the invocations of the operation.
+        """
+        return self._objects
+
+    @property
+    def histogram(self):
+        """
+        list: The histogram of the elapsed times for invoking the operation,
+        as a list of tuples (upper_bound, count) for the non-empty buckets,
+        in ascending order of the upper bound. `upper_bound` is the upper
+        bound of the bucket, in seconds, and `count` is the number of
+        invocations with an elapsed time in that bucket.
+        """
+        return [(_histogram_bound(i), n) for i, n in enumerate(self._buckets)
+                if n]
+
+    def percentile(self, percent):
+        """
+        Return the elapsed time below or at which the specified percentage of
+        the invocations of the operation lies, in seconds.
+
+        The result is determined from the histogram and has a relative error
+        of less than 10%, but it never is outside of the range between
+        minimum and maximum time.
+
+        Parameters:
+
+          percent (:term:`number`):
+            The percentage, in the range 0 to 100. For example, 99 returns
+            the 99th percentile.
+
+        Returns:
+
+          float: The elapsed time in seconds, or 0 if there were no
+          invocations.
+
+        Raises:
+
+          ValueError: `percent` is not in the range 0 to 100.
+        """
+        if percent < 0 or percent > 100:
+            raise ValueError("percent must be in the range 0 to 100, but "
+                             "is: {}".format(percent))
+        if self._count == 0:
+            return 0
+        rank = max(1, int(math.ceil(self._count * percent / 100.0)))
+        seen = 0
+        for i, n in enumerate(self._buckets):
+            seen += n
+            if seen >= rank:
+                return max(self._min, min(self._max, _histogram_bound(i)))
+        return self._max
+
     @logged_api_call
     def reset(self):
         """
         Reset the time statistics data for the operation.
         """
-        self._count = 0
-        self._sum = float(0)
-        self._min = float('inf')
-        self._max = float(0)
+        with self._lock:
+            self._count = 0
+            self._sum = float(0)
+            self._min = float('inf')
+            self._max = float(0)
+            self._buckets = [0] * _HISTOGRAM_BUCKETS
+            self._bytes_sent = 0
+            self._bytes_received = 0
+            self._decode_time = float(0)
+            self._objects = 0
+
+    @logged_api_call
+    def merge(self, other):
+        """
+        Merge the time statistics data of another time statistics into this
+        time statistics.
+
+        This can be used for example to combine the time statistics for the
+        same operation from multiple statistics keepers.
+
+        Parameters:
+
+          other (:class:`~zhmcclient.TimeStats`):
+            The other time statistics.
+        """
+        other = other._copy()
+        with self._lock:
+            self._count += other._count
+            self._sum += other._sum
+            self._min = min(self._min, other._min)
+            self._max = max(self._max, other._max)
+            self._buckets = [a + b for a, b in
+                             zip(self._buckets, other._buckets)]
+            self._bytes_sent += other._bytes_sent
+            self._bytes_received += other._bytes_received
+            self._decode_time += other._decode_time
+            self._objects += other._objects
+
+    @logged_api_call
+    def diff(self, earlier):
+        """
+        Return a new time statistics with the time statistics data of the
+        invocations of the operation that happened after an earlier snapshot
+        of this time statistics was taken.
+
+        Because minimum and maximum time of these invocations cannot be
+        determined exactly, they are determined from the histogram.
+
+        Parameters:
+
+          earlier (:class:`~zhmcclient.TimeStats`):
+            The time statistics for the same operation, from an earlier
+            snapshot (see :meth:`~zhmcclient.TimeStatsKeeper.snapshot`).
+
+        Returns:
+
+          :class:`~zhmcclient.TimeStats`: The difference of the time
+          statistics data.
+        """
+        current = self._copy()
+        result = TimeStats(self._keeper, self._name)
+        result._count = current._count - earlier._count
+        result._sum = current._sum - earlier._sum
+        result._buckets = [a - b for a, b in
+                           zip(current._buckets, earlier._buckets)]
+        result._bytes_sent = current._bytes_sent - earlier._bytes_sent
+        result._bytes_received = \
+            current._bytes_received - earlier._bytes_received
+        result._decode_time = current._decode_time - earlier._decode_time
+        result._objects = current._objects - earlier._objects
+        used = [i for i, n in enumerate(result._buckets) if n > 0]
+        if used:
+            lower = _histogram_bound(used[0] - 1) if used[0] > 0 else 0.0
+            result._min = max(current._min, lower)
+            result._max = min(current._max, _histogram_bound(used[-1]))
+        return result
+
+    def timer(self):
+        """
+        Return a new timer for measuring one invocation of the operation.
+
+        The timer is a context manager that measures the elapsed time of its
+        `with` block and updates this time statistics when the block is left.
+        Alternatively, its `start()` and `stop()` methods can be used.
+
+        Each invocation of the operation uses its own timer, so that this time
+        statistics can be updated concurrently by multiple threads, and
+        invocations of the same operation may be nested.
+
+        If the statistics keeper holding this time statistics is disabled
+        when the timer is started, the timer does nothing, in order to save
+        resources.
+
+        Example::
+
+            stats = keeper.get_stats('get /api/cpcs')
+            with stats.timer():
+                # invoke the operation
+
+        Returns:
+
+          Timer object for this time statistics.
+        """
+        return _TimeStatsTimer(self)
 
     @logged_api_call
     def begin(self):
         """
         This method must be called before invoking the operation.
-        Note that this method is not to be invoked by the user; it is invoked
-        by the implementation of the :class:`~zhmcclient.Session` class.
+        Note that this method is not to be invoked by the user.
 
         If the statistics keeper holding this time statistics is enabled, this
         method takes the current time, so that
         :meth:`~zhmcclient.TimeStats.end` can calculate the elapsed time
-        between the two method calls.
+        between the two method calls. The begin time is kept per thread.
 
         If the statistics keeper holding this time statistics is disabled,
         this method does nothing, in order to save resources.
+
+        :meth:`~zhmcclient.TimeStats.timer` should be preferred over this
+        method, because it also supports nested invocations of the same
+        operation in a thread.
         """
         if self.keeper.enabled:
-            self._begin_time = time.time()
+            self._local.begin_time = time.time()
 
     @logged_api_call
     def end(self):
         """
         This method must be called after the operation returns.
-        Note that this method is not to be invoked by the user; it is invoked
-        by the implementation of the :class:`~zhmcclient.Session` class.
+        Note that this method is not to be invoked by the user.
 
         If the statistics keeper holding this time statistics is enabled, this
         method takes the current time, calculates the duration of the operation
-        since the last call to :meth:`~zhmcclient.TimeStats.begin`, and updates
-        the time statistics to reflect the new operation.
+        since the last call to :meth:`~zhmcclient.TimeStats.begin` in the same
+        thread, and updates the time statistics to reflect the new operation.
 
         If the statistics keeper holding this time statistics is disabled,
         this method does nothing, in order to save resources.
 
         If this method is called without a preceding call to
-        :meth:`~zhmcclient.TimeStats.begin`, a :exc:`py:RuntimeError` is
-        raised.
+        :meth:`~zhmcclient.TimeStats.begin` in the same thread, a
+        :exc:`py:RuntimeError` is raised.
+
+        :meth:`~zhmcclient.TimeStats.timer` should be preferred over this
+        method.
 
         Raises:
           RuntimeError
         """
         if self.keeper.enabled:
-            if self._begin_time is None:
+            begin_time = getattr(self._local, 'begin_time', None)
+            if begin_time is None:
                 raise RuntimeError("end() called without preceding begin()")
-            dt = time.time() - self._begin_time
-            self._begin_time = None
+            self._local.begin_time = None
+            self._add(time.time() - begin_time)
+
+    def _add(self, dt):
+        """
+        Update the time statistics to reflect an invocation of the operation
+        with an elapsed time of `dt` seconds.
+        """
+        index = _histogram_index(dt)
+        with self._lock:
             self._count += 1
             self._sum += dt
             if dt > self._max:
                 self._max = dt
             if dt < self._min:
                 self._min = dt
+            self._buckets[index] += 1
+
+    def _add_transfer(self, bytes_sent, bytes_received):
+        """
+        Update the time statistics with the number of bytes in the request
+        and response bodies of an invocation of the operation, if the
+        statistics keeper is enabled. `None` is treated as 0.
+        """
+        if self._keeper.enabled:
+            with self._lock:
+                self._bytes_sent += bytes_sent or 0
+                self._bytes_received += bytes_received or 0
+
+    def _add_decode(self, decode_time, objects):
+        """
+        Update the time statistics with the time for decoding the JSON
+        payload of the response of an invocation of the operation and the
+        number of JSON objects in it, if the statistics keeper is enabled.
+        """
+        if self._keeper.enabled:
+            with self._lock:
+                self._decode_time += decode_time
+                self._objects += objects
 
     def __str__(self):
         """
         Return a human readable string with the time statistics for this
         operation.
 
-        Example result:
+        Example result (wrapped into two lines):
 
         .. code-block:: text
 
-            TimeStats: count=1 avg=1.000s min=1.000s max=1.000s get /api/cpcs
+            TimeStats: count=1 avg=1.000s min=1.000s max=1.000s sent=0B
+            received=1024B decode=0.001s objects=3 get /api/cpcs
         """
         return "TimeStats: count={:d} avg={:.3f}s min={:.3f}s "\
-               "max={:.3f}s {}".format(
+               "max={:.3f}s sent={:d}B received={:d}B decode={:.3f}s "\
+               "objects={:d} {}".format(
                    self.count, self.avg_time, self.min_time, self.max_time,
-                   self.name)
+                   self.bytes_sent, self.bytes_received, self.decode_time,
+                   self.object_count, self.name)
+
+
+class _TimeStatsTimer(object):
+    """
+    Timer for measuring one invocation of an operation, returned by
+    :meth:`~zhmcclient.TimeStats.timer`.
+    """
+
+    def __init__(self, stats):
+        self._stats = stats
+        self._begin_time = None
+
+    def start(self):
+        """
+        Start the timer, if the statistics keeper is enabled.
+        """
+        if self._stats.keeper.enabled:
+            self._begin_time = time.time()
+
+    def stop(self):
+        """
+        Stop the timer and update the time statistics, if the timer was
+        started.
+        """
+        if self._begin_time is not None:
+            dt = time.time() - self._begin_time
+            self._begin_time = None
+            self._stats._add(dt)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
 
 
 class TimeStatsKeeper(object):
@@ -229,7 +636,9 @@ class TimeStatsKeeper(object):
 
     def __init__(self):
         self._enabled = False
+        self._raw_uris = False
         self._time_stats = {}  # TimeStats objects
+        self._lock = threading.Lock()  # For adding to _time_stats
         self._disabled_stats = TimeStats(self, "disabled")
 
     @property
@@ -239,11 +648,30 @@ class TimeStatsKeeper(object):
         """
         return self._enabled
 
+    @property
+    def raw_uris(self):
+        """
+        bool: Indicates whether the names of the time statistics for HTTP
+        requests contain the actual URIs (`True`), or URI templates (`False`).
+        See :meth:`~zhmcclient.TimeStatsKeeper.operation_name`.
+        """
+        return self._raw_uris
+
     @logged_api_call
-    def enable(self):
+    def enable(self, raw_uris=False):
         """
         Enable the statistics keeper.
+
+        Parameters:
+
+          raw_uris (bool):
+            Controls whether the names of the time statistics for HTTP
+            requests contain the actual URIs (`True`), or URI templates
+            (`False`). With URI templates, the time statistics of all
+            resources of a type are accumulated for each operation, and the
+            number of time statistics remains bounded.
         """
+        self._raw_uris = raw_uris
         self._enabled = True
 
     @logged_api_call
@@ -253,6 +681,33 @@ class TimeStatsKeeper(object):
         """
         self._enabled = False
 
+    def operation_name(self, method, uri):
+        """
+        Return the name of the time statistics for an HTTP request.
+
+        If this statistics keeper uses URI templates (see
+        :attr:`~zhmcclient.TimeStatsKeeper.raw_uris`), resource IDs in the URI
+        are replaced by '{id}' and query parameter values by '{value}', so
+        that for example a "GET" of
+        '/api/partitions/1a2b/nics/3c4d' results in the name
+        'get /api/partitions/{id}/nics/{id}'.
+
+        Parameters:
+
+          method (string):
+            HTTP method of the request, in lower case (e.g. 'get').
+
+          uri (string):
+            URI of the request.
+
+        Returns:
+
+          :term:`string`: Name of the time statistics.
+        """
+        if not self._raw_uris:
+            uri = _uri_template(uri)
+        return method + ' ' + uri
+
     @logged_api_call
     def get_stats(self, name):
         """
@@ -272,9 +727,19 @@ class TimeStatsKeeper(object):
         """
         if not self.enabled:
             return self._disabled_stats
-        if name not in self._time_stats:
-            self._time_stats[name] = TimeStats(self, name)
-        return self._time_stats[name]
+        return self._get_stats(name)
+
+    def _get_stats(self, name):
+        """
+        Get the time statistics for a name, creating it if needed.
+        """
+        try:
+            return self._time_stats[name]
+        except KeyError:
+            with self._lock:
+                if name not in self._time_stats:
+                    self._time_stats[name] = TimeStats(self, name)
+                return self._time_stats[name]
 
     @logged_api_call
     def snapshot(self):
@@ -293,7 +758,60 @@ class TimeStatsKeeper(object):
           - value (:class:`~zhmcclient.TimeStats`): Time statistics for the
             operation
         """
-        return copy.deepcopy(self._time_stats)
+        with self._lock:
+            items = list(self._time_stats.items())
+        return {name: stats._copy() for name, stats in items}
+
+    @logged_api_call
+    def diff(self, snapshot):
+        """
+        Return the time statistics for the invocations of the operations that
+        happened after an earlier snapshot of this keeper was taken.
+
+        Parameters:
+
+          snapshot (dict):
+            An earlier snapshot of this keeper, as returned by
+            :meth:`~zhmcclient.TimeStatsKeeper.snapshot`.
+
+        Returns:
+
+         dict: A dictionary of the time statistics by operation, in the same
+         format as returned by :meth:`~zhmcclient.TimeStatsKeeper.snapshot`.
+         Operations that were not invoked since the earlier snapshot are
+         not included.
+        """
+        result = {}
+        for name, stats in self.snapshot().items():
+            try:
+                earlier = snapshot[name]
+            except KeyError:
+                earlier = TimeStats(self, name)
+            stats_diff = stats.diff(earlier)
+            if stats_diff.count:
+                result[name] = stats_diff
+        return result
+
+    @logged_api_call
+    def merge(self, other):
+        """
+        Merge the time statistics of another statistics keeper into this
+        statistics keeper.
+
+        Time statistics for operations this keeper does not have yet are
+        added, and time statistics for operations it already has are merged
+        (see :meth:`~zhmcclient.TimeStats.merge`).
+
+        Parameters:
+
+          other (:class:`~zhmcclient.TimeStatsKeeper` or dict):
+            The other statistics keeper, or a snapshot of it (see
+            :meth:`~zhmcclient.TimeStatsKeeper.snapshot`).
+        """
+        if isinstance(other, TimeStatsKeeper):
+            other = other.snapshot()
+        for name, stats in other.items():
+            self._get_stats(name).merge(stats)
 
     def __str__(self):
         """
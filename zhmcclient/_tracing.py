@@ -0,0 +1,559 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The :class:`~zhmcclient.Session` class supports hooks that are invoked around
+every HTTP request against the HMC API and around every wait for completion of
+an asynchronous job. Hooks are objects of a subclass of
+:class:`~zhmcclient.SessionHook` and are added to a session with
+:meth:`~zhmcclient.Session.add_hook`.
+
+The hooks are passed a :class:`~zhmcclient.RequestInfo` object with
+information about the request, such as the HTTP method, the URI template of
+the operation, the HTTP status code, the number of bytes sent and received,
+the number of retries, whether a re-logon happened, and the elapsed time.
+
+The following hooks are provided:
+
+* :class:`~zhmcclient.OpenTelemetryHook` emits an OpenTelemetry span for each
+  request and job wait. It requires the `opentelemetry-api` Python package
+  to be installed.
+
+* :class:`~zhmcclient.PrometheusHook` maintains request counters and elapsed
+  time histograms and exports them in the Prometheus text format. It does not
+  require any additional Python packages.
+
+Example::
+
+    import zhmcclient
+
+    session = zhmcclient.Session(hmc, userid, password)
+    prom_hook = zhmcclient.PrometheusHook()
+    session.add_hook(prom_hook)
+
+    # Some operations that are being observed
+    client = zhmcclient.Client(session)
+    cpcs = client.cpcs.list()
+
+    print(prom_hook.exposition())
+"""
+
+from __future__ import absolute_import
+
+import time
+import threading
+from collections import OrderedDict
+
+from ._logging import get_logger
+from ._timestats import _uri_template
+
+__all__ = ['RequestInfo', 'SessionHook', 'OpenTelemetryHook',
+           'PrometheusHook']
+
+LOG = get_logger(__name__)
+
+# Default upper bounds of the buckets of the elapsed time histograms of
+# PrometheusHook, in seconds.
+_DEFAULT_PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                               1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class RequestInfo(object):
+    """
+    Information about an HTTP request against the HMC API, or about a wait
+    for completion of an asynchronous job, that is passed to the hooks of a
+    session.
+
+    Objects of this class are not directly created by the user; they are
+    created by the :class:`~zhmcclient.Session` class.
+
+    Attributes:
+
+      kind (:term:`string`): 'request' for an HTTP request, or 'job-wait' for
+        a wait for completion of an asynchronous job.
+
+      method (:term:`string`): HTTP method of the request (e.g. 'GET'). For
+        job waits, the HTTP method of the operation that started the job.
+
+      uri (:term:`string`): URI of the request. For job waits, the URI of the
+        operation that started the job.
+
+      job_uri (:term:`string`): For job waits, the URI of the job. `None`
+        for requests.
+
+      status (:term:`integer`): HTTP status code of the response, or `None`
+        if no response was received, or for job waits.
+
+      bytes_sent (:term:`integer`): Number of bytes in the request body, or
+        `None` if not known (e.g. when sending from a file).
+
+      request_body (:term:`string` or :term:`byte string`): The request body
+        as it was sent, or `None` if the request has no body or if the body
+        is not a string (e.g. when sending from a file). For the "Logon"
+        operation, this includes the password.
+
+      bytes_received (:term:`integer`): Number of bytes in the response body.
+
+      response (:class:`requests.Response`): The HTTP response, or `None` if
+        no response was received, or for job waits.
+
+      retries (:term:`integer`): Number of retries of the HTTP request that
+        were performed because of connection or read errors.
+
+      relogon (bool): Indicates whether the request failed because the API
+        session token expired, and was therefore repeated after a re-logon.
+
+      priority (:term:`integer`): Priority of the HTTP request (see
+        :meth:`~zhmcclient.Session.request_priority`), or `None` for job
+        waits.
+
+      queue_time (float): Time in seconds the HTTP request waited for the
+        rate limit of the session before it was started (see the
+        `rate_limit` attribute of :class:`~zhmcclient.RetryTimeoutConfig`).
+
+      start_time (float): Time when the request was started, as returned by
+        :func:`py:time.time`.
+
+      end_time (float): Time when the request ended, as returned by
+        :func:`py:time.time`, or `None` if it has not ended yet.
+
+      exception (:exc:`py:Exception`): The exception that was raised, or
+        `None` if no exception was raised.
+
+      context (dict): Data that hooks can associate with the request, e.g.
+        between :meth:`~zhmcclient.SessionHook.request_started` and
+        :meth:`~zhmcclient.SessionHook.request_ended`. Hooks should use
+        themselves as the key.
+    """
+
+    def __init__(self, kind, method, uri, job_uri=None):
+        self.kind = kind
+        self.method = method
+        self.uri = uri
+        self.job_uri = job_uri
+        self._operation = None
+        self.status = None
+        self.bytes_sent = 0
+        self.request_body = None
+        self.bytes_received = 0
+        self.response = None
+        self.retries = 0
+        self.relogon = False
+        self.priority = None
+        self.queue_time = 0.0
+        self.start_time = None
+        self.end_time = None
+        self.exception = None
+        self.context = {}
+
+    @property
+    def operation(self):
+        """
+        :term:`string`: Name of the operation, with a URI template instead
+        of the URI (e.g. 'get /api/partitions/{id}'). For job waits, the
+        name of the operation that started the job.
+        """
+        if self._operation is None:
+            self._operation = self.method.lower() + ' ' + \
+                _uri_template(self.uri)
+        return self._operation
+
+    @property
+    def duration(self):
+        """
+        float: Elapsed time of the request in seconds, or `None` if it has
+        not ended yet.
+        """
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def __repr__(self):
+        return "RequestInfo(kind={!r}, operation={!r}, status={!r}, " \
+            "duration={!r})".format(self.kind, self.operation, self.status,
+                                    self.duration)
+
+
+class SessionHook(object):
+    """
+    Base class for hooks that are invoked by a :class:`~zhmcclient.Session`
+    around every HTTP request against the HMC API and around every wait for
+    completion of an asynchronous job.
+
+    The methods of this class do nothing; subclasses override the methods
+    they need. Exceptions raised by these methods are logged and otherwise
+    ignored.
+
+    The methods are invoked in the thread that performs the request. Nested
+    requests (e.g. the requests for checking job status during a job wait, or
+    the repeated request after a re-logon) are started and ended within
+    their outer request.
+    """
+
+    def request_started(self, info):
+        """
+        Invoked before an HTTP request is sent, or before waiting for job
+        completion starts.
+
+        Parameters:
+
+          info (:class:`~zhmcclient.RequestInfo`): Information about the
+            request.
+        """
+        pass
+
+    def request_ended(self, info):
+        """
+        Invoked after an HTTP request has ended (successfully or with an
+        exception), or after waiting for job completion has ended.
+
+        Parameters:
+
+          info (:class:`~zhmcclient.RequestInfo`): Information about the
+            request.
+        """
+        pass
+
+
+class _RequestTracer(object):
+    """
+    Context manager that invokes the hooks of a session around a request.
+    """
+
+    def __init__(self, hooks, info):
+        self._hooks = hooks
+        self.info = info
+
+    def __enter__(self):
+        self.info.start_time = time.time()
+        for hook in self._hooks:
+            try:
+                hook.request_started(self.info)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.warning("Ignoring exception in request_started() of "
+                            "session hook %r: %s", hook, exc)
+        return self.info
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.info.end_time = time.time()
+        if exc_value is not None:
+            self.info.exception = exc_value
+        for hook in reversed(self._hooks):
+            try:
+                hook.request_ended(self.info)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.warning("Ignoring exception in request_ended() of "
+                            "session hook %r: %s", hook, exc)
+        return False
+
+
+class OpenTelemetryHook(SessionHook):
+    """
+    Session hook that emits an OpenTelemetry span for each HTTP request
+    against the HMC API and for each wait for job completion.
+
+    The spans are named by the operation (e.g. 'get /api/partitions/{id}'
+    or 'wait post /api/partitions/{id}/operations/start') and are made the
+    current span while the request is performed, so that spans created by
+    the application around zhmcclient API calls become their parents, and the
+    spans for checking job status become children of the span for the job
+    wait.
+
+    The spans have the following attributes:
+
+    * `http.method`, `http.url` (the URI), `http.status_code`
+    * `zhmc.operation`, `zhmc.kind`, `zhmc.job_uri`
+    * `zhmc.bytes_sent`, `zhmc.bytes_received`, `zhmc.retries`,
+      `zhmc.relogon`
+
+    This hook requires the `opentelemetry-api` Python package to be installed,
+    unless a tracer is specified.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        Parameters:
+
+          tracer (opentelemetry.trace.Tracer):
+            The OpenTelemetry tracer to be used for creating the spans.
+            `None` causes the tracer named 'zhmcclient' to be obtained from
+            the global tracer provider.
+
+        Raises:
+
+          ImportError: The `opentelemetry-api` package is not installed and
+            no tracer was specified.
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            if tracer is None:
+                raise
+            trace = None
+        self._trace = trace
+        if tracer is None:
+            tracer = trace.get_tracer('zhmcclient')
+        self._tracer = tracer
+
+    @property
+    def tracer(self):
+        """
+        The OpenTelemetry tracer used for creating the spans.
+        """
+        return self._tracer
+
+    def request_started(self, info):
+        """
+        Start a span for the request and make it the current span.
+        """
+        name = info.operation
+        if info.kind == 'job-wait':
+            name = 'wait ' + name
+        attributes = {
+            'http.method': info.method,
+            'http.url': info.uri,
+            'zhmc.operation': info.operation,
+            'zhmc.kind': info.kind,
+        }
+        if info.job_uri is not None:
+            attributes['zhmc.job_uri'] = info.job_uri
+        if self._trace is not None:
+            span = self._tracer.start_span(
+                name, kind=self._trace.SpanKind.CLIENT, attributes=attributes)
+            activation = self._trace.use_span(span, end_on_exit=False)
+            activation.__enter__()
+        else:
+            span = self._tracer.start_span(name, attributes=attributes)
+            activation = None
+        info.context[self] = (span, activation)
+
+    def request_ended(self, info):
+        """
+        Set the result attributes of the span for the request and end it.
+        """
+        try:
+            span, activation = info.context.pop(self)
+        except KeyError:
+            return
+        if info.status is not None:
+            span.set_attribute('http.status_code', info.status)
+        if info.bytes_sent is not None:
+            span.set_attribute('zhmc.bytes_sent', info.bytes_sent)
+        span.set_attribute('zhmc.bytes_received', info.bytes_received)
+        span.set_attribute('zhmc.retries', info.retries)
+        span.set_attribute('zhmc.relogon', info.relogon)
+        if info.exception is not None:
+            span.record_exception(info.exception)
+            if self._trace is not None:
+                span.set_status(self._trace.Status(
+                    self._trace.StatusCode.ERROR, str(info.exception)))
+        if activation is not None:
+            activation.__exit__(None, None, None)
+        span.end()
+
+
+def _escape_label_value(value):
+    """
+    Return a label value escaped for the Prometheus text format.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"'). \
+        replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    """
+    Return the labels in the Prometheus text format, from a tuple of tuples
+    (name, value).
+    """
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(n, _escape_label_value(v))
+                          for n, v in labels) + '}'
+
+
+def _format_value(value):
+    """
+    Return a sample value in the Prometheus text format.
+    """
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class PrometheusHook(SessionHook):
+    """
+    Session hook that maintains counters and elapsed time histograms for the
+    HTTP requests against the HMC API and the waits for job completion, and
+    exports them in the Prometheus text exposition format.
+
+    The following metrics are maintained:
+
+    * `zhmc_requests_total` (counter): Number of HTTP requests, by `method`,
+      `operation` and `status`. For requests that failed without a response,
+      `status` is the name of the exception class.
+    * `zhmc_request_duration_seconds` (histogram): Elapsed time of HTTP
+      requests, by `method` and `operation`.
+    * `zhmc_request_bytes_sent_total` and `zhmc_request_bytes_received_total`
+      (counters): Number of bytes in request and response bodies, by `method`
+      and `operation`.
+    * `zhmc_request_retries_total` (counter): Number of retries of HTTP
+      requests, by `method` and `operation`.
+    * `zhmc_relogons_total` (counter): Number of re-logons because of
+      expired API session tokens, by `method` and `operation`.
+    * `zhmc_job_wait_duration_seconds` (histogram): Elapsed time of waits
+      for job completion, by `operation`.
+    * `zhmc_request_queue_seconds` (histogram): Time HTTP requests waited
+      for the rate limit of the session, by `priority`.
+
+    This class does not require the `prometheus_client` Python package. The
+    exported text can be served to Prometheus by the application, or the
+    values can be obtained with :meth:`~zhmcclient.PrometheusHook.samples`.
+    """
+
+    def __init__(self, buckets=None, prefix='zhmc'):
+        """
+        Parameters:
+
+          buckets (iterable of float):
+            Upper bounds of the buckets of the elapsed time histograms, in
+            seconds. `None` causes the default buckets to be used.
+
+          prefix (:term:`string`):
+            Prefix for the names of the metrics.
+        """
+        if buckets is None:
+            buckets = _DEFAULT_PROMETHEUS_BUCKETS
+        self._buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        # Counters, by metric name; each is a dict of value by labels tuple
+        self._counters = OrderedDict()
+        # Histograms, by metric name; each is a dict by labels tuple of
+        # list [bucket counts..., sum, count]
+        self._histograms = OrderedDict()
+        for name in ('requests_total', 'request_bytes_sent_total',
+                     'request_bytes_received_total',
+                     'request_retries_total', 'relogons_total'):
+            self._counters[self._prefix + '_' + name] = {}
+        for name in ('request_duration_seconds',
+                     'job_wait_duration_seconds', 'request_queue_seconds'):
+            self._histograms[self._prefix + '_' + name] = {}
+
+    def _inc(self, name, labels, value=1):
+        counter = self._counters[self._prefix + '_' + name]
+        counter[labels] = counter.get(labels, 0) + value
+
+    def _observe(self, name, labels, value):
+        histogram = self._histograms[self._prefix + '_' + name]
+        try:
+            data = histogram[labels]
+        except KeyError:
+            data = histogram[labels] = [0] * (len(self._buckets) + 2)
+        for i, bound in enumerate(self._buckets):
+            if value <= bound:
+                data[i] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    def request_ended(self, info):
+        """
+        Update the metrics for the request.
+        """
+        with self._lock:
+            if info.kind == 'job-wait':
+                self._observe('job_wait_duration_seconds',
+                              (('operation', info.operation),),
+                              info.duration)
+                return
+            labels = (('method', info.method), ('operation', info.operation))
+            if info.status is not None:
+                status = str(info.status)
+            elif info.exception is not None:
+                status = info.exception.__class__.__name__
+            else:
+                status = ''
+            self._inc('requests_total', labels + (('status', status),))
+            self._observe('request_duration_seconds', labels, info.duration)
+            self._observe('request_queue_seconds',
+                          (('priority', str(info.priority)),),
+                          info.queue_time)
+            if info.bytes_sent:
+                self._inc('request_bytes_sent_total', labels, info.bytes_sent)
+            if info.bytes_received:
+                self._inc('request_bytes_received_total', labels,
+                          info.bytes_received)
+            if info.retries:
+                self._inc('request_retries_total', labels, info.retries)
+            if info.relogon:
+                self._inc('relogons_total', labels)
+
+    def samples(self):
+        """
+        Return the current values of the metrics.
+
+        Returns:
+
+          list: List of tuples (name, labels, value), where `name` is the
+          sample name (e.g. 'zhmc_request_duration_seconds_bucket'), `labels`
+          is a dict of label values by label name, and `value` is the sample
+          value.
+        """
+        result = []
+        with self._lock:
+            for name, counter in self._counters.items():
+                for labels, value in sorted(counter.items()):
+                    result.append((name, dict(labels), value))
+            for name, histogram in self._histograms.items():
+                for labels, data in sorted(histogram.items()):
+                    for i, bound in enumerate(self._buckets):
+                        le = (('le', _format_value(float(bound))),)
+                        result.append((name + '_bucket', dict(labels + le),
+                                       data[i]))
+                    result.append((name + '_sum', dict(labels), data[-2]))
+                    result.append((name + '_count', dict(labels), data[-1]))
+        return result
+
+    def exposition(self):
+        """
+        Return the current values of the metrics in the Prometheus text
+        exposition format (version 0.0.4).
+
+        Returns:
+
+          :term:`unicode string`: The metrics in the Prometheus text format.
+        """
+        lines = []
+        samples = self.samples()
+        for name in self._counters:
+            lines.append('# TYPE {} counter'.format(name))
+            lines.extend(self._sample_lines(samples, name, ('',)))
+        for name in self._histograms:
+            lines.append('# TYPE {} histogram'.format(name))
+            lines.extend(self._sample_lines(samples, name,
+                                            ('_bucket', '_sum', '_count')))
+        return u'\n'.join(lines) + u'\n'
+
+    @staticmethod
+    def _sample_lines(samples, name, suffixes):
+        names = [name + suffix for suffix in suffixes]
+        for sample_name, labels, value in samples:
+            if sample_name in names:
+                label_items = sorted(labels.items(),
+                                     key=lambda item: (item[0] == 'le',
+                                                       item[0]))
+                yield '{}{} {}'.format(sample_name,
+                                       _format_labels(label_items),
+                                       _format_value(value))
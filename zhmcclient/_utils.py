@@ -18,6 +18,7 @@ Utility functions.
 
 from __future__ import absolute_import
 
+import re
 import six
 from collections import OrderedDict, Mapping, MutableSequence, Iterable
 from datetime import datetime
@@ -28,6 +29,9 @@ __all__ = ['datetime_from_timestamp', 'timestamp_from_datetime']
 
 _EPOCH_DT = datetime(1970, 1, 1, 0, 0, 0, 0, pytz.utc)
 
+# Characters with a special meaning in regular expressions
+_REGEXP_CHARS = re.compile(r'[\\.^$*+?{}\[\]|()]')
+
 
 def _indent(text, amount, ch=' '):
     """Return the indent text, where each line is indented by `amount`
@@ -109,6 +113,20 @@ def repr_manager(manager, indent):
     return repr_text(repr(manager), indent=indent)
 
 
+def is_literal_match(match_value):
+    """
+    Return a boolean indicating whether a match value in filter arguments is
+    a string without special characters for regular expressions, so that
+    matching it as a regular expression is the same as comparing it.
+
+    This is used by the client-side filtering of the zhmcclient package and
+    by the filtering of the faked HMC in the mock support, so that they agree
+    on which match values are literals.
+    """
+    return isinstance(match_value, six.string_types) and \
+        not _REGEXP_CHARS.search(match_value)
+
+
 def datetime_from_timestamp(ts):
     """
     Convert an :term:`HMC timestamp number <timestamp>` into a
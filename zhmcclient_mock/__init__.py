@@ -22,3 +22,7 @@ from ._session import *       # noqa: F401
 from ._urihandler import *    # noqa: F401
 from ._hmc import *           # noqa: F401
 from ._idpool import *        # noqa: F401
+from ._clock import *         # noqa: F401
+from ._generator import *     # noqa: F401
+from ._injector import *      # noqa: F401
+from ._server import *        # noqa: F401
@@ -0,0 +1,112 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The :class:`~zhmcclient_mock.VirtualClock` class provides the simulated time
+of a faked HMC. This is used for example to determine when the simulated
+asynchronous jobs of the faked HMC complete.
+"""
+
+from __future__ import absolute_import
+
+import time
+import threading
+
+__all__ = ['VirtualClock']
+
+
+class VirtualClock(object):
+    """
+    A clock for the simulated time of a faked HMC.
+
+    The virtual time advances with the real time multiplied by a speed
+    factor, and can in addition be advanced explicitly. A speed factor of 0
+    stops the clock, so that the virtual time only advances when
+    :meth:`advance` is called, which makes tests that depend on the
+    durations of asynchronous jobs deterministic.
+    """
+
+    def __init__(self, speed=1.0):
+        """
+        Parameters:
+
+          speed (:term:`number`): Number of virtual seconds by which the
+            clock advances per real second. Must not be negative.
+        """
+        if speed < 0:
+            raise ValueError("Speed of the virtual clock must not be "
+                             "negative: %r" % speed)
+        self._lock = threading.Lock()
+        self._speed = speed
+        # Virtual time at the real time self._real_start
+        self._virtual_start = 0.0
+        self._real_start = time.time()
+
+    def __repr__(self):
+        """
+        Return a string with the state of this clock, for debug purposes.
+        """
+        return "{classname}(speed={speed!r}, time={time!r})".format(
+            classname=self.__class__.__name__,
+            speed=self._speed,
+            time=self.time())
+
+    def _now(self, real_now):
+        return self._virtual_start + \
+            (real_now - self._real_start) * self._speed
+
+    @property
+    def speed(self):
+        """
+        :term:`number`: Number of virtual seconds by which the clock advances
+        per real second. Can be set, without changing the current virtual
+        time.
+        """
+        return self._speed
+
+    @speed.setter
+    def speed(self, speed):
+        if speed < 0:
+            raise ValueError("Speed of the virtual clock must not be "
+                             "negative: %r" % speed)
+        with self._lock:
+            real_now = time.time()
+            self._virtual_start = self._now(real_now)
+            self._real_start = real_now
+            self._speed = speed
+
+    def time(self):
+        """
+        Return the current virtual time.
+
+        Returns:
+          float: Virtual time in seconds since the clock was created.
+        """
+        with self._lock:
+            return self._now(time.time())
+
+    def advance(self, seconds):
+        """
+        Advance the virtual time.
+
+        Parameters:
+
+          seconds (:term:`number`): Number of seconds by which the virtual
+            time is advanced. Must not be negative.
+        """
+        if seconds < 0:
+            raise ValueError("Virtual time cannot be advanced by a negative "
+                             "number of seconds: %r" % seconds)
+        with self._lock:
+            self._virtual_start += seconds
@@ -0,0 +1,452 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The :class:`~zhmcclient_mock.TopologyGenerator` class generates a synthetic
+resource topology of configurable size for a faked HMC. This is used for
+example to drive scale and performance tests of code that uses the zhmcclient
+package.
+"""
+
+from __future__ import absolute_import
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+import random
+import uuid
+import six
+
+from ._hmc import InputError
+from ._session import FakedSession
+
+__all__ = ['TopologyGenerator']
+
+
+# Default property distributions, by resource class. See TopologyGenerator
+# for the supported forms of distributions.
+_DEFAULT_PROPERTIES = {
+    'cpc': {
+        'dpm-enabled': True,
+        'machine-type': '3906',
+        'status': 'active',
+    },
+    'adapter': {
+        'status': 'active',
+    },
+    'virtual-switch': {
+        'type': 'osd',
+    },
+    'partition': {
+        'status': {'active': 8, 'stopped': 2},
+        'type': {'linux': 9, 'ssc': 1},
+        'ifl-processors': [1, 2, 4, 8],
+        'initial-memory': [4096, 8192, 16384, 32768],
+        'maximum-memory': 65536,
+    },
+    'nic': {
+        'type': 'osd',
+    },
+    'hba': {},
+    'storage-group': {
+        'type': 'fcp',
+        'shared': False,
+        'fulfillment-state': 'complete',
+    },
+    'storage-volume': {
+        'size': [16.0, 32.0, 64.0, 128.0],
+        'usage': {'data': 9, 'boot': 1},
+        'fulfillment-state': 'complete',
+    },
+}
+
+
+def _value(distribution, rng, index):
+    """
+    Return a property value drawn from a property distribution.
+    """
+    if callable(distribution):
+        return distribution(rng, index)
+    if isinstance(distribution, (list, tuple)):
+        return rng.choice(distribution)
+    if isinstance(distribution, dict):
+        # Sorting makes the result independent of the dict ordering
+        values = sorted(distribution.items(), key=lambda item: repr(item[0]))
+        point = rng.uniform(0, sum(weight for _, weight in values))
+        for value, weight in values:
+            point -= weight
+            if point < 0:
+                return value
+        return values[-1][0]
+    return distribution
+
+
+def _count(count, rng):
+    """
+    Return a resource count drawn from a count specification.
+    """
+    if isinstance(count, tuple):
+        return rng.randint(count[0], count[1])
+    return count
+
+
+class TopologyGenerator(object):
+    """
+    A generator for a synthetic resource topology of a faked HMC.
+
+    The generated topology consists of CPCs in DPM mode. Each CPC has network
+    adapters (alternately OSA adapters with a virtual switch and RoCE
+    adapters, each with one port), FCP storage adapters (each with one port),
+    partitions with NICs and HBAs that are backed by these adapters, and
+    FCP storage groups with storage volumes.
+
+    The resource counts are specified per parent resource. Each count can be
+    an integer, or a tuple (min, max) in which case the count is drawn
+    randomly for each parent resource from that range (including both ends).
+
+    The resource names are generated from the position of the resource in
+    the tree, e.g. 'CPC02' for the third CPC, 'CPC02-P0005' for the sixth
+    partition of that CPC, 'NIC1' for the second NIC of a partition, or
+    'CPC02-SG0003' and 'VOL0007' for storage groups and storage volumes.
+    The object IDs are generated as UUIDs, as on a real HMC.
+
+    The other resource properties are drawn from property distributions that
+    can be specified in the `properties` init parameter, and that default to
+    a set of typical values. A property distribution can be one of:
+
+    * A list or tuple of values: One of the values is chosen randomly with
+      equal probability.
+    * A dict of value and weight: One of the values is chosen randomly, with
+      a probability proportional to its weight.
+    * A callable: It is called with the random number generator
+      (:class:`py:random.Random`) and the 0-based index of the resource
+      within its parent, and returns the value.
+    * Any other value: The value is used as a constant.
+
+    The random choices are made using a random number generator that is
+    initialized with the `seed` init parameter, so the same seed always
+    generates the same topology.
+
+    Example for generating a topology with 8 CPCs, 600 partitions and about
+    20000 storage volumes, and loading it into a faked session::
+
+        generator = zhmcclient_mock.TopologyGenerator(
+            cpcs=8, partitions=75, nics=2, hbas=2,
+            storage_groups=75, storage_volumes=(20, 46),
+            properties={'partition': {'status': 'active'}},
+            seed=42)
+        session = generator.faked_session()
+        client = zhmcclient.Client(session)
+
+    Example for using the generator in a pytest fixture::
+
+        @pytest.fixture(scope='module')
+        def large_client():
+            generator = zhmcclient_mock.TopologyGenerator(
+                cpcs=4, partitions=500, seed=1)
+            return zhmcclient.Client(generator.faked_session())
+    """
+
+    def __init__(self, cpcs=1, partitions=10, nics=1, hbas=1,
+                 network_adapters=2, storage_adapters=2, storage_groups=0,
+                 storage_volumes=0, properties=None, seed=None):
+        """
+        Parameters:
+
+          cpcs (integer): Number of CPCs.
+
+          partitions (integer or tuple): Number of partitions per CPC.
+
+          nics (integer or tuple): Number of NICs per partition.
+
+          hbas (integer or tuple): Number of HBAs per partition.
+
+          network_adapters (integer): Number of network adapters per CPC.
+            Must be at least 1 if NICs are generated.
+
+          storage_adapters (integer): Number of FCP storage adapters per CPC.
+            Must be at least 1 if HBAs are generated.
+
+          storage_groups (integer or tuple): Number of storage groups per
+            CPC.
+
+          storage_volumes (integer or tuple): Number of storage volumes per
+            storage group.
+
+          properties (dict): Property distributions that extend or override
+            the default property distributions. The dict key is the resource
+            class (i.e. 'cpc', 'adapter', 'virtual-switch', 'partition',
+            'nic', 'hba', 'storage-group', 'storage-volume'), and the dict
+            value is a dict of property distributions by property name.
+
+          seed: Seed for the random number generator. `None` causes a
+            different topology to be generated each time.
+
+        Raises:
+
+          :exc:`~zhmcclient_mock.InputError`: Invalid input parameters.
+        """
+        if network_adapters < 1 and nics != 0:
+            raise InputError("At least one network adapter is needed for "
+                             "generating NICs")
+        if storage_adapters < 1 and hbas != 0:
+            raise InputError("At least one storage adapter is needed for "
+                             "generating HBAs")
+        self._counts = {
+            'cpc': cpcs,
+            'partition': partitions,
+            'nic': nics,
+            'hba': hbas,
+            'network-adapter': network_adapters,
+            'storage-adapter': storage_adapters,
+            'storage-group': storage_groups,
+            'storage-volume': storage_volumes,
+        }
+        self._properties = dict(
+            (class_, dict(props))
+            for class_, props in six.iteritems(_DEFAULT_PROPERTIES))
+        for class_, props in six.iteritems(properties or {}):
+            if class_ not in self._properties:
+                raise InputError("Invalid resource class in properties: "
+                                 "{!r}".format(class_))
+            self._properties[class_].update(props)
+        self._seed = seed
+
+    @property
+    def seed(self):
+        """
+        The seed for the random number generator.
+        """
+        return self._seed
+
+    def resources(self):
+        """
+        Generate the topology and return it as a resource dictionary in the
+        format expected by :meth:`~zhmcclient_mock.FakedHmc.add_resources`.
+
+        Each invocation starts over with the seed, so a generator with a
+        seed always returns the same resource dictionary.
+
+        Returns:
+
+          dict: The resource dictionary.
+        """
+        rng = random.Random(self._seed)
+        cpcs = []
+        storage_groups = []
+        for c in range(_count(self._counts['cpc'], rng)):
+            cpc, cpc_storage_groups = self._cpc(rng, c)
+            cpcs.append(cpc)
+            storage_groups.extend(cpc_storage_groups)
+        resources = OrderedDict()
+        resources['cpcs'] = cpcs
+        resources['consoles'] = [
+            OrderedDict([
+                ('properties', {'name': 'HMC'}),
+                ('storage_groups', storage_groups),
+            ]),
+        ]
+        return resources
+
+    def populate(self, hmc):
+        """
+        Generate the topology and add it to a faked HMC.
+
+        If the faked HMC already has a console, the storage groups are added
+        to that console.
+
+        Parameters:
+
+          hmc (:class:`~zhmcclient_mock.FakedHmc`): The faked HMC.
+        """
+        resources = self.resources()
+        if hmc.consoles.list():
+            consoles = resources.pop('consoles')
+            hmc.add_resources(resources)
+            hmc._process_child_list(hmc.consoles.console, 'storage_groups',
+                                    consoles[0]['storage_groups'])
+        else:
+            hmc.add_resources(resources)
+
+    def faked_session(self, host='fake-host', hmc_name='fake-hmc',
+                      hmc_version='2.13.1', api_version='1.8'):
+        """
+        Return a new faked session whose faked HMC has the generated
+        topology.
+
+        The parameters are passed on to
+        :class:`~zhmcclient_mock.FakedSession`.
+
+        Returns:
+
+          :class:`~zhmcclient_mock.FakedSession`: The faked session.
+        """
+        session = FakedSession(host, hmc_name, hmc_version, api_version)
+        self.populate(session.hmc)
+        return session
+
+    def _props(self, class_, rng, index, props):
+        """
+        Return the properties for a resource, by adding the properties drawn
+        from the property distributions to the specified properties.
+        """
+        # Sorting makes the drawn values independent of the dict ordering
+        for name, distribution in sorted(
+                six.iteritems(self._properties[class_])):
+            if name not in props:
+                props[name] = _value(distribution, rng, index)
+        return props
+
+    @staticmethod
+    def _oid(rng):
+        """
+        Return a new object ID.
+        """
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def _cpc(self, rng, c):
+        """
+        Return the resource dictionary for a CPC, and the list of resource
+        dictionaries for its storage groups.
+        """
+        cpc_name = 'CPC{:02d}'.format(c)
+        cpc_oid = self._oid(rng)
+        cpc_uri = '/api/cpcs/' + cpc_oid
+
+        adapters = []
+        vswitches = []
+        nic_backings = []
+        for a in range(self._counts['network-adapter']):
+            adapter_oid = self._oid(rng)
+            adapter_uri = '/api/adapters/' + adapter_oid
+            if a % 2 == 0:
+                name = 'OSA{}'.format(a)
+                adapter_type = 'osd'
+            else:
+                name = 'ROCE{}'.format(a)
+                adapter_type = 'roce'
+            port_uri = adapter_uri + '/network-ports/0'
+            adapters.append(self._adapter(rng, a, adapter_oid, name,
+                                          adapter_type))
+            if adapter_type == 'osd':
+                vswitch_oid = self._oid(rng)
+                vswitch_uri = '/api/virtual-switches/' + vswitch_oid
+                vswitches.append({
+                    'properties': self._props('virtual-switch', rng, a, {
+                        'object-id': vswitch_oid,
+                        'name': 'VSW-{}'.format(name),
+                        'backing-adapter-uri': adapter_uri,
+                        'port': 0,
+                    }),
+                })
+                nic_backings.append(('virtual-switch-uri', vswitch_uri))
+            else:
+                nic_backings.append(('network-adapter-port-uri', port_uri))
+        hba_backings = []
+        for a in range(self._counts['storage-adapter']):
+            adapter_oid = self._oid(rng)
+            adapters.append(self._adapter(rng, a, adapter_oid,
+                                          'FCP{}'.format(a), 'fcp'))
+            hba_backings.append(
+                '/api/adapters/{}/storage-ports/0'.format(adapter_oid))
+
+        partitions = []
+        for p in range(_count(self._counts['partition'], rng)):
+            partitions.append(self._partition(
+                rng, p, '{}-P{:04d}'.format(cpc_name, p), nic_backings,
+                hba_backings))
+
+        storage_groups = []
+        for s in range(_count(self._counts['storage-group'], rng)):
+            volumes = []
+            for v in range(_count(self._counts['storage-volume'], rng)):
+                volumes.append({
+                    'properties': self._props('storage-volume', rng, v, {
+                        'element-id': self._oid(rng),
+                        'name': 'VOL{:04d}'.format(v),
+                    }),
+                })
+            storage_groups.append(OrderedDict([
+                ('properties', self._props('storage-group', rng, s, {
+                    'object-id': self._oid(rng),
+                    'name': '{}-SG{:04d}'.format(cpc_name, s),
+                    'cpc-uri': cpc_uri,
+                })),
+                ('storage_volumes', volumes),
+            ]))
+
+        # The order matters: NICs and HBAs refer to virtual switches and
+        # adapter ports, which must exist when they are added.
+        cpc = OrderedDict([
+            ('properties', self._props('cpc', rng, c, {
+                'object-id': cpc_oid,
+                'name': cpc_name,
+            })),
+            ('adapters', adapters),
+            ('virtual_switches', vswitches),
+            ('partitions', partitions),
+        ])
+        return cpc, storage_groups
+
+    def _adapter(self, rng, index, adapter_oid, name, adapter_type):
+        """
+        Return the resource dictionary for an adapter with one port.
+        """
+        return OrderedDict([
+            ('properties', self._props('adapter', rng, index, {
+                'object-id': adapter_oid,
+                'name': name,
+                'type': adapter_type,
+            })),
+            ('ports', [
+                {'properties': {'element-id': '0', 'index': 0,
+                                'name': 'Port 0'}},
+            ]),
+        ])
+
+    def _partition(self, rng, index, name, nic_backings, hba_backings):
+        """
+        Return the resource dictionary for a partition with its NICs and
+        HBAs.
+        """
+        nics = []
+        for n in range(_count(self._counts['nic'], rng)):
+            backing_prop, backing_uri = \
+                nic_backings[(index + n) % len(nic_backings)]
+            nics.append({
+                'properties': self._props('nic', rng, n, {
+                    'element-id': self._oid(rng),
+                    'name': 'NIC{}'.format(n),
+                    backing_prop: backing_uri,
+                }),
+            })
+        hbas = []
+        for h in range(_count(self._counts['hba'], rng)):
+            hbas.append({
+                'properties': self._props('hba', rng, h, {
+                    'element-id': self._oid(rng),
+                    'name': 'HBA{}'.format(h),
+                    'adapter-port-uri':
+                        hba_backings[(index + h) % len(hba_backings)],
+                }),
+            })
+        return OrderedDict([
+            ('properties', self._props('partition', rng, index, {
+                'object-id': self._oid(rng),
+                'name': name,
+            })),
+            ('nics', nics),
+            ('hbas', hbas),
+        ])
@@ -27,10 +27,15 @@ except ImportError:
 import six
 import re
 import copy
+import heapq
+import threading
+from contextlib import contextmanager
+from six.moves._thread import get_ident
 
 from ._idpool import IdPool
+from ._clock import VirtualClock
 from zhmcclient._utils import repr_dict, repr_manager, repr_list, \
-    timestamp_from_datetime
+    timestamp_from_datetime, is_literal_match
 
 __all__ = ['InputError', 'FakedBaseResource', 'FakedBaseManager', 'FakedHmc',
            'FakedConsoleManager', 'FakedConsole',
@@ -45,6 +50,7 @@ __all__ = ['InputError', 'FakedBaseResource', 'FakedBaseManager', 'FakedHmc',
            'FakedCpcManager', 'FakedCpc',
            'FakedUnmanagedCpcManager', 'FakedUnmanagedCpc',
            'FakedHbaManager', 'FakedHba',
+           'FakedJobManager', 'FakedJob',
            'FakedLparManager', 'FakedLpar',
            'FakedNicManager', 'FakedNic',
            'FakedPartitionManager', 'FakedPartition',
@@ -69,6 +75,236 @@ class InputError(Exception):
         super(InputError, self).__init__(message)
 
 
+def _tracking(method):
+    """
+    Return a wrapper for a method of a tracked container that changes the
+    container, that saves the state of the owning faked resource first.
+    """
+    def tracking_method(self, *args, **kwargs):
+        self._resource._save_state()
+        return method(self, *args, **kwargs)
+    tracking_method.__name__ = method.__name__
+    return tracking_method
+
+
+class _TrackedDict(dict):
+    """
+    A dict within the properties of a faked resource, that saves the state of
+    the resource before it is changed for the first time after a snapshot of
+    the faked HMC was taken. Copies of it are plain dicts.
+    """
+    __slots__ = ('_resource',)
+
+    def __init__(self, items, resource):
+        super(_TrackedDict, self).__init__(items)
+        self._resource = resource
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self),)
+
+
+class _TrackedList(list):
+    """
+    A list within the properties of a faked resource, that saves the state
+    of the resource before it is changed for the first time after a snapshot
+    of the faked HMC was taken. Copies of it are plain lists.
+    """
+    __slots__ = ('_resource',)
+
+    def __init__(self, items, resource):
+        super(_TrackedList, self).__init__(items)
+        self._resource = resource
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+def _indexing(method):
+    """
+    Return a wrapper for a method of the properties of a faked resource that
+    changes the properties, that saves the state of the resource first and
+    updates the property indexes of its manager.
+    """
+    def indexing_method(self, *args, **kwargs):
+        resource = self._resource
+        manager = resource._manager
+        if manager is None:
+            resource._save_state()
+            return method(self, *args, **kwargs)
+        with manager._lock.write():
+            resource._save_state()
+            manager._unindex(resource)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                manager._index(resource)
+    indexing_method.__name__ = method.__name__
+    return indexing_method
+
+
+class _TrackedProperties(_TrackedDict):
+    """
+    The properties of a faked resource, that additionally update the
+    property indexes of the manager of the resource when they are changed.
+    """
+    __slots__ = ()
+
+
+for _name in ('__setitem__', '__delitem__', '__ior__', 'clear', 'pop',
+              'popitem', 'setdefault', 'update'):
+    if hasattr(dict, _name):
+        setattr(_TrackedDict, _name, _tracking(getattr(dict, _name)))
+        setattr(_TrackedProperties, _name, _indexing(getattr(dict, _name)))
+for _name in ('__setitem__', '__delitem__', '__setslice__', '__delslice__',
+              '__iadd__', '__imul__', 'append', 'clear', 'extend', 'insert',
+              'pop', 'remove', 'reverse', 'sort'):
+    if hasattr(list, _name):
+        setattr(_TrackedList, _name, _tracking(getattr(list, _name)))
+
+
+def _tracked(value, resource):
+    """
+    Return a copy of a property value of a faked resource, where the dicts
+    and lists are tracked for changes.
+    """
+    if isinstance(value, dict):
+        return _TrackedDict(((k, _tracked(v, resource))
+                             for k, v in six.iteritems(value)), resource)
+    if isinstance(value, list):
+        return _TrackedList((_tracked(v, resource) for v in value), resource)
+    return value
+
+
+def _tracked_properties(properties, resource):
+    """
+    Return a copy of the properties of a faked resource, where the
+    properties and the dicts and lists in them are tracked for changes.
+    """
+    return _TrackedProperties(((k, _tracked(v, resource))
+                               for k, v in six.iteritems(properties)),
+                              resource)
+
+
+class _Snapshot(object):
+    """
+    The changes of a faked HMC since a snapshot was taken, as the saved states
+    of the objects that were changed.
+    """
+
+    def __init__(self):
+        self.states = {}  # id(object) -> tuple(object, saved state)
+        self.uris = {}  # URI -> saved resource in all_resources, or None
+
+
+class _RWLock(object):
+    """
+    A reader-writer lock, that can be held by multiple threads for reading
+    or by a single thread for writing.
+
+    Threads waiting for writing take precedence over threads that start
+    reading. The lock is reentrant for reading and for writing, and a thread
+    that holds it for writing can also acquire it for reading. A thread that
+    holds it only for reading cannot acquire it for writing.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = {}  # thread ident -> number of read acquisitions
+        self._writer = None  # thread ident of the writer
+        self._writer_count = 0  # number of write acquisitions of the writer
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        """
+        Acquire the lock for reading, waiting while another thread holds it
+        for writing or waits for writing.
+        """
+        me = get_ident()
+        with self._cond:
+            if self._writer != me and me not in self._readers:
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+    def release_read(self):
+        """
+        Release the lock for reading.
+        """
+        me = get_ident()
+        with self._cond:
+            count = self._readers[me] - 1
+            if count:
+                self._readers[me] = count
+            else:
+                del self._readers[me]
+                if not self._readers:
+                    self._cond.notify_all()
+
+    def acquire_write(self):
+        """
+        Acquire the lock for writing, waiting while other threads hold it.
+
+        Raises:
+          RuntimeError: The current thread holds the lock only for reading.
+        """
+        me = get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_count += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("A lock held for reading cannot be "
+                                   "acquired for writing")
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._writer_count = 1
+
+    def release_write(self):
+        """
+        Release the lock for writing.
+        """
+        with self._cond:
+            self._writer_count -= 1
+            if not self._writer_count:
+                self._writer = None
+                self._cond.notify_all()
+
+    def held(self):
+        """
+        Return whether the current thread holds the lock for reading or for
+        writing.
+        """
+        me = get_ident()
+        return self._writer == me or me in self._readers
+
+    @contextmanager
+    def read(self):
+        """
+        Context manager that holds the lock for reading.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """
+        Context manager that holds the lock for writing.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
 class FakedBaseResource(object):
     """
     A base class for faked resource classes in the faked HMC.
@@ -177,6 +413,29 @@ class FakedBaseResource(object):
         """
         return self._properties['name']
 
+    def _save_state(self):
+        """
+        Save the state of this resource before it is changed, if a snapshot
+        of the faked HMC is active.
+        """
+        hmc = self._manager.hmc if self._manager else self
+        if getattr(hmc, '_snapshot', None) is not None:
+            hmc._save_object_state(self)
+
+    def _get_state(self):
+        """
+        Return the state of this resource that is restored by
+        :meth:`FakedHmc.restore`.
+        """
+        return copy.deepcopy(self._properties)
+
+    def _set_state(self, state):
+        """
+        Set the state of this resource to a state returned by
+        :meth:`_get_state`.
+        """
+        self._properties = _tracked_properties(state, self)
+
     def update(self, properties):
         """
         update the properties of this resource.
@@ -321,6 +580,12 @@ class FakedBaseManager(object):
     api_root = '/api'  # root of all resource URIs
     next_oid = 1  # next object ID, for auto-generating them
 
+    # Names of the resource properties that are indexed when list() is
+    # invoked with filter arguments on them. Can be changed for a manager
+    # class or object.
+    indexed_props = ('name', 'status', 'type', 'fulfillment-state',
+                     'adapter-family')
+
     def __init__(self, hmc, parent, resource_class, base_uri, oid_prop,
                  uri_prop, class_value):
         self._hmc = hmc
@@ -331,9 +596,24 @@ class FakedBaseManager(object):
         self._uri_prop = uri_prop
         self._class_value = class_value
 
+        # Lock for the resources of this faked manager and their indexes
+        self._lock = _RWLock()
+
         # List of Faked{Resource} objects in this faked manager, by object ID
         self._resources = OrderedDict()
 
+        # Positions of the resources in self._resources, by object ID, for
+        # returning resources found in the indexes in the original order
+        self._positions = {}
+        self._next_position = 0
+
+        # Indexes of resource properties, by property name, as a dict of
+        # object IDs by property value. An index is built when it is needed
+        # for the first time, and all indexes are discarded when a snapshot
+        # of the faked HMC is restored.
+        self._indexes = {}
+        self._indexes_generation = None
+
     def __repr__(self):
         """
         Return a string with the state of this faked manager, for debug
@@ -513,6 +793,25 @@ class FakedBaseManager(object):
         """
         return self._class_value
 
+    def _get_state(self):
+        """
+        Return the state of this manager that is restored by
+        :meth:`FakedHmc.restore`.
+        """
+        state = dict(self.__dict__)
+        state['_resources'] = OrderedDict(self._resources)
+        state['_positions'] = dict(self._positions)
+        return state
+
+    def _set_state(self, state):
+        """
+        Set the state of this manager to a state returned by
+        :meth:`_get_state`.
+        """
+        with self._lock.write():
+            self.__dict__.clear()
+            self.__dict__.update(state)
+
     def _new_oid(self):
         new_oid = self.next_oid
         self.next_oid += 1
@@ -534,9 +833,20 @@ class FakedBaseManager(object):
         Returns:
           FakedBaseResource: The faked resource object.
         """
-        resource = self.resource_class(self, properties)
-        self._resources[resource.oid] = resource
-        self._hmc.all_resources[resource.uri] = resource
+        with self._lock.write():
+            self._hmc._save_object_state(self)
+            resource = self.resource_class(self, properties)
+            resource._properties = _TrackedProperties(resource._properties,
+                                                      resource)
+            self._hmc._save_uri(resource.uri)
+            if resource.oid in self._resources:
+                self._unindex(self._resources[resource.oid])
+            else:
+                self._positions[resource.oid] = self._next_position
+                self._next_position += 1
+            self._resources[resource.oid] = resource
+            self._hmc.all_resources[resource.uri] = resource
+            self._index(resource)
         return resource
 
     def remove(self, oid):
@@ -549,9 +859,15 @@ class FakedBaseManager(object):
             The object ID of the resource (e.g. value of the 'object-uri'
             property).
         """
-        uri = self._resources[oid].uri
-        del self._resources[oid]
-        del self._hmc.all_resources[uri]
+        with self._lock.write():
+            resource = self._resources[oid]
+            uri = resource.uri
+            self._hmc._save_object_state(self)
+            self._hmc._save_uri(uri)
+            self._unindex(resource)
+            del self._resources[oid]
+            del self._positions[oid]
+            del self._hmc.all_resources[uri]
 
     def list(self, filter_args=None):
         """
@@ -567,12 +883,20 @@ class FakedBaseManager(object):
           list of FakedBaseResource: The faked resource objects of this
             manager.
         """
-        res = list()
-        for oid in self._resources:
-            resource = self._resources[oid]
-            if self._matches_filters(resource, filter_args):
-                res.append(resource)
-        return res
+        with self._lock.read():
+            if filter_args:
+                oids = self._indexed_oids(filter_args)
+                if oids is not None:
+                    oids = sorted(oids, key=self._positions.__getitem__)
+                    return [self._resources[oid] for oid in oids
+                            if self._matches_filters(self._resources[oid],
+                                                     filter_args)]
+            res = list()
+            for oid in self._resources:
+                resource = self._resources[oid]
+                if self._matches_filters(resource, filter_args):
+                    res.append(resource)
+            return res
 
     def lookup_by_oid(self, oid):
         """
@@ -593,6 +917,99 @@ class FakedBaseManager(object):
         """
         return self._resources[oid]
 
+    def _indexed_oids(self, filter_args):
+        """
+        Return the object IDs of the faked resources that may match a set of
+        filter arguments, from the indexes of the properties in the filter
+        arguments that are matched against values without special characters
+        for regular expressions.
+
+        Returns:
+          set of string: The object IDs, or `None` if none of the filter
+            arguments can be looked up in an index.
+        """
+        oids = None
+        for prop_name in filter_args:
+            if prop_name not in self.indexed_props:
+                continue
+            prop_match = filter_args[prop_name]
+            if not isinstance(prop_match, (list, tuple)):
+                prop_match = [prop_match]
+            if not all(is_literal_match(pm) for pm in prop_match):
+                continue
+            index = self._get_index(prop_name)
+            prop_oids = set()
+            for pm in prop_match:
+                prop_oids.update(index.get(pm, ()))
+                # The '$' added by _matches_prop() also matches before a
+                # newline at the end of the property value.
+                prop_oids.update(index.get(pm + '\n', ()))
+            oids = prop_oids if oids is None else oids & prop_oids
+        return oids
+
+    def _valid_indexes(self):
+        """
+        Return the property indexes of this manager, after discarding them if
+        a snapshot of the faked HMC was restored since they were built.
+        """
+        generation = self._hmc._generation
+        if self._indexes_generation != generation:
+            self._indexes = {}
+            self._indexes_generation = generation
+        return self._indexes
+
+    def _get_index(self, prop_name):
+        """
+        Return the index for a resource property, building it if needed.
+
+        Must be called with the lock held at least for reading. Threads that
+        hold the lock for reading may build the same index concurrently.
+        """
+        indexes = self._valid_indexes()
+        index = indexes.get(prop_name)
+        if index is None:
+            index = indexes[prop_name] = {}
+            for resource in self._resources.values():
+                self._add_to_index(index, prop_name, resource)
+        return index
+
+    @staticmethod
+    def _add_to_index(index, prop_name, resource):
+        try:
+            value = resource.properties[prop_name]
+            index.setdefault(value, set()).add(resource.oid)
+        except (KeyError, TypeError):
+            # Resources without the property or with an unhashable value
+            # cannot match a value from an index.
+            pass
+
+    def _index(self, resource):
+        """
+        Add a faked resource of this manager to the property indexes.
+
+        Must be called with the lock held for writing.
+        """
+        if self._indexes and self._resources.get(resource.oid) is resource:
+            for prop_name, index in six.iteritems(self._valid_indexes()):
+                self._add_to_index(index, prop_name, resource)
+
+    def _unindex(self, resource):
+        """
+        Remove a faked resource of this manager from the property indexes.
+
+        Must be called with the lock held for writing.
+        """
+        if self._indexes and self._resources.get(resource.oid) is resource:
+            for prop_name, index in six.iteritems(self._valid_indexes()):
+                try:
+                    value = resource.properties[prop_name]
+                    oids = index[value]
+                except (KeyError, TypeError):
+                    continue
+                oids.discard(resource.oid)
+                if not oids:
+                    del index[value]
+
 
 class FakedHmc(FakedBaseResource):
     """
@@ -616,6 +1033,10 @@ class FakedHmc(FakedBaseResource):
 
     def __init__(self, hmc_name, hmc_version, api_version):
         super(FakedHmc, self).__init__(manager=None, properties=None)
+        self._snapshot = None  # _Snapshot object, if a snapshot is active
+        self._snapshot_lock = threading.Lock()  # For saving object states
+        self._generation = 0  # Incremented when a snapshot is restored
+        self._lock = _RWLock()
         self.hmc_name = hmc_name
         self.hmc_version = hmc_version
         self.api_version = api_version
@@ -623,6 +1044,10 @@ class FakedHmc(FakedBaseResource):
         self.metrics_contexts = FakedMetricsContextManager(
             hmc=self, client=self)
         self.consoles = FakedConsoleManager(hmc=self, client=self)
+        self.jobs = FakedJobManager(hmc=self)
+
+        # Virtual clock for the durations of the faked jobs
+        self.clock = VirtualClock()
 
         # Flat list of all Faked{Resource} objs in this faked HMC, by URI:
         self.all_resources = {}
@@ -642,6 +1067,7 @@ class FakedHmc(FakedBaseResource):
             "  cpcs = {cpcs}\n"
             "  metrics_contexts = {metrics_contexts}\n"
             "  consoles = {consoles}\n"
+            "  jobs = {jobs}\n"
             "  all_resources (keys only) = {all_resource_keys}\n"
             ")".format(
                 classname=self.__class__.__name__,
@@ -653,6 +1079,7 @@ class FakedHmc(FakedBaseResource):
                 cpcs=repr_manager(self.cpcs, indent=2),
                 metrics_contexts=repr_manager(self.metrics_contexts, indent=2),
                 consoles=repr_manager(self.consoles, indent=2),
+                jobs=repr_manager(self.jobs, indent=2),
                 all_resource_keys=repr_list(self.all_resources.keys(),
                                             indent=2),
             ))
@@ -665,10 +1092,44 @@ class FakedHmc(FakedBaseResource):
         """
         return self._enabled
 
+    @property
+    def lock(self):
+        """
+        The reader-writer lock of this faked HMC.
+
+        The URI handlers of the mock support hold the lock for reading during
+        GET operations and for writing during all other operations, so that
+        each operation sees and leaves a consistent state of the faked HMC,
+        including operations that change multiple resources (e.g. "Modify
+        Storage Group Properties"), while operations can be performed
+        concurrently in multiple threads.
+
+        In addition, each faked resource manager has its own lock for adding,
+        removing and listing its resources and for changes to the properties
+        of its resources, so that the methods of the faked resource and
+        manager classes can be used concurrently. Code that changes multiple
+        faked resources while the faked HMC is in use by other threads, and
+        that needs these changes to be atomic, can hold this lock for
+        writing.
+
+        The lock has methods ``read()`` and ``write()`` that return context
+        managers that hold the lock for reading or for writing, respectively.
+        The lock is reentrant.
+
+        Example::
+
+            with hmc.lock.write():
+                cpc.properties['status'] = 'not-operating'
+                for partition in cpc.partitions.list():
+                    partition.properties['status'] = 'stopped'
+        """
+        return self._lock
+
     def enable(self):
         """
         Enable the faked HMC.
         """
+        self._save_state()
         self._enabled = True
 
     def disable(self):
@@ -676,8 +1137,113 @@ class FakedHmc(FakedBaseResource):
         Disable the faked HMC. This will cause an error to be raised when
         a faked session attempts to communicate with the disabled HMC.
         """
+        self._save_state()
         self._enabled = False
 
+    def snapshot(self):
+        """
+        Take a snapshot of the state of this faked HMC, including all of its
+        faked resources, that can be restored with :meth:`restore` any
+        number of times.
+
+        This allows building a faked HMC with a large topology once, and
+        restoring its state before each test, instead of building the faked
+        HMC for each test.
+
+        Taking a snapshot converts the dicts and lists in the properties of
+        all faked resources to objects that track changes. Each object of
+        the faked HMC saves its state when it is changed for the first time
+        after the snapshot was taken, so that restoring the snapshot only
+        needs to process the objects that have changed. Taking a snapshot
+        replaces any previous snapshot.
+
+        The faked resource and manager objects keep their identity when the
+        snapshot is restored, but dicts or lists obtained from resource
+        properties before :meth:`snapshot` or :meth:`restore` was called must
+        not be used afterwards. Resources that are added after the snapshot
+        was taken are no longer in the faked HMC after it is restored.
+        Changes to mutable property values other than dicts and lists, and
+        changes that bypass the methods of the faked resource and manager
+        classes, are not tracked.
+
+        Example::
+
+            # Once, e.g. in a module-scoped fixture:
+            session = zhmcclient_mock.FakedSession(
+                'fake-host', 'fake-hmc', '2.13.1', '1.8')
+            session.hmc.add_resources(LARGE_TOPOLOGY)
+            session.hmc.snapshot()
+
+            # Before each test:
+            session.hmc.restore()
+        """
+        with self._lock.write():
+            self._snapshot = None
+            resources = [self]
+            while resources:
+                resource = resources.pop()
+                resource._properties = _tracked_properties(
+                    resource._properties, resource)
+                for value in vars(resource).values():
+                    if isinstance(value, FakedBaseManager) and \
+                            value is not resource.manager:
+                        resources.extend(value._resources.values())
+            self._snapshot = _Snapshot()
+
+    def restore(self):
+        """
+        Restore the state of this faked HMC to the snapshot taken with
+        :meth:`snapshot`.
+
+        The snapshot remains active, so it can be restored again.
+
+        Raises:
+          ValueError: No snapshot has been taken.
+        """
+        with self._lock.write():
+            snapshot = self._snapshot
+            if snapshot is None:
+                raise ValueError("No snapshot has been taken of the faked "
+                                 "HMC")
+            self._snapshot = _Snapshot()
+            self._generation += 1
+            for obj, state in snapshot.states.values():
+                obj._set_state(state)
+            for uri, resource in six.iteritems(snapshot.uris):
+                if resource is None:
+                    del self.all_resources[uri]
+                else:
+                    self.all_resources[uri] = resource
+
+    def _save_object_state(self, obj):
+        """
+        Save the state of a faked resource or manager of this faked HMC
+        before it is changed for the first time after a snapshot was taken.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and id(obj) not in snapshot.states:
+            with self._snapshot_lock:
+                if id(obj) not in snapshot.states:
+                    snapshot.states[id(obj)] = (obj, obj._get_state())
+
+    def _save_uri(self, uri):
+        """
+        Save the resource for a URI in the flat list of all resources before
+        it is changed for the first time after a snapshot was taken.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and uri not in snapshot.uris:
+            with self._snapshot_lock:
+                if uri not in snapshot.uris:
+                    snapshot.uris[uri] = self.all_resources.get(uri)
+
+    def _get_state(self):
+        return self._enabled, super(FakedHmc, self)._get_state()
+
+    def _set_state(self, state):
+        self._enabled, properties = state
+        super(FakedHmc, self)._set_state(properties)
+
     def lookup_by_uri(self, uri):
         """
         Look up a faked resource by its object URI, within this faked HMC.
@@ -1852,6 +2418,293 @@ class FakedHba(FakedBaseResource):
             properties=properties)
 
 
+class FakedJobManager(FakedBaseManager):
+    """
+    A manager for faked jobs of asynchronous operations within a faked HMC
+    (see :class:`zhmcclient_mock.FakedHmc`).
+
+    Derived from :class:`zhmcclient_mock.FakedBaseManager`, see there for
+    common methods and attributes.
+
+    When an asynchronous operation (e.g. "Start Partition") is performed
+    without waiting for its completion, the operation is performed right
+    away, and a faked job is created that completes when the duration of
+    the operation has passed on the virtual clock of the faked HMC (see
+    :attr:`zhmcclient_mock.FakedHmc.clock`). While the job is running, the
+    'status' property of the target resource of the operation has a
+    transitional value (e.g. 'starting'), or its value from before the
+    operation. When the job completes, the 'status' property is set to its
+    value after the operation.
+
+    The jobs whose completion time has been reached are completed by
+    :meth:`process`, which is called by the URI handlers of the mock support
+    before each operation.
+
+    The durations of the operations are configured in :attr:`durations` and
+    :attr:`default_duration`. By default, the duration of all operations is
+    0, so that their jobs complete with the next operation.
+
+    Example::
+
+        hmc.clock.speed = 0  # only advance() changes the virtual time
+        hmc.jobs.durations['partition/start'] = 30
+
+        job = partition.start(wait_for_completion=False)
+        # partition status is now 'starting'
+        hmc.clock.advance(30)
+        hmc.jobs.process()
+        # partition status is now 'active', and the job is complete
+    """
+
+    # Transitional values of the 'status' property of the target resource
+    # of an operation while its job is running, by operation key (see
+    # durations). The target resources of other operations keep their
+    # status from before the operation while the job is running. Can be
+    # changed for a manager class or object.
+    transitional_statuses = {
+        'partition/start': 'starting',
+        'partition/stop': 'stopping',
+    }
+
+    def __init__(self, hmc):
+        super(FakedJobManager, self).__init__(
+            hmc=hmc,
+            parent=hmc,
+            resource_class=FakedJob,
+            base_uri=self.api_root + '/jobs',
+            oid_prop='job-id',
+            uri_prop='job-uri',
+            class_value=None)
+
+        # Durations of the operations in seconds of virtual time, by
+        # operation key. The operation key is the value of the 'class'
+        # property of the target resource and the last segment of the
+        # operation URI, separated by '/' (e.g. 'partition/start').
+        self.durations = {}
+
+        # Duration in seconds of virtual time of the operations that are not
+        # in self.durations.
+        self.default_duration = 0
+
+        # Heap of the running jobs, as tuples(completion time, sequence
+        # number, job).
+        self._running = []
+        self._sequence = 0
+
+        # Functions that are called with each completed job.
+        self._callbacks = []
+
+    def _get_state(self):
+        state = super(FakedJobManager, self)._get_state()
+        state['_running'] = list(self._running)
+        return state
+
+    def add_completion_callback(self, callback):
+        """
+        Add a function that is called with each faked job when it completes,
+        e.g. for sending job completion notifications.
+
+        The function is called without holding the lock of the faked HMC.
+
+        Parameters:
+
+          callback (callable): Function with the completed
+            :class:`~zhmcclient_mock.FakedJob` object as its only argument.
+        """
+        self._callbacks.append(callback)
+
+    def remove_completion_callback(self, callback):
+        """
+        Remove a function that was added with
+        :meth:`add_completion_callback`.
+
+        Parameters:
+
+          callback (callable): The function.
+
+        Raises:
+          ValueError: The function was not added.
+        """
+        self._callbacks.remove(callback)
+
+    def start_job(self, op_method, op_uri, operation,
+                  notification_topic=None):
+        """
+        Perform an asynchronous operation and create a faked job for it.
+
+        Parameters:
+
+          op_method (:term:`string`): HTTP method of the operation (e.g.
+            'POST').
+
+          op_uri (:term:`string`): URI of the operation (e.g.
+            '/api/partitions/1/operations/start').
+
+          operation (callable): Function without arguments that performs the
+            operation and returns the results of the job, or `None`.
+            Exceptions raised by the function are propagated, and no job is
+            created in that case.
+
+          notification_topic (:term:`string`): Name of the job notification
+            topic of the API session that performed the operation, or
+            `None`.
+
+        Returns:
+          :class:`~zhmcclient_mock.FakedJob`: The faked job, with status
+            'running'.
+        """
+        hmc = self.hmc
+        with hmc.lock.write():
+            target_uri, _, op_name = op_uri.partition('/operations/')
+            target = hmc.all_resources.get(target_uri)
+            old_status = target.properties.get('status') if target else None
+            results = operation()
+
+            if target is not None:
+                op_key = '{}/{}'.format(target.properties.get('class'),
+                                        op_name)
+            else:
+                op_key = op_name
+            duration = self.durations.get(op_key, self.default_duration)
+
+            job = self.add({'status': 'running'})
+            job._op_method = op_method
+            job._op_uri = op_uri
+            job._results = results
+            job._completion_time = hmc.clock.time() + duration
+            job._notification_topic = notification_topic
+            if target is not None and duration > 0:
+                new_status = target.properties.get('status')
+                if new_status != old_status:
+                    status = self.transitional_statuses.get(op_key,
+                                                            old_status)
+                    target.properties['status'] = status
+                    job._status_change = (target_uri, status, new_status)
+
+            heapq.heappush(self._running,
+                           (job._completion_time, self._sequence, job))
+            self._sequence += 1
+        return job
+
+    def process(self):
+        """
+        Complete the running faked jobs whose completion time has been
+        reached on the virtual clock of the faked HMC, and call the
+        completion callbacks for them.
+
+        Jobs are not completed if the current thread holds the lock of the
+        faked HMC, so that the completion callbacks are never called with
+        the lock held.
+
+        Returns:
+          list of :class:`~zhmcclient_mock.FakedJob`: The completed jobs.
+        """
+        hmc = self.hmc
+        if not self._due(hmc.clock.time()) or hmc.lock.held():
+            return []
+        completed = []
+        with hmc.lock.write():
+            now = hmc.clock.time()
+            if self._due(now):
+                hmc._save_object_state(self)
+            while self._due(now):
+                _, _, job = heapq.heappop(self._running)
+                self._complete(job)
+                completed.append(job)
+        for job in completed:
+            for callback in list(self._callbacks):
+                callback(job)
+        return completed
+
+    def _due(self, now):
+        """
+        Return whether the first running job has reached its completion time.
+        """
+        try:
+            return self._running[0][0] <= now
+        except IndexError:
+            return False
+
+    def _complete(self, job):
+        """
+        Complete a running faked job.
+
+        Must be called with the lock of the faked HMC held for writing.
+        """
+        properties = {
+            'status': 'complete',
+            'job-status-code': 200 if job._results is not None else 204,
+            'job-reason-code': None,
+        }
+        if job._results is not None:
+            properties['job-results'] = job._results
+        job.update(properties)
+        if job._status_change is not None:
+            target_uri, status, new_status = job._status_change
+            target = self.hmc.all_resources.get(target_uri)
+            # The status is not changed if the resource was removed or its
+            # status was changed otherwise while the job was running
+            if target is not None and \
+                    target.properties.get('status') == status:
+                target.properties['status'] = new_status
+
+
+class FakedJob(FakedBaseResource):
+    """
+    A faked job of an asynchronous operation within a faked HMC (see
+    :class:`zhmcclient_mock.FakedJobManager`).
+
+    Derived from :class:`zhmcclient_mock.FakedBaseResource`, see there for
+    common methods and attributes.
+
+    The 'status' property of the job is 'running' or 'complete'. When the
+    job is complete, it also has the properties 'job-status-code',
+    'job-reason-code' and 'job-results' (if the operation has results).
+    """
+
+    def __init__(self, manager, properties):
+        super(FakedJob, self).__init__(
+            manager=manager,
+            properties=properties)
+        self._op_method = None
+        self._op_uri = None
+        self._results = None
+        self._completion_time = None
+        self._notification_topic = None
+        # tuple(URI of target resource, transitional status, final status)
+        self._status_change = None
+
+    @property
+    def op_method(self):
+        """
+        :term:`string`: HTTP method of the operation of this job.
+        """
+        return self._op_method
+
+    @property
+    def op_uri(self):
+        """
+        :term:`string`: URI of the operation of this job.
+        """
+        return self._op_uri
+
+    @property
+    def completion_time(self):
+        """
+        float: Time on the virtual clock of the faked HMC when this job
+        completes.
+        """
+        return self._completion_time
+
+    @property
+    def notification_topic(self):
+        """
+        :term:`string`: Name of the job notification topic of the API
+        session that performed the operation of this job, or `None`.
+        """
+        return self._notification_topic
+
+
 class FakedLparManager(FakedBaseManager):
     """
     A manager for faked LPAR resources within a faked HMC (see
@@ -2124,6 +2977,7 @@ class FakedPartition(FakedBaseResource):
             hmc=manager.hmc, partition=self)
         self._devno_pool = IdPool(0x8000, 0xFFFF)
         self._wwpn_pool = IdPool(0x8000, 0xFFFF)
+        self._pool_lock = threading.Lock()  # For the ID pools
 
     def __repr__(self):
         """
@@ -2178,6 +3032,15 @@ class FakedPartition(FakedBaseResource):
         """
         return self._virtual_functions
 
+    def _get_state(self):
+        return (super(FakedPartition, self)._get_state(),
+                copy.deepcopy(self._devno_pool),
+                copy.deepcopy(self._wwpn_pool))
+
+    def _set_state(self, state):
+        properties, self._devno_pool, self._wwpn_pool = state
+        super(FakedPartition, self)._set_state(properties)
+
     def devno_alloc(self):
         """
         Allocates a device number unique to this partition, in the range of
@@ -2189,7 +3052,9 @@ class FakedPartition(FakedBaseResource):
         Raises:
           ValueError: No more device numbers available in that range.
         """
-        devno_int = self._devno_pool.alloc()
+        with self._pool_lock:
+            self._save_state()
+            devno_int = self._devno_pool.alloc()
         devno = "{:04X}".format(devno_int)
         return devno
 
@@ -2207,7 +3072,9 @@ class FakedPartition(FakedBaseResource):
             allocated.
         """
         devno_int = int(devno, 16)
-        self._devno_pool.free(devno_int)
+        with self._pool_lock:
+            self._save_state()
+            self._devno_pool.free(devno_int)
 
     def devno_free_if_allocated(self, devno):
         """
@@ -2220,7 +3087,9 @@ class FakedPartition(FakedBaseResource):
           devno (string): The device number as four hexadecimal digits.
         """
         devno_int = int(devno, 16)
-        self._devno_pool.free_if_allocated(devno_int)
+        with self._pool_lock:
+            self._save_state()
+            self._devno_pool.free_if_allocated(devno_int)
 
     def wwpn_alloc(self):
         """
@@ -2233,7 +3102,9 @@ class FakedPartition(FakedBaseResource):
         Raises:
           ValueError: No more WWPNs available in that range.
         """
-        wwpn_int = self._wwpn_pool.alloc()
+        with self._pool_lock:
+            self._save_state()
+            wwpn_int = self._wwpn_pool.alloc()
         wwpn = "AFFEAFFE0000" + "{:04X}".format(wwpn_int)
         return wwpn
 
@@ -2251,7 +3122,9 @@ class FakedPartition(FakedBaseResource):
             allocated.
         """
         wwpn_int = int(wwpn[-4:], 16)
-        self._wwpn_pool.free(wwpn_int)
+        with self._pool_lock:
+            self._save_state()
+            self._wwpn_pool.free(wwpn_int)
 
     def wwpn_free_if_allocated(self, wwpn):
 
@@ -2265,7 +3138,9 @@ class FakedPartition(FakedBaseResource):
           WWPN (string): The WWPN as 16 hexadecimal digits.
         """
         wwpn_int = int(wwpn[-4:], 16)
-        self._wwpn_pool.free_if_allocated(wwpn_int)
+        with self._pool_lock:
+            self._save_state()
+            self._wwpn_pool.free_if_allocated(wwpn_int)
 
 
 class FakedPortManager(FakedBaseManager):
@@ -2817,6 +3692,16 @@ class FakedMetricsContextManager(FakedBaseManager):
         """
         return super(FakedMetricsContextManager, self).add(properties)
 
+    def _get_state(self):
+        state = super(FakedMetricsContextManager, self)._get_state()
+        state['_metric_group_def_names'] = list(self._metric_group_def_names)
+        state['_metric_group_defs'] = dict(self._metric_group_defs)
+        state['_metric_value_names'] = list(self._metric_value_names)
+        state['_metric_values'] = dict(
+            (name, list(values))
+            for name, values in six.iteritems(self._metric_values))
+        return state
+
     def add_metric_group_definition(self, definition):
         """
         Add a faked metric group definition.
@@ -2844,6 +3729,7 @@ class FakedMetricsContextManager(FakedBaseManager):
         if group_name in self._metric_group_defs:
             raise ValueError("A metric group definition with this name "
                              "already exists: {}".format(group_name))
+        self._hmc._save_object_state(self)
         self._metric_group_defs[group_name] = definition
         self._metric_group_def_names.append(group_name)
 
@@ -2896,6 +3782,7 @@ class FakedMetricsContextManager(FakedBaseManager):
         """
         assert isinstance(values, FakedMetricObjectValues)
         group_name = values.group_name
+        self._hmc._save_object_state(self)
         if group_name not in self._metric_values:
             self._metric_values[group_name] = []
         self._metric_values[group_name].append(values)
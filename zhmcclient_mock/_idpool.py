@@ -22,15 +22,21 @@ from __future__ import absolute_import
 
 __all__ = ['IdPool']
 
+_FREE = b'\x00'
+_USED = b'\x01'
+
 
 class IdPool(object):
     """
     A pool of integer ID values from a defined value range.
 
-    The IDs can be allocated from and returned to the pool.
+    The IDs can be allocated from and returned to the pool, individually or
+    in bulk, and ranges of IDs can be reserved. The lowest free ID values are
+    allocated first, so the allocation is deterministic.
 
-    The pool is optimized for memory consumption, by only materializing ID
-    values as needed.
+    The pool is optimized for memory consumption, by keeping the state of
+    the ID values in a byte array that only extends up to the highest ID
+    value that has been allocated so far.
     """
 
     def __init__(self, lowest, highest):
@@ -50,50 +56,139 @@ class IdPool(object):
         self._range_start = lowest
         self._range_end = highest + 1
 
-        # The ID values in use.
-        self._used = set()
+        # State of the ID values, with the byte at index i being 1 if ID
+        # value (lowest + i) is in use, and 0 if it is free. ID values beyond
+        # the end of the array are free.
+        self._used = bytearray()
 
-        # Free pool: The ID values that are free and materialized.
-        self._free = set()
+        # Number of ID values in use.
+        self._count = 0
 
-        # Start of new free ID values to be materialized when the free pool is
-        # expanded.
-        self._expand_start = lowest
+        # Index in the array where the search for a free ID value starts. All
+        # ID values before it are in use.
+        self._search_start = 0
 
-        # Expansion chunk size: Number of new free ID values to be materialized
-        # when the free pool is expanded.
-        self._expand_len = 10
+    @property
+    def lowest(self):
+        """
+        integer: Lowest value of the ID value range.
+        """
+        return self._range_start
 
-    def _expand(self):
+    @property
+    def highest(self):
         """
-        Expand the free pool, if possible.
+        integer: Highest value of the ID value range.
+        """
+        return self._range_end - 1
 
-        If out of capacity w.r.t. the defined ID value range, ValueError is
-        raised.
+    @property
+    def allocated_count(self):
         """
-        assert not self._free  # free pool is empty
-        expand_end = self._expand_start + self._expand_len
-        if expand_end > self._range_end:
-            # This happens if the size of the value range is not a multiple
-            # of the expansion chunk size.
-            expand_end = self._range_end
-        if self._expand_start == expand_end:
-            raise ValueError("Out of capacity in ID pool")
-        self._free = set(range(self._expand_start, expand_end))
-        self._expand_start = expand_end
+        integer: Number of ID values that are currently allocated.
+        """
+        return self._count
+
+    def is_allocated(self, id):
+        """
+        Return a boolean indicating whether an ID value is currently
+        allocated.
+        """
+        index = id - self._range_start
+        return 0 <= index < len(self._used) and self._used[index] == 1
 
     def alloc(self):
         """
-        Allocate an ID value and return it.
+        Allocate the lowest free ID value and return it.
 
         Raises:
             ValueError: Out of capacity in ID pool.
         """
-        if not self._free:
-            self._expand()
-        id = self._free.pop()
-        self._used.add(id)
-        return id
+        used = self._used
+        index = used.find(_FREE, self._search_start)
+        if index < 0:
+            index = len(used)
+            if self._range_start + index >= self._range_end:
+                raise ValueError("Out of capacity in ID pool")
+            used.append(1)
+        else:
+            used[index] = 1
+        self._search_start = index + 1
+        self._count += 1
+        return self._range_start + index
+
+    def alloc_many(self, count):
+        """
+        Allocate the lowest free ID values and return them.
+
+        Either all or none of the ID values are allocated.
+
+        Parameters:
+
+          count (integer): Number of ID values to allocate.
+
+        Returns:
+            list of integer: The allocated ID values, in ascending order.
+
+        Raises:
+            ValueError: Out of capacity in ID pool.
+        """
+        if count > self._range_end - self._range_start - self._count:
+            raise ValueError("Out of capacity in ID pool")
+        used = self._used
+        indexes = []
+        index = self._search_start
+        while len(indexes) < count:
+            index = used.find(_FREE, index)
+            if index < 0:
+                # Extend the array by the remaining ID values in one step
+                index = len(used)
+                remaining = count - len(indexes)
+                used.extend(_USED * remaining)
+                indexes.extend(range(index, index + remaining))
+                index += remaining
+                break
+            used[index] = 1
+            indexes.append(index)
+            index += 1
+        self._search_start = index
+        self._count += count
+        return [self._range_start + i for i in indexes]
+
+    def reserve(self, lowest, highest=None):
+        """
+        Allocate a specific range of ID values.
+
+        Either all or none of the ID values are allocated.
+
+        Parameters:
+
+          lowest (integer): Lowest value of the range to be reserved.
+
+          highest (integer): Highest value of the range to be reserved.
+            `None` means to reserve only the lowest value.
+
+        Raises:
+            ValueError: Range not within the range of the pool, or an ID
+              value in the range is already allocated.
+        """
+        if highest is None:
+            highest = lowest
+        if lowest > highest or lowest < self._range_start or \
+                highest >= self._range_end:
+            raise ValueError("ID value range to be reserved is not within "
+                             "the ID pool: %d - %d" % (lowest, highest))
+        used = self._used
+        start = lowest - self._range_start
+        end = highest + 1 - self._range_start
+        index = used.find(_USED, start, end)
+        if index >= 0:
+            raise ValueError("ID value to be reserved is already "
+                             "allocated: %d" % (self._range_start + index))
+        if end > len(used):
+            used.extend(bytearray(end - len(used)))
+        used[start:end] = _USED * (end - start)
+        self._count += end - start
 
     def free(self, id):
         """
@@ -106,6 +201,24 @@ class IdPool(object):
         """
         self._free_impl(id, fail_if_not_allocated=True)
 
+    def free_many(self, ids):
+        """
+        Free ID values.
+
+        The ID values must be allocated. Either all or none of the ID values
+        are freed.
+
+        Raises:
+            ValueError: An ID value to be freed is not currently allocated.
+        """
+        ids = set(ids)
+        for id in ids:
+            if not self.is_allocated(id):
+                raise ValueError("ID value to be freed is not currently "
+                                 "allocated: %d" % id)
+        for id in ids:
+            self._free_impl(id, fail_if_not_allocated=True)
+
     def free_if_allocated(self, id):
         """
         Free an ID value, if it is currently allocated.
@@ -115,9 +228,12 @@ class IdPool(object):
         self._free_impl(id, fail_if_not_allocated=False)
 
     def _free_impl(self, id, fail_if_not_allocated):
-        if id in self._used:
-            self._used.remove(id)
-            self._free.add(id)
+        if self.is_allocated(id):
+            index = id - self._range_start
+            self._used[index] = 0
+            self._count -= 1
+            if index < self._search_start:
+                self._search_start = index
         elif fail_if_not_allocated:
             raise ValueError("ID value to be freed is not currently "
                              "allocated: %d" % id)
@@ -0,0 +1,308 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The :class:`~zhmcclient_mock.FaultInjector` class injects latency and
+failures into the operations of a faked session, in order to make the
+faked HMC behave more like a real HMC in a real network. This is used for
+example to evaluate the effect of parallelism, caching, timeouts and retries
+in code that uses the zhmcclient package.
+"""
+
+from __future__ import absolute_import
+
+import re
+import time
+import random
+import threading
+
+__all__ = ['FaultInjector']
+
+
+# Valid failure kinds
+_FAILURES = ('unavailable', 'connection-reset', 'session-expired')
+
+
+class _Rule(object):
+    """
+    A latency or failure rule of a FaultInjector, that applies to the HTTP
+    operations matching a method and URI pattern.
+    """
+
+    def __init__(self, method, uri, value, probability=1.0, count=None):
+        self.method = method.upper() if method else None
+        self.uri_pattern = re.compile(uri + '$') if uri else None
+        self.value = value
+        self.probability = probability
+        self.count = count  # remaining count, or None for unlimited
+
+    def matches(self, method, uri):
+        if self.method is not None and self.method != method.upper():
+            return False
+        if self.uri_pattern is not None and \
+                not self.uri_pattern.match(uri.split('?', 1)[0]):
+            return False
+        return True
+
+
+class FaultInjector(object):
+    """
+    An injector for latency and failures into the HTTP operations performed
+    against a faked HMC by a :class:`~zhmcclient_mock.FakedSession` object.
+
+    A fault injector is attached to a faked session via its
+    :attr:`~zhmcclient_mock.FakedSession.fault_injector` property. Without a
+    fault injector, a faked session answers each operation instantly and
+    successfully.
+
+    The following can be injected:
+
+    * Latency, per HTTP method and URI pattern (see :meth:`add_latency`).
+      It is simulated by sleeping, which releases the GIL, so the effect of
+      performing operations in multiple threads can be measured.
+
+    * A bandwidth limit for the request and response bodies (see
+      :meth:`set_bandwidth`).
+
+    * Failures, per HTTP method and URI pattern (see :meth:`add_failure`).
+      The faked session reacts to them like :class:`zhmcclient.Session`
+      reacts to the corresponding real failures: An expired API session
+      token causes a re-logon and a retry of the operation, a connection
+      reset causes retries up to the
+      :attr:`~zhmcclient.RetryTimeoutConfig.read_retries` limit of the
+      session for the HTTP methods in its
+      :attr:`~zhmcclient.RetryTimeoutConfig.method_whitelist` and is
+      surfaced to the caller for other methods, and a service unavailable
+      error is surfaced to the caller.
+
+    The random choices are made using a random number generator that is
+    initialized with the `seed` init parameter. The fault injector can be
+    used by multiple threads concurrently.
+
+    Example::
+
+        injector = zhmcclient_mock.FaultInjector(seed=1)
+        injector.add_latency((0.01, 0.03), method='get')
+        injector.add_latency(0.2, method='post', uri='/api/partitions/.*')
+        injector.set_bandwidth(10 * 1024 * 1024)
+        injector.add_failure('session-expired', count=1)
+        injector.add_failure('unavailable', probability=0.01)
+
+        session = zhmcclient_mock.FakedSession(
+            'fake-host', 'fake-hmc', '2.13.1', '1.8')
+        session.fault_injector = injector
+    """
+
+    def __init__(self, seed=None, sleep=None):
+        """
+        Parameters:
+
+          seed: Seed for the random number generator. `None` causes
+            different random choices to be made each time.
+
+          sleep (callable): Function that is called with the number of
+            seconds to sleep, for simulating latency and transfer time.
+            `None` means to use :func:`py:time.sleep`. Tests that only want
+            to verify the simulated time can provide a function that
+            accumulates the time instead of sleeping.
+        """
+        self._rng = random.Random(seed)
+        self._sleep = sleep or time.sleep
+        self._lock = threading.Lock()
+        self._latency_rules = []
+        self._failure_rules = []
+        self._bandwidth = None
+        self._injected = dict((failure, 0) for failure in _FAILURES)
+
+    def add_latency(self, latency, method=None, uri=None):
+        """
+        Add a latency rule.
+
+        For each operation, the first latency rule that matches the HTTP
+        method and URI of the operation determines its latency. Operations
+        that do not match any latency rule have no latency.
+
+        Parameters:
+
+          latency: The latency in seconds, as one of:
+
+            * A number: Constant latency.
+            * A tuple (min, max): Latency drawn from a uniform distribution
+              between min and max.
+            * A callable: It is called with the random number generator
+              (:class:`py:random.Random`) and returns the latency, e.g.
+              ``lambda rng: rng.lognormvariate(-3.0, 0.5)``.
+
+          method (:term:`string`): HTTP method to which the rule applies
+            (case insensitive). `None` means all methods.
+
+          uri (:term:`string`): Regular expression that must match the entire
+            URI path (without query parameters) to which the rule applies.
+            `None` means all URIs.
+        """
+        with self._lock:
+            self._latency_rules.append(_Rule(method, uri, latency))
+
+    def set_bandwidth(self, bytes_per_second):
+        """
+        Set the bandwidth limit for the request and response bodies.
+
+        The transfer time of the JSON-encoded request and response bodies at
+        this bandwidth is added to the latency of each operation.
+
+        Parameters:
+
+          bytes_per_second (:term:`number`): Bandwidth in bytes per second.
+            `None` means no bandwidth limit.
+        """
+        if bytes_per_second is not None and bytes_per_second <= 0:
+            raise ValueError("Invalid bandwidth: {}".format(bytes_per_second))
+        with self._lock:
+            self._bandwidth = bytes_per_second
+
+    def add_failure(self, failure, probability=1.0, count=None, method=None,
+                    uri=None):
+        """
+        Add a failure rule.
+
+        For each attempt to perform an operation, the failure rules that match
+        the HTTP method and URI of the operation are evaluated in the order
+        they were added, and the first rule that triggers determines the
+        injected failure.
+
+        Parameters:
+
+          failure (:term:`string`): The kind of failure, as one of:
+
+            * 'unavailable': The HMC returns HTTP status 503 (Service
+              Unavailable).
+            * 'connection-reset': The connection is reset by the HMC.
+            * 'session-expired': The HMC returns HTTP status 403 with reason
+              code 5 (API session token expired). This is not injected into
+              operations that do not require to be logged on.
+
+          probability (:term:`number`): Probability for the failure to be
+            injected into a matching operation, between 0 and 1.
+
+          count (:term:`integer`): Maximum number of times the failure is
+            injected. `None` means there is no limit.
+
+          method (:term:`string`): HTTP method to which the rule applies
+            (case insensitive). `None` means all methods.
+
+          uri (:term:`string`): Regular expression that must match the entire
+            URI path (without query parameters) to which the rule applies.
+            `None` means all URIs.
+        """
+        if failure not in _FAILURES:
+            raise ValueError("Invalid failure kind: {!r}".format(failure))
+        if not 0 <= probability <= 1:
+            raise ValueError("Invalid probability: {}".format(probability))
+        with self._lock:
+            self._failure_rules.append(
+                _Rule(method, uri, failure, probability, count))
+
+    def clear(self):
+        """
+        Remove all latency and failure rules and the bandwidth limit, and
+        reset the counters of injected failures.
+        """
+        with self._lock:
+            self._latency_rules = []
+            self._failure_rules = []
+            self._bandwidth = None
+            self._injected = dict((failure, 0) for failure in _FAILURES)
+
+    @property
+    def bandwidth(self):
+        """
+        :term:`number`: The bandwidth limit in bytes per second, or `None`
+        for no bandwidth limit.
+        """
+        return self._bandwidth
+
+    @property
+    def injected(self):
+        """
+        dict: The number of injected failures so far, by kind of failure.
+        """
+        with self._lock:
+            return dict(self._injected)
+
+    def failure(self, method, uri, logon_required=True):
+        """
+        Determine the failure to be injected into an attempt to perform an
+        operation, if any.
+
+        This method is called by the faked session.
+
+        Returns:
+
+          :term:`string`: The kind of failure, or `None` for no failure.
+        """
+        with self._lock:
+            for rule in self._failure_rules:
+                if rule.count == 0 or not rule.matches(method, uri):
+                    continue
+                if rule.value == 'session-expired' and not logon_required:
+                    continue
+                if rule.probability < 1 and \
+                        self._rng.random() >= rule.probability:
+                    continue
+                if rule.count is not None:
+                    rule.count -= 1
+                self._injected[rule.value] += 1
+                return rule.value
+        return None
+
+    def delay(self, method, uri, bytes_transferred=0):
+        """
+        Return the simulated time for an operation, consisting of its
+        latency and the transfer time of its request and response bodies.
+
+        This method is called by the faked session.
+
+        Returns:
+
+          float: The simulated time in seconds.
+        """
+        seconds = 0.0
+        with self._lock:
+            for rule in self._latency_rules:
+                if rule.matches(method, uri):
+                    seconds = self._latency(rule.value)
+                    break
+            if self._bandwidth and bytes_transferred:
+                seconds += float(bytes_transferred) / self._bandwidth
+        return seconds
+
+    def _latency(self, latency):
+        """
+        Return a latency drawn from a latency specification.
+        Must be called with the lock held.
+        """
+        if callable(latency):
+            return max(0.0, float(latency(self._rng)))
+        if isinstance(latency, tuple):
+            return self._rng.uniform(latency[0], latency[1])
+        return float(latency)
+
+    def sleep(self, seconds):
+        """
+        Sleep for the simulated time of an operation.
+
+        This method is called by the faked session.
+        """
+        if seconds > 0:
+            self._sleep(seconds)
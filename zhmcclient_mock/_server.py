@@ -0,0 +1,665 @@
+# Copyright 2017 IBM Corp. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The :class:`~zhmcclient_mock.FakedHmcServer` class provides a local HTTPS
+server that makes a faked HMC available over the wire format of the HMC WS
+API, and a local STOMP server for its notifications. This allows the real
+:class:`zhmcclient.Session` and :class:`zhmcclient.NotificationReceiver`
+classes to be used against a faked HMC, e.g. for load testing end to end
+without access to a real HMC.
+"""
+
+from __future__ import absolute_import
+
+import os
+import ssl
+import json
+import uuid
+import shutil
+import socket
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from six.moves import BaseHTTPServer, socketserver
+
+from ._hmc import FakedHmc
+from ._urihandler import UriHandler, HTTPError, ConnectionError, URIS
+
+__all__ = ['FakedHmcServer']
+
+
+_STOMP_VERSION = '1.1'
+
+
+def _create_certificate(directory):
+    """
+    Create a self-signed certificate for 'localhost' in a directory using the
+    'openssl' command, and return the paths of the certificate and key files.
+    """
+    certfile = os.path.join(directory, 'cert.pem')
+    keyfile = os.path.join(directory, 'key.pem')
+    cmd = ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+           '-days', '1', '-subj', '/CN=localhost',
+           '-keyout', keyfile, '-out', certfile]
+    try:
+        with open(os.devnull, 'w') as devnull:
+            subprocess.check_call(cmd, stdout=devnull, stderr=devnull)
+    except (OSError, subprocess.CalledProcessError) as exc:
+        raise RuntimeError(
+            "Cannot create a self-signed certificate using the 'openssl' "
+            "command: {}. Specify the certfile and keyfile parameters "
+            "instead.".format(exc))
+    return certfile, keyfile
+
+
+def _stomp_escape(value):
+    """
+    Escape a STOMP 1.1 header name or value.
+    """
+    return value.replace('\\', '\\\\').replace('\n', '\\n'). \
+        replace(':', '\\c')
+
+
+def _stomp_frame(command, headers, body=b''):
+    """
+    Return a STOMP frame as a byte string.
+    """
+    lines = [command]
+    for name, value in headers.items():
+        lines.append('{}:{}'.format(_stomp_escape(name),
+                                    _stomp_escape(str(value))))
+    head = ('\n'.join(lines) + '\n\n').encode('utf-8')
+    return head + body + b'\x00'
+
+
+class _HttpServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    Multi-threaded HTTP server of a FakedHmcServer.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, handler_class, hmc_server, ssl_context):
+        BaseHTTPServer.HTTPServer.__init__(self, address, handler_class)
+        self.hmc_server = hmc_server
+        self.ssl_context = ssl_context
+
+    def get_request(self):
+        sock, address = self.socket.accept()
+        sock = self.ssl_context.wrap_socket(sock, server_side=True)
+        return sock, address
+
+
+class _HttpRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Handler for the HTTP requests of a FakedHmcServer.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # pylint: disable=redefined-builtin
+        pass
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def _handle(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        if body is not None and \
+                (self.headers.get('Content-Type') or '').startswith(
+                    'application/json'):
+            body = json.loads(body.decode('utf-8'),
+                              object_pairs_hook=OrderedDict)
+        token = self.headers.get('X-API-Session')
+        try:
+            status, result = self.server.hmc_server._process(
+                method, self.path, token, body)
+        except ConnectionError:
+            # The faked HMC is disabled: Close the connection without a
+            # response.
+            self.close_connection = True
+            return
+        self.send_response(status)
+        if result is None:
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            content = json.dumps(result).encode('utf-8')
+            self.send_header('Content-Type',
+                             'application/json;charset=UTF-8')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+
+class _StompServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Multi-threaded STOMP server of a FakedHmcServer.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, handler_class, hmc_server, ssl_context):
+        socketserver.TCPServer.__init__(self, address, handler_class)
+        self.hmc_server = hmc_server
+        self.ssl_context = ssl_context
+
+    def get_request(self):
+        sock, address = self.socket.accept()
+        sock = self.ssl_context.wrap_socket(sock, server_side=True)
+        return sock, address
+
+
+class _StompRequestHandler(socketserver.BaseRequestHandler):
+    """
+    Handler for a STOMP connection to a FakedHmcServer.
+
+    It supports the subset of STOMP 1.1 that is used by
+    :class:`zhmcclient.NotificationReceiver`.
+    """
+
+    def setup(self):
+        self._buffer = b''
+        self._send_lock = threading.Lock()
+        self._subscriptions = {}  # subscription id -> topic name
+        self._sequence_nr = 0
+
+    def send_frame(self, command, headers, body=b''):
+        frame = _stomp_frame(command, headers, body)
+        with self._send_lock:
+            self.request.sendall(frame)
+
+    def send_message(self, topic, headers, message):
+        """
+        Send a notification message to this connection, if it has
+        subscribed to the topic.
+        """
+        body = json.dumps(message).encode('utf-8')
+        for sub_id, sub_topic in list(self._subscriptions.items()):
+            if sub_topic != topic:
+                continue
+            with self._send_lock:
+                self._sequence_nr += 1
+                seq_nr = self._sequence_nr
+            msg_headers = OrderedDict()
+            msg_headers['destination'] = '/topic/' + topic
+            msg_headers['subscription'] = sub_id
+            msg_headers['message-id'] = '{}-{}'.format(sub_id, seq_nr)
+            msg_headers['session-sequence-nr'] = seq_nr
+            msg_headers.update(headers)
+            msg_headers['content-type'] = 'application/json'
+            msg_headers['content-length'] = len(body)
+            try:
+                self.send_frame('MESSAGE', msg_headers, body)
+            except (socket.error, ValueError):
+                pass  # The connection has been closed
+
+    def _read_frame(self):
+        """
+        Read the next frame and return a tuple (command, headers), or `None`
+        if the connection has been closed. Frame bodies are ignored.
+        """
+        while b'\x00' not in self._buffer:
+            data = self.request.recv(4096)
+            if not data:
+                return None
+            self._buffer += data
+        frame, self._buffer = self._buffer.split(b'\x00', 1)
+        lines = frame.decode('utf-8').lstrip('\r\n').split('\n')
+        command = lines[0].strip()
+        headers = {}
+        for line in lines[1:]:
+            line = line.rstrip('\r')
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers.setdefault(name, value)
+        return command, headers
+
+    def handle(self):
+        hmc_server = self.server.hmc_server
+        try:
+            while True:
+                frame = self._read_frame()
+                if frame is None:
+                    break
+                command, headers = frame
+                if command in ('CONNECT', 'STOMP'):
+                    self.send_frame('CONNECTED', OrderedDict([
+                        ('version', _STOMP_VERSION),
+                        ('heart-beat', '0,0'),
+                        ('server', 'zhmcclient_mock'),
+                    ]))
+                    hmc_server._add_stomp_connection(self)
+                elif command == 'SUBSCRIBE':
+                    topic = headers.get('destination', '')
+                    if topic.startswith('/topic/'):
+                        topic = topic[len('/topic/'):]
+                    self._subscriptions[headers.get('id')] = topic
+                elif command == 'UNSUBSCRIBE':
+                    self._subscriptions.pop(headers.get('id'), None)
+                # After a DISCONNECT, the client closes the connection when
+                # it receives the receipt.
+                if 'receipt' in headers:
+                    self.send_frame('RECEIPT', {
+                        'receipt-id': headers['receipt']})
+        except (socket.error, ValueError):
+            pass  # The connection has been closed
+        finally:
+            hmc_server._remove_stomp_connection(self)
+
+
+class FakedHmcServer(object):
+    """
+    A local HTTPS server for a faked HMC (see
+    :class:`~zhmcclient_mock.FakedHmc`), that implements the wire format of
+    the HMC WS API, and optionally a STOMP server for its notifications.
+
+    In contrast to :class:`~zhmcclient_mock.FakedSession`, which dispatches
+    the operations of the zhmcclient API directly to the faked HMC, this
+    server is used with the real :class:`zhmcclient.Session` and
+    :class:`zhmcclient.NotificationReceiver` classes. The operations
+    therefore pass through the complete HTTP, TLS and JSON processing, which
+    makes it suitable for load testing code that uses the zhmcclient package
+    end to end, on a single system.
+
+    The server emulates the following behavior of a real HMC:
+
+    * Logon and logoff: Any userid and password are accepted. The API
+      session token is required for all other operations, except for
+      "Query API Version". Unknown API session tokens are rejected with
+      HTTP status 403 and reason code 5, so a :class:`zhmcclient.Session`
+      re-logs on (e.g. after :meth:`expire_sessions`).
+
+    * Asynchronous operations (e.g. "Start Partition"): The server returns
+      HTTP status 202 with the URI of a job of the faked HMC (see
+      :class:`~zhmcclient_mock.FakedJobManager`). The job completes when the
+      duration of the operation (see ``hmc.jobs.durations``) has passed on
+      the virtual clock of the faked HMC (see ``hmc.clock``). The server
+      completes the due jobs periodically, and if a STOMP server is enabled,
+      sends a job completion notification on the job notification topic of
+      the API session when a job completes.
+
+    * Notifications: The STOMP server supports the operations used by
+      :class:`zhmcclient.NotificationReceiver`. Notifications can be sent
+      using :meth:`send_notification`.
+
+    The server handles each HTTP request in its own thread, so operations
+    against the faked HMC are performed concurrently. Each operation holds
+    the reader-writer lock of the faked HMC (see
+    :attr:`zhmcclient_mock.FakedHmc.lock`) for reading if it is a GET
+    operation and for writing otherwise, so that it sees and leaves a
+    consistent state of the faked HMC.
+
+    The server listens on the loopback interface by default. Since the
+    :class:`zhmcclient.Session` class always uses HTTPS, the server always
+    uses TLS. If no certificate is specified, a temporary self-signed
+    certificate is created using the ``openssl`` command.
+
+    Example::
+
+        with zhmcclient_mock.FakedHmcServer(hmc) as server:
+            session = zhmcclient.Session(
+                server.host, 'user', 'password', port=server.port)
+            client = zhmcclient.Client(session)
+            cpcs = client.cpcs.list()
+
+            receiver = zhmcclient.NotificationReceiver(
+                topic, server.host, 'user', 'password',
+                port=server.stomp_port)
+    """
+
+    def __init__(self, hmc=None, host='127.0.0.1', port=0, stomp_port=0,
+                 certfile=None, keyfile=None):
+        """
+        Parameters:
+
+          hmc (:class:`~zhmcclient_mock.FakedHmc`): The faked HMC that is
+            served. `None` causes an empty faked HMC to be created.
+
+          host (:term:`string`): IP address or host name of the interface
+            the servers listen on.
+
+          port (:term:`integer`): Port of the HTTPS server. 0 causes a free
+            port to be chosen when the server is started.
+
+          stomp_port (:term:`integer`): Port of the STOMP server. 0 causes a
+            free port to be chosen when the server is started. `None`
+            disables the STOMP server.
+
+          certfile (:term:`string`): Path name of the PEM file with the
+            server certificate. `None` causes a temporary self-signed
+            certificate to be created.
+
+          keyfile (:term:`string`): Path name of the PEM file with the
+            private key of the server certificate, if it is not contained
+            in `certfile`.
+        """
+        if hmc is None:
+            hmc = FakedHmc('fake-hmc', '2.13.1', '1.8')
+        self._hmc = hmc
+        self._host = host
+        self._port = port
+        self._stomp_port = stomp_port
+        self._certfile = certfile
+        self._keyfile = keyfile
+        self._urihandler = UriHandler(URIS)
+        # Serializes the access to the sessions and STOMP connections.
+        # The operations against the faked HMC are performed concurrently,
+        # using the lock of the faked HMC.
+        self._lock = threading.RLock()
+        self._sessions = {}  # API session token -> dict with topic names
+        self._stomp_connections = set()
+        self._tempdir = None
+        self._http_server = None
+        self._stomp_server = None
+        self._threads = []
+        self._stopping = threading.Event()
+
+    def __repr__(self):
+        """
+        Return a string with the state of this server, for debug purposes.
+        """
+        ret = (
+            "{classname} at 0x{id:08x} (\n"
+            "  _hmc = {_hmc_classname} at 0x{_hmc_id:08x}\n"
+            "  _host = {_host!r}\n"
+            "  _port = {_port!r}\n"
+            "  _stomp_port = {_stomp_port!r}\n"
+            "  started = {started!r}\n"
+            ")".format(
+                classname=self.__class__.__name__,
+                id=id(self),
+                _hmc_classname=self._hmc.__class__.__name__,
+                _hmc_id=id(self._hmc),
+                _host=self._host,
+                _port=self._port,
+                _stomp_port=self._stomp_port,
+                started=self.started,
+            ))
+        return ret
+
+    @property
+    def hmc(self):
+        """
+        :class:`~zhmcclient_mock.FakedHmc`: The faked HMC served by this
+        server.
+        """
+        return self._hmc
+
+    @property
+    def host(self):
+        """
+        :term:`string`: IP address or host name of the interface the servers
+        listen on.
+        """
+        return self._host
+
+    @property
+    def port(self):
+        """
+        :term:`integer`: Port of the HTTPS server. If the port was specified
+        as 0, this is the actually used port once the server is started.
+        """
+        return self._port
+
+    @property
+    def stomp_port(self):
+        """
+        :term:`integer`: Port of the STOMP server, or `None` if the STOMP
+        server is disabled. If the port was specified as 0, this is the
+        actually used port once the server is started.
+        """
+        return self._stomp_port
+
+    @property
+    def started(self):
+        """
+        bool: Indicates whether the server is started.
+        """
+        return self._http_server is not None
+
+    def start(self):
+        """
+        Start the HTTPS server and the STOMP server in background threads.
+        """
+        if self.started:
+            return
+        certfile, keyfile = self._certfile, self._keyfile
+        if certfile is None:
+            self._tempdir = tempfile.mkdtemp(prefix='zhmcclient_mock_')
+            certfile, keyfile = _create_certificate(self._tempdir)
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        ssl_context.load_cert_chain(certfile, keyfile)
+
+        self._http_server = _HttpServer(
+            (self._host, self._port), _HttpRequestHandler, self,
+            ssl_context)
+        self._port = self._http_server.server_address[1]
+        servers = [self._http_server]
+        if self._stomp_port is not None:
+            self._stomp_server = _StompServer(
+                (self._host, self._stomp_port), _StompRequestHandler, self,
+                ssl_context)
+            self._stomp_port = self._stomp_server.server_address[1]
+            servers.append(self._stomp_server)
+        self._stopping.clear()
+        self._hmc.jobs.add_completion_callback(self._job_completed)
+        targets = [(server.serve_forever, dict(poll_interval=0.1))
+                   for server in servers]
+        targets.append((self._process_jobs, {}))
+        for target, kwargs in targets:
+            thread = threading.Thread(target=target, kwargs=kwargs)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """
+        Stop the servers and close the open STOMP connections.
+        """
+        if not self.started:
+            return
+        for server in (self._http_server, self._stomp_server):
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join()
+        with self._lock:
+            connections = list(self._stomp_connections)
+        for conn in connections:
+            try:
+                conn.request.shutdown(socket.SHUT_RDWR)
+            except (socket.error, ValueError):
+                pass
+        self._hmc.jobs.remove_completion_callback(self._job_completed)
+        self._http_server = None
+        self._stomp_server = None
+        self._threads = []
+        if self._tempdir is not None:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            self._tempdir = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def expire_sessions(self):
+        """
+        Invalidate all API session tokens, as if they had expired.
+        """
+        with self._lock:
+            self._sessions.clear()
+
+    def send_notification(self, topic, headers, message):
+        """
+        Send a notification message to the STOMP connections that have
+        subscribed to a topic.
+
+        Parameters:
+
+          topic (:term:`string`): Name of the notification topic.
+
+          headers (dict): JMS headers of the notification (e.g.
+            'notification-type').
+
+          message: JSON-serializable object that is the message body.
+        """
+        with self._lock:
+            connections = list(self._stomp_connections)
+        for conn in connections:
+            conn.send_message(topic, headers, message)
+
+    def _process_jobs(self):
+        """
+        Complete the due jobs of the faked HMC periodically, so that their
+        job completion notifications are sent without waiting for the next
+        request.
+        """
+        while not self._stopping.wait(0.1):
+            self._hmc.jobs.process()
+
+    def _job_completed(self, job):
+        """
+        Send the job completion notification for a completed job of the
+        faked HMC.
+        """
+        if job.notification_topic is not None:
+            self.send_notification(
+                job.notification_topic,
+                {'notification-type': 'job-completion', 'job-uri': job.uri},
+                {})
+
+    def _add_stomp_connection(self, conn):
+        with self._lock:
+            self._stomp_connections.add(conn)
+
+    def _remove_stomp_connection(self, conn):
+        with self._lock:
+            self._stomp_connections.discard(conn)
+
+    def _process(self, method, uri, token, body):
+        """
+        Process an HTTP request and return a tuple (status, result), where
+        result is the JSON-serializable response body or `None`.
+
+        Raises ConnectionError if the faked HMC is disabled.
+        """
+        try:
+            return self._process_request(method, uri, token, body)
+        except HTTPError as exc:
+            return exc.http_status, exc.response()
+        except ConnectionError:
+            raise
+        except Exception as exc:  # pylint: disable=broad-except
+            return 500, {
+                'request-method': method,
+                'request-uri': uri,
+                'http-status': 500,
+                'reason': 0,
+                'message': "{}: {}".format(exc.__class__.__name__, exc),
+            }
+
+    def _process_request(self, method, uri, token, body):
+        hmc = self._hmc
+        if not hmc.enabled:
+            raise ConnectionError("HMC is not enabled.")
+
+        if method == 'POST' and uri == '/api/sessions':
+            return 200, self._logon()
+        if uri == '/api/version':
+            return 200, self._urihandler.get(hmc, uri, False)
+
+        with self._lock:
+            if token is None:
+                raise HTTPError(method, uri, 403, 4,
+                                "No API session token specified")
+            if token not in self._sessions:
+                raise HTTPError(method, uri, 403, 5,
+                                "API session token expired")
+            session = self._sessions[token]
+
+            if uri == '/api/sessions/this-session' and method == 'DELETE':
+                del self._sessions[token]
+                return 204, None
+            if uri == '/api/sessions/operations/get-notification-topics' \
+                    and method == 'GET':
+                return 200, {'topics': [
+                    {'topic-type': 'object-notification',
+                     'topic-name': session['notification-topic']},
+                    {'topic-type': 'job-notification',
+                     'topic-name': session['job-notification-topic']},
+                ]}
+
+        if method == 'GET':
+            # The result may be the properties of a faked resource, so it is
+            # copied before other threads can change them. The due jobs are
+            # completed first, because that is not possible while holding
+            # the lock for reading.
+            hmc.jobs.process()
+            with hmc.lock.read():
+                result = self._urihandler.get(hmc, uri, True)
+                if isinstance(result, dict):
+                    result = dict(result)
+        elif method == 'POST':
+            handler_class, _ = self._urihandler.handler(uri, method)
+            if getattr(handler_class, 'asynchronous', False):
+                # The job is created with the job notification topic of the
+                # session, for its job completion notification
+                hmc.jobs.process()
+                job = hmc.jobs.start_job(
+                    method, uri,
+                    lambda: self._urihandler.post(hmc, uri, body, True, True),
+                    notification_topic=session['job-notification-topic'])
+                return 202, {'job-uri': job.uri}
+            result = self._urihandler.post(hmc, uri, body, True, True)
+        else:
+            result = self._urihandler.delete(hmc, uri, True)
+
+        return (204, None) if result is None else (200, result)
+
+    def _logon(self):
+        """
+        Create a new API session and return the response body of the
+        "Logon" operation.
+        """
+        token = uuid.uuid4().hex
+        session = {
+            'notification-topic': 'faked-topic.{}.obj'.format(token),
+            'job-notification-topic': 'faked-topic.{}.job'.format(token),
+        }
+        with self._lock:
+            self._sessions[token] = session
+        api_major, api_minor = self._hmc.api_version.split('.')
+        result = {
+            'api-session': token,
+            'api-major-version': int(api_major),
+            'api-minor-version': int(api_minor),
+        }
+        result.update(session)
+        return result
@@ -18,6 +18,8 @@ A faked Session class for the zhmcclient package.
 
 from __future__ import absolute_import
 
+import json
+
 import zhmcclient
 
 from ._hmc import FakedHmc
@@ -26,6 +28,15 @@ from ._urihandler import UriHandler, HTTPError, ConnectionError, URIS
 __all__ = ['FakedSession']
 
 
+def _json_size(obj):
+    """
+    Return the size of the JSON representation of an object, in bytes.
+    """
+    if obj is None:
+        return 0
+    return len(json.dumps(obj))
+
+
 class FakedSession(zhmcclient.Session):
     """
     A faked Session class for the zhmcclient package, that can be used as a
@@ -47,9 +58,13 @@ class FakedSession(zhmcclient.Session):
 
     It is possible to populate the faked HMC with an initial resource state
     (see :meth:`~zhmcclient_mock.FakedHmc.add_resources`).
+
+    Latency and failures can be injected into the operations, using a
+    fault injector (see :class:`~zhmcclient_mock.FaultInjector`).
     """
 
-    def __init__(self, host, hmc_name, hmc_version, api_version):
+    def __init__(self, host, hmc_name, hmc_version, api_version,
+                 retry_timeout_config=None, fault_injector=None):
         """
         Parameters:
 
@@ -66,10 +81,21 @@ class FakedSession(zhmcclient.Session):
           api_version (:term:`string`):
             HMC API version string (e.g. '1.8'). Used for result of
             Query Version Info operation.
+
+          retry_timeout_config (:class:`~zhmcclient.RetryTimeoutConfig`):
+            The retry/timeout configuration for this session, see
+            :class:`zhmcclient.Session`. It is used by the faked session only
+            when failures are injected.
+
+          fault_injector (:class:`~zhmcclient_mock.FaultInjector`):
+            The fault injector for this session. `None` means that no
+            latency and failures are injected.
         """
-        super(FakedSession, self).__init__(host)
+        super(FakedSession, self).__init__(
+            host, retry_timeout_config=retry_timeout_config)
         self._hmc = FakedHmc(hmc_name, hmc_version, api_version)
         self._urihandler = UriHandler(URIS)
+        self._fault_injector = fault_injector
 
     def __repr__(self):
         """
@@ -89,6 +115,7 @@ class FakedSession(zhmcclient.Session):
             "  _session = {s._session!r}\n"
             "  _hmc = {hmc_classname} at 0x{hmc_id:08x}\n"
             "  _urihandler = {s._urihandler!r}\n"
+            "  _fault_injector = {s._fault_injector!r}\n"
             ")".format(
                 classname=self.__class__.__name__,
                 id=id(self),
@@ -115,6 +142,20 @@ class FakedSession(zhmcclient.Session):
         """
         return self._hmc
 
+    @property
+    def fault_injector(self):
+        """
+        :class:`~zhmcclient_mock.FaultInjector`: The fault injector for this
+        faked session, or `None` if no latency and failures are injected.
+
+        This property can be set.
+        """
+        return self._fault_injector
+
+    @fault_injector.setter
+    def fault_injector(self, fault_injector):
+        self._fault_injector = fault_injector
+
     def get(self, uri, logon_required=True):
         """
         Perform the HTTP GET method against the resource identified by a URI,
@@ -146,12 +187,17 @@ class FakedSession(zhmcclient.Session):
           :exc:`~zhmcclient.AuthError` (not implemented)
           :exc:`~zhmcclient.ConnectionError`
         """
-        try:
-            return self._urihandler.get(self._hmc, uri, logon_required)
-        except HTTPError as exc:
-            raise zhmcclient.HTTPError(exc.response())
-        except ConnectionError as exc:
-            raise zhmcclient.ConnectionError(exc.message, None)
+        def get():
+            # The result may be the properties of a faked resource, so it is
+            # copied before other threads can change them. The due jobs are
+            # completed first, because that is not possible while holding
+            # the lock for reading.
+            self._hmc.jobs.process()
+            with self._hmc.lock.read():
+                result = self._urihandler.get(self._hmc, uri, logon_required)
+                return dict(result) if isinstance(result, dict) else result
+
+        return self._faked_request('GET', uri, None, logon_required, get)
 
     def post(self, uri, body=None, logon_required=True,
              wait_for_completion=True, operation_timeout=None):
@@ -240,10 +286,10 @@ class FakedSession(zhmcclient.Session):
             is returned.
 
             If `wait_for_completion` is `False`, returns a JSON object
-            representing the response body of the synchronous or asynchronous
-            operation. In case of an asynchronous operation, the JSON object
-            will have a member named ``job-uri``, whose value can be used with
-            the :meth:`~zhmcclient.Session.query_job_status` method to
+            representing the response body of a synchronous operation, or a
+            :class:`~zhmcclient.Job` object for the faked job of an
+            asynchronous operation (see
+            :class:`~zhmcclient_mock.FakedJobManager`), that can be used to
             determine the status of the job and the result of the original
             operation, once the job has completed.
 
@@ -258,13 +304,14 @@ class FakedSession(zhmcclient.Session):
           :exc:`~zhmcclient.AuthError` (not implemented)
           :exc:`~zhmcclient.ConnectionError`
         """
-        try:
-            return self._urihandler.post(self._hmc, uri, body, logon_required,
-                                         wait_for_completion)
-        except HTTPError as exc:
-            raise zhmcclient.HTTPError(exc.response())
-        except ConnectionError as exc:
-            raise zhmcclient.ConnectionError(exc.message, None)
+        result = self._faked_request(
+            'POST', uri, body, logon_required,
+            lambda: self._urihandler.post(self._hmc, uri, body,
+                                          logon_required, wait_for_completion))
+        if not wait_for_completion and isinstance(result, dict) and \
+                'job-uri' in result:
+            return zhmcclient.Job(self, result['job-uri'], 'POST', uri)
+        return result
 
     def delete(self, uri, logon_required=True):
         """
@@ -295,8 +342,57 @@ class FakedSession(zhmcclient.Session):
           :exc:`~zhmcclient.AuthError` (not implemented)
           :exc:`~zhmcclient.ConnectionError`
         """
+        self._faked_request(
+            'DELETE', uri, None, logon_required,
+            lambda: self._urihandler.delete(self._hmc, uri, logon_required))
+
+    def _faked_request(self, method, uri, body, logon_required, func):
+        """
+        Perform an operation against the faked HMC by calling a function
+        that invokes the URI handler, and return its result.
+
+        If a fault injector is set, its latency and failures are injected,
+        and the injected failures are handled the same way as
+        :class:`zhmcclient.Session` handles the corresponding real failures.
+        """
         try:
-            self._urihandler.delete(self._hmc, uri, logon_required)
+            injector = self._fault_injector
+            if injector is None:
+                return func()
+            request_size = _json_size(body) if injector.bandwidth else 0
+            retries = 0
+            while True:
+                failure = injector.failure(method, uri, logon_required)
+                if failure is None:
+                    try:
+                        result = func()
+                    except (HTTPError, ConnectionError):
+                        injector.sleep(
+                            injector.delay(method, uri, request_size))
+                        raise
+                    response_size = _json_size(result) \
+                        if injector.bandwidth else 0
+                    injector.sleep(injector.delay(
+                        method, uri, request_size + response_size))
+                    return result
+                injector.sleep(injector.delay(method, uri, request_size))
+                if failure == 'session-expired':
+                    # API session token expired: re-logon and retry
+                    self._faked_request(
+                        'POST', '/api/sessions', None, False,
+                        lambda: {'api-session': self._session_id})
+                elif failure == 'connection-reset':
+                    # Like the HTTP adapter of the session, only operations
+                    # with the methods in the whitelist are retried
+                    if method not in \
+                            self.retry_timeout_config.method_whitelist or \
+                            retries >= self.retry_timeout_config.read_retries:
+                        raise ConnectionError(
+                            "Connection reset by peer (injected failure)")
+                    retries += 1
+                else:
+                    raise HTTPError(method, uri, 503, 1,
+                                    "Service unavailable (injected failure)")
         except HTTPError as exc:
             raise zhmcclient.HTTPError(exc.response())
         except ConnectionError as exc:
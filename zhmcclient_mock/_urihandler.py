@@ -26,9 +26,11 @@ from __future__ import absolute_import
 import re
 import time
 import copy
+from operator import itemgetter
 from requests.utils import unquote
 
 from ._hmc import InputError
+from zhmcclient._utils import is_literal_match
 
 __all__ = ['UriHandler', 'LparActivateHandler', 'LparDeactivateHandler',
            'LparLoadHandler', 'HTTPError', 'URIS']
@@ -303,26 +305,113 @@ def check_partition_status(method, uri, partition, valid_statuses=None,
                                 format(partition.name, status))
 
 
+# URI pattern for a path segment with an ID, that is indexed as a wildcard
+_ANY_SEGMENT = '([^/]+)'
+
+# Maximum number of URIs whose resolution is cached by a UriHandler object
+_HANDLER_CACHE_SIZE = 10000
+
+
 class UriHandler(object):
     """
     Handle HTTP methods against a set of known URIs and invoke respective
     handlers.
+
+    The URI patterns are indexed by their leading path segments that are
+    literal or that match any single path segment, so that resolving a URI
+    only needs to match the URI patterns whose indexed path segments match
+    the URI, in their original order. In addition, the resolutions of URIs
+    are cached.
+
+    The handlers are invoked with the lock of the faked HMC (see
+    :attr:`zhmcclient_mock.FakedHmc.lock`) held for reading for GET and for
+    writing for all other HTTP methods, so that the URI handler can be used
+    by multiple threads concurrently.
+
+    The handlers of asynchronous operations have a class attribute
+    ``asynchronous`` that is `True`. When such an operation is performed
+    without waiting for its completion, the operation is performed by a
+    faked job (see :meth:`zhmcclient_mock.FakedJobManager.start_job`), and
+    the URI of the job is returned. The jobs whose durations have passed are
+    completed before each operation is handled.
     """
 
     def __init__(self, uris):
-        self._uri_handlers = []  # tuple of (regexp-pattern, handler-name)
-        for uri, handler_class in uris:
+        # Trie of dicts by indexed path segment. The item with key None of a
+        # trie node is the list of (index, regexp-pattern, handler-class)
+        # tuples of the URI patterns whose indexed path segments lead to
+        # that node.
+        self._uri_index = {}
+        # URI -> tuple(handler-class, uri-parms), or None for unknown URIs
+        self._handler_cache = {}
+        for index, (uri, handler_class) in enumerate(uris):
             uri_pattern = re.compile('^' + uri + '$')
-            tup = (uri_pattern, handler_class)
-            self._uri_handlers.append(tup)
+            node = self._uri_index
+            for segment in self._index_segments(uri):
+                node = node.setdefault(segment, {})
+            node.setdefault(None, []).append(
+                (index, uri_pattern, handler_class))
+
+    @staticmethod
+    def _index_segments(uri):
+        """
+        Return the leading path segments of a URI pattern that are literal
+        or that match any single path segment, and that are followed by '/'
+        or by the end of the URI.
+        """
+        if '|' in uri:
+            # An alternative may start anywhere
+            return []
+        segments = []
+        # The '/' within the ID pattern must not split path segments
+        for segment in uri.replace(_ANY_SEGMENT, '\0').split('/'):
+            if segment == '\0':
+                segment = _ANY_SEGMENT
+            elif '\0' in segment or not is_literal_match(segment):
+                if segment[0] in '*+?{' and segments:
+                    # The quantifier applies to the preceding '/'
+                    segments.pop()
+                break
+            segments.append(segment)
+        return segments
 
     def handler(self, uri, method):
-        for uri_pattern, handler_class in self._uri_handlers:
+        try:
+            result = self._handler_cache[uri]
+        except KeyError:
+            result = self._lookup(uri)
+            if len(self._handler_cache) >= _HANDLER_CACHE_SIZE:
+                self._handler_cache.clear()
+            self._handler_cache[uri] = result
+        if result is None:
+            raise InvalidResourceError(method, uri)
+        return result
+
+    def _lookup(self, uri):
+        """
+        Return a tuple(handler-class, uri-parms) for the first URI pattern
+        that matches a URI, or None if no URI pattern matches.
+        """
+        candidates = []
+        nodes = [self._uri_index]
+        for segment in uri.split('/'):
+            children = []
+            for node in nodes:
+                candidates.extend(node.get(None, []))
+                if segment in node:
+                    children.append(node[segment])
+                if segment and _ANY_SEGMENT in node:
+                    children.append(node[_ANY_SEGMENT])
+            nodes = children
+        for node in nodes:
+            candidates.extend(node.get(None, []))
+        candidates.sort(key=itemgetter(0))
+        for _, uri_pattern, handler_class in candidates:
             m = uri_pattern.match(uri)
             if m:
                 uri_parms = m.groups()
                 return handler_class, uri_parms
-        raise InvalidResourceError(method, uri)
+        return None
 
     def get(self, hmc, uri, logon_required):
         if not hmc.enabled:
@@ -330,7 +419,10 @@ class UriHandler(object):
         handler_class, uri_parms = self.handler(uri, 'GET')
         if not getattr(handler_class, 'get', None):
             raise InvalidMethodError('GET', uri, handler_class)
-        return handler_class.get('GET', hmc, uri, uri_parms, logon_required)
+        hmc.jobs.process()
+        with hmc.lock.read():
+            return handler_class.get('GET', hmc, uri, uri_parms,
+                                     logon_required)
 
     def post(self, hmc, uri, body, logon_required, wait_for_completion):
         if not hmc.enabled:
@@ -338,8 +430,17 @@ class UriHandler(object):
         handler_class, uri_parms = self.handler(uri, 'POST')
         if not getattr(handler_class, 'post', None):
             raise InvalidMethodError('POST', uri, handler_class)
-        return handler_class.post('POST', hmc, uri, uri_parms, body,
-                                  logon_required, wait_for_completion)
+        hmc.jobs.process()
+        if not wait_for_completion and \
+                getattr(handler_class, 'asynchronous', False):
+            job = hmc.jobs.start_job(
+                'POST', uri,
+                lambda: handler_class.post('POST', hmc, uri, uri_parms, body,
+                                           logon_required, True))
+            return {'job-uri': job.uri}
+        with hmc.lock.write():
+            return handler_class.post('POST', hmc, uri, uri_parms, body,
+                                      logon_required, wait_for_completion)
 
     def delete(self, hmc, uri, logon_required):
         if not hmc.enabled:
@@ -347,7 +448,10 @@ class UriHandler(object):
         handler_class, uri_parms = self.handler(uri, 'DELETE')
         if not getattr(handler_class, 'delete', None):
             raise InvalidMethodError('DELETE', uri, handler_class)
-        handler_class.delete('DELETE', hmc, uri, uri_parms, logon_required)
+        hmc.jobs.process()
+        with hmc.lock.write():
+            handler_class.delete('DELETE', hmc, uri, uri_parms,
+                                 logon_required)
 
 
 class GenericGetPropertiesHandler(object):
@@ -401,6 +505,35 @@ class VersionHandler(object):
         }
 
 
+class JobHandler(object):
+
+    @staticmethod
+    def get(method, hmc, uri, uri_parms, logon_required):
+        """Operation: Query Job Status."""
+        try:
+            job = hmc.jobs.lookup_by_oid(uri_parms[0])
+        except KeyError:
+            raise InvalidResourceError(method, uri)
+        result = {}
+        for prop_name in ('status', 'job-status-code', 'job-reason-code',
+                          'job-results'):
+            if prop_name in job.properties:
+                result[prop_name] = job.properties[prop_name]
+        return result
+
+    @staticmethod
+    def delete(method, hmc, uri, uri_parms, logon_required):
+        """Operation: Delete Completed Job Status."""
+        try:
+            job = hmc.jobs.lookup_by_oid(uri_parms[0])
+        except KeyError:
+            raise InvalidResourceError(method, uri)
+        if job.properties['status'] != 'complete':
+            raise ConflictError(method, uri, reason=40,
+                                message="The job is not complete: %s" % uri)
+        hmc.jobs.remove(job.oid)
+
+
 class ConsoleHandler(GenericGetPropertiesHandler):
     pass
 
@@ -947,11 +1080,14 @@ class CpcHandler(GenericGetPropertiesHandler,
 
 class CpcSetPowerSaveHandler(object):
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Set CPC Power Save (any CPC mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         cpc_oid = uri_parms[0]
         try:
             cpc = hmc.cpcs.lookup_by_oid(cpc_oid)
@@ -973,11 +1109,14 @@ class CpcSetPowerSaveHandler(object):
 
 class CpcSetPowerCappingHandler(object):
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Set CPC Power Capping (any CPC mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         cpc_oid = uri_parms[0]
         try:
             cpc = hmc.cpcs.lookup_by_oid(cpc_oid)
@@ -1089,11 +1228,14 @@ class CpcGetEnergyManagementDataHandler(object):
 
 class CpcStartHandler(object):
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Start CPC (requires DPM mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         cpc_oid = uri_parms[0]
         try:
             cpc = hmc.cpcs.lookup_by_oid(cpc_oid)
@@ -1106,11 +1248,14 @@ class CpcStartHandler(object):
 
 class CpcStopHandler(object):
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Stop CPC (requires DPM mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         cpc_oid = uri_parms[0]
         try:
             cpc = hmc.cpcs.lookup_by_oid(cpc_oid)
@@ -1478,11 +1623,14 @@ class PartitionHandler(GenericGetPropertiesHandler,
 
 class PartitionStartHandler(object):
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Start Partition (requires DPM mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         partition_oid = uri_parms[0]
         partition_uri = '/api/partitions/' + partition_oid
         try:
@@ -1502,11 +1650,14 @@ class PartitionStartHandler(object):
 
 class PartitionStopHandler(object):
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Stop Partition (requires DPM mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         partition_oid = uri_parms[0]
         partition_uri = '/api/partitions/' + partition_oid
         try:
@@ -1530,11 +1681,14 @@ class PartitionStopHandler(object):
 
 class PartitionScsiDumpHandler(object):
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Dump Partition (requires DPM mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         partition_oid = uri_parms[0]
         partition_uri = '/api/partitions/' + partition_oid
         try:
@@ -1558,11 +1712,14 @@ class PartitionScsiDumpHandler(object):
 
 class PartitionPswRestartHandler(object):
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Perform PSW Restart (requires DPM mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         partition_oid = uri_parms[0]
         partition_uri = '/api/partitions/' + partition_oid
         try:
@@ -2319,6 +2476,9 @@ class LparActivateHandler(object):
     A handler class for the "Activate Logical Partition" operation.
     """
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def get_status():
         """
@@ -2335,7 +2495,7 @@ class LparActivateHandler(object):
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Activate Logical Partition (requires classic mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         lpar_oid = uri_parms[0]
         lpar_uri = '/api/logical-partitions/' + lpar_oid
         try:
@@ -2379,6 +2539,9 @@ class LparDeactivateHandler(object):
     A handler class for the "Deactivate Logical Partition" operation.
     """
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def get_status():
         """
@@ -2395,7 +2558,7 @@ class LparDeactivateHandler(object):
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Deactivate Logical Partition (requires classic mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         lpar_oid = uri_parms[0]
         lpar_uri = '/api/logical-partitions/' + lpar_oid
         try:
@@ -2432,6 +2595,9 @@ class LparLoadHandler(object):
     A handler class for the "Load Logical Partition" operation.
     """
 
+    # The operation is asynchronous, see UriHandler.post()
+    asynchronous = True
+
     @staticmethod
     def get_status():
         """
@@ -2447,7 +2613,7 @@ class LparLoadHandler(object):
     def post(method, hmc, uri, uri_parms, body, logon_required,
              wait_for_completion):
         """Operation: Load Logical Partition (requires classic mode)."""
-        assert wait_for_completion is True  # async not supported yet
+        assert wait_for_completion is True  # jobs are created by caller
         lpar_oid = uri_parms[0]
         lpar_uri = '/api/logical-partitions/' + lpar_oid
         try:
@@ -2605,6 +2771,8 @@ URIS = (
 
     (r'/api/version', VersionHandler),
 
+    (r'/api/jobs/([^/]+)', JobHandler),
+
     (r'/api/console', ConsoleHandler),
     (r'/api/console/operations/restart', ConsoleRestartHandler),
     (r'/api/console/operations/shutdown', ConsoleShutdownHandler),